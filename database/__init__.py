@@ -58,6 +58,7 @@ from .models import (
     Preisvorschlag,
     PreisHistorie,
     MarktDaten,
+    MarktReferenzPreis,
     # Dokumente
     Dokument,
     # Analytics
@@ -86,6 +87,7 @@ from .models import (
 # Verbindungsfunktionen exportieren
 from .connection import (
     get_engine,
+    get_engine_for_url,
     get_session,
     get_session_no_commit,
     get_session_factory,
@@ -96,24 +98,60 @@ from .connection import (
     run_migration,
     backup_table,
     get_db_session_for_request,
+    release_db_session,
     close_db_session,
+    db_request_scope,
+    get_pool_metrics,
     health_check,
 )
 
+# Interaktions-Writer exportieren
+from .tracking import (
+    InteraktionsWriter,
+    get_interaktions_writer,
+)
+
+# Bulk-Migration exportieren
+from .migration import (
+    BulkErgebnis,
+    MigrationsErgebnis,
+    bulk_insert_neue,
+    bulk_migriere,
+    migration_uuid,
+    db_enum,
+    dialect_insert,
+)
+
+# Lookup-Cache exportieren
+from .cache import (
+    LookupCache,
+    cached_lookup,
+    invalidiere,
+    tabellen_version,
+    get_cache_stats,
+    leere_caches,
+)
+
 # Services exportieren
 from .services import (
     # Nutzer
     create_nutzer,
     get_nutzer_by_email,
     get_nutzer_by_id,
+    get_notar_profil_id,
     authenticate_nutzer,
     update_nutzer_last_login,
     # Interaktionen
     track_interaktion,
+    track_interaktion_async,
     get_interaktionen_stats,
     # Projekte
     create_projekt,
     get_projekte_by_nutzer,
+    # Seitenweises Laden
+    get_sichtbare_projekt_ids,
+    iter_nutzer,
+    iter_projekte,
     # Preisverhandlung
     create_preisvorschlag,
     respond_to_preisvorschlag,
@@ -121,6 +159,8 @@ from .services import (
     # ML/Preis-Analyse
     get_preis_training_data,
     get_markt_referenzpreise,
+    create_preis_historie,
+    aktualisiere_markt_referenzpreise,
     # Dokumente
     create_dokument,
     update_dokument_ocr,
@@ -128,6 +168,11 @@ from .services import (
     create_benachrichtigung,
     get_ungelesene_benachrichtigungen,
     mark_benachrichtigung_gelesen,
+    # Bibliothek genereller Bausteine
+    get_generic_block_library_eintraege,
+    # Urkundenparser-Ergebnisse
+    speichere_parser_ergebnis,
+    lade_parser_ergebnis,
 )
 
 __version__ = "1.1.0"
@@ -163,6 +208,7 @@ __all__ = [
     "Preisvorschlag",
     "PreisHistorie",
     "MarktDaten",
+    "MarktReferenzPreis",
     "Dokument",
     "Interaktion",
     "Benachrichtigung",
@@ -185,6 +231,7 @@ __all__ = [
     "GenericBlockLibrary",
     # Connection functions
     "get_engine",
+    "get_engine_for_url",
     "get_session",
     "get_session_no_commit",
     "get_session_factory",
@@ -195,26 +242,57 @@ __all__ = [
     "run_migration",
     "backup_table",
     "get_db_session_for_request",
+    "release_db_session",
     "close_db_session",
+    "db_request_scope",
+    "get_pool_metrics",
     "health_check",
+    # Migration
+    "BulkErgebnis",
+    "MigrationsErgebnis",
+    "bulk_insert_neue",
+    "bulk_migriere",
+    "migration_uuid",
+    "db_enum",
+    "dialect_insert",
+    # Tracking
+    "InteraktionsWriter",
+    "get_interaktions_writer",
+    # Lookup-Cache
+    "LookupCache",
+    "cached_lookup",
+    "invalidiere",
+    "tabellen_version",
+    "get_cache_stats",
+    "leere_caches",
     # Services
     "create_nutzer",
     "get_nutzer_by_email",
     "get_nutzer_by_id",
+    "get_notar_profil_id",
     "authenticate_nutzer",
     "update_nutzer_last_login",
     "track_interaktion",
+    "track_interaktion_async",
     "get_interaktionen_stats",
     "create_projekt",
     "get_projekte_by_nutzer",
+    "get_sichtbare_projekt_ids",
+    "iter_nutzer",
+    "iter_projekte",
     "create_preisvorschlag",
     "respond_to_preisvorschlag",
     "get_preisverhandlungs_historie",
     "get_preis_training_data",
     "get_markt_referenzpreise",
+    "create_preis_historie",
+    "aktualisiere_markt_referenzpreise",
     "create_dokument",
     "update_dokument_ocr",
     "create_benachrichtigung",
     "get_ungelesene_benachrichtigungen",
     "mark_benachrichtigung_gelesen",
+    "get_generic_block_library_eintraege",
+    "speichere_parser_ergebnis",
+    "lade_parser_ergebnis",
 ]
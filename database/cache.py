@@ -0,0 +1,186 @@
+"""
+Prozessweiter Read-Through-Cache für häufige Datenbank-Lookups
+
+Streamlit führt bei jeder Interaktion das komplette Skript erneut aus; ohne
+Cache fragt jeder Rerun Nutzer, Projekte und Benachrichtigungen neu ab.
+
+- Je Lookup (Entität) ein eigener LRU-Cache mit TTL
+- Invalidierung über einen Versionszähler je Tabelle: Schreibende
+  Service-Funktionen rufen nach dem Commit invalidiere() auf; ein Eintrag
+  gilt nur, solange sich die Versionen seiner Tabellen nicht geändert haben
+- Treffer/Fehlzugriffe je Cache über get_cache_stats()
+
+Die Versionszähler gelten nur im eigenen Prozess. Schreibzugriffe anderer
+Prozesse (oder direkt per Session ohne Service-Funktion) werden spätestens
+nach Ablauf der TTL sichtbar.
+
+Gecachte ORM-Objekte werden von allen Aufrufern geteilt (expire_on_commit
+ist deaktiviert) und dürfen nicht verändert werden; Listen und Dicts werden
+als flache Kopie zurückgegeben.
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Standardwerte je Lookup
+CACHE_MAXSIZE = 1024
+CACHE_TTL_SEKUNDEN = 60.0
+
+_versionen: Dict[str, int] = {}
+_versionen_lock = threading.Lock()
+
+_caches: Dict[str, "LookupCache"] = {}
+
+_FEHLT = object()
+
+
+def _tabellenname(tabelle: Any) -> str:
+    """Tabellenname aus Modellklasse oder String."""
+    return getattr(tabelle, "__tablename__", tabelle)
+
+
+def tabellen_version(tabelle: Any) -> int:
+    """Aktuelle Version einer Tabelle (Modellklasse oder Tabellenname)."""
+    return _versionen.get(_tabellenname(tabelle), 0)
+
+
+def invalidiere(*tabellen: Any) -> None:
+    """
+    Erhöht die Version der Tabellen und macht damit alle Cache-Einträge
+    ungültig, die von ihnen abhängen. Nach dem Commit aufrufen.
+    """
+    with _versionen_lock:
+        for tabelle in tabellen:
+            name = _tabellenname(tabelle)
+            _versionen[name] = _versionen.get(name, 0) + 1
+
+
+class LookupCache:
+    """
+    LRU-Cache mit TTL, dessen Einträge an Tabellenversionen gebunden sind.
+
+    In der Regel über den Decorator cached_lookup() verwendet.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tabellen: Tuple[Any, ...],
+        maxsize: int = CACHE_MAXSIZE,
+        ttl: float = CACHE_TTL_SEKUNDEN,
+    ):
+        self.name = name
+        self.tabellen = tuple(_tabellenname(t) for t in tabellen)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._eintraege: "OrderedDict[Hashable, Tuple[float, Tuple[int, ...], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidiert": 0}
+
+    def versionen(self) -> Tuple[int, ...]:
+        """Momentaufnahme der Tabellenversionen (vor der Abfrage nehmen)."""
+        return tuple(_versionen.get(t, 0) for t in self.tabellen)
+
+    def get(self, key: Hashable) -> Any:
+        """Gibt den gültigen Wert zurück oder _FEHLT."""
+        jetzt = time.monotonic()
+        aktuell = self.versionen()
+        with self._lock:
+            eintrag = self._eintraege.get(key)
+            if eintrag is not None:
+                ablauf, versionen, wert = eintrag
+                if ablauf > jetzt and versionen == aktuell:
+                    self._eintraege.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return wert
+                del self._eintraege[key]
+                self._stats["invalidiert"] += 1
+            self._stats["misses"] += 1
+            return _FEHLT
+
+    def put(self, key: Hashable, wert: Any, versionen: Tuple[int, ...]) -> None:
+        """
+        Speichert einen Wert mit den Versionen von vor der Abfrage - wurde
+        währenddessen geschrieben, ist der Eintrag sofort veraltet.
+        """
+        with self._lock:
+            self._eintraege[key] = (time.monotonic() + self.ttl, versionen, wert)
+            self._eintraege.move_to_end(key)
+            while len(self._eintraege) > self.maxsize:
+                self._eintraege.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Leert den Cache (Zähler bleiben erhalten)."""
+        with self._lock:
+            self._eintraege.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Zähler: hits, misses, evictions, invalidiert, eintraege, hit_rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["eintraege"] = len(self._eintraege)
+        anfragen = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / anfragen if anfragen else 0.0
+        return stats
+
+
+def _kopie(wert: Any) -> Any:
+    if isinstance(wert, list):
+        return list(wert)
+    if isinstance(wert, dict):
+        return dict(wert)
+    return wert
+
+
+def cached_lookup(
+    *tabellen: Any,
+    maxsize: int = CACHE_MAXSIZE,
+    ttl: float = CACHE_TTL_SEKUNDEN,
+    name: Optional[str] = None,
+) -> Callable:
+    """
+    Decorator für Lookup-Funktionen mit hashbaren Argumenten.
+
+    Args:
+        *tabellen: Tabellen (Modellklassen oder Namen), von denen das Ergebnis abhängt
+        maxsize: Maximale Anzahl Einträge
+        ttl: Lebensdauer eines Eintrags in Sekunden
+        name: Name in get_cache_stats() (Standard: Funktionsname)
+
+    Exceptions werden nicht gecacht. Die ungecachte Funktion ist als
+    `__wrapped__` erreichbar, der Cache als `cache`.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = LookupCache(name or func.__name__, tabellen, maxsize=maxsize, ttl=ttl)
+        _caches[cache.name] = cache
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            wert = cache.get(key)
+            if wert is _FEHLT:
+                versionen = cache.versionen()
+                wert = func(*args, **kwargs)
+                cache.put(key, wert, versionen)
+            return _kopie(wert)
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Trefferstatistik aller Lookup-Caches für das Monitoring."""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def leere_caches() -> None:
+    """Leert alle Lookup-Caches (z.B. nach Wartungsarbeiten direkt in der DB)."""
+    for cache in _caches.values():
+        cache.clear()
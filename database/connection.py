@@ -2,14 +2,18 @@
 Datenbankverbindungsmanagement für die Immobilien-Transaktionsplattform
 
 Dieses Modul stellt Funktionen bereit für:
-- Connection Pooling mit SQLAlchemy
+- Connection Pooling mit SQLAlchemy (inkl. Pool-Metriken)
 - Session Management als Context Manager
+- Request-Scope: Session-Verbindung am Ende jedes Script-Runs zurückgeben
 - Datenbankinitialisierung
 - Verbindungsprüfung
 """
 
 import os
 import logging
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
 from typing import Generator, Optional
 
@@ -17,9 +21,10 @@ import streamlit as st
 from sqlalchemy import create_engine, text, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
-from sqlalchemy.exc import SQLAlchemyError, OperationalError
+from sqlalchemy.exc import SQLAlchemyError, OperationalError, TimeoutError as PoolTimeoutError
 
 from .models import Base
+from .cache import get_cache_stats
 
 # Logging konfigurieren
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +33,93 @@ logger = logging.getLogger(__name__)
 
 # ==================== ENGINE & CONNECTION POOL ====================
 
+# Pool-Größe per Umgebungsvariable anpassbar (viele gleichzeitige Nutzer)
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+POOL_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+# Zeitfenster, in dem Pool-Timeouts den Health Check auf "warn" setzen
+POOL_TIMEOUT_FENSTER_S = int(os.environ.get('DB_POOL_TIMEOUT_FENSTER', 300))
+
+# Prozessweite Pool-Metriken (über Engine-Events und get_session gepflegt)
+_pool_metrics_lock = threading.Lock()
+_pool_metrics = {
+    "checkouts": 0,
+    "checkins": 0,
+    "connects": 0,
+    "timeouts": 0,
+    "max_checked_out": 0,
+    "max_checkout_dauer_s": 0.0,
+}
+# Zeitpunkte der letzten Pool-Timeouts (für die Zählung im Zeitfenster)
+_pool_timeout_zeiten: deque = deque(maxlen=1000)
+
+
+def _register_pool_metrics(engine) -> None:
+    """Zählt Checkouts/Checkins und misst, wie lange Verbindungen gehalten werden."""
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        logger.debug("Neue Datenbankverbindung erstellt")
+        with _pool_metrics_lock:
+            _pool_metrics["connects"] += 1
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        logger.debug("Verbindung aus Pool ausgecheckt")
+        connection_record.info["checkout_zeit"] = time.monotonic()
+        checked_out = engine.pool.checkedout() if hasattr(engine.pool, 'checkedout') else 0
+        with _pool_metrics_lock:
+            _pool_metrics["checkouts"] += 1
+            if checked_out > _pool_metrics["max_checked_out"]:
+                _pool_metrics["max_checked_out"] = checked_out
+
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        start = connection_record.info.pop("checkout_zeit", None)
+        with _pool_metrics_lock:
+            _pool_metrics["checkins"] += 1
+            if start is not None:
+                dauer = time.monotonic() - start
+                if dauer > _pool_metrics["max_checkout_dauer_s"]:
+                    _pool_metrics["max_checkout_dauer_s"] = dauer
+
+
+def _zaehle_pool_timeout(e: Exception) -> None:
+    if isinstance(e, PoolTimeoutError):
+        with _pool_metrics_lock:
+            _pool_metrics["timeouts"] += 1
+            _pool_timeout_zeiten.append(time.monotonic())
+        logger.warning(f"Connection Pool erschöpft: {e}")
+
+
+def get_pool_metrics() -> dict:
+    """
+    Gibt aktuelle Pool-Auslastung und kumulierte Pool-Metriken zurück.
+
+    Returns:
+        dict: size, checked_out, overflow sowie checkouts, timeouts,
+              max_checked_out und max_checkout_dauer_s seit Prozessstart;
+              timeouts_im_fenster zählt nur die letzten POOL_TIMEOUT_FENSTER_S
+              Sekunden
+    """
+    grenze = time.monotonic() - POOL_TIMEOUT_FENSTER_S
+    with _pool_metrics_lock:
+        metrics = dict(_pool_metrics)
+        metrics["timeouts_im_fenster"] = sum(1 for t in _pool_timeout_zeiten if t >= grenze)
+    metrics["timeout_fenster_s"] = POOL_TIMEOUT_FENSTER_S
+    engine = get_engine()
+    pool = engine.pool
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            metrics[name] = getattr(pool, name)()
+    # Nur für den selbst konfigurierten Pool ist die Overflow-Grenze bekannt
+    # (-1 = unbegrenzt)
+    if isinstance(pool, QueuePool) and engine.dialect.name != "sqlite" and POOL_MAX_OVERFLOW >= 0:
+        metrics["kapazitaet"] = pool.size() + POOL_MAX_OVERFLOW
+    return metrics
+
+
 @st.cache_resource
 def get_engine():
     """
@@ -58,6 +150,24 @@ def get_engine():
         logger.warning("Keine DATABASE_URL gefunden. Verwende SQLite für Entwicklung.")
         database_url = "sqlite:///./notarplattform_dev.db"
 
+    return get_engine_for_url(database_url)
+
+
+@st.cache_resource
+def get_engine_for_url(database_url: str):
+    """
+    Erstellt und cached eine Engine je Datenbank-URL.
+
+    get_engine() nutzt diese Funktion für die konfigurierte URL; Funktionen,
+    die mit einer im Session State gewählten URL arbeiten (z.B. die
+    Datenmigration), erhalten so dieselbe gepoolte Engine statt einer neuen.
+
+    Args:
+        database_url: SQLAlchemy-kompatible Datenbank-URL
+
+    Returns:
+        Engine: SQLAlchemy Engine mit konfiguriertem Connection Pool
+    """
     # PostgreSQL URL-Korrektur (Heroku-Stil postgres:// -> postgresql://)
     if database_url.startswith("postgres://"):
         database_url = database_url.replace("postgres://", "postgresql://", 1)
@@ -75,36 +185,38 @@ def get_engine():
         engine = create_engine(
             database_url,
             poolclass=QueuePool,
-            pool_size=5,  # Anzahl permanenter Verbindungen
-            max_overflow=10,  # Zusätzliche Verbindungen bei Bedarf
-            pool_timeout=30,  # Timeout für Verbindungsanfrage
+            pool_size=POOL_SIZE,  # Anzahl permanenter Verbindungen
+            max_overflow=POOL_MAX_OVERFLOW,  # Zusätzliche Verbindungen bei Bedarf
+            pool_timeout=POOL_TIMEOUT,  # Timeout für Verbindungsanfrage
             pool_recycle=1800,  # Verbindungen nach 30 Min erneuern
             pool_pre_ping=True,  # Verbindung vor Nutzung prüfen
             echo=False,
         )
 
-        # Event-Listener für Verbindungsprobleme
-        @event.listens_for(engine, "connect")
-        def connect(dbapi_connection, connection_record):
-            logger.debug("Neue Datenbankverbindung erstellt")
-
-        @event.listens_for(engine, "checkout")
-        def checkout(dbapi_connection, connection_record, connection_proxy):
-            logger.debug("Verbindung aus Pool ausgecheckt")
+    # Event-Listener für Pool-Metriken
+    _register_pool_metrics(engine)
 
     logger.info(f"Database Engine erstellt: {database_url.split('@')[-1] if '@' in database_url else 'sqlite'}")
 
     return engine
 
 
-def get_session_factory():
+@st.cache_resource
+def get_session_factory(database_url: Optional[str] = None):
     """
-    Erstellt eine Session Factory für die Datenbank.
+    Erstellt und cached die Session Factory für die Datenbank.
+
+    Wie die Engine einmal pro Prozess (je URL); get_session() erzeugt daraus
+    nur noch die Session.
+
+    Args:
+        database_url: Optional - Datenbank-URL (z.B. die im Admin-Bereich
+            konfigurierte); ohne Angabe die URL von get_engine()
 
     Returns:
         sessionmaker: Konfigurierte Session Factory
     """
-    engine = get_engine()
+    engine = get_engine_for_url(database_url) if database_url else get_engine()
     return sessionmaker(
         bind=engine,
         autocommit=False,
@@ -116,7 +228,7 @@ def get_session_factory():
 # ==================== SESSION MANAGEMENT ====================
 
 @contextmanager
-def get_session() -> Generator[Session, None, None]:
+def get_session(database_url: Optional[str] = None) -> Generator[Session, None, None]:
     """
     Context Manager für Datenbank-Sessions.
 
@@ -128,10 +240,13 @@ def get_session() -> Generator[Session, None, None]:
 
     Bei Fehlern wird automatisch ein Rollback durchgeführt.
 
+    Args:
+        database_url: Optional - Datenbank-URL statt der von get_engine()
+
     Yields:
         Session: SQLAlchemy Session
     """
-    SessionFactory = get_session_factory()
+    SessionFactory = get_session_factory(database_url)
     session = SessionFactory()
 
     try:
@@ -139,6 +254,7 @@ def get_session() -> Generator[Session, None, None]:
         session.commit()
     except SQLAlchemyError as e:
         session.rollback()
+        _zaehle_pool_timeout(e)
         logger.error(f"Datenbankfehler: {e}")
         raise
     except Exception as e:
@@ -149,6 +265,7 @@ def get_session() -> Generator[Session, None, None]:
         session.close()
 
 
+@contextmanager
 def get_session_no_commit() -> Generator[Session, None, None]:
     """
     Context Manager für Datenbank-Sessions ohne automatisches Commit.
@@ -165,6 +282,7 @@ def get_session_no_commit() -> Generator[Session, None, None]:
         yield session
     except SQLAlchemyError as e:
         session.rollback()
+        _zaehle_pool_timeout(e)
         logger.error(f"Datenbankfehler: {e}")
         raise
     finally:
@@ -368,8 +486,9 @@ def get_db_session_for_request():
     """
     Gibt eine Datenbank-Session für den aktuellen Streamlit-Request zurück.
 
-    Die Session wird im Session State gespeichert und am Ende des Requests
-    automatisch geschlossen.
+    Die Session wird im Session State gespeichert. Eine Verbindung aus dem
+    Pool holt sie erst bei der ersten Abfrage; db_request_scope() gibt sie
+    am Ende jedes Script-Runs zurück.
 
     Returns:
         Session: SQLAlchemy Session
@@ -381,6 +500,21 @@ def get_db_session_for_request():
     return st.session_state.db_session
 
 
+def release_db_session():
+    """
+    Gibt die Verbindung der Request-Session an den Pool zurück.
+
+    Offene Transaktionen werden zurückgerollt; das Session-Objekt bleibt im
+    Session State und ist im nächsten Run wieder verwendbar.
+    """
+    session = st.session_state.get('db_session')
+    if session is not None:
+        try:
+            session.close()
+        except Exception as e:
+            logger.warning(f"Fehler beim Freigeben der Request-Session: {e}")
+
+
 def close_db_session():
     """
     Schließt die Datenbank-Session im Session State.
@@ -393,6 +527,25 @@ def close_db_session():
         del st.session_state.db_session
 
 
+@contextmanager
+def db_request_scope() -> Generator[None, None, None]:
+    """
+    Klammert einen Streamlit-Script-Run.
+
+    Verwendung:
+        with db_request_scope():
+            main()
+
+    Auch bei st.rerun()/st.stop() (Exceptions) wird die Verbindung der
+    Request-Session zurückgegeben, sodass zwischen Reruns keine
+    Pool-Verbindung belegt bleibt.
+    """
+    try:
+        yield
+    finally:
+        release_db_session()
+
+
 # ==================== HEALTH CHECK ====================
 
 def health_check() -> dict:
@@ -443,6 +596,26 @@ def health_check() -> dict:
             "error": str(e)
         }
 
+    # 4. Pool-Auslastung (Timeouts = Pool war erschöpft); nur Timeouts im
+    # Zeitfenster zählen, sonst bliebe der Status nach einem Engpass dauerhaft "warn"
+    try:
+        pool_metrics = get_pool_metrics()
+        health["checks"]["pool"] = {
+            "status": "pass" if pool_metrics["timeouts_im_fenster"] == 0 else "warn",
+            "details": pool_metrics
+        }
+    except Exception as e:
+        health["checks"]["pool"] = {
+            "status": "fail",
+            "error": str(e)
+        }
+
+    # 5. Lookup-Cache (nur informativ)
+    health["checks"]["cache"] = {
+        "status": "pass",
+        "details": get_cache_stats()
+    }
+
     # Gesamtstatus
     all_passed = all(
         check.get("status") == "pass"
@@ -0,0 +1,329 @@
+"""
+Bulk-Migration von Session-State-Daten in die Datenbank
+
+Statt pro Objekt eine Existenzprüfung (N+1) und ein einzelnes INSERT
+abzusetzen, werden Zeilen in Blöcken per executemany geschrieben
+(SQLAlchemy fasst diese zu mehrzeiligen INSERTs zusammen, ohne das
+Statement je Block neu zu kompilieren).
+Bereits vorhandene Zeilen werden übersprungen:
+- Zeilen, deren eindeutige Spalte (z.B. nutzer.email) schon in der
+  Datenbank steht, werden nicht eingefügt; abhängige Zeilen verweisen dann
+  auf die ID der vorhandenen Zeile
+- PostgreSQL / SQLite: INSERT ... ON CONFLICT DO NOTHING
+- andere Datenbanken: eine IN-Abfrage der vorhandenen Schlüssel je Block
+
+Fremdschlüssel werden vor dem Einfügen gegen die Datenbank geprüft: fehlt
+die Elternzeile, wird eine Pflicht-Referenz übersprungen (ohne_bezug) und
+eine optionale auf NULL gesetzt - ein einzelner verwaister Datensatz
+bricht so nicht die ganze Migration ab.
+
+Session-IDs werden über migration_uuid() auf stabile UUIDs abgebildet,
+sodass eine wiederholte Migration dieselben Zeilen erkennt.
+
+Das Schema nutzt PostgreSQL-Typen (ARRAY, JSONB); auf SQLite lassen sich
+u.a. notar_profile nicht anlegen, Zieldatenbank ist PostgreSQL.
+"""
+
+import enum
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Type
+
+from sqlalchemy import insert, literal_column, select
+from sqlalchemy.engine import Connection
+
+from .cache import invalidiere
+
+logger = logging.getLogger(__name__)
+
+# Zeilen je Block (executemany, IN-Abfrage, Fortschrittsmeldung)
+MIGRATION_CHUNK_SIZE = 1000
+
+# Namespace für die aus Session-IDs abgeleiteten UUIDs (nicht ändern)
+MIGRATION_NAMESPACE = uuid.UUID("6f1c2a4e-9b3d-5e7f-8a1b-2c3d4e5f6a7b")
+
+_UMLAUTE = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", " ": "_", "-": "_", "/": "_"})
+
+
+@dataclass
+class BulkErgebnis:
+    """Ergebnis eines Bulk-Inserts für eine Tabelle"""
+    eingefuegt: int = 0
+    vorhanden: int = 0
+    ohne_bezug: int = 0  # übersprungen, weil eine Pflicht-Elternzeile fehlt
+
+
+@dataclass
+class MigrationsErgebnis:
+    """Gesamtergebnis einer Migration je Tabelle"""
+    tabellen: Dict[str, BulkErgebnis] = field(default_factory=dict)
+    uebersprungen: int = 0
+
+    @property
+    def eingefuegt(self) -> int:
+        return sum(e.eingefuegt for e in self.tabellen.values())
+
+    @property
+    def vorhanden(self) -> int:
+        return sum(e.vorhanden for e in self.tabellen.values())
+
+    @property
+    def ohne_bezug(self) -> int:
+        return sum(e.ohne_bezug for e in self.tabellen.values())
+
+
+def migration_uuid(art: str, schluessel: Any) -> Optional[uuid.UUID]:
+    """
+    Stabile UUID für eine Session-ID.
+
+    Ist die ID bereits eine UUID, wird sie übernommen; sonst wird sie
+    deterministisch aus Objektart und ID abgeleitet (uuid5).
+    """
+    if schluessel is None or schluessel == "":
+        return None
+    if isinstance(schluessel, uuid.UUID):
+        return schluessel
+    try:
+        return uuid.UUID(str(schluessel))
+    except ValueError:
+        return uuid.uuid5(MIGRATION_NAMESPACE, f"{art}:{schluessel}")
+
+
+def db_enum(enum_cls: Type[enum.Enum], wert: Any, default: enum.Enum) -> enum.Enum:
+    """
+    Bildet einen Anzeige-Wert des Session State (z.B. "Käufer",
+    "In Bearbeitung") auf das Datenbank-Enum ab; unbekannt → default.
+    """
+    if isinstance(wert, enum_cls):
+        return wert
+    if isinstance(wert, enum.Enum):
+        wert = wert.value
+    if not wert:
+        return default
+    normalisiert = str(wert).strip().lower().translate(_UMLAUTE)
+    for mitglied in enum_cls:
+        if mitglied.value == normalisiert or mitglied.name.lower() == normalisiert:
+            return mitglied
+    return default
+
+
+def dialect_insert(conn: Connection, model):
+    """
+    INSERT-Konstrukt des Dialekts mit ON CONFLICT (on_conflict_do_nothing /
+    on_conflict_do_update) für PostgreSQL und SQLite; None bei anderen
+    Datenbanken (dort muss der Aufrufer vorhandene Zeilen selbst prüfen).
+    """
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(model)
+    if conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model)
+    return None
+
+
+# Abbildung je Tabelle: Migrations-ID → ID der vorhandenen Zeile in der Datenbank
+IdAbbildung = Dict[str, Dict[Any, Any]]
+
+
+def _vorhandene_werte(conn: Connection, spalte, werte: Set[Any]) -> Set[Any]:
+    """Welche der Werte in der Spalte bereits vorkommen (IN-Abfrage)"""
+    if not werte:
+        return set()
+    return set(conn.execute(select(spalte).where(spalte.in_(werte))).scalars())
+
+
+def _pruefe_fremdschluessel(
+    conn: Connection,
+    model,
+    block: List[Dict[str, Any]],
+    id_abbildung: IdAbbildung,
+    ergebnis: BulkErgebnis,
+) -> List[Dict[str, Any]]:
+    """
+    Bildet Fremdschlüssel auf die IDs in der Datenbank ab und prüft, ob die
+    Elternzeilen existieren. Fehlt eine Pflicht-Elternzeile, entfällt die
+    Zeile (ohne_bezug); optionale Verweise werden auf NULL gesetzt.
+    """
+    for fk in model.__table__.foreign_keys:
+        spalte = fk.parent.name
+        if not block or spalte not in block[0]:
+            continue
+        abbildung = id_abbildung.get(fk.column.table.name, {})
+        for zeile in block:
+            wert = zeile[spalte]
+            if wert is not None:
+                zeile[spalte] = abbildung.get(wert, wert)
+        vorhanden = _vorhandene_werte(
+            conn, fk.column, {z[spalte] for z in block if z[spalte] is not None}
+        )
+
+        gueltig = []
+        for zeile in block:
+            wert = zeile[spalte]
+            if wert is None or wert in vorhanden:
+                gueltig.append(zeile)
+            elif fk.parent.nullable:
+                zeile[spalte] = None
+                gueltig.append(zeile)
+            else:
+                ergebnis.ohne_bezug += 1
+        if len(gueltig) < len(block):
+            logger.warning(
+                f"Migration {model.__tablename__}: {len(block) - len(gueltig)} Zeilen ohne "
+                f"Eintrag in {fk.column.table.name} ({spalte}) übersprungen"
+            )
+        block = gueltig
+    return block
+
+
+def _ordne_vorhandene_zu(
+    conn: Connection,
+    model,
+    block: List[Dict[str, Any]],
+    key: str,
+    id_abbildung: IdAbbildung,
+    ergebnis: BulkErgebnis,
+) -> List[Dict[str, Any]]:
+    """
+    Entfernt Zeilen, deren eindeutige Spalte (unique=True, z.B. E-Mail)
+    schon in der Datenbank steht, und merkt sich die vorhandene ID für
+    abhängige Tabellen.
+    """
+    key_spalte = getattr(model, key)
+    abbildung = id_abbildung.setdefault(model.__tablename__, {})
+    for spalte in model.__table__.columns:
+        if not spalte.unique or spalte.primary_key or not block or spalte.name not in block[0]:
+            continue
+        werte = {z[spalte.name] for z in block if z[spalte.name] is not None}
+        if not werte:
+            continue
+        vorhanden = dict(conn.execute(
+            select(spalte, key_spalte).where(spalte.in_(werte))
+        ).all())
+
+        neu = []
+        for zeile in block:
+            db_key = vorhanden.get(zeile[spalte.name])
+            if db_key is None:
+                neu.append(zeile)
+                continue
+            if db_key != zeile[key]:
+                abbildung[zeile[key]] = db_key
+            ergebnis.vorhanden += 1
+        block = neu
+    return block
+
+
+def bulk_insert_neue(
+    conn: Connection,
+    model,
+    zeilen: List[Dict[str, Any]],
+    key: str = "id",
+    chunk_size: int = MIGRATION_CHUNK_SIZE,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    id_abbildung: Optional[IdAbbildung] = None,
+) -> BulkErgebnis:
+    """
+    Fügt Zeilen blockweise ein und überspringt vorhandene.
+
+    Args:
+        conn: Verbindung mit offener Transaktion (engine.begin())
+        model: SQLAlchemy-Modell
+        zeilen: Spaltenwerte; alle Zeilen mit denselben Schlüsseln
+        key: Schlüsselspalte für die Existenzprüfung ohne ON CONFLICT
+        chunk_size: Zeilen je Block
+        progress_callback: Optional - wird mit (fertig, gesamt) aufgerufen
+        id_abbildung: Optional - Migrations-ID → vorhandene ID je Tabelle;
+            wird für Fremdschlüssel gelesen und um diese Tabelle ergänzt
+            (bulk_migriere reicht sie von Tabelle zu Tabelle weiter)
+
+    Returns:
+        BulkErgebnis mit eingefügten, bereits vorhandenen und mangels
+        Elternzeile übersprungenen Zeilen
+    """
+    ergebnis = BulkErgebnis()
+    gesamt = len(zeilen)
+    key_spalte = getattr(model, key)
+    if id_abbildung is None:
+        id_abbildung = {}
+
+    for start in range(0, gesamt, chunk_size):
+        block = [dict(z) for z in zeilen[start:start + chunk_size]]
+        block = _pruefe_fremdschluessel(conn, model, block, id_abbildung, ergebnis)
+        block = _ordne_vorhandene_zu(conn, model, block, key, id_abbildung, ergebnis)
+
+        if not block:
+            eingefuegt = 0
+        elif (stmt := dialect_insert(conn, model)) is not None:
+            # Übrige Unique-Verletzungen (PK, mehrspaltige Constraints)
+            # überspringen; RETURNING liefert nur die eingefügten Zeilen
+            stmt = stmt.on_conflict_do_nothing().returning(literal_column("1"))
+            eingefuegt = len(conn.execute(stmt, block).all())
+        else:
+            schluessel = [z[key] for z in block]
+            vorhanden = set(conn.execute(
+                select(key_spalte).where(key_spalte.in_(schluessel))
+            ).scalars())
+            neu = [z for z in block if z[key] not in vorhanden]
+            if neu:
+                conn.execute(insert(model), neu)
+            eingefuegt = len(neu)
+
+        ergebnis.eingefuegt += eingefuegt
+        ergebnis.vorhanden += len(block) - eingefuegt
+
+        if progress_callback:
+            progress_callback(min(start + chunk_size, gesamt), gesamt)
+
+    return ergebnis
+
+
+def bulk_migriere(
+    engine,
+    tabellen: List[tuple],
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    chunk_size: int = MIGRATION_CHUNK_SIZE,
+) -> MigrationsErgebnis:
+    """
+    Migriert mehrere Tabellen in einer Transaktion.
+
+    Args:
+        engine: Engine (i.d.R. database.connection.get_engine_for_url)
+        tabellen: [(Model, zeilen), ...] in Abhängigkeitsreihenfolge
+                  (z.B. Nutzer vor NotarProfil vor Akte)
+        progress_callback: Optional - (fertig, gesamt) über alle Tabellen
+        chunk_size: Zeilen je Block
+
+    Returns:
+        MigrationsErgebnis je Tabelle
+    """
+    ergebnis = MigrationsErgebnis()
+    gesamt = sum(len(zeilen) for _, zeilen in tabellen)
+    bisher = 0
+    id_abbildung: IdAbbildung = {}
+
+    with engine.begin() as conn:
+        for model, zeilen in tabellen:
+            if not zeilen:
+                continue
+
+            def fortschritt(fertig: int, _anzahl: int, _offset: int = bisher) -> None:
+                if progress_callback:
+                    progress_callback(_offset + fertig, gesamt)
+
+            teil = bulk_insert_neue(conn, model, zeilen, chunk_size=chunk_size,
+                                    progress_callback=fortschritt, id_abbildung=id_abbildung)
+            vorher = ergebnis.tabellen.setdefault(model.__tablename__, BulkErgebnis())
+            vorher.eingefuegt += teil.eingefuegt
+            vorher.vorhanden += teil.vorhanden
+            vorher.ohne_bezug += teil.ohne_bezug
+            bisher += len(zeilen)
+
+    invalidiere(*(model for model, zeilen in tabellen if zeilen))
+    logger.info(
+        f"Migration: {ergebnis.eingefuegt} eingefügt, {ergebnis.vorhanden} bereits vorhanden, "
+        f"{ergebnis.ohne_bezug} ohne Elternzeile übersprungen"
+    )
+    return ergebnis
@@ -0,0 +1,14 @@
+-- ============================================================
+-- URKUNDENPARSER - PARAMETER-HASH FÜR GESPEICHERTE ERGEBNISSE
+-- ============================================================
+-- Gespeicherte Parser-Runs werden über Dokument-Hash UND
+-- Parameter-Hash (Kontext, Modell, Prompt-Version) wiederverwendet.
+-- Bestehende Runs ohne Parameter-Hash werden nicht mehr geliefert
+-- und beim nächsten Parsen neu erzeugt.
+-- ============================================================
+
+ALTER TABLE urkunden_parser_runs
+    ADD COLUMN IF NOT EXISTS parameter_hash VARCHAR(64);
+
+CREATE INDEX IF NOT EXISTS ix_urkunden_parser_runs_parameter_hash
+    ON urkunden_parser_runs (parameter_hash);
@@ -0,0 +1,47 @@
+-- ============================================================
+-- MARKT-REFERENZPREISE - AGGREGAT ANLEGEN UND BEFÜLLEN
+-- ============================================================
+-- Voraggregierte Vergleichspreise je PLZ-Region (3 Stellen),
+-- Immobilientyp, Flächenband (5 m²) und Verkaufsmonat.
+-- Neue Verkäufe schreibt services.create_preis_historie fort;
+-- bestehende Einträge der Preishistorie werden hier einmalig
+-- übernommen (entspricht aktualisiere_markt_referenzpreise()).
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS markt_referenzpreise (
+    plz_region VARCHAR(3) NOT NULL,
+    immobilientyp immobilientyp NOT NULL,
+    flaechenband INTEGER NOT NULL,      -- wohnflaeche_qm // 5
+    monat DATE NOT NULL,                -- Erster Tag des Verkaufsmonats
+    anzahl INTEGER NOT NULL DEFAULT 0,
+    summe_preis_qm NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    min_preis_qm NUMERIC(10, 2),
+    max_preis_qm NUMERIC(10, 2),
+    aktualisiert_am TIMESTAMP,
+    PRIMARY KEY (plz_region, immobilientyp, flaechenband, monat)
+);
+
+-- Einmalige Übernahme der bestehenden Verkäufe (nur in eine leere Tabelle)
+INSERT INTO markt_referenzpreise (
+    plz_region, immobilientyp, flaechenband, monat,
+    anzahl, summe_preis_qm, min_preis_qm, max_preis_qm, aktualisiert_am
+)
+SELECT
+    LEFT(i.plz, 3),
+    i.immobilientyp,
+    FLOOR(i.wohnflaeche_qm / 5)::INTEGER,
+    DATE_TRUNC('month', p.verkaufsdatum)::DATE,
+    COUNT(*),
+    SUM(p.preis_pro_qm),
+    MIN(p.preis_pro_qm),
+    MAX(p.preis_pro_qm),
+    NOW()
+FROM preis_historien p
+JOIN immobilien i ON i.id = p.immobilie_id
+WHERE p.verkaufspreis IS NOT NULL
+  AND p.preis_pro_qm IS NOT NULL
+  AND p.verkaufsdatum IS NOT NULL
+  AND i.wohnflaeche_qm > 0
+  AND i.plz <> ''
+  AND NOT EXISTS (SELECT 1 FROM markt_referenzpreise)
+GROUP BY 1, 2, 3, 4;
@@ -215,7 +215,7 @@ class Nutzer(Base):
     makler_profil = relationship("MaklerProfil", back_populates="nutzer", uselist=False)
     notar_profil = relationship("NotarProfil", back_populates="nutzer", uselist=False)
     projekt_beteiligungen = relationship("ProjektBeteiligung", back_populates="nutzer")
-    dokumente = relationship("Dokument", back_populates="nutzer")
+    dokumente = relationship("Dokument", foreign_keys="Dokument.nutzer_id", back_populates="nutzer")
     interaktionen = relationship("Interaktion", back_populates="nutzer")
     preisvorschlaege_gesendet = relationship("Preisvorschlag", foreign_keys="Preisvorschlag.absender_id", back_populates="absender")
     preisvorschlaege_empfangen = relationship("Preisvorschlag", foreign_keys="Preisvorschlag.empfaenger_id", back_populates="empfaenger")
@@ -658,6 +658,31 @@ class MarktDaten(Base):
     )
 
 
+class MarktReferenzPreis(Base):
+    """
+    Voraggregierte Vergleichspreise aus der Preishistorie
+
+    Je PLZ-Region (erste 3 Stellen) × Immobilientyp × Flächenband × Verkaufsmonat.
+    Wird beim Anlegen von Preishistorie-Einträgen fortgeschrieben und kann
+    über services.aktualisiere_markt_referenzpreise() neu berechnet werden.
+    """
+    __tablename__ = "markt_referenzpreise"
+
+    # Schlüssel - Reihenfolge entspricht der Abfrage (Gleichheit vor Bereichen)
+    plz_region = Column(String(3), primary_key=True)
+    immobilientyp = Column(Enum(ImmobilienTyp), primary_key=True)
+    flaechenband = Column(Integer, primary_key=True)  # wohnflaeche_qm // FLAECHENBAND_QM
+    monat = Column(Date, primary_key=True)  # Erster Tag des Verkaufsmonats
+
+    # Aggregate über preis_pro_qm
+    anzahl = Column(Integer, nullable=False, default=0)
+    summe_preis_qm = Column(Numeric(16, 2), nullable=False, default=0)
+    min_preis_qm = Column(Numeric(10, 2))
+    max_preis_qm = Column(Numeric(10, 2))
+
+    aktualisiert_am = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # ==================== DOKUMENTE & OCR ====================
 
 class Dokument(Base):
@@ -1226,6 +1251,8 @@ class UrkundenParserRun(Base):
 
     # Dokument-Hash für Deduplikation
     dokument_hash = Column(String(64), index=True)
+    # Hash von Kontext, Modell und Prompt-Version (urkundenparser.parser_parameter_hash)
+    parameter_hash = Column(String(64), index=True)
 
     # Rohe LLM-Antwort (für Debugging)
     raw_response = Column(JSONB)
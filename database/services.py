@@ -6,27 +6,34 @@ Dieses Modul enthält High-Level-Funktionen für:
 - Interaktions-Tracking
 - Preis-Analysen
 - Dokument-Management
+- Bibliothek genereller Bausteine
+- Urkundenparser-Ergebnisse (Persistenz & Deduplikation per Dokument-Hash)
 """
 
 import hashlib
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
 from decimal import Decimal
 import uuid
 import logging
 
-from sqlalchemy import func, and_, or_, desc
+from sqlalchemy import func, and_, or_, desc, insert
 from sqlalchemy.orm import Session
 
 from .models import (
     Nutzer, MaklerProfil, NotarProfil, NotarMitarbeiter,
     Immobilie, Projekt, ProjektBeteiligung,
-    Preisvorschlag, PreisHistorie, MarktDaten,
+    Preisvorschlag, PreisHistorie, MarktDaten, MarktReferenzPreis,
     Dokument, Interaktion, Benachrichtigung,
-    Textbaustein, VertragsDokument,
-    UserRole, ProjektStatus, PreisvorschlagStatus, InteraktionsTyp, DokumentTyp
+    Textbaustein, VertragsDokument, GenericBlockLibrary,
+    UrkundenParserRun, ParsedBlock, ParsedFact, ParsedTask, ParsedIssue,
+    UserRole, ImmobilienTyp, ProjektStatus, PreisvorschlagStatus, InteraktionsTyp, DokumentTyp,
+    ParserBlockType, ParserStage, ParserRunStatus
 )
 from .connection import get_session
+from .cache import cached_lookup, invalidiere
+from .migration import db_enum, dialect_insert
+from .tracking import get_interaktions_writer
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +80,7 @@ def create_nutzer(
             )
             session.add(nutzer)
             session.commit()
+            invalidiere(Nutzer)
 
             logger.info(f"Nutzer erstellt: {email}")
             return nutzer
@@ -82,18 +90,27 @@ def create_nutzer(
         return None
 
 
-def get_nutzer_by_email(email: str) -> Optional[Nutzer]:
+@cached_lookup(Nutzer, maxsize=2048)
+def get_nutzer_by_email(email: str, database_url: Optional[str] = None) -> Optional[Nutzer]:
     """Findet einen Nutzer anhand der E-Mail."""
-    with get_session() as session:
+    with get_session(database_url) as session:
         return session.query(Nutzer).filter_by(email=email).first()
 
 
-def get_nutzer_by_id(nutzer_id: uuid.UUID) -> Optional[Nutzer]:
-    """Findet einen Nutzer anhand der ID."""
-    with get_session() as session:
+@cached_lookup(Nutzer, maxsize=2048)
+def get_nutzer_by_id(nutzer_id: uuid.UUID, database_url: Optional[str] = None) -> Optional[Nutzer]:
+    """Findet einen Nutzer anhand der ID (database_url: optional, sonst get_engine())."""
+    with get_session(database_url) as session:
         return session.query(Nutzer).filter_by(id=nutzer_id).first()
 
 
+@cached_lookup(NotarProfil)
+def get_notar_profil_id(nutzer_id: uuid.UUID) -> Optional[uuid.UUID]:
+    """Gibt die ID des Notarprofils eines Nutzers zurück (None ohne Profil)."""
+    with get_session() as session:
+        return session.query(NotarProfil.id).filter_by(nutzer_id=nutzer_id).scalar()
+
+
 def update_nutzer_last_login(nutzer_id: uuid.UUID) -> bool:
     """Aktualisiert den letzten Login-Zeitpunkt."""
     try:
@@ -103,6 +120,7 @@ def update_nutzer_last_login(nutzer_id: uuid.UUID) -> bool:
                 nutzer.letzter_login = datetime.utcnow()
                 nutzer.login_versuche = 0
                 session.commit()
+                invalidiere(Nutzer)
                 return True
         return False
     except Exception as e:
@@ -140,6 +158,7 @@ def authenticate_nutzer(email: str, password_hash: str) -> Optional[Nutzer]:
             if failed_nutzer.login_versuche >= 5:
                 failed_nutzer.gesperrt_bis = datetime.utcnow() + timedelta(minutes=15)
             session.commit()
+            invalidiere(Nutzer)
 
         return None
 
@@ -196,6 +215,45 @@ def track_interaktion(
         return None
 
 
+def track_interaktion_async(
+    typ: InteraktionsTyp,
+    seite: str = None,
+    aktion: str = None,
+    nutzer_id: uuid.UUID = None,
+    session_id: str = None,
+    projekt_id: uuid.UUID = None,
+    details: Dict[str, Any] = None,
+    user_agent: str = None,
+    geraetetyp: str = None
+) -> bool:
+    """
+    Trackt eine Benutzerinteraktion ohne Datenbank-Roundtrip.
+
+    Die Interaktion wird nur in die Queue des prozessweiten
+    InteraktionsWriter gelegt und im Hintergrund gesammelt geschrieben.
+    Der Zeitstempel wird hier gesetzt, nicht beim Schreiben.
+
+    Args: wie track_interaktion
+
+    Returns:
+        bool: True wenn eingereiht, False wenn verworfen (Queue voll)
+    """
+    # Alle Zeilen eines Bulk-INSERT brauchen dieselben Spalten
+    return get_interaktions_writer().submit({
+        "id": uuid.uuid4(),
+        "typ": typ,
+        "seite": seite,
+        "aktion": aktion,
+        "nutzer_id": _als_uuid(nutzer_id),
+        "session_id": session_id,
+        "projekt_id": _als_uuid(projekt_id),
+        "details": details,
+        "user_agent": user_agent,
+        "geraetetyp": geraetetyp,
+        "erstellt_am": datetime.utcnow(),
+    })
+
+
 def get_interaktionen_stats(
     zeitraum_tage: int = 30,
     nutzer_id: uuid.UUID = None
@@ -308,6 +366,7 @@ def create_projekt(
                     session.add(beteiligung)
 
             session.commit()
+            invalidiere(Projekt, ProjektBeteiligung)
             logger.info(f"Projekt erstellt: {name}")
             return projekt
 
@@ -316,6 +375,7 @@ def create_projekt(
         return None
 
 
+@cached_lookup(Projekt, ProjektBeteiligung)
 def get_projekte_by_nutzer(nutzer_id: uuid.UUID) -> List[Projekt]:
     """Gibt alle Projekte zurück, an denen ein Nutzer beteiligt ist."""
     with get_session() as session:
@@ -327,6 +387,96 @@ def get_projekte_by_nutzer(nutzer_id: uuid.UUID) -> List[Projekt]:
         ).all()
 
 
+# ==================== SEITENWEISES LADEN (SESSION STATE) ====================
+
+# Zeilen je Seite beim Streamen (yield_per)
+LADE_BATCH_GROESSE = 500
+
+
+def get_sichtbare_projekt_ids(nutzer_id: uuid.UUID, database_url: Optional[str] = None) -> List[uuid.UUID]:
+    """IDs aller Projekte, an denen ein Nutzer aktiv beteiligt ist (ein Query, keine Objekte)."""
+    with get_session(database_url) as session:
+        return [
+            projekt_id for (projekt_id,) in session.query(ProjektBeteiligung.projekt_id).filter(
+                ProjektBeteiligung.nutzer_id == nutzer_id,
+                ProjektBeteiligung.ist_aktiv == True
+            ).distinct()
+        ]
+
+
+def iter_nutzer(
+    nutzer_ids: Optional[Iterable[uuid.UUID]] = None,
+    batch_size: int = LADE_BATCH_GROESSE,
+    database_url: Optional[str] = None
+) -> Iterator[Nutzer]:
+    """
+    Liest Nutzer seitenweise (yield_per) statt alle auf einmal.
+
+    Args:
+        nutzer_ids: Optional - nur diese Nutzer
+        batch_size: Zeilen je Seite
+        database_url: Optional - Datenbank-URL statt der von get_engine()
+    """
+    with get_session(database_url) as session:
+        query = session.query(Nutzer)
+        if nutzer_ids is not None:
+            ids = [i for i in map(_als_uuid, nutzer_ids) if i is not None]
+            if not ids:
+                return
+            query = query.filter(Nutzer.id.in_(ids))
+        yield from query.yield_per(batch_size)
+
+
+def iter_projekte(
+    projekt_ids: Optional[Iterable[uuid.UUID]] = None,
+    batch_size: int = LADE_BATCH_GROESSE,
+    database_url: Optional[str] = None
+) -> Iterator[Tuple[Projekt, Optional[Immobilie], List[ProjektBeteiligung]]]:
+    """
+    Liest Projekte seitenweise mit Immobilie und aktiven Beteiligungen.
+
+    Je Seite wird ein zusätzlicher IN-Query für die Beteiligungen
+    abgesetzt (statt einem je Projekt).
+
+    Args:
+        projekt_ids: Optional - nur diese Projekte
+        batch_size: Zeilen je Seite
+        database_url: Optional - Datenbank-URL statt der von get_engine()
+
+    Yields:
+        (Projekt, Immobilie oder None, Beteiligungen)
+    """
+    with get_session(database_url) as session:
+        query = session.query(Projekt, Immobilie).outerjoin(
+            Immobilie, Projekt.immobilie_id == Immobilie.id
+        )
+        if projekt_ids is not None:
+            ids = [i for i in map(_als_uuid, projekt_ids) if i is not None]
+            if not ids:
+                return
+            query = query.filter(Projekt.id.in_(ids))
+
+        seite = []
+        for projekt, immobilie in query.yield_per(batch_size):
+            seite.append((projekt, immobilie))
+            if len(seite) >= batch_size:
+                yield from _mit_beteiligungen(session, seite)
+                seite = []
+        if seite:
+            yield from _mit_beteiligungen(session, seite)
+
+
+def _mit_beteiligungen(session: Session, seite: list):
+    beteiligungen: Dict[uuid.UUID, List[ProjektBeteiligung]] = {}
+    for b in session.query(ProjektBeteiligung).filter(
+        ProjektBeteiligung.projekt_id.in_([p.id for p, _ in seite]),
+        ProjektBeteiligung.ist_aktiv == True
+    ):
+        beteiligungen.setdefault(b.projekt_id, []).append(b)
+    for projekt, immobilie in seite:
+        yield projekt, immobilie, beteiligungen.get(projekt.id, [])
+
+
 # ==================== PREISVERHANDLUNG ====================
 
 def create_preisvorschlag(
@@ -407,6 +557,7 @@ def respond_to_preisvorschlag(
                     projekt.verkaufspreis = vorschlag.vorgeschlagener_preis
 
             session.commit()
+            invalidiere(Projekt)
             return True
 
     except Exception as e:
@@ -509,61 +660,291 @@ def get_markt_referenzpreise(
     """
     Gibt Markt-Referenzpreise für eine Immobilie zurück.
 
+    Die Vergleichswerte stammen aus dem Aggregat MarktReferenzPreis
+    (Flächenbänder à FLAECHENBAND_QM m², Verkaufsmonate der letzten 12 Monate).
+    Ist das Aggregat noch leer (Tabelle neu angelegt, bestehende Preishistorie
+    nicht übernommen), wird direkt über die Preishistorie gerechnet.
+
     Returns:
         Dict mit Durchschnittspreisen und Vergleichswerten
     """
     try:
-        with get_session() as session:
-            # Aktuelle Marktdaten für PLZ
-            markt = session.query(MarktDaten).filter(
-                MarktDaten.plz == plz,
-                or_(
-                    MarktDaten.gueltig_bis.is_(None),
-                    MarktDaten.gueltig_bis >= datetime.utcnow().date()
-                )
-            ).order_by(desc(MarktDaten.gueltig_ab)).first()
+        return _lade_markt_referenzpreise(plz, immobilientyp, wohnflaeche_qm)
+    except Exception as e:
+        logger.error(f"Fehler beim Abrufen der Referenzpreise: {e}")
+        return {}
 
-            # Ähnliche verkaufte Immobilien
-            plz_prefix = plz[:3]  # Gleiche Region
+
+@cached_lookup(MarktDaten, MarktReferenzPreis, PreisHistorie, Immobilie, ttl=300.0,
+               name="get_markt_referenzpreise")
+def _lade_markt_referenzpreise(
+    plz: str,
+    immobilientyp: str,
+    wohnflaeche_qm: float
+) -> Dict[str, Any]:
+    """Abfrage für get_markt_referenzpreise (Fehler werden nicht gecacht)."""
+    typ = db_enum(ImmobilienTyp, immobilientyp, None)
+    typ_name = typ.value if typ else str(immobilientyp).lower()
+
+    with get_session() as session:
+        # Aktuelle Marktdaten für PLZ
+        markt = session.query(MarktDaten).filter(
+            MarktDaten.plz == plz,
+            or_(
+                MarktDaten.gueltig_bis.is_(None),
+                MarktDaten.gueltig_bis >= datetime.utcnow().date()
+            )
+        ).order_by(desc(MarktDaten.gueltig_ab)).first()
+
+        # Ähnliche verkaufte Immobilien: ein Bereichs-Scan über den Primärschlüssel
+        aehnliche = None
+        if typ is not None and wohnflaeche_qm:
+            ab_monat = _monatsanfang(datetime.utcnow().date() - timedelta(days=365))
             aehnliche = session.query(
-                func.avg(PreisHistorie.preis_pro_qm),
-                func.min(PreisHistorie.preis_pro_qm),
-                func.max(PreisHistorie.preis_pro_qm),
-                func.count(PreisHistorie.id)
-            ).join(
-                Immobilie
+                func.sum(MarktReferenzPreis.summe_preis_qm),
+                func.sum(MarktReferenzPreis.anzahl),
+                func.min(MarktReferenzPreis.min_preis_qm),
+                func.max(MarktReferenzPreis.max_preis_qm)
             ).filter(
-                Immobilie.plz.startswith(plz_prefix),
-                Immobilie.immobilientyp == immobilientyp,
-                Immobilie.wohnflaeche_qm.between(wohnflaeche_qm * 0.8, wohnflaeche_qm * 1.2),
-                PreisHistorie.verkaufspreis.isnot(None),
-                PreisHistorie.verkaufsdatum >= datetime.utcnow().date() - timedelta(days=365)
+                MarktReferenzPreis.plz_region == plz[:3],  # Gleiche Region
+                MarktReferenzPreis.immobilientyp == typ,
+                MarktReferenzPreis.flaechenband.between(
+                    _flaechenband(wohnflaeche_qm * 0.8),
+                    _flaechenband(wohnflaeche_qm * 1.2)
+                ),
+                MarktReferenzPreis.monat >= ab_monat
             ).first()
+            if not aehnliche[1] and session.query(MarktReferenzPreis.plz_region).first() is None:
+                aehnliche = _vergleichspreise_live(session, plz, typ, wohnflaeche_qm)
+
+        result = {
+            "plz": plz,
+            "immobilientyp": immobilientyp,
+            "wohnflaeche_qm": wohnflaeche_qm,
+        }
+
+        if markt:
+            preis_qm = markt.durchschnittspreis_qm_wohnung if "wohnung" in typ_name else markt.durchschnittspreis_qm_haus
+            result["markt_preis_qm"] = float(preis_qm) if preis_qm else None
+            result["markt_geschaetzter_preis"] = float(preis_qm * Decimal(str(wohnflaeche_qm))) if preis_qm else None
+            result["preisaenderung_1_jahr"] = float(markt.preisaenderung_1_jahr_prozent) if markt.preisaenderung_1_jahr_prozent else None
+
+        if aehnliche and aehnliche[1]:
+            durchschnitt = float(aehnliche[0]) / int(aehnliche[1])
+            result["vergleich_durchschnitt_qm"] = durchschnitt
+            result["vergleich_min_qm"] = float(aehnliche[2])
+            result["vergleich_max_qm"] = float(aehnliche[3])
+            result["vergleich_anzahl"] = int(aehnliche[1])
+            result["vergleich_geschaetzter_preis"] = durchschnitt * wohnflaeche_qm
+
+        return result
+
+
+def _vergleichspreise_live(session: Session, plz: str, typ: ImmobilienTyp, wohnflaeche_qm: float) -> tuple:
+    """
+    Vergleichspreise direkt aus der Preishistorie, solange das Aggregat leer
+    ist - gleiche Form wie die Aggregat-Abfrage (Summe, Anzahl, Min, Max).
+    """
+    logger.warning(
+        "Referenzpreis-Aggregat ist leer - Vergleichspreise werden aus der Preishistorie "
+        "berechnet; aktualisiere_markt_referenzpreise() füllt es"
+    )
+    return session.query(
+        func.sum(PreisHistorie.preis_pro_qm),
+        func.count(PreisHistorie.id),
+        func.min(PreisHistorie.preis_pro_qm),
+        func.max(PreisHistorie.preis_pro_qm)
+    ).join(
+        Immobilie, PreisHistorie.immobilie_id == Immobilie.id
+    ).filter(
+        Immobilie.plz.startswith(plz[:3]),
+        Immobilie.immobilientyp == typ,
+        Immobilie.wohnflaeche_qm.between(wohnflaeche_qm * 0.8, wohnflaeche_qm * 1.2),
+        PreisHistorie.verkaufspreis.isnot(None),
+        PreisHistorie.preis_pro_qm.isnot(None),
+        PreisHistorie.verkaufsdatum >= datetime.utcnow().date() - timedelta(days=365)
+    ).first()
+
+
+# ==================== MARKT-REFERENZPREISE (AGGREGAT) ====================
+
+# Breite eines Flächenbands in m² (Schlüssel von MarktReferenzPreis)
+FLAECHENBAND_QM = 5
 
-            result = {
-                "plz": plz,
-                "immobilientyp": immobilientyp,
-                "wohnflaeche_qm": wohnflaeche_qm,
-            }
 
-            if markt:
-                preis_qm = markt.durchschnittspreis_qm_wohnung if "wohnung" in immobilientyp.lower() else markt.durchschnittspreis_qm_haus
-                result["markt_preis_qm"] = float(preis_qm) if preis_qm else None
-                result["markt_geschaetzter_preis"] = float(preis_qm * Decimal(str(wohnflaeche_qm))) if preis_qm else None
-                result["preisaenderung_1_jahr"] = float(markt.preisaenderung_1_jahr_prozent) if markt.preisaenderung_1_jahr_prozent else None
+def _flaechenband(wohnflaeche_qm: float) -> int:
+    return int(wohnflaeche_qm // FLAECHENBAND_QM)
 
-            if aehnliche[0]:
-                result["vergleich_durchschnitt_qm"] = float(aehnliche[0])
-                result["vergleich_min_qm"] = float(aehnliche[1])
-                result["vergleich_max_qm"] = float(aehnliche[2])
-                result["vergleich_anzahl"] = aehnliche[3]
-                result["vergleich_geschaetzter_preis"] = float(aehnliche[0]) * wohnflaeche_qm
 
-            return result
+def _monatsanfang(datum: date) -> date:
+    return datum.replace(day=1)
+
+
+def _referenz_schluessel(immobilie: Immobilie, verkaufsdatum: Optional[date]) -> Optional[Dict[str, Any]]:
+    """Aggregat-Schlüssel eines Verkaufs oder None, wenn Angaben fehlen."""
+    if not (immobilie.plz and immobilie.immobilientyp and immobilie.wohnflaeche_qm and verkaufsdatum):
+        return None
+    return {
+        "plz_region": immobilie.plz[:3],
+        "immobilientyp": immobilie.immobilientyp,
+        "flaechenband": _flaechenband(immobilie.wohnflaeche_qm),
+        "monat": _monatsanfang(verkaufsdatum),
+    }
+
+
+def _referenzpreis_fortschreiben(session: Session, schluessel: Dict[str, Any], preis_qm: Decimal) -> None:
+    """Rechnet einen Verkauf in die Aggregat-Zeile seines Schlüssels ein (Upsert)."""
+    conn = session.connection()
+    stmt = dialect_insert(conn, MarktReferenzPreis)
+
+    if stmt is None:
+        # Andere Datenbanken: Zeile sperren und in Python fortschreiben
+        eintrag = session.get(MarktReferenzPreis, tuple(schluessel.values()), with_for_update=True)
+        if eintrag is None:
+            session.add(MarktReferenzPreis(
+                **schluessel, anzahl=1, summe_preis_qm=preis_qm,
+                min_preis_qm=preis_qm, max_preis_qm=preis_qm
+            ))
+        else:
+            eintrag.anzahl += 1
+            eintrag.summe_preis_qm += preis_qm
+            eintrag.min_preis_qm = min(eintrag.min_preis_qm, preis_qm) if eintrag.min_preis_qm is not None else preis_qm
+            eintrag.max_preis_qm = max(eintrag.max_preis_qm, preis_qm) if eintrag.max_preis_qm is not None else preis_qm
+        session.flush()
+        return
+
+    # PostgreSQL: LEAST/GREATEST, SQLite: min()/max() mit zwei Argumenten
+    kleinster, groesster = (func.least, func.greatest) if conn.dialect.name == "postgresql" else (func.min, func.max)
+    tabelle = MarktReferenzPreis.__table__
+    stmt = stmt.values(
+        **schluessel, anzahl=1, summe_preis_qm=preis_qm,
+        min_preis_qm=preis_qm, max_preis_qm=preis_qm,
+        aktualisiert_am=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[spalte.name for spalte in tabelle.primary_key],
+        set_={
+            "anzahl": tabelle.c.anzahl + 1,
+            "summe_preis_qm": tabelle.c.summe_preis_qm + stmt.excluded.summe_preis_qm,
+            "min_preis_qm": kleinster(func.coalesce(tabelle.c.min_preis_qm, stmt.excluded.min_preis_qm),
+                                      stmt.excluded.min_preis_qm),
+            "max_preis_qm": groesster(func.coalesce(tabelle.c.max_preis_qm, stmt.excluded.max_preis_qm),
+                                      stmt.excluded.max_preis_qm),
+            "aktualisiert_am": stmt.excluded.aktualisiert_am,
+        }
+    )
+    session.execute(stmt)
+
+
+def create_preis_historie(
+    immobilie_id: uuid.UUID,
+    angebotspreis: Decimal,
+    angebotsdatum: date,
+    verkaufspreis: Decimal = None,
+    verkaufsdatum: date = None,
+    projekt_id: uuid.UUID = None,
+    **kwargs
+) -> Optional[PreisHistorie]:
+    """
+    Legt einen Preishistorie-Eintrag an und schreibt bei einem Verkauf das
+    Referenzpreis-Aggregat in derselben Transaktion fort.
+
+    preis_pro_qm wird aus Verkaufspreis und Wohnfläche berechnet, falls nicht angegeben.
+    """
+    try:
+        with get_session() as session:
+            immobilie = session.get(Immobilie, immobilie_id)
+            if not immobilie:
+                logger.warning(f"Immobilie {immobilie_id} für Preishistorie nicht gefunden")
+                return None
+
+            if kwargs.get("preis_pro_qm") is None and verkaufspreis and immobilie.wohnflaeche_qm:
+                kwargs["preis_pro_qm"] = (
+                    Decimal(verkaufspreis) / Decimal(str(immobilie.wohnflaeche_qm))
+                ).quantize(Decimal("0.01"))
+
+            historie = PreisHistorie(
+                immobilie_id=immobilie_id,
+                projekt_id=projekt_id,
+                angebotspreis=angebotspreis,
+                angebotsdatum=angebotsdatum,
+                verkaufspreis=verkaufspreis,
+                verkaufsdatum=verkaufsdatum,
+                **kwargs
+            )
+            session.add(historie)
+            session.flush()
+
+            schluessel = _referenz_schluessel(immobilie, verkaufsdatum)
+            if verkaufspreis is not None and historie.preis_pro_qm is not None and schluessel:
+                _referenzpreis_fortschreiben(session, schluessel, Decimal(historie.preis_pro_qm))
+
+            session.commit()
+            invalidiere(PreisHistorie, MarktReferenzPreis)
+            return historie
 
     except Exception as e:
-        logger.error(f"Fehler beim Abrufen der Referenzpreise: {e}")
-        return {}
+        logger.error(f"Fehler beim Erstellen der Preishistorie: {e}")
+        return None
+
+
+def aktualisiere_markt_referenzpreise() -> Optional[int]:
+    """
+    Berechnet das Referenzpreis-Aggregat vollständig aus der Preishistorie neu
+    (z.B. nach einem Import oder nachträglich geänderten Verkäufen).
+
+    Returns:
+        int: Anzahl der Aggregat-Zeilen oder None bei Fehler
+    """
+    try:
+        with get_session() as session:
+            aggregate: Dict[tuple, Dict[str, Any]] = {}
+            verkaeufe = session.query(
+                Immobilie.plz,
+                Immobilie.immobilientyp,
+                Immobilie.wohnflaeche_qm,
+                PreisHistorie.verkaufsdatum,
+                PreisHistorie.preis_pro_qm
+            ).join(
+                Immobilie, PreisHistorie.immobilie_id == Immobilie.id
+            ).filter(
+                PreisHistorie.verkaufspreis.isnot(None),
+                PreisHistorie.preis_pro_qm.isnot(None),
+                PreisHistorie.verkaufsdatum.isnot(None),
+                Immobilie.wohnflaeche_qm.isnot(None)
+            ).yield_per(LADE_BATCH_GROESSE)
+
+            for plz, typ, flaeche, verkaufsdatum, preis_qm in verkaeufe:
+                if not plz or not flaeche:
+                    continue
+                key = (plz[:3], typ, _flaechenband(flaeche), _monatsanfang(verkaufsdatum))
+                zeile = aggregate.get(key)
+                if zeile is None:
+                    aggregate[key] = {
+                        "plz_region": key[0], "immobilientyp": key[1],
+                        "flaechenband": key[2], "monat": key[3],
+                        "anzahl": 1, "summe_preis_qm": preis_qm,
+                        "min_preis_qm": preis_qm, "max_preis_qm": preis_qm,
+                    }
+                else:
+                    zeile["anzahl"] += 1
+                    zeile["summe_preis_qm"] += preis_qm
+                    zeile["min_preis_qm"] = min(zeile["min_preis_qm"], preis_qm)
+                    zeile["max_preis_qm"] = max(zeile["max_preis_qm"], preis_qm)
+
+            session.query(MarktReferenzPreis).delete(synchronize_session=False)
+            zeilen = list(aggregate.values())
+            if zeilen:
+                session.execute(insert(MarktReferenzPreis), zeilen)
+            session.commit()
+
+        invalidiere(MarktReferenzPreis)
+        logger.info(f"Markt-Referenzpreise neu berechnet: {len(zeilen)} Zeilen")
+        return len(zeilen)
+
+    except Exception as e:
+        logger.error(f"Fehler beim Neuberechnen der Markt-Referenzpreise: {e}")
+        return None
 
 
 # ==================== DOKUMENT-MANAGEMENT ====================
@@ -671,6 +1052,7 @@ def create_benachrichtigung(
             )
             session.add(benachrichtigung)
             session.commit()
+            invalidiere(Benachrichtigung)
             return benachrichtigung
 
     except Exception as e:
@@ -678,6 +1060,7 @@ def create_benachrichtigung(
         return None
 
 
+@cached_lookup(Benachrichtigung, maxsize=2048)
 def get_ungelesene_benachrichtigungen(nutzer_id: uuid.UUID) -> List[Benachrichtigung]:
     """Gibt alle ungelesenen Benachrichtigungen für einen Nutzer zurück."""
     with get_session() as session:
@@ -698,8 +1081,367 @@ def mark_benachrichtigung_gelesen(benachrichtigung_id: uuid.UUID) -> bool:
                 benachrichtigung.gelesen = True
                 benachrichtigung.gelesen_am = datetime.utcnow()
                 session.commit()
+                invalidiere(Benachrichtigung)
                 return True
         return False
     except Exception as e:
         logger.error(f"Fehler beim Markieren als gelesen: {e}")
         return False
+
+
+# ==================== BIBLIOTHEK GENERELLER BAUSTEINE ====================
+
+def get_generic_block_library_eintraege(
+    seit: Optional[datetime] = None,
+    notar_id: Optional[uuid.UUID] = None,
+    nur_global: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Lädt Einträge der Bibliothek genereller Bausteine für den GenericBlockLibraryIndex
+    (modules/urkundenparser.py).
+
+    Ohne `seit` werden alle aktiven Einträge geladen (Erstbefüllung). Mit `seit`
+    werden alle seitdem geänderten Zeilen geliefert - auch deaktivierte, damit
+    der Index sie entfernen kann (inkrementeller Refresh).
+
+    Args:
+        seit: Optional - nur Zeilen mit aktualisiert_am > seit
+        notar_id: Optional - nur globale Einträge und die des Notars
+        nur_global: Nur globale Einträge (Nutzer ohne Notarprofil)
+
+    Returns:
+        Liste von Dicts {"id", "hash", "description", "text", "kategorie", "aktiv", "aktualisiert_am"}
+    """
+    try:
+        with get_session() as session:
+            query = session.query(
+                GenericBlockLibrary.id,
+                GenericBlockLibrary.name,
+                GenericBlockLibrary.beschreibung,
+                GenericBlockLibrary.kategorie,
+                GenericBlockLibrary.text,
+                GenericBlockLibrary.text_hash,
+                GenericBlockLibrary.ist_aktiv,
+                GenericBlockLibrary.aktualisiert_am,
+            )
+            if seit is None:
+                query = query.filter(GenericBlockLibrary.ist_aktiv == True)
+            else:
+                query = query.filter(GenericBlockLibrary.aktualisiert_am > seit)
+            if notar_id is not None:
+                query = query.filter(or_(
+                    GenericBlockLibrary.notar_id == notar_id,
+                    GenericBlockLibrary.notar_id.is_(None)
+                ))
+            elif nur_global:
+                query = query.filter(GenericBlockLibrary.notar_id.is_(None))
+
+            return [
+                {
+                    "id": str(row.id),
+                    "hash": row.text_hash,
+                    "description": row.beschreibung or row.name,
+                    "text": row.text,
+                    "kategorie": row.kategorie,
+                    "aktiv": bool(row.ist_aktiv),
+                    "aktualisiert_am": row.aktualisiert_am,
+                }
+                for row in query.order_by(GenericBlockLibrary.aktualisiert_am).yield_per(1000)
+            ]
+
+    except Exception as e:
+        logger.error(f"Fehler beim Laden der Bausteinbibliothek: {e}")
+        return []
+
+
+# ==================== URKUNDENPARSER-ERGEBNISSE ====================
+
+# Zeilen je INSERT ... VALUES (...), (...) - bleibt deutlich unter dem
+# Parameterlimit von PostgreSQL (65535) auch bei ParsedBlock (~16 Spalten)
+PARSER_BULK_BATCH = 1000
+
+
+def _als_uuid(wert: Any) -> Optional[uuid.UUID]:
+    """Wandelt eine ID (UUID oder String) in eine UUID; ungültige Werte → None."""
+    if wert is None or isinstance(wert, uuid.UUID):
+        return wert
+    try:
+        return uuid.UUID(str(wert))
+    except ValueError:
+        return None
+
+
+def _bulk_insert(session: Session, model, zeilen: List[Dict[str, Any]]) -> None:
+    """Mehrzeiliges INSERT in Batches (ein Roundtrip je Batch statt je Zeile)."""
+    for start in range(0, len(zeilen), PARSER_BULK_BATCH):
+        session.execute(insert(model).values(zeilen[start:start + PARSER_BULK_BATCH]))
+
+
+def _parser_stage(stage: str) -> ParserStage:
+    try:
+        return ParserStage[stage]
+    except KeyError:
+        return ParserStage.OTHER
+
+
+def speichere_parser_ergebnis(
+    output: Any,
+    notar_id: Any,
+    vertragsdokument_id: Any = None,
+    akte_id: Any = None,
+    model_verwendet: str = None,
+    raw_response: Dict[str, Any] = None,
+    parameter_hash: str = None
+) -> Optional[uuid.UUID]:
+    """
+    Speichert einen NotarParserOutput (modules/urkundenparser.py) als
+    UrkundenParserRun mit ParsedBlock/ParsedFact/ParsedTask/ParsedIssue.
+
+    Alle Kind-Zeilen werden per mehrzeiligem INSERT geschrieben, der gesamte
+    Durchlauf in einer Transaktion.
+
+    Args:
+        output: NotarParserOutput mit gesetztem source_document_hash
+        notar_id: ID des Notarprofils (notar_profile.id, siehe get_notar_profil_id)
+        vertragsdokument_id: Optional - ID des Vertragsdokuments (vertragsdokumente.id)
+        akte_id: Optional - ID der Akte
+        model_verwendet: Optional - verwendetes LLM-Modell
+        raw_response: Optional - rohe LLM-Antwort (Debugging)
+        parameter_hash: Optional - Hash von Kontext/Modell/Prompt für lade_parser_ergebnis()
+
+    Returns:
+        ID des Parser-Runs oder None bei Fehler
+    """
+    notar_uuid = _als_uuid(notar_id)
+    if notar_uuid is None:
+        logger.warning(f"Parser-Ergebnis nicht gespeichert: ungültige Notar-ID {notar_id!r}")
+        return None
+    verknuepfungen = {"vertragsdokument_id": vertragsdokument_id, "akte_id": akte_id}
+    for feld, wert in verknuepfungen.items():
+        if wert is not None and _als_uuid(wert) is None:
+            logger.warning(f"Parser-Ergebnis nicht gespeichert: ungültige {feld} {wert!r}")
+            return None
+
+    try:
+        with get_session() as session:
+            jetzt = datetime.utcnow()
+            run_id = uuid.uuid4()
+            meta = output.meta
+
+            session.execute(insert(UrkundenParserRun).values(
+                id=run_id,
+                vertragsdokument_id=_als_uuid(vertragsdokument_id),
+                akte_id=_als_uuid(akte_id),
+                notar_id=notar_uuid,
+                status=ParserRunStatus.COMPLETED,
+                contract_type_guess=meta.contract_type_guess,
+                subtype_guess=list(meta.subtype_guess),
+                property_kind_guess=meta.property_kind_guess,
+                anzahl_blocks=len(output.blocks),
+                anzahl_facts=len(output.facts),
+                anzahl_tasks=len(output.tasks),
+                anzahl_issues=len(output.issues),
+                model_verwendet=model_verwendet,
+                parser_version=output.parser_version,
+                dokument_hash=output.source_document_hash,
+                parameter_hash=parameter_hash,
+                raw_response=raw_response,
+                gestartet_am=output.parsed_at,
+                abgeschlossen_am=jetzt,
+                erstellt_am=jetzt,
+            ))
+
+            # erstellt_am steigt je Zeile um 1 µs, damit lade_parser_ergebnis()
+            # die Reihenfolge des Parsers wiederherstellen kann
+            _bulk_insert(session, ParsedBlock, [
+                {
+                    "id": uuid.uuid4(),
+                    "parser_run_id": run_id,
+                    "block_id": b.block_id,
+                    "block_type": ParserBlockType[b.block_type],
+                    "outline_path": b.outline_path,
+                    "anchor": b.anchor,
+                    "role_guess": b.role_guess,
+                    "text_excerpt": b.text_excerpt,
+                    "constraints": b.to_dict()["constraints"],
+                    "generic_candidate": b.generic_candidate,
+                    "generic_reason": b.generic_reason,
+                    "generic_match": b.to_dict()["generic_match"],
+                    "variant_group_id": b.variant.group_id,
+                    "is_active_default": b.variant.is_active_default,
+                    "line_hint": b.source_ref.line_hint,
+                    "text_hash": hashlib.sha256(b.text_excerpt.encode("utf-8")).hexdigest(),
+                    "erstellt_am": jetzt + timedelta(microseconds=pos),
+                }
+                for pos, b in enumerate(output.blocks)
+            ])
+            _bulk_insert(session, ParsedFact, [
+                {
+                    "id": uuid.uuid4(),
+                    "parser_run_id": run_id,
+                    "fact_id": f.fact_id,
+                    "fact_type": f.fact_type,
+                    "stage": _parser_stage(f.stage),
+                    "confidence": f.confidence,
+                    "needs_confirmation": f.needs_confirmation,
+                    "source_block_id": f.source_block_id,
+                    "params": f.params,
+                    "suppressed_by_override": f.suppressed_by_override,
+                    "conditional_on_variant_group": f.conditional_on_variant_group,
+                    "erstellt_am": jetzt + timedelta(microseconds=pos),
+                }
+                for pos, f in enumerate(output.facts)
+            ])
+            _bulk_insert(session, ParsedTask, [
+                {
+                    "id": uuid.uuid4(),
+                    "parser_run_id": run_id,
+                    "task_id": t.task_id,
+                    "task_type": t.task_type,
+                    "stage": _parser_stage(t.stage),
+                    "actor": t.actor,
+                    "description": t.description,
+                    "evidence_to_collect": list(t.evidence_to_collect),
+                    "depends_on_task_ids": list(t.depends_on_task_ids),
+                    "derived_from_fact_ids": list(t.derived_from_fact_ids),
+                    "ist_abgeschlossen": False,
+                    "erstellt_am": jetzt + timedelta(microseconds=pos),
+                }
+                for pos, t in enumerate(output.tasks)
+            ])
+            _bulk_insert(session, ParsedIssue, [
+                {
+                    "id": uuid.uuid4(),
+                    "parser_run_id": run_id,
+                    "severity": i.severity,
+                    "message": i.message,
+                    "block_id_hint": i.block_id_hint,
+                    "ist_behoben": False,
+                    "erstellt_am": jetzt + timedelta(microseconds=pos),
+                }
+                for pos, i in enumerate(output.issues)
+            ])
+
+            logger.info(
+                f"Parser-Ergebnis gespeichert: {output.source_document_hash[:12]} "
+                f"({len(output.blocks)} Blocks, {len(output.facts)} Facts)"
+            )
+            return run_id
+
+    except Exception as e:
+        logger.error(f"Fehler beim Speichern des Parser-Ergebnisses: {e}")
+        return None
+
+
+def lade_parser_ergebnis(
+    dokument_hash: str,
+    notar_id: Any = None,
+    parameter_hash: str = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Lädt den letzten abgeschlossenen Parser-Run zu einem Dokument-Hash.
+
+    Das Ergebnis hat das Format von NotarParserOutput.to_dict() und kann mit
+    parse_llm_response() wieder in Datenklassen überführt werden.
+
+    Args:
+        dokument_hash: SHA-256 des Urkundentexts (source_document_hash)
+        notar_id: Optional - nur Runs dieses Notarprofils
+        parameter_hash: Optional - nur Runs mit gleichem Kontext/Modell/Prompt
+
+    Returns:
+        Dict oder None, wenn das Dokument noch nicht geparst wurde
+    """
+    try:
+        with get_session() as session:
+            query = session.query(UrkundenParserRun).filter(
+                UrkundenParserRun.dokument_hash == dokument_hash,
+                UrkundenParserRun.status == ParserRunStatus.COMPLETED
+            )
+            if notar_id is not None:
+                notar_uuid = _als_uuid(notar_id)
+                if notar_uuid is None:
+                    return None
+                query = query.filter(UrkundenParserRun.notar_id == notar_uuid)
+            if parameter_hash is not None:
+                query = query.filter(UrkundenParserRun.parameter_hash == parameter_hash)
+            run = query.order_by(desc(UrkundenParserRun.abgeschlossen_am)).first()
+            if run is None:
+                return None
+
+            def _kinder(model):
+                return session.query(model).filter(
+                    model.parser_run_id == run.id
+                ).order_by(model.erstellt_am).all()
+
+            return {
+                "meta": {
+                    "contract_type_guess": run.contract_type_guess or "",
+                    "subtype_guess": list(run.subtype_guess or []),
+                    "property_kind_guess": run.property_kind_guess or "",
+                },
+                "blocks": [
+                    {
+                        "block_id": b.block_id,
+                        "block_type": b.block_type.name,
+                        "outline_path": b.outline_path or "",
+                        "anchor": b.anchor or "",
+                        "role_guess": b.role_guess or "",
+                        "text_excerpt": b.text_excerpt or "",
+                        "constraints": b.constraints or {"before_roles": [], "after_roles": [], "priority": 0},
+                        "generic_candidate": bool(b.generic_candidate),
+                        "generic_reason": b.generic_reason or "",
+                        "generic_match": b.generic_match or {
+                            "matched": False, "match_type": "NONE", "match_score": 0.0, "library_id": ""
+                        },
+                        "variant": {
+                            "group_id": b.variant_group_id or "",
+                            "is_active_default": bool(b.is_active_default),
+                        },
+                        "source_ref": {"line_hint": b.line_hint or ""},
+                    }
+                    for b in _kinder(ParsedBlock)
+                ],
+                "facts": [
+                    {
+                        "fact_id": f.fact_id,
+                        "fact_type": f.fact_type,
+                        "stage": f.stage.name,
+                        "confidence": f.confidence,
+                        "needs_confirmation": bool(f.needs_confirmation),
+                        "source_block_id": f.source_block_id or "",
+                        "params": f.params or {},
+                        "suppressed_by_override": bool(f.suppressed_by_override),
+                        "conditional_on_variant_group": f.conditional_on_variant_group or "",
+                    }
+                    for f in _kinder(ParsedFact)
+                ],
+                "tasks": [
+                    {
+                        "task_id": t.task_id,
+                        "task_type": t.task_type,
+                        "stage": t.stage.name,
+                        "actor": t.actor or "",
+                        "description": t.description or "",
+                        "evidence_to_collect": list(t.evidence_to_collect or []),
+                        "depends_on_task_ids": list(t.depends_on_task_ids or []),
+                        "derived_from_fact_ids": list(t.derived_from_fact_ids or []),
+                    }
+                    for t in _kinder(ParsedTask)
+                ],
+                "issues": [
+                    {
+                        "severity": i.severity,
+                        "message": i.message,
+                        "block_id_hint": i.block_id_hint or "",
+                    }
+                    for i in _kinder(ParsedIssue)
+                ],
+                "parsed_at": run.gestartet_am,
+                "parser_version": run.parser_version or "1.0",
+                "source_document_hash": run.dokument_hash,
+            }
+
+    except Exception as e:
+        logger.error(f"Fehler beim Laden des Parser-Ergebnisses: {e}")
+        return None
@@ -0,0 +1,264 @@
+"""
+Gepuffertes, asynchrones Interaktions-Tracking
+
+Interaktionen werden im Streamlit-Thread nur in eine begrenzte Queue gelegt
+(Mikrosekunden). Ein Hintergrund-Thread schreibt sie gesammelt - alle
+`batch_size` Ereignisse oder spätestens nach `flush_interval_ms` - per
+Bulk-INSERT über eine eigene, dauerhaft gehaltene Pool-Verbindung.
+
+Ist die Queue voll (Datenbank langsam oder nicht erreichbar), werden neue
+Ereignisse verworfen und gezählt, statt die Oberfläche zu blockieren.
+Beim Beenden des Prozesses wird der Puffer noch geschrieben.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, SQLAlchemyError
+
+from .models import Interaktion
+from .connection import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Standardwerte des Writers
+TRACKING_QUEUE_SIZE = 10_000
+TRACKING_BATCH_SIZE = 200
+TRACKING_FLUSH_INTERVAL_MS = 500
+
+
+class InteraktionsWriter:
+    """
+    Hintergrund-Writer für Interaktionen.
+
+    Verwendung:
+        writer = get_interaktions_writer()
+        writer.submit({"typ": InteraktionsTyp.LOGIN, "nutzer_id": ...})
+        writer.stats()  # {"geschrieben": ..., "verworfen": ..., ...}
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        queue_size: int = TRACKING_QUEUE_SIZE,
+        batch_size: int = TRACKING_BATCH_SIZE,
+        flush_interval_ms: int = TRACKING_FLUSH_INTERVAL_MS,
+    ):
+        self._engine = engine
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+
+        self._connection = None
+        self._stop = threading.Event()
+        self._flush_requested = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self._stats_lock = threading.Lock()
+        self._geschrieben = 0
+        self._verworfen = 0
+        self._fehlgeschlagen = 0
+
+    # ==================== ÖFFENTLICHE API ====================
+
+    def submit(self, zeile: Dict[str, Any]) -> bool:
+        """
+        Legt eine Interaktion (Spaltenwerte) in die Queue.
+
+        Returns:
+            bool: False, wenn die Queue voll ist und das Ereignis verworfen wurde
+        """
+        if self._thread is None:
+            self._ensure_started()
+        try:
+            self._queue.put_nowait(zeile)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self._verworfen += 1
+            return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Schreibt alle bisher eingereihten Interaktionen.
+
+        Returns:
+            bool: True, wenn die Queue innerhalb des Timeouts geleert wurde
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        ende = time.monotonic() + timeout
+        self._flush_requested.set()
+        while time.monotonic() < ende:
+            # unfinished_tasks sinkt erst nach dem Schreiben (task_done)
+            if self._queue.unfinished_tasks == 0:
+                return True
+            self._flush_requested.set()
+            time.sleep(0.01)
+        return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Schreibt den Puffer und beendet den Writer-Thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        self._flush_requested.set()
+        thread.join(timeout)
+        self._thread = None
+        self._close_connection()
+
+    def stats(self) -> Dict[str, int]:
+        """Zähler: geschrieben, verworfen (Queue voll), fehlgeschlagen (DB-Fehler), wartend."""
+        with self._stats_lock:
+            return {
+                "geschrieben": self._geschrieben,
+                "verworfen": self._verworfen,
+                "fehlgeschlagen": self._fehlgeschlagen,
+                "wartend": self._queue.qsize(),
+            }
+
+    # ==================== HINTERGRUND-THREAD ====================
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="interaktions-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._sammle_batch()
+            if batch:
+                try:
+                    self._schreibe(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+            elif self._stop.is_set():
+                return
+
+    def _sammle_batch(self) -> List[Dict[str, Any]]:
+        """Wartet auf das erste Ereignis und sammelt bis batch_size bzw. Intervallende."""
+        batch: List[Dict[str, Any]] = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval))
+        except queue.Empty:
+            self._flush_requested.clear()
+            return batch
+
+        ende = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if self._stop.is_set() or self._flush_requested.is_set():
+                # Kein Warten mehr - nur noch einsammeln, was schon da ist
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    self._flush_requested.clear()
+                    break
+            rest = ende - time.monotonic()
+            if rest <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=rest))
+            except queue.Empty:
+                break
+        return batch
+
+    def _get_connection(self):
+        if self._connection is None:
+            engine = self._engine if self._engine is not None else get_engine()
+            self._connection = engine.connect()
+        return self._connection
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def _schreibe(self, batch: List[Dict[str, Any]]) -> None:
+        """Bulk-INSERT eines Batches; bei Verbindungsfehler ein neuer Versuch."""
+        for versuch in range(2):
+            try:
+                conn = self._get_connection()
+                conn.execute(insert(Interaktion), batch)
+                conn.commit()
+                with self._stats_lock:
+                    self._geschrieben += len(batch)
+                return
+            except (IntegrityError, DataError):
+                # Einzelne fehlerhafte Zeile (z.B. unbekannte nutzer_id) soll
+                # nicht den ganzen Batch kosten
+                self._rollback()
+                self._schreibe_einzeln(batch)
+                return
+            except DBAPIError as e:
+                self._rollback()
+                if e.connection_invalidated and versuch == 0:
+                    self._close_connection()
+                    continue
+                self._close_connection()
+                logger.error(f"Fehler beim Schreiben von {len(batch)} Interaktionen: {e}")
+                break
+            except Exception as e:
+                self._rollback()
+                self._close_connection()
+                logger.error(f"Fehler beim Schreiben von {len(batch)} Interaktionen: {e}")
+                break
+        with self._stats_lock:
+            self._fehlgeschlagen += len(batch)
+
+    def _schreibe_einzeln(self, batch: List[Dict[str, Any]]) -> None:
+        geschrieben = fehlgeschlagen = 0
+        for zeile in batch:
+            try:
+                conn = self._get_connection()
+                conn.execute(insert(Interaktion), [zeile])
+                conn.commit()
+                geschrieben += 1
+            except SQLAlchemyError as e:
+                self._rollback()
+                fehlgeschlagen += 1
+                logger.debug(f"Interaktion verworfen: {e}")
+        if fehlgeschlagen:
+            logger.warning(f"{fehlgeschlagen} Interaktionen konnten nicht geschrieben werden")
+        with self._stats_lock:
+            self._geschrieben += geschrieben
+            self._fehlgeschlagen += fehlgeschlagen
+
+    def _rollback(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.rollback()
+            except Exception:
+                self._close_connection()
+
+
+# ==================== PROZESSWEITER WRITER ====================
+
+_writer: Optional[InteraktionsWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_interaktions_writer() -> InteraktionsWriter:
+    """Gibt den prozessweiten Interaktions-Writer zurück (wird beim Beenden geflusht)."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = InteraktionsWriter()
+                atexit.register(_writer.close)
+    return _writer
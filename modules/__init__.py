@@ -3,14 +3,26 @@ Module für spezialisierte Funktionen der Notarplattform
 
 Dieses Paket enthält:
 - urkundenparser: LLM-basierte Extraktion von Textbausteinen, Facts und Workflow-Tasks
+- datenspeicher: Prozessweiter, thread-sicherer Speicher für Entitäts-Collections
+- volltextsuche: Invertierter Volltextindex mit deutscher Tokenisierung
+- ki_cache: Zweistufiger Cache (Speicher + SQLite) für LLM-Ergebnisse
+- dokumentverarbeitung: Textextraktion und nebenläufige Batch-Pipeline für Uploads
+- aehnlichkeit: MinHash/LSH-Index für nahezu gleiche Texte
+- fristenindex: Nach Datum sortierter Fristenindex und Erinnerungs-Scheduler
 """
 
 from .urkundenparser import (
     # Hauptfunktionen
     parse_urkunde,
+    parser_parameter_hash,
     segment_paragraphs,
     build_workflow_from_facts,
     match_generic_block,
+    build_near_text_index,
+    GenericBlockLibraryIndex,
+    bilde_chunks,
+    merge_parser_outputs,
+    schaetze_tokens,
     normalize_for_hash,
     block_hash,
 
@@ -29,6 +41,10 @@ from .urkundenparser import (
     # Konstanten
     NOTAR_PARSER_SYSTEM_PROMPT,
     NOTAR_PARSER_JSON_SCHEMA,
+    NOTAR_PARSER_PROMPT_VERSION,
+    NEAR_TEXT_SCHWELLENWERT,
+    CHUNK_MAX_TOKENS,
+    CHUNK_SCHWELLE_TOKENS,
 
     # Enums
     BlockType,
@@ -37,12 +53,63 @@ from .urkundenparser import (
     IssueSeverity,
 )
 
+from .datenspeicher import (
+    SharedCollection,
+    IndexedCollection,
+    SharedList,
+    SharedDataStore,
+    find_by,
+    reindex_entry,
+    volltext_ids,
+    faellige_objekte,
+)
+
+from .volltextsuche import (
+    VolltextIndex,
+    tokenize,
+    normalisiere,
+)
+
+from .ki_cache import (
+    KICache,
+    get_ki_cache,
+)
+
+from .dokumentverarbeitung import (
+    extrahiere_text_aus_datei,
+    zerlege_vertrag_in_bausteine,
+    verarbeite_batch_parallel,
+    DokumentErgebnis,
+    RateLimiter,
+    get_llm_rate_limiter,
+    mit_wiederholung,
+)
+
+from .aehnlichkeit import (
+    AehnlichkeitsIndex,
+    berechne_minhash,
+    minhash_signatur,
+    jaccard,
+)
+
+from .fristenindex import (
+    FristenIndex,
+    ErinnerungsScheduler,
+    baue_fristen_index,
+)
+
 __all__ = [
     # Hauptfunktionen
     "parse_urkunde",
+    "parser_parameter_hash",
     "segment_paragraphs",
     "build_workflow_from_facts",
     "match_generic_block",
+    "build_near_text_index",
+    "bilde_chunks",
+    "merge_parser_outputs",
+    "schaetze_tokens",
+    "GenericBlockLibraryIndex",
     "normalize_for_hash",
     "block_hash",
 
@@ -61,10 +128,53 @@ __all__ = [
     # Konstanten
     "NOTAR_PARSER_SYSTEM_PROMPT",
     "NOTAR_PARSER_JSON_SCHEMA",
+    "NOTAR_PARSER_PROMPT_VERSION",
+    "NEAR_TEXT_SCHWELLENWERT",
+    "CHUNK_MAX_TOKENS",
+    "CHUNK_SCHWELLE_TOKENS",
 
     # Enums
     "BlockType",
     "Stage",
     "MatchType",
     "IssueSeverity",
+
+    # Datenspeicher
+    "SharedCollection",
+    "IndexedCollection",
+    "SharedList",
+    "SharedDataStore",
+    "find_by",
+    "reindex_entry",
+    "volltext_ids",
+    "faellige_objekte",
+
+    # Volltextsuche
+    "VolltextIndex",
+    "tokenize",
+    "normalisiere",
+
+    # KI-Cache
+    "KICache",
+    "get_ki_cache",
+
+    # Dokumentverarbeitung
+    "extrahiere_text_aus_datei",
+    "zerlege_vertrag_in_bausteine",
+    "verarbeite_batch_parallel",
+    "DokumentErgebnis",
+    "RateLimiter",
+    "get_llm_rate_limiter",
+    "mit_wiederholung",
+
+    # Ähnlichkeit
+    "AehnlichkeitsIndex",
+    "berechne_minhash",
+    "minhash_signatur",
+    "jaccard",
+
+    # Fristenindex
+    "FristenIndex",
+    "ErinnerungsScheduler",
+    "baue_fristen_index",
 ]
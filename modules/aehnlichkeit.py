@@ -0,0 +1,284 @@
+"""
+Ähnlichkeitssuche - MinHash-Signaturen mit LSH-Banding
+
+Findet nahezu gleiche Texte (z.B. Textbausteine, generelle Klauseln), ohne
+jeden neuen Text gegen den gesamten Bestand per Jaccard zu vergleichen:
+
+1. Jeder Text wird auf seine Wortmenge abgebildet und daraus eine
+   MinHash-Signatur (NUM_PERM Werte) berechnet. Die Wahrscheinlichkeit,
+   dass zwei Signaturen an einer Position übereinstimmen, ist gleich der
+   Jaccard-Ähnlichkeit der Wortmengen.
+2. Die Signatur wird in Bänder zerlegt; Texte mit mindestens einem gleichen
+   Band landen im selben Bucket (Locality Sensitive Hashing). Die Anzahl
+   Bänder/Zeilen wird aus dem Schwellenwert bestimmt.
+3. Nur für die so gefundenen Kandidaten wird die exakte Jaccard-Ähnlichkeit
+   berechnet - das Ergebnis ist also exakt, nur die Kandidatensuche ist
+   probabilistisch (Trefferquote oberhalb des Schwellenwerts > 99%).
+
+Signaturen sind prozessübergreifend stabil (blake2b statt hash()) und können
+deshalb am Objekt gespeichert werden (Textbaustein.minhash_signatur).
+
+Verwendung:
+    index = AehnlichkeitsIndex(schwellenwert=0.5)
+    index.add("b1", "Der Kaufpreis ist fällig ...")
+    index.suche("Der Kaufpreis ist fällig, sobald ...", schwellenwert=0.8)
+    # [("b1", 0.86)]
+"""
+
+import hashlib
+import random
+import threading
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# ============================================================================
+# MINHASH
+# ============================================================================
+
+# Anzahl Hashfunktionen je Signatur
+NUM_PERM = 64
+
+# Untere Ähnlichkeitsgrenze, für die ein Index Kandidaten zuverlässig findet
+DEFAULT_INDEX_SCHWELLENWERT = 0.5
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 61) - 1
+
+# Feste Saat → gleiche Permutationen in jedem Prozess
+_rng = random.Random(0x5EED)
+_PERMUTATIONEN: List[Tuple[int, int]] = [
+    (_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)
+]
+
+
+def wort_menge(text: str) -> FrozenSet[str]:
+    """Wortmenge eines Textes (Kleinschreibung, Trennung an Whitespace)."""
+    return frozenset(text.lower().split())
+
+
+def jaccard(a: Iterable[str], b: Iterable[str]) -> float:
+    """Exakte Jaccard-Ähnlichkeit zweier Wortmengen."""
+    a = a if isinstance(a, (set, frozenset)) else set(a)
+    b = b if isinstance(b, (set, frozenset)) else set(b)
+    if not a or not b:
+        return 0.0
+    schnitt = len(a & b)
+    return schnitt / (len(a) + len(b) - schnitt)
+
+
+def _wort_hash(wort: str) -> int:
+    return int.from_bytes(hashlib.blake2b(wort.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signatur(woerter: Iterable[str], num_perm: int = NUM_PERM) -> List[int]:
+    """
+    Berechnet die MinHash-Signatur einer Wortmenge.
+
+    Args:
+        woerter: Wortmenge (z.B. aus wort_menge())
+        num_perm: Anzahl Hashfunktionen (max. NUM_PERM)
+
+    Returns:
+        Liste von num_perm Ganzzahlen; leere Menge → Liste aus _MAX_HASH
+    """
+    hashes = [_wort_hash(w) for w in set(woerter)]
+    if not hashes:
+        return [_MAX_HASH] * num_perm
+    return [
+        min([(a * h + b) % _MERSENNE for h in hashes])
+        for a, b in _PERMUTATIONEN[:num_perm]
+    ]
+
+
+def berechne_minhash(text: str, num_perm: int = NUM_PERM) -> List[int]:
+    """MinHash-Signatur direkt aus einem Text."""
+    return minhash_signatur(wort_menge(text), num_perm)
+
+
+def geschaetzte_aehnlichkeit(sig_a: List[int], sig_b: List[int]) -> float:
+    """Schätzt die Jaccard-Ähnlichkeit aus zwei Signaturen gleicher Länge."""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+# ============================================================================
+# LSH-PARAMETER
+# ============================================================================
+
+def _integral(f, a: float, b: float, schritte: int = 100) -> float:
+    breite = (b - a) / schritte
+    return sum(f(a + (i + 0.5) * breite) for i in range(schritte)) * breite
+
+
+@lru_cache(maxsize=32)
+def lsh_parameter(
+    schwellenwert: float,
+    num_perm: int = NUM_PERM,
+    gewicht_fp: float = 0.2,
+    gewicht_fn: float = 0.8,
+) -> Tuple[int, int]:
+    """
+    Wählt Bänder b und Zeilen r (b·r ≤ num_perm), die die gewichtete Summe aus
+    falsch-positiven und falsch-negativen Kandidaten minimieren.
+
+    Falsch-negative werden stärker gewichtet: falsch-positive kostet nur eine
+    exakte Jaccard-Prüfung, ein falsch-negativer ist ein verpasster Treffer.
+    """
+    bestes = (1, num_perm)
+    bester_fehler = float("inf")
+    for b in range(1, num_perm + 1):
+        for r in range(1, num_perm // b + 1):
+            fp = _integral(lambda s: 1 - (1 - s ** r) ** b, 0.0, schwellenwert)
+            fn = _integral(lambda s: (1 - s ** r) ** b, schwellenwert, 1.0)
+            fehler = gewicht_fp * fp + gewicht_fn * fn
+            if fehler < bester_fehler:
+                bester_fehler = fehler
+                bestes = (b, r)
+    return bestes
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class AehnlichkeitsIndex:
+    """
+    LSH-Index über MinHash-Signaturen mit exakter Nachprüfung.
+
+    Kandidaten werden über die Bänder in O(Bänder) gefunden; für Abfragen mit
+    einem Schwellenwert unterhalb des Index-Schwellenwerts wird auf einen
+    (exakten) Vergleich mit allen Einträgen zurückgefallen.
+
+    Thread-sicher; für die gemeinsame Nutzung über alle Sessions gedacht
+    (siehe IndexedCollection.add_aehnlichkeit in modules/datenspeicher.py).
+    """
+
+    def __init__(self, schwellenwert: float = DEFAULT_INDEX_SCHWELLENWERT, num_perm: int = NUM_PERM):
+        self.schwellenwert = schwellenwert
+        self.num_perm = num_perm
+        self.baender, self.zeilen = lsh_parameter(schwellenwert, num_perm)
+        self._lock = threading.RLock()
+        self._buckets: List[Dict[Tuple[int, ...], Set[Any]]] = [{} for _ in range(self.baender)]
+        self._eintraege: Dict[Any, Tuple[List[int], FrozenSet[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._eintraege)
+
+    def __contains__(self, key) -> bool:
+        return key in self._eintraege
+
+    def _baender(self, signatur: List[int]) -> List[Tuple[int, ...]]:
+        r = self.zeilen
+        return [tuple(signatur[i * r:(i + 1) * r]) for i in range(self.baender)]
+
+    # ---------- Pflege ----------
+
+    def add(
+        self,
+        key: Any,
+        text: Optional[str] = None,
+        woerter: Optional[Iterable[str]] = None,
+        signatur: Optional[List[int]] = None,
+    ) -> List[int]:
+        """
+        Nimmt einen Eintrag auf (ersetzt einen vorhandenen).
+
+        Args:
+            key: Schlüssel des Eintrags
+            text: Text (alternativ `woerter`)
+            woerter: Bereits gebildete Wortmenge
+            signatur: Optional - vorberechnete Signatur (z.B. am Objekt gespeichert)
+
+        Returns:
+            Die verwendete Signatur
+        """
+        if woerter is None:
+            woerter = wort_menge(text or "")
+        woerter = frozenset(woerter)
+        if not signatur or len(signatur) < self.num_perm:
+            signatur = minhash_signatur(woerter, self.num_perm)
+        signatur = list(signatur[:self.num_perm])
+
+        with self._lock:
+            self._remove(key)
+            self._eintraege[key] = (signatur, woerter)
+            for bucket, band in zip(self._buckets, self._baender(signatur)):
+                bucket.setdefault(band, set()).add(key)
+        return signatur
+
+    def remove(self, key: Any) -> None:
+        """Entfernt einen Eintrag."""
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Any) -> None:
+        eintrag = self._eintraege.pop(key, None)
+        if eintrag is None:
+            return
+        for bucket, band in zip(self._buckets, self._baender(eintrag[0])):
+            keys = bucket.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del bucket[band]
+
+    def clear(self) -> None:
+        """Leert den Index."""
+        with self._lock:
+            for bucket in self._buckets:
+                bucket.clear()
+            self._eintraege.clear()
+
+    # ---------- Abfragen ----------
+
+    def kandidaten(self, signatur: List[int]) -> Set[Any]:
+        """Alle Schlüssel, die mindestens ein Band mit der Signatur teilen."""
+        treffer: Set[Any] = set()
+        with self._lock:
+            for bucket, band in zip(self._buckets, self._baender(signatur)):
+                keys = bucket.get(band)
+                if keys:
+                    treffer |= keys
+        return treffer
+
+    def suche(
+        self,
+        text: Optional[str] = None,
+        schwellenwert: Optional[float] = None,
+        woerter: Optional[Iterable[str]] = None,
+        signatur: Optional[List[int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[Any, float]]:
+        """
+        Findet Einträge mit Jaccard-Ähnlichkeit ≥ schwellenwert.
+
+        Returns:
+            Liste von (key, exakte Jaccard-Ähnlichkeit), absteigend sortiert
+        """
+        if schwellenwert is None:
+            schwellenwert = self.schwellenwert
+        if woerter is None:
+            woerter = wort_menge(text or "")
+        woerter = frozenset(woerter)
+        if not woerter:
+            return []
+
+        if schwellenwert < self.schwellenwert:
+            with self._lock:
+                keys = list(self._eintraege)
+        else:
+            if not signatur or len(signatur) < self.num_perm:
+                signatur = minhash_signatur(woerter, self.num_perm)
+            keys = self.kandidaten(signatur[:self.num_perm])
+
+        ergebnis = []
+        for key in keys:
+            eintrag = self._eintraege.get(key)
+            if eintrag is None:
+                continue
+            wert = jaccard(woerter, eintrag[1])
+            if wert >= schwellenwert:
+                ergebnis.append((key, wert))
+        ergebnis.sort(key=lambda x: x[1], reverse=True)
+        return ergebnis[:limit] if limit else ergebnis
@@ -0,0 +1,799 @@
+"""
+Gemeinsamer Datenspeicher - prozessweite Collections für alle Sessions
+
+Bisher hat init_session_state() für jede Browser-Session eigene Dicts
+(users, projekte, akten, termine, vdr_*, ...) angelegt und mit Demo-Daten
+befüllt. Dieses Modul stellt stattdessen einen einzigen Speicher bereit,
+der über st.cache_resource im Prozess gehalten wird:
+
+- SharedCollection: Thread-sicheres Dict mit Copy-on-Write-Snapshots für Iteration
+  und optionalem Read-Through-Loader (fehlende Schlüssel bei Bedarf nachladen)
+- IndexedCollection: SharedCollection mit Hash-Indizes auf Fremdschlüsseln
+  und optionalem Volltext-, Ähnlichkeits- bzw. Fristenindex (siehe
+  volltextsuche.py, aehnlichkeit.py, fristenindex.py)
+- SharedList: Thread-sichere Liste (z.B. append-only Audit-Logs)
+- SharedDataStore: Registry aller Collections inkl. einmaliger Initialisierung
+
+Die Session hält nur noch Referenzen auf die gemeinsamen Collections sowie
+reinen UI-State; der Speicherverbrauch wächst damit nicht mehr mit der
+Anzahl gleichzeitiger Sessions.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .aehnlichkeit import DEFAULT_INDEX_SCHWELLENWERT, AehnlichkeitsIndex
+from .fristenindex import FristenIndex
+from .volltextsuche import VolltextIndex, tokenize
+
+
+# ============================================================================
+# COLLECTIONS
+# ============================================================================
+
+class SharedCollection(dict):
+    """
+    Thread-sicheres Dict für gemeinsam genutzte Entitäten.
+
+    Schreibzugriffe laufen unter einem Lock. Iterationen (keys/values/items,
+    for-Schleifen) arbeiten auf einem unveränderlichen Snapshot, der erst nach
+    dem nächsten Schreibzugriff neu kopiert wird (Copy-on-Write). Parallele
+    Reruns anderer Sessions können so nie ein "dictionary changed size during
+    iteration" auslösen. Einzelzugriffe (get, [], in, len) lesen direkt.
+
+    Mit set_loader() wird die Collection zum Read-Through-Cache: fehlende
+    Schlüssel werden bei get/[] über den Loader (z.B. aus der Datenbank)
+    nachgeladen und gespeichert; Fehltreffer merkt sie sich für
+    `negativ_ttl` Sekunden. Jeder andere Fehlzugriff per get/[] kostet
+    damit einen Loader-Aufruf (i.d.R. eine Datenbankabfrage) - auch aus
+    Hintergrund-Threads wie dem Erinnerungs-Scheduler. `in`, Iteration und
+    len() sehen nur Geladenes und lösen nie einen Loader-Aufruf aus.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+        self._snapshot: Optional[Dict[Any, Any]] = None
+        self._loader: Optional[Callable[[Any], Any]] = None
+        self._negativ_ttl = 0.0
+        self._fehlt: Dict[Any, float] = {}
+
+    # ---------- Read-Through ----------
+
+    def set_loader(self, loader: Optional[Callable[[Any], Any]], negativ_ttl: float = 60.0) -> None:
+        """
+        Setzt den Loader für fehlende Schlüssel (None entfernt ihn).
+
+        Args:
+            loader: Funktion key -> Objekt oder None (nicht vorhanden)
+            negativ_ttl: Sekunden, die ein Fehltreffer nicht erneut geladen wird
+        """
+        with self._lock:
+            self._loader = loader
+            self._negativ_ttl = negativ_ttl
+            self._fehlt = {}
+
+    def _nachladen(self, key) -> Any:
+        """Lädt `key` über den Loader; None wenn nicht vorhanden."""
+        loader = self._loader
+        if loader is None:
+            return None
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        zeitpunkt = self._fehlt.get(key)
+        if zeitpunkt is not None and time.monotonic() - zeitpunkt < self._negativ_ttl:
+            return None
+
+        # Laden außerhalb des Locks (I/O), Einfügen darunter
+        value = loader(key)
+        with self._lock:
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+            if value is None:
+                if len(self._fehlt) > 10_000:
+                    self._fehlt.clear()
+                self._fehlt[key] = time.monotonic()
+                return None
+            self[key] = value
+        return value
+
+    def __missing__(self, key):
+        value = self._nachladen(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if self._loader is None:
+            return default
+        value = self._nachladen(key)
+        return default if value is None else value
+
+    def __contains__(self, key) -> bool:
+        # Bewusst ohne Nachladen: `in` ist eine billige Prüfung auf Geladenes
+        return dict.__contains__(self, key)
+
+    # ---------- Lesen ----------
+
+    def snapshot(self) -> Dict[Any, Any]:
+        """Gibt einen konsistenten, nicht zu verändernden Stand der Collection zurück."""
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                snap = self._snapshot
+                if snap is None:
+                    snap = dict(dict.items(self))
+                    self._snapshot = snap
+        return snap
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.snapshot())
+
+    def keys(self):
+        return self.snapshot().keys()
+
+    def values(self):
+        return self.snapshot().values()
+
+    def items(self):
+        return self.snapshot().items()
+
+    def copy(self) -> Dict[Any, Any]:
+        return dict(self.snapshot())
+
+    # ---------- Schreiben ----------
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            dict.__setitem__(self, key, value)
+            self._snapshot = None
+            if self._fehlt:
+                self._fehlt.pop(key, None)
+
+    def __delitem__(self, key):
+        with self._lock:
+            dict.__delitem__(self, key)
+            self._snapshot = None
+
+    def pop(self, key, *default):
+        with self._lock:
+            value = dict.pop(self, key, *default)
+            self._snapshot = None
+            return value
+
+    def popitem(self):
+        with self._lock:
+            item = dict.popitem(self)
+            self._snapshot = None
+            return item
+
+    def setdefault(self, key, default=None):
+        with self._lock:
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+            self[key] = default
+            return default
+
+    def update(self, *args, **kwargs):
+        with self._lock:
+            for key, value in dict(*args, **kwargs).items():
+                self[key] = value
+
+    def clear(self):
+        with self._lock:
+            dict.clear(self)
+            self._snapshot = None
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self.snapshot()),))
+
+
+def _index_werte(obj: Any, feld: str) -> List[Any]:
+    """Liest die Indexwerte eines Objekts (Listenfelder werden je Element indiziert)."""
+    wert = getattr(obj, feld, None)
+    if wert is None:
+        return []
+    if isinstance(wert, (list, tuple, set, frozenset)):
+        return [w for w in wert if w is not None]
+    return [wert]
+
+
+class IndexedCollection(SharedCollection):
+    """
+    SharedCollection mit Hash-Indizes auf Attributen der gespeicherten Objekte
+    (typischerweise Fremdschlüssel wie notar_id, projekt_id, empfaenger_id, deal_id).
+
+    Die Indizes werden bei jedem Einfügen, Ersetzen und Löschen mitgeführt;
+    find() liefert damit die k Treffer in O(k) statt per Full-Scan in O(N).
+    Listenattribute (z.B. empfaenger_ids) werden je Element indiziert.
+
+    Optional wird ein Volltextindex mitgeführt (add_volltext); search()
+    liefert dann nach Relevanz sortierte Objekte. Ein MinHash/LSH-Index
+    (add_aehnlichkeit) liefert über aehnliche() nahezu gleiche Texte. Ein
+    Fristenindex (add_fristen) liefert über faellig()/ueberfaellig() die
+    Objekte eines Datumsbereichs, sortiert nach Datum.
+
+    Wird ein indiziertes Attribut eines bereits gespeicherten Objekts direkt
+    geändert, muss anschließend reindex(key) aufgerufen werden (oder das Objekt
+    erneut zugewiesen werden). find() prüft Treffer zusätzlich gegen den
+    aktuellen Attributwert, liefert also nie veraltete Objekte.
+
+    Verwendung:
+        akten = IndexedCollection(indexes=("notar_id", "projekt_id"))
+        akten[akte.akte_id] = akte
+        akten.find("notar_id", "notar1")
+    """
+
+    def __init__(self, *args, indexes: Iterable[str] = (), **kwargs):
+        self._indexes: Dict[str, Dict[Any, Dict[Any, None]]] = {}
+        self._index_keys: Dict[Any, Dict[str, List[Any]]] = {}
+        self._volltext: Optional[VolltextIndex] = None
+        self._volltext_func: Optional[Callable[[Any], Iterable[Any]]] = None
+        self._aehnlichkeit: Optional[AehnlichkeitsIndex] = None
+        self._aehnlichkeit_felder: Optional[Dict[str, Any]] = None
+        self._fristen: Optional[FristenIndex] = None
+        super().__init__(*args, **kwargs)
+        for feld in indexes:
+            self.add_index(feld)
+
+    # ---------- Index-Verwaltung ----------
+
+    def add_index(self, feld: str) -> None:
+        """Legt einen Index auf `feld` an und befüllt ihn aus dem aktuellen Bestand."""
+        with self._lock:
+            if feld in self._indexes:
+                return
+            self._indexes[feld] = {}
+            for key, obj in dict.items(self):
+                self._index_feld(key, obj, feld)
+
+    def add_volltext(self, text_func: Callable[[Any], Iterable[Any]]) -> None:
+        """
+        Legt einen Volltextindex an und befüllt ihn aus dem aktuellen Bestand.
+
+        Args:
+            text_func: Liefert zu einem Objekt die zu indizierenden Textfelder
+        """
+        with self._lock:
+            if self._volltext is not None:
+                return
+            self._volltext = VolltextIndex()
+            self._volltext_func = text_func
+            for key, obj in dict.items(self):
+                self._volltext_add(key, obj)
+
+    def add_aehnlichkeit(
+        self,
+        text_feld: str = "text",
+        signatur_feld: Optional[str] = None,
+        schwellenwert: float = DEFAULT_INDEX_SCHWELLENWERT,
+    ) -> None:
+        """
+        Legt einen MinHash/LSH-Ähnlichkeitsindex über ein Textattribut an.
+
+        Args:
+            text_feld: Attribut mit dem zu vergleichenden Text
+            signatur_feld: Optional - Attribut, in dem die MinHash-Signatur am
+                Objekt gespeichert wird; eine vorhandene Signatur wird
+                wiederverwendet, eine leere berechnet und zurückgeschrieben.
+                Wer `text_feld` ändert, leert die Signatur und ruft reindex(key) auf.
+            schwellenwert: Untere Ähnlichkeitsgrenze, für die Kandidaten über
+                LSH gefunden werden (darunter: exakter Vergleich mit allen)
+        """
+        with self._lock:
+            if self._aehnlichkeit is not None:
+                return
+            self._aehnlichkeit = AehnlichkeitsIndex(schwellenwert=schwellenwert)
+            self._aehnlichkeit_felder = {
+                "text_feld": text_feld,
+                "signatur_feld": signatur_feld,
+                "schwellenwert": schwellenwert,
+            }
+            for key, obj in dict.items(self):
+                self._aehnlichkeit_add(key, obj)
+
+    def add_fristen(self, feld: str, aktiv: Optional[Callable[[Any], bool]] = None) -> None:
+        """
+        Legt einen nach Datum sortierten Fristenindex an.
+
+        Args:
+            feld: Datumsattribut (date oder datetime), z.B. "faellig_am"
+            aktiv: Optional - nur Objekte mit aktiv(obj) == True werden
+                aufgenommen (z.B. lambda f: f.status == "offen"). Wer den
+                Status direkt am Objekt ändert, ruft reindex(key) auf.
+        """
+        with self._lock:
+            if self._fristen is not None:
+                return
+            self._fristen = FristenIndex(feld, aktiv=aktiv)
+            for key, obj in dict.items(self):
+                self._fristen.add(key, obj)
+
+    @property
+    def fristen(self) -> Optional[FristenIndex]:
+        """Der Fristenindex der Collection (None wenn keiner angelegt ist)."""
+        return self._fristen
+
+    @property
+    def aehnlichkeit(self) -> Optional[AehnlichkeitsIndex]:
+        """Der Ähnlichkeitsindex der Collection (None wenn keiner angelegt ist)."""
+        return self._aehnlichkeit
+
+    @property
+    def volltext(self) -> Optional[VolltextIndex]:
+        """Der Volltextindex der Collection (None wenn keiner angelegt ist)."""
+        return self._volltext
+
+    def indexes(self) -> List[str]:
+        """Namen aller indizierten Attribute."""
+        return list(self._indexes.keys())
+
+    def _volltext_add(self, key, obj) -> None:
+        try:
+            texte = self._volltext_func(obj)
+        except Exception:
+            texte = ()  # Objekt ohne die erwarteten Felder - nicht durchsuchbar
+        self._volltext.add(key, *texte)
+
+    def _aehnlichkeit_add(self, key, obj) -> None:
+        text = getattr(obj, self._aehnlichkeit_felder["text_feld"], None)
+        if not isinstance(text, str):
+            return
+        signatur_feld = self._aehnlichkeit_felder["signatur_feld"]
+        signatur = getattr(obj, signatur_feld, None) if signatur_feld else None
+        neu = self._aehnlichkeit.add(key, text, signatur=signatur)
+        if signatur_feld and neu != signatur and hasattr(obj, signatur_feld):
+            setattr(obj, signatur_feld, neu)
+
+    def _index_feld(self, key, obj, feld: str) -> None:
+        werte = []
+        for wert in _index_werte(obj, feld):
+            try:
+                self._indexes[feld].setdefault(wert, {})[key] = None
+            except TypeError:
+                continue  # nicht hashbarer Wert - nicht indizierbar
+            werte.append(wert)
+        self._index_keys.setdefault(key, {})[feld] = werte
+
+    def _index_add(self, key, obj) -> None:
+        for feld in self._indexes:
+            self._index_feld(key, obj, feld)
+        if self._volltext is not None:
+            self._volltext_add(key, obj)
+        if self._aehnlichkeit is not None:
+            self._aehnlichkeit_add(key, obj)
+        if self._fristen is not None:
+            self._fristen.add(key, obj)
+
+    def _index_remove(self, key) -> None:
+        if self._fristen is not None:
+            self._fristen.remove(key)
+        if self._volltext is not None:
+            self._volltext.remove(key)
+        if self._aehnlichkeit is not None:
+            self._aehnlichkeit.remove(key)
+        alte = self._index_keys.pop(key, None)
+        if not alte:
+            return
+        for feld, werte in alte.items():
+            index = self._indexes.get(feld)
+            if index is None:
+                continue
+            for wert in werte:
+                bucket = index.get(wert)
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del index[wert]
+
+    def reindex(self, key) -> None:
+        """Aktualisiert die Indexeinträge nach direkter Änderung eines Objekts."""
+        with self._lock:
+            self._index_remove(key)
+            if dict.__contains__(self, key):
+                self._index_add(key, dict.__getitem__(self, key))
+
+    # ---------- Abfragen ----------
+
+    def find(self, feld: str, wert: Any) -> List[Any]:
+        """
+        Alle Objekte, deren Attribut `feld` gleich `wert` ist (bzw. `wert` enthält).
+
+        Reihenfolge entspricht der Einfügereihenfolge. Ohne Index auf `feld`
+        wird auf einen Full-Scan zurückgefallen.
+        """
+        index = self._indexes.get(feld)
+        if index is None:
+            return [obj for obj in self.values() if wert in _index_werte(obj, feld)]
+
+        with self._lock:
+            keys = list(index.get(wert, ()))
+        treffer = []
+        for key in keys:
+            obj = dict.get(self, key)
+            if obj is not None and wert in _index_werte(obj, feld):
+                treffer.append(obj)
+        return treffer
+
+    def find_one(self, feld: str, wert: Any) -> Optional[Any]:
+        """Erstes Objekt mit `feld == wert` oder None."""
+        treffer = self.find(feld, wert)
+        return treffer[0] if treffer else None
+
+    def count(self, feld: str, wert: Any) -> int:
+        """Anzahl der Objekte mit `feld == wert`."""
+        return len(self.find(feld, wert))
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Any]:
+        """Volltextsuche: nach Relevanz sortierte Objekte, die alle Suchbegriffe enthalten."""
+        if self._volltext is None:
+            raise ValueError("Collection hat keinen Volltextindex")
+        treffer = []
+        for key, _score in self._volltext.search(query, limit=limit):
+            obj = dict.get(self, key)
+            if obj is not None:
+                treffer.append(obj)
+        return treffer
+
+    def faellig(self, von: Any = None, bis: Any = None) -> List[Any]:
+        """
+        Objekte des Fristenindex mit von <= Datum <= bis, aufsteigend nach Datum.
+
+        Ein date als `bis` schließt den ganzen Tag ein; beide Grenzen sind optional.
+        """
+        if self._fristen is None:
+            raise ValueError("Collection hat keinen Fristenindex")
+        return self._fristen_objekte(self._fristen.zwischen(von, bis))
+
+    def ueberfaellig(self, stichtag: Any) -> List[Any]:
+        """Objekte des Fristenindex mit Datum < stichtag, aufsteigend nach Datum."""
+        if self._fristen is None:
+            raise ValueError("Collection hat keinen Fristenindex")
+        return self._fristen_objekte(self._fristen.vor(stichtag))
+
+    def _fristen_objekte(self, eintraege) -> List[Any]:
+        treffer = []
+        for key, zeitpunkt in eintraege:
+            obj = dict.get(self, key)
+            # Wie find(): gegen den aktuellen Stand prüfen (z.B. Status direkt geändert)
+            if self._fristen.passt(obj, zeitpunkt):
+                treffer.append(obj)
+        return treffer
+
+    def aehnliche(
+        self,
+        text: str,
+        schwellenwert: float = 0.8,
+        limit: Optional[int] = None,
+    ) -> List[tuple]:
+        """
+        Objekte, deren Text eine Jaccard-Ähnlichkeit ≥ schwellenwert zu `text` hat.
+
+        Returns:
+            Liste von (objekt, ähnlichkeit), absteigend sortiert
+        """
+        if self._aehnlichkeit is None:
+            raise ValueError("Collection hat keinen Ähnlichkeitsindex")
+        treffer = []
+        for key, wert in self._aehnlichkeit.suche(text, schwellenwert=schwellenwert, limit=limit):
+            obj = dict.get(self, key)
+            if obj is not None:
+                treffer.append((obj, wert))
+        return treffer
+
+    # ---------- Schreiben ----------
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._index_remove(key)
+            dict.__setitem__(self, key, value)
+            self._index_add(key, value)
+            self._snapshot = None
+            if self._fehlt:
+                self._fehlt.pop(key, None)
+
+    def __delitem__(self, key):
+        with self._lock:
+            dict.__delitem__(self, key)
+            self._index_remove(key)
+            self._snapshot = None
+
+    def pop(self, key, *default):
+        with self._lock:
+            vorhanden = dict.__contains__(self, key)
+            value = dict.pop(self, key, *default)
+            if vorhanden:
+                self._index_remove(key)
+                self._snapshot = None
+            return value
+
+    def popitem(self):
+        with self._lock:
+            key, value = dict.popitem(self)
+            self._index_remove(key)
+            self._snapshot = None
+            return key, value
+
+    def clear(self):
+        with self._lock:
+            dict.clear(self)
+            for index in self._indexes.values():
+                index.clear()
+            self._index_keys.clear()
+            if self._volltext is not None:
+                self._volltext.clear()
+            if self._aehnlichkeit is not None:
+                self._aehnlichkeit.clear()
+            if self._fristen is not None:
+                self._fristen.clear()
+            self._snapshot = None
+
+    def __reduce__(self):
+        fristen = (self._fristen.feld, self._fristen.aktiv) if self._fristen is not None else None
+        return (_rebuild_indexed, (dict(self.snapshot()), tuple(self._indexes), self._volltext_func,
+                                   self._aehnlichkeit_felder, fristen))
+
+
+def _rebuild_indexed(daten: Dict[Any, Any], indexes: tuple, volltext_func=None,
+                     aehnlichkeit_felder=None, fristen=None) -> IndexedCollection:
+    collection = IndexedCollection(daten, indexes=indexes)
+    if volltext_func is not None:
+        collection.add_volltext(volltext_func)
+    if aehnlichkeit_felder is not None:
+        collection.add_aehnlichkeit(**aehnlichkeit_felder)
+    if fristen is not None:
+        collection.add_fristen(*fristen)
+    return collection
+
+
+class SharedList(list):
+    """
+    Thread-sichere Liste für gemeinsam genutzte, meist append-only Daten
+    (z.B. audit_log, vdr_audit_events).
+
+    Wie SharedCollection: Schreiben unter Lock, Iteration über Snapshot.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._lock = threading.RLock()
+        self._snapshot: Optional[tuple] = None
+
+    def snapshot(self) -> tuple:
+        """Gibt einen konsistenten Stand der Liste als Tupel zurück."""
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                snap = self._snapshot
+                if snap is None:
+                    snap = tuple(list.__iter__(self))
+                    self._snapshot = snap
+        return snap
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def __reversed__(self):
+        return reversed(self.snapshot())
+
+    def copy(self) -> list:
+        return list(self.snapshot())
+
+    def _schreibe(self, methode: Callable, *args):
+        with self._lock:
+            result = methode(self, *args)
+            self._snapshot = None
+            return result
+
+    def append(self, item):
+        self._schreibe(list.append, item)
+
+    def extend(self, items):
+        self._schreibe(list.extend, list(items))
+
+    def insert(self, index, item):
+        self._schreibe(list.insert, index, item)
+
+    def remove(self, item):
+        self._schreibe(list.remove, item)
+
+    def pop(self, *index):
+        return self._schreibe(list.pop, *index)
+
+    def clear(self):
+        self._schreibe(list.clear)
+
+    def sort(self, *args, **kwargs):
+        with self._lock:
+            list.sort(self, *args, **kwargs)
+            self._snapshot = None
+
+    def __setitem__(self, index, value):
+        self._schreibe(list.__setitem__, index, value)
+
+    def __delitem__(self, index):
+        self._schreibe(list.__delitem__, index)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (list(self.snapshot()),))
+
+
+# ============================================================================
+# DATENSPEICHER
+# ============================================================================
+
+class SharedDataStore:
+    """
+    Prozessweiter Speicher für alle Entitäts-Collections der Plattform.
+
+    Wird in streamlit_app.py über st.cache_resource genau einmal pro Prozess
+    erzeugt. Sessions binden sich per get_dict()/get_list() an dieselben
+    Collection-Objekte; Schreibzugriffe einer Session sind dadurch sofort
+    für alle anderen sichtbar.
+
+    Verwendung:
+        store = SharedDataStore()
+        st.session_state.akten = store.get_dict("akten")
+        store.run_once("demo_daten", create_demo_users)
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._collections: Dict[str, Any] = {}
+        self._erledigt: set = set()
+
+    def get_dict(
+        self,
+        name: str,
+        indexes: Iterable[str] = (),
+        volltext: Optional[Callable[[Any], Iterable[Any]]] = None,
+        aehnlichkeit: Optional[Dict[str, Any]] = None,
+        fristen: Optional[Dict[str, Any]] = None,
+    ) -> SharedCollection:
+        """
+        Gibt die gemeinsame Dict-Collection `name` zurück (legt sie bei Bedarf an).
+
+        Args:
+            name: Name der Collection (entspricht dem Session-State-Schlüssel)
+            indexes: Attribute, auf denen Hash-Indizes geführt werden sollen;
+                dann wird eine IndexedCollection angelegt
+            volltext: Textfunktion für einen Volltextindex (ebenfalls IndexedCollection)
+            aehnlichkeit: Argumente für IndexedCollection.add_aehnlichkeit
+                (z.B. {"text_feld": "text"}; ebenfalls IndexedCollection)
+            fristen: Argumente für IndexedCollection.add_fristen
+                (z.B. {"feld": "faellig_am"}; ebenfalls IndexedCollection)
+        """
+        indexes = tuple(indexes)
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    if indexes or volltext is not None or aehnlichkeit is not None or fristen is not None:
+                        collection = IndexedCollection(indexes=indexes)
+                    else:
+                        collection = SharedCollection()
+                    self._collections[name] = collection
+        if isinstance(collection, IndexedCollection):
+            for feld in indexes:
+                collection.add_index(feld)
+            if volltext is not None:
+                collection.add_volltext(volltext)
+            if aehnlichkeit is not None:
+                collection.add_aehnlichkeit(**aehnlichkeit)
+            if fristen is not None:
+                collection.add_fristen(**fristen)
+        return collection
+
+    def get_list(self, name: str) -> SharedList:
+        """Gibt die gemeinsame Listen-Collection `name` zurück (legt sie bei Bedarf an)."""
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    collection = SharedList()
+                    self._collections[name] = collection
+        return collection
+
+    def get_value(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Gibt ein gemeinsames Einzelobjekt zurück (z.B. System-Einstellungen)."""
+        value = self._collections.get(name)
+        if value is None:
+            with self._lock:
+                value = self._collections.get(name)
+                if value is None:
+                    value = factory()
+                    self._collections[name] = value
+        return value
+
+    def run_once(self, key: str, func: Callable[[], Any]) -> bool:
+        """
+        Führt `func` prozessweit genau einmal aus (z.B. Demo-Daten anlegen).
+
+        Returns:
+            True wenn `func` in diesem Aufruf ausgeführt wurde
+        """
+        if key in self._erledigt:
+            return False
+        with self._lock:
+            if key in self._erledigt:
+                return False
+            func()
+            self._erledigt.add(key)
+            return True
+
+    def namen(self) -> List[str]:
+        """Namen aller registrierten Collections."""
+        return sorted(self._collections.keys())
+
+    def stats(self) -> Dict[str, int]:
+        """Anzahl Einträge je Collection (für Monitoring/Admin-Ansicht)."""
+        return {
+            name: len(collection)
+            for name, collection in list(self._collections.items())
+            if isinstance(collection, (dict, list))
+        }
+
+
+# ============================================================================
+# HILFSFUNKTIONEN
+# ============================================================================
+
+def find_by(collection: Dict[Any, Any], feld: str, wert: Any) -> List[Any]:
+    """
+    Indexbasierte Suche in einer Collection.
+
+    Nutzt den Hash-Index einer IndexedCollection; bei normalen Dicts
+    (z.B. Fallback `st.session_state.get(..., {})`) wird gescannt.
+    """
+    if isinstance(collection, IndexedCollection):
+        return collection.find(feld, wert)
+    return [obj for obj in collection.values() if wert in _index_werte(obj, feld)]
+
+
+def reindex_entry(collection: Dict[Any, Any], key: Any) -> None:
+    """Aktualisiert die Indizes nach direkter Änderung eines gespeicherten Objekts."""
+    if isinstance(collection, IndexedCollection):
+        collection.reindex(key)
+
+
+def volltext_ids(collection: Dict[Any, Any], query: str) -> Optional[set]:
+    """
+    IDs aller Objekte der Collection, die die Volltextabfrage erfüllen.
+
+    Returns:
+        Menge der Schlüssel oder None, wenn die Collection keinen Volltextindex hat
+        (Aufrufer fallen dann auf ihre bisherige Substring-Suche zurück)
+    """
+    if not tokenize(query):
+        return None  # z.B. nur Satzzeichen - nicht über den Index abbildbar
+    if isinstance(collection, IndexedCollection) and collection.volltext is not None:
+        return collection.volltext.search_ids(query)
+    return None
+
+
+def faellige_objekte(collection: Dict[Any, Any], von: Any = None, bis: Any = None) -> Optional[List[Any]]:
+    """
+    Objekte mit Datum im Bereich [von, bis] über den Fristenindex der Collection.
+
+    Returns:
+        Liste aufsteigend nach Datum oder None, wenn die Collection keinen
+        Fristenindex hat (Aufrufer fallen dann auf ihren bisherigen Scan zurück)
+    """
+    if isinstance(collection, IndexedCollection) and collection.fristen is not None:
+        return collection.faellig(von, bis)
+    return None
@@ -0,0 +1,510 @@
+"""
+Dokumentverarbeitung - Textextraktion und nebenläufige Batch-Pipeline
+
+Enthält die reinen (Streamlit-freien) Verarbeitungsschritte für hochgeladene
+Vertragsdokumente, damit sie in Worker-Prozessen laufen können:
+
+1. Textextraktion aus DOCX/RTF/PDF/Bildern
+2. Zerlegung des Volltexts in Textbausteine
+3. Nebenläufige Batch-Pipeline:
+   - Extraktion + Zerlegung in einem Prozess-Pool (CPU-gebunden)
+   - KI-Analyse der Bausteine in einem Thread-Pool (I/O-gebunden),
+     gedrosselt über einen Token-Bucket und mit Wiederholung bei
+     vorübergehenden API-Fehlern (429/5xx/Timeouts)
+   - Ergebnisse werden je Dokument geliefert, sobald es fertig ist
+   - Fehler in einem Dokument beenden nicht den gesamten Batch
+
+Verwendung:
+    for erg in verarbeite_batch_parallel(dateien, analysiere=meine_analyse):
+        if erg.fehler:
+            ...
+        else:
+            for baustein in erg.bausteine:
+                baustein['analyse']  # Ergebnis von meine_analyse oder None
+"""
+
+import io
+import logging
+import os
+import random
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# KONFIGURATION
+# ============================================================================
+
+# Gleichzeitige KI-Anfragen
+LLM_MAX_PARALLEL = 8
+
+# Erlaubte KI-Anfragen pro Sekunde (Token-Bucket) und Burst-Größe
+LLM_RATE_PRO_SEKUNDE = 5.0
+LLM_BURST = 10
+
+# Wiederholungen bei vorübergehenden API-Fehlern
+LLM_MAX_VERSUCHE = 4
+LLM_BASIS_WARTEZEIT = 1.0
+LLM_MAX_WARTEZEIT = 30.0
+
+# Mindestlänge für einen Baustein bzw. einen verwertbaren Volltext
+MIN_BAUSTEIN_LAENGE = 50
+MIN_TEXT_LAENGE = 50
+MIN_ZERLEGUNG_LAENGE = 100
+
+
+# ============================================================================
+# TEXTEXTRAKTION
+# ============================================================================
+
+_WORD_NS = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+
+
+def extrahiere_text_aus_datei(datei_bytes: bytes, dateityp: str, dateiname: str) -> str:
+    """Extrahiert Text aus verschiedenen Dateiformaten"""
+    text = ""
+
+    if dateityp == "docx":
+        try:
+            # Versuche docx zu parsen (einfache XML-Extraktion)
+            with zipfile.ZipFile(io.BytesIO(datei_bytes)) as docx:
+                if 'word/document.xml' in docx.namelist():
+                    with docx.open('word/document.xml') as doc:
+                        tree = ElementTree.parse(doc)
+                        root = tree.getroot()
+                        paragraphs = root.findall('.//w:p', _WORD_NS)
+                        for p in paragraphs:
+                            texts = p.findall('.//w:t', _WORD_NS)
+                            para_text = ''.join(t.text or '' for t in texts)
+                            if para_text.strip():
+                                text += para_text + "\n"
+        except Exception as e:
+            text = f"[Fehler beim Lesen der DOCX-Datei: {str(e)}]"
+
+    elif dateityp == "rtf":
+        try:
+            # RTF-Text-Extraktion
+            content = datei_bytes.decode('latin-1', errors='ignore')
+
+            # Entferne RTF-Steuerzeichen und extrahiere Text
+            # Entferne RTF-Header und Control-Words
+            content = re.sub(r'\\[a-z]+\d*\s?', '', content)
+            # Entferne geschweifte Klammern
+            content = re.sub(r'[{}]', '', content)
+            # Entferne Hex-Codes wie \'xx
+            content = re.sub(r"\\'[0-9a-fA-F]{2}", '', content)
+            # Ersetze RTF-Zeilenumbrüche
+            content = content.replace('\\par', '\n')
+            content = content.replace('\\line', '\n')
+            # Bereinige mehrfache Leerzeichen
+            content = re.sub(r' +', ' ', content)
+            content = re.sub(r'\n+', '\n', content)
+
+            text = content.strip()
+
+            if len(text) < 50:
+                text = "[RTF-Text konnte nicht vollständig extrahiert werden. Bitte prüfen Sie das Dokument.]"
+        except Exception as e:
+            text = f"[Fehler beim Lesen der RTF-Datei: {str(e)}]"
+
+    elif dateityp == "pdf":
+        # PDF-Text-Extraktion (vereinfacht - in Production würde man PyPDF2 oder pdfplumber verwenden)
+        try:
+            # Versuche einfache Text-Extraktion aus PDF
+            content = datei_bytes.decode('latin-1', errors='ignore')
+            # Suche nach Text-Streams
+            text_pattern = re.compile(r'\((.*?)\)', re.DOTALL)
+            matches = text_pattern.findall(content)
+            text = ' '.join(matches[:100])  # Begrenzen
+            if len(text) < 100:
+                text = "[PDF-Text konnte nicht automatisch extrahiert werden. Bitte OCR verwenden oder Text manuell eingeben.]"
+        except Exception:
+            text = "[PDF-Verarbeitung fehlgeschlagen]"
+
+    elif dateityp in ["image", "jpg", "jpeg", "png"]:
+        text = "[Bild-Datei erkannt. OCR-Verarbeitung erforderlich für Textextraktion.]"
+
+    return text.strip()
+
+
+def ermittle_dateityp(dateiname: str) -> str:
+    """Leitet den internen Dateityp aus der Endung ab (Bilder → 'image')."""
+    dateityp = dateiname.split('.')[-1].lower()
+    if dateityp in ['jpg', 'jpeg', 'png']:
+        dateityp = 'image'
+    return dateityp
+
+
+# ============================================================================
+# ZERLEGUNG IN TEXTBAUSTEINE
+# ============================================================================
+
+# Verschiedene Muster für Vertragsabschnitte (in Prioritätsreihenfolge)
+_ABSCHNITT_MUSTER = [
+    re.compile(r'§\s*\d+', re.MULTILINE),  # § 1, § 2, etc.
+    re.compile(r'Artikel\s+\d+', re.MULTILINE),  # Artikel 1, etc.
+    re.compile(r'\n[IVX]+\.\s', re.MULTILINE),  # I. II. III. etc.
+    re.compile(r'\n\d+\.\s+[A-ZÄÖÜ]', re.MULTILINE),  # 1. Titel, 2. Titel
+]
+_LEERZEILE_RE = re.compile(r'\n\s*\n')
+
+
+def zerlege_vertrag_in_bausteine(volltext: str) -> List[Dict[str, Any]]:
+    """Zerlegt einen Vertrag in einzelne Textbausteine mit Start/End-Indizes"""
+    bausteine = []
+
+    # Finde alle Trennpunkte mit Positionen
+    trennpunkte = [0]  # Start des Dokuments
+
+    for pattern in _ABSCHNITT_MUSTER:
+        matches = list(pattern.finditer(volltext))
+        if len(matches) >= 2:  # Mindestens 2 Treffer für sinnvolle Zerlegung
+            trennpunkte = [0] + [m.start() for m in matches] + [len(volltext)]
+            break
+
+    # Falls keine Muster gefunden, nach doppelten Zeilenumbrüchen suchen
+    if len(trennpunkte) <= 2:
+        matches = list(_LEERZEILE_RE.finditer(volltext))
+        if matches:
+            trennpunkte = [0] + [m.end() for m in matches] + [len(volltext)]
+
+    # Falls immer noch keine Trennpunkte, den gesamten Text als einen Baustein
+    if len(trennpunkte) <= 2:
+        trennpunkte = [0, len(volltext)]
+
+    # Bausteine aus Trennpunkten erstellen
+    for i in range(len(trennpunkte) - 1):
+        start_idx = trennpunkte[i]
+        end_idx = trennpunkte[i + 1]
+        teil_text = volltext[start_idx:end_idx].strip()
+
+        if len(teil_text) > MIN_BAUSTEIN_LAENGE:  # Mindestlänge für einen Baustein
+            # Berechne tatsächliche Start/End-Position (ohne führende/trailing Whitespaces)
+            actual_start = volltext.find(teil_text, start_idx)
+            actual_end = actual_start + len(teil_text)
+
+            bausteine.append({
+                'text': teil_text,
+                'position': i,
+                'start_index': actual_start,
+                'end_index': actual_end
+            })
+
+    return bausteine
+
+
+# ============================================================================
+# DROSSELUNG & WIEDERHOLUNG FÜR KI-AUFRUFE
+# ============================================================================
+
+class RateLimiter:
+    """
+    Thread-sicherer Token-Bucket: höchstens `rate` Aufrufe pro Sekunde,
+    kurzfristig bis zu `burst` Aufrufe am Stück.
+    """
+
+    def __init__(self, rate: float = LLM_RATE_PRO_SEKUNDE, burst: int = LLM_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._zuletzt = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blockiert, bis ein Aufruf erlaubt ist."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                jetzt = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (jetzt - self._zuletzt) * self.rate)
+                self._zuletzt = jetzt
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                warte = (1 - self._tokens) / self.rate
+            time.sleep(warte)
+
+
+_llm_limiter: Optional[RateLimiter] = None
+_llm_limiter_lock = threading.Lock()
+
+
+def get_llm_rate_limiter() -> RateLimiter:
+    """Prozessweiter Token-Bucket für KI-Anfragen (gilt für alle Sessions)."""
+    global _llm_limiter
+    if _llm_limiter is None:
+        with _llm_limiter_lock:
+            if _llm_limiter is None:
+                _llm_limiter = RateLimiter()
+    return _llm_limiter
+
+
+def ist_voruebergehender_fehler(fehler: BaseException) -> bool:
+    """
+    Ob sich eine Wiederholung lohnt: Rate-Limit (429), Serverfehler (5xx),
+    Timeouts und Verbindungsabbrüche. Andere 4xx-Fehler sind endgültig.
+    """
+    status = getattr(fehler, 'code', None) or getattr(fehler, 'status_code', None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(fehler, (TimeoutError, ConnectionError)):
+        return True
+    # urllib.error.URLError ohne HTTP-Status (DNS, Verbindung) und SDK-Fehlerklassen
+    name = type(fehler).__name__
+    return name in ('URLError', 'APIConnectionError', 'APITimeoutError', 'RateLimitError')
+
+
+def _retry_after(fehler: BaseException) -> Optional[float]:
+    """Liest einen Retry-After-Header (Sekunden) aus HTTP-Fehlern, falls vorhanden."""
+    headers = getattr(fehler, 'headers', None)
+    if headers is None:
+        antwort = getattr(fehler, 'response', None)
+        headers = getattr(antwort, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+def mit_wiederholung(
+    aufruf: Callable[[], Any],
+    drossel: Optional[RateLimiter] = None,
+    max_versuche: int = LLM_MAX_VERSUCHE,
+    basis_wartezeit: float = LLM_BASIS_WARTEZEIT,
+    max_wartezeit: float = LLM_MAX_WARTEZEIT,
+    wiederholen_bei: Callable[[BaseException], bool] = ist_voruebergehender_fehler,
+) -> Any:
+    """
+    Führt einen Aufruf gedrosselt aus und wiederholt ihn bei vorübergehenden
+    Fehlern mit exponentiellem Backoff (mit Jitter, Retry-After wird beachtet).
+
+    Args:
+        aufruf: Funktion ohne Argumente (z.B. der eigentliche API-Request)
+        drossel: Optional - RateLimiter, vor jedem Versuch abgefragt
+        max_versuche: Maximale Anzahl Versuche insgesamt
+        basis_wartezeit: Wartezeit vor dem zweiten Versuch (verdoppelt sich)
+        max_wartezeit: Obergrenze der Wartezeit zwischen zwei Versuchen
+        wiederholen_bei: Prädikat, ob ein Fehler wiederholt werden soll
+
+    Returns:
+        Rückgabewert des Aufrufs
+
+    Raises:
+        Den letzten Fehler, wenn alle Versuche fehlschlagen oder der Fehler endgültig ist
+    """
+    versuch = 0
+    while True:
+        versuch += 1
+        if drossel is not None:
+            drossel.acquire()
+        try:
+            return aufruf()
+        except Exception as e:
+            if versuch >= max_versuche or not wiederholen_bei(e):
+                raise
+            warte = _retry_after(e)
+            if warte is None:
+                warte = basis_wartezeit * (2 ** (versuch - 1))
+                warte *= 0.5 + random.random()
+            warte = min(warte, max_wartezeit)
+            logger.info(f"KI-Aufruf fehlgeschlagen ({e}), Versuch {versuch + 1}/{max_versuche} in {warte:.1f}s")
+            time.sleep(warte)
+
+
+# ============================================================================
+# BATCH-PIPELINE
+# ============================================================================
+
+@dataclass
+class DokumentErgebnis:
+    """Ergebnis der Pipeline für ein einzelnes Dokument."""
+    index: int
+    dateiname: str
+    dateityp: str
+    datei_bytes: bytes
+    volltext: str = ""
+    bausteine: List[Dict[str, Any]] = field(default_factory=list)
+    fehler: Optional[str] = None
+
+
+def _extraktion_worker(
+    dateiname: str,
+    datei_bytes: bytes,
+    auto_zerlegen: bool,
+) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """Läuft im Worker-Prozess: Text extrahieren und in Bausteine zerlegen."""
+    dateityp = ermittle_dateityp(dateiname)
+    text = extrahiere_text_aus_datei(datei_bytes, dateityp, dateiname)
+    bausteine: List[Dict[str, Any]] = []
+    if auto_zerlegen and len(text) > MIN_ZERLEGUNG_LAENGE:
+        bausteine = zerlege_vertrag_in_bausteine(text)
+    return dateityp, text, bausteine
+
+
+def _erstelle_extraktions_pool(max_prozesse: Optional[int], anzahl: int) -> Executor:
+    """Prozess-Pool für die Extraktion; fällt auf Threads zurück, wenn Prozesse nicht verfügbar sind."""
+    if max_prozesse is None:
+        max_prozesse = min(anzahl, os.cpu_count() or 1)
+    if max_prozesse > 1 and anzahl > 1:
+        try:
+            return ProcessPoolExecutor(max_workers=max_prozesse)
+        except (OSError, NotImplementedError, ValueError) as e:
+            logger.warning(f"Prozess-Pool nicht verfügbar ({e}), Extraktion in Threads")
+    return ThreadPoolExecutor(max_workers=max(1, min(max_prozesse, 4)))
+
+
+def extraktion_pool_defekt(pool: Executor) -> bool:
+    """Ob ein Prozess-Pool nach einem Worker-Absturz unbrauchbar ist."""
+    return bool(getattr(pool, '_broken', False))
+
+
+def verarbeite_batch_parallel(
+    dateien: Sequence[Tuple[str, bytes]],
+    analysiere: Optional[Callable[[str], Any]] = None,
+    auto_zerlegen: bool = True,
+    max_prozesse: Optional[int] = None,
+    max_threads: int = LLM_MAX_PARALLEL,
+) -> Iterator[DokumentErgebnis]:
+    """
+    Verarbeitet Dokumente nebenläufig und liefert jedes Ergebnis, sobald es fertig ist.
+
+    Extraktion und Zerlegung laufen im Prozess-Pool; höchstens doppelt so
+    viele Dokumente wie Worker sind gleichzeitig unterwegs. Die Analyse der
+    Bausteine läuft im Thread-Pool; die Drosselung übernimmt `analysiere`
+    selbst (siehe mit_wiederholung).
+
+    Der Generator muss im aufrufenden (Streamlit-)Thread konsumiert werden;
+    dort können Session-State und Fortschrittsanzeige gefahrlos aktualisiert
+    werden.
+
+    Args:
+        dateien: Liste von (dateiname, datei_bytes)
+        analysiere: Optional - Funktion Baustein-Text → Analyse (läuft in Threads);
+            schlägt sie fehl, ist baustein['analyse'] None
+        auto_zerlegen: Ob der Volltext in Bausteine zerlegt wird
+        max_prozesse: Anzahl Extraktions-Prozesse (Default: CPU-Anzahl, 1 = ohne Prozesse)
+        max_threads: Anzahl gleichzeitiger Analyse-Threads
+
+    Yields:
+        DokumentErgebnis je Dokument (in Fertigstellungsreihenfolge)
+    """
+    if not dateien:
+        return
+
+    extraktion_pool = _erstelle_extraktions_pool(max_prozesse, len(dateien))
+    analyse_pool = ThreadPoolExecutor(max_workers=max(1, max_threads)) if analysiere else None
+    fenster = max(2, getattr(extraktion_pool, '_max_workers', 1) * 2)
+
+    offen: Dict[Future, Tuple[str, Any]] = {}
+    ausstehend: Dict[int, int] = {}  # Dokument-Index → offene Analysen
+    ergebnisse: Dict[int, DokumentErgebnis] = {}
+    wiederholen: List[int] = []  # nach Absturz eines Worker-Prozesses erneut einzureichen
+    abgestuerzt: set = set()
+    naechstes = 0
+
+    def _submit_extraktion(idx: int) -> None:
+        dateiname, datei_bytes = dateien[idx]
+        future = extraktion_pool.submit(_extraktion_worker, dateiname, datei_bytes, auto_zerlegen)
+        offen[future] = ('extraktion', idx)
+
+    def _einreichen() -> None:
+        nonlocal naechstes
+        while wiederholen:
+            _submit_extraktion(wiederholen.pop())
+        while naechstes < len(dateien) and sum(1 for art, _ in offen.values() if art == 'extraktion') < fenster:
+            _submit_extraktion(naechstes)
+            naechstes += 1
+
+    try:
+        _einreichen()
+        while offen:
+            fertig, _ = wait(list(offen), return_when=FIRST_COMPLETED)
+            for future in fertig:
+                art, ref = offen.pop(future)
+
+                if art == 'extraktion':
+                    idx = ref
+                    dateiname, datei_bytes = dateien[idx]
+                    erg = DokumentErgebnis(
+                        index=idx,
+                        dateiname=dateiname,
+                        dateityp=ermittle_dateityp(dateiname),
+                        datei_bytes=datei_bytes,
+                    )
+                    try:
+                        erg.dateityp, erg.volltext, erg.bausteine = future.result()
+                    except BrokenProcessPool as e:
+                        # Ein Worker ist abgestürzt (z.B. Speicher) - alle laufenden Aufträge
+                        # des Pools sind betroffen. Neuer Pool, jedes Dokument bekommt einen
+                        # zweiten Versuch; erst danach gilt es als fehlerhaft.
+                        if extraktion_pool_defekt(extraktion_pool):
+                            extraktion_pool.shutdown(wait=False, cancel_futures=True)
+                            extraktion_pool = _erstelle_extraktions_pool(max_prozesse, len(dateien))
+                        if idx not in abgestuerzt:
+                            abgestuerzt.add(idx)
+                            wiederholen.append(idx)
+                            continue
+                        logger.warning(f"Extraktion fehlgeschlagen für {dateiname}: Worker-Prozess abgestürzt")
+                        erg.fehler = f"Worker-Prozess abgestürzt ({e})"
+                        yield erg
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Extraktion fehlgeschlagen für {dateiname}: {e}")
+                        erg.fehler = str(e) or type(e).__name__
+                        yield erg
+                        continue
+
+                    if len(erg.volltext.strip()) < MIN_TEXT_LAENGE:
+                        erg.fehler = "Kein Text extrahierbar oder zu kurz"
+                        yield erg
+                        continue
+
+                    if analyse_pool is None or not erg.bausteine:
+                        yield erg
+                        continue
+
+                    ergebnisse[idx] = erg
+                    ausstehend[idx] = len(erg.bausteine)
+                    for b_idx, baustein in enumerate(erg.bausteine):
+                        baustein['analyse'] = None
+                        a_future = analyse_pool.submit(analysiere, baustein['text'])
+                        offen[a_future] = ('analyse', (idx, b_idx))
+
+                else:
+                    idx, b_idx = ref
+                    erg = ergebnisse[idx]
+                    try:
+                        erg.bausteine[b_idx]['analyse'] = future.result()
+                    except Exception as e:
+                        logger.warning(f"KI-Analyse fehlgeschlagen ({erg.dateiname}, Baustein {b_idx}): {e}")
+                    ausstehend[idx] -= 1
+                    if ausstehend[idx] == 0:
+                        del ausstehend[idx]
+                        yield ergebnisse.pop(idx)
+
+            _einreichen()
+    finally:
+        for future in offen:
+            future.cancel()
+        extraktion_pool.shutdown(wait=False, cancel_futures=True)
+        if analyse_pool is not None:
+            analyse_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,337 @@
+"""
+Fristenindex - nach Datum sortierter Index und Erinnerungs-Scheduler
+
+Ersetzt die bisherigen Listen-Scans über alle Fristen, Termine und
+Löschungsbewilligungs-Fälle (Status prüfen, Datum vergleichen, sortieren -
+bei jedem Aufruf bzw. jedem Seiten-Render) durch:
+
+- FristenIndex: sortierte Liste (Datum, Schlüssel) mit eingebautem
+  Statusfilter; Bereichsabfragen ("fällig in den nächsten N Tagen",
+  "überfällig") per Binärsuche in O(log n + k)
+- ErinnerungsScheduler: Hintergrund-Thread mit Min-Heap nach
+  Fälligkeitszeitpunkt, der jede Erinnerung genau einmal auslöst
+
+Datumswerte werden intern als datetime geführt (date → 00:00 Uhr), sodass
+Fristen (datetime) und Termine/Fälle (date) denselben Index nutzen können.
+"""
+
+import heapq
+import logging
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, time as dt_time, timedelta
+from itertools import count
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def als_zeitpunkt(wert: Any) -> Optional[datetime]:
+    """Normalisiert date/datetime auf datetime (date → 00:00 Uhr); sonst None."""
+    if isinstance(wert, datetime):
+        return wert.replace(tzinfo=None) if wert.tzinfo else wert
+    if isinstance(wert, date):
+        return datetime.combine(wert, dt_time.min)
+    return None
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class FristenIndex:
+    """
+    Nach Datum sortierter Index über Objekte mit Fälligkeitsdatum.
+
+    Aufgenommen werden nur Objekte, für die `aktiv(obj)` wahr ist (z.B.
+    Status "offen"); erledigte Fristen belegen damit keinen Platz in den
+    Bereichsabfragen. Die Einträge sind (zeitpunkt, schlüssel)-Tupel in
+    einer sortierten Liste; Abfragen liefern Schlüssel in Datumsreihenfolge.
+
+    Thread-sicher; für die gemeinsame Nutzung über alle Sessions gedacht
+    (siehe IndexedCollection.add_fristen in modules/datenspeicher.py).
+
+    Verwendung:
+        index = FristenIndex("faellig_am", aktiv=lambda f: f.status == "offen")
+        index.add(frist.frist_id, frist)
+        index.zwischen(heute, heute + timedelta(days=7))
+    """
+
+    def __init__(self, feld: str, aktiv: Optional[Callable[[Any], bool]] = None):
+        self.feld = feld
+        self.aktiv = aktiv
+        self._lock = threading.RLock()
+        self._eintraege: List[Tuple[datetime, int, Hashable]] = []
+        self._position: Dict[Hashable, Tuple[datetime, int, Hashable]] = {}
+        # Reihenfolge bei gleichem Datum: Einfügereihenfolge (Schlüssel selbst
+        # müssen nicht vergleichbar sein)
+        self._seq = count()
+
+    def zeitpunkt(self, obj: Any) -> Optional[datetime]:
+        """Zeitpunkt, unter dem `obj` indiziert wird (None = nicht indiziert)."""
+        if self.aktiv is not None:
+            try:
+                if not self.aktiv(obj):
+                    return None
+            except Exception:
+                return None  # Objekt ohne die erwarteten Felder
+        return als_zeitpunkt(getattr(obj, self.feld, None))
+
+    def passt(self, obj: Any, zeitpunkt: datetime) -> bool:
+        """Ob ein Treffer noch dem aktuellen Stand des Objekts entspricht."""
+        return obj is not None and self.zeitpunkt(obj) == zeitpunkt
+
+    # ---------- Pflege ----------
+
+    def add(self, key: Hashable, obj: Any) -> None:
+        """Nimmt `obj` unter `key` auf (bzw. ersetzt den bisherigen Eintrag)."""
+        with self._lock:
+            self.remove(key)
+            zeitpunkt = self.zeitpunkt(obj)
+            if zeitpunkt is None:
+                return
+            eintrag = (zeitpunkt, next(self._seq), key)
+            insort(self._eintraege, eintrag)
+            self._position[key] = eintrag
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            eintrag = self._position.pop(key, None)
+            if eintrag is None:
+                return
+            i = bisect_left(self._eintraege, eintrag)
+            if i < len(self._eintraege) and self._eintraege[i] == eintrag:
+                del self._eintraege[i]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._eintraege.clear()
+            self._position.clear()
+
+    def __len__(self) -> int:
+        return len(self._position)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._position
+
+    # ---------- Abfragen ----------
+
+    def _bereich(self, lo: int, hi: int) -> List[Tuple[Hashable, datetime]]:
+        return [(key, zeitpunkt) for zeitpunkt, _, key in self._eintraege[lo:hi]]
+
+    def zwischen(self, von: Any = None, bis: Any = None) -> List[Tuple[Hashable, datetime]]:
+        """
+        Alle Einträge mit von <= zeitpunkt <= bis (Grenzen optional).
+
+        Ein date als `bis` schließt den ganzen Tag ein.
+
+        Returns:
+            Liste von (schlüssel, zeitpunkt), aufsteigend nach Datum
+        """
+        with self._lock:
+            lo = 0
+            hi = len(self._eintraege)
+            if von is not None:
+                lo = bisect_left(self._eintraege, (als_zeitpunkt(von),))
+            if bis is not None:
+                grenze = als_zeitpunkt(bis)
+                if not isinstance(bis, datetime):
+                    grenze = datetime.combine(bis, dt_time.max)
+                # (grenze, ∞): alle Einträge mit zeitpunkt == grenze liegen davor
+                hi = bisect_right(self._eintraege, (grenze, float("inf")))
+            return self._bereich(lo, hi)
+
+    def vor(self, stichtag: Any) -> List[Tuple[Hashable, datetime]]:
+        """Alle Einträge mit zeitpunkt < stichtag (überfällig), aufsteigend."""
+        with self._lock:
+            hi = bisect_left(self._eintraege, (als_zeitpunkt(stichtag),))
+            return self._bereich(0, hi)
+
+    def naechster(self) -> Optional[Tuple[Hashable, datetime]]:
+        """Frühester Eintrag oder None."""
+        with self._lock:
+            if not self._eintraege:
+                return None
+            zeitpunkt, _, key = self._eintraege[0]
+            return key, zeitpunkt
+
+
+def baue_fristen_index(
+    objekte: Iterable[Tuple[Hashable, Any]],
+    feld: str,
+    aktiv: Optional[Callable[[Any], bool]] = None,
+) -> FristenIndex:
+    """Erzeugt einen FristenIndex aus (schlüssel, objekt)-Paaren (sortiert einmal)."""
+    index = FristenIndex(feld, aktiv=aktiv)
+    eintraege = []
+    for key, obj in objekte:
+        zeitpunkt = index.zeitpunkt(obj)
+        if zeitpunkt is not None:
+            eintrag = (zeitpunkt, next(index._seq), key)
+            eintraege.append(eintrag)
+            index._position[key] = eintrag
+    eintraege.sort()
+    index._eintraege = eintraege
+    return index
+
+
+# ============================================================================
+# SCHEDULER
+# ============================================================================
+
+class ErinnerungsScheduler:
+    """
+    Löst Erinnerungen zum geplanten Zeitpunkt genau einmal aus.
+
+    Geplante Erinnerungen liegen in einem Min-Heap nach Zeitpunkt; ein
+    Hintergrund-Thread schläft bis zur nächsten Fälligkeit (bzw. bis eine
+    frühere eingeplant wird) und ruft dann `aktion(payload)` auf. Jeder
+    Erinnerungs-Schlüssel wird höchstens einmal ausgelöst, auch wenn er
+    mehrfach eingeplant wird. Zusätzlich können periodische Jobs
+    registriert werden (z.B. Abgleich gegen einen FristenIndex).
+
+    Die Aktionen laufen im Scheduler-Thread, also ohne Streamlit-Session;
+    sie dürfen nur auf den gemeinsamen Datenspeicher zugreifen.
+
+    Verwendung:
+        scheduler = ErinnerungsScheduler()
+        scheduler.plane(("termin1", 1), zeitpunkt, sende, payload)
+        scheduler.start()
+    """
+
+    def __init__(self, jetzt: Callable[[], datetime] = datetime.now):
+        self._jetzt = jetzt
+        self._bedingung = threading.Condition()
+        self._heap: List[Tuple[datetime, int, Hashable]] = []
+        self._geplant: Dict[Hashable, Tuple[datetime, Callable[[Any], Any], Any]] = {}
+        self._ausgeloest: set = set()
+        self._jobs: List[Tuple[float, Callable[[], Any]]] = []
+        self._naechster_job: List[datetime] = []
+        self._seq = count()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+
+    # ---------- Planung ----------
+
+    def plane(self, key: Hashable, zeitpunkt: Any, aktion: Callable[[Any], Any], payload: Any = None) -> bool:
+        """
+        Plant eine Erinnerung (ersetzt eine noch nicht ausgelöste mit gleichem Schlüssel).
+
+        Returns:
+            False wenn `key` bereits ausgelöst wurde
+        """
+        zeitpunkt = als_zeitpunkt(zeitpunkt)
+        if zeitpunkt is None:
+            return False
+        with self._bedingung:
+            if key in self._ausgeloest:
+                return False
+            vorher = self._geplant.get(key)
+            self._geplant[key] = (zeitpunkt, aktion, payload)
+            if vorher is not None and vorher[0] == zeitpunkt:
+                return True  # Heap-Eintrag besteht bereits (wiederholter Abgleich)
+            heapq.heappush(self._heap, (zeitpunkt, next(self._seq), key))
+            self._bedingung.notify()
+            return True
+
+    def entferne(self, key: Hashable) -> None:
+        """Verwirft eine geplante Erinnerung (der Heap-Eintrag verfällt beim Auslesen)."""
+        with self._bedingung:
+            self._geplant.pop(key, None)
+
+    def markiere_ausgeloest(self, key: Hashable) -> None:
+        """Markiert `key` als bereits ausgelöst (z.B. aus persistiertem Stand)."""
+        with self._bedingung:
+            self._ausgeloest.add(key)
+            self._geplant.pop(key, None)
+
+    def ist_ausgeloest(self, key: Hashable) -> bool:
+        return key in self._ausgeloest
+
+    def registriere_job(self, intervall_sekunden: float, job: Callable[[], Any]) -> None:
+        """Registriert einen periodischen Job (erster Lauf beim nächsten Tick)."""
+        with self._bedingung:
+            self._jobs.append((intervall_sekunden, job))
+            self._naechster_job.append(self._jetzt())
+            self._bedingung.notify()
+
+    def __len__(self) -> int:
+        return len(self._geplant)
+
+    # ---------- Ausführung ----------
+
+    def tick(self) -> int:
+        """
+        Führt alle fälligen Jobs und Erinnerungen aus (auch ohne Thread nutzbar).
+
+        Returns:
+            Anzahl ausgelöster Erinnerungen
+        """
+        jetzt = self._jetzt()
+        faellige_jobs = []
+        with self._bedingung:
+            for i, (intervall, job) in enumerate(self._jobs):
+                if self._naechster_job[i] <= jetzt:
+                    self._naechster_job[i] = jetzt + timedelta(seconds=intervall)
+                    faellige_jobs.append(job)
+        for job in faellige_jobs:
+            try:
+                job()
+            except Exception as e:
+                logger.exception(f"Scheduler-Job fehlgeschlagen: {e}")
+
+        faellig = []
+        with self._bedingung:
+            while self._heap and self._heap[0][0] <= jetzt:
+                zeitpunkt, _, key = heapq.heappop(self._heap)
+                geplant = self._geplant.get(key)
+                # Veraltete Heap-Einträge (ersetzt/entfernt) überspringen
+                if geplant is None or geplant[0] != zeitpunkt:
+                    continue
+                del self._geplant[key]
+                self._ausgeloest.add(key)
+                faellig.append((key, geplant[1], geplant[2]))
+
+        for key, aktion, payload in faellig:
+            try:
+                aktion(payload)
+            except Exception as e:
+                logger.exception(f"Erinnerung {key!r} fehlgeschlagen: {e}")
+        return len(faellig)
+
+    def _wartezeit(self) -> Optional[float]:
+        termine = [zeitpunkt for zeitpunkt, _, _ in self._heap[:1]] + self._naechster_job
+        if not termine:
+            return None
+        return max(0.0, (min(termine) - self._jetzt()).total_seconds())
+
+    def _laufe(self) -> None:
+        while True:
+            with self._bedingung:
+                if self._stop:
+                    return
+                wartezeit = self._wartezeit()
+                if wartezeit is None or wartezeit > 0:
+                    # Höchstens eine Minute am Stück: fängt Uhrzeitsprünge ab
+                    self._bedingung.wait(min(wartezeit, 60.0) if wartezeit is not None else 60.0)
+                if self._stop:
+                    return
+            self.tick()
+
+    def start(self) -> None:
+        """Startet den Hintergrund-Thread (idempotent)."""
+        with self._bedingung:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop = False
+            self._thread = threading.Thread(target=self._laufe, name="erinnerungs-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._bedingung:
+            self._stop = True
+            self._bedingung.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
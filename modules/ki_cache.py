@@ -0,0 +1,359 @@
+"""
+KI-Cache - Zwischenspeicher für LLM-Ergebnisse
+
+Jeder Aufruf der KI-Funktionen (parse_urkunde, ocr_grundbuch_mit_ki,
+ocr_personalausweis_*, ki_analysiere_textbaustein, ...) kostet Tokens und
+Sekunden - auch wenn nach einem Streamlit-Rerun dasselbe PDF erneut
+analysiert wird. Dieser Cache speichert die Modellantworten unter
+
+    sha256(Eingabe-Bytes bzw. -Text) + Modell + Prompt-Version
+
+zweistufig:
+1. In-Memory-LRU (prozessweit, Millisekunden-Zugriff)
+2. SQLite-Datei auf der Festplatte (übersteht Neustarts)
+
+Einträge verfallen nach einer TTL; die Festplattendatei wird per
+Größenlimit (älteste Zugriffe zuerst) begrenzt. Ergebnisse mit
+personenbezogenen Daten (z.B. Ausweis-OCR) werden mit persistent=False
+und kurzer TTL nur im Speicher gehalten.
+
+Verwendung:
+    cache = get_ki_cache()
+    key = cache.make_key(pdf_bytes, model="gpt-4o-mini", prompt_version="grundbuch-v1")
+    antwort = cache.get(key)
+    if antwort is None:
+        antwort = client.chat.completions.create(...).choices[0].message.content
+        cache.set(key, antwort, model="gpt-4o-mini")
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# KONFIGURATION
+# ============================================================================
+
+# Pfad der SQLite-Datei (über Umgebungsvariable KI_CACHE_PATH überschreibbar)
+DEFAULT_CACHE_PATH = "./ki_cache.db"
+
+# Standard-Lebensdauer eines Eintrags: 30 Tage
+DEFAULT_TTL_SEKUNDEN = 30 * 24 * 3600
+
+# Maximale Anzahl Einträge im Speicher
+DEFAULT_MAX_SPEICHER_EINTRAEGE = 512
+
+# Maximale Größe der Einträge auf der Festplatte (Summe der Werte in Bytes)
+DEFAULT_MAX_DISK_BYTES = 200 * 1024 * 1024
+
+_FEHLT = object()
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class KICache:
+    """
+    Zweistufiger Cache (LRU im Speicher vor SQLite) für Modellantworten.
+
+    Werte müssen JSON-serialisierbar sein (typisch: Antworttext oder Dict).
+    Alle Methoden sind thread-sicher. Ein nicht verfügbarer Festplatten-Store
+    (z.B. schreibgeschütztes Verzeichnis) degradiert auf reinen Speicher-Cache.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_sekunden: float = DEFAULT_TTL_SEKUNDEN,
+        max_speicher_eintraege: int = DEFAULT_MAX_SPEICHER_EINTRAEGE,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+        self.path = path
+        self.ttl_sekunden = ttl_sekunden
+        self.max_speicher_eintraege = max_speicher_eintraege
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.RLock()
+        self._speicher: "OrderedDict[str, Tuple[float, Any, float]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self.stats = {"hits_speicher": 0, "hits_disk": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        if path:
+            self._oeffne_disk(path)
+
+    # ---------- Schlüssel ----------
+
+    @staticmethod
+    def make_key(
+        inhalt: Union[bytes, str],
+        model: str,
+        prompt_version: str,
+        **extra: Any,
+    ) -> str:
+        """
+        Erzeugt den Cache-Schlüssel aus Eingabe, Modell und Prompt-Version.
+
+        Args:
+            inhalt: Eingabe als Bytes (PDF, Bild) oder Text
+            model: Modellbezeichnung (z.B. "gpt-4o-mini")
+            prompt_version: Version des Prompts; bei Prompt-Änderungen erhöhen
+            **extra: Weitere ergebnisrelevante Parameter (z.B. Kontext)
+        """
+        if isinstance(inhalt, str):
+            inhalt = inhalt.encode("utf-8")
+        inhalt_hash = hashlib.sha256(inhalt).hexdigest()
+        teile = [inhalt_hash, model, prompt_version]
+        if extra:
+            teile.append(json.dumps(extra, sort_keys=True, ensure_ascii=False, default=str))
+        return hashlib.sha256("|".join(teile).encode("utf-8")).hexdigest()
+
+    # ---------- Lesen/Schreiben ----------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Liefert den gecachten Wert oder `default`."""
+        jetzt = time.time()
+        with self._lock:
+            eintrag = self._speicher.get(key)
+            if eintrag is not None:
+                erstellt, wert, ttl = eintrag
+                if jetzt - erstellt <= ttl:
+                    self._speicher.move_to_end(key)
+                    self.stats["hits_speicher"] += 1
+                    return wert
+                del self._speicher[key]
+
+            wert = self._disk_get(key, jetzt)
+            if wert is not _FEHLT:
+                self.stats["hits_disk"] += 1
+                return wert
+
+            self.stats["misses"] += 1
+            return default
+
+    def set(
+        self,
+        key: str,
+        wert: Any,
+        model: str = "",
+        persistent: bool = True,
+        ttl_sekunden: Optional[float] = None,
+    ) -> None:
+        """
+        Speichert einen Wert in Speicher und (falls konfiguriert) auf der Festplatte.
+
+        Args:
+            persistent: False hält den Wert nur im Speicher (sensible Daten)
+            ttl_sekunden: Abweichende Lebensdauer im Speicher (nur mit persistent=False)
+        """
+        jetzt = time.time()
+        with self._lock:
+            if persistent:
+                self._speicher_set(key, jetzt, wert)
+                self._disk_set(key, wert, model, jetzt)
+            else:
+                self._speicher_set(key, jetzt, wert, ttl_sekunden)
+                if self._conn is not None:
+                    self._disk_delete(key)
+            self.stats["writes"] += 1
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        model: str = "",
+        persistent: bool = True,
+        ttl_sekunden: Optional[float] = None,
+    ) -> Any:
+        """
+        Liefert den gecachten Wert oder berechnet und speichert ihn.
+
+        Ergebnisse `None` werden nicht gecacht (z.B. fehlgeschlagene Aufrufe).
+        persistent/ttl_sekunden wie bei set().
+        """
+        wert = self.get(key, _FEHLT)
+        if wert is not _FEHLT:
+            return wert
+        wert = compute()
+        if wert is not None:
+            self.set(key, wert, model=model, persistent=persistent, ttl_sekunden=ttl_sekunden)
+        return wert
+
+    def invalidate(self, key: str) -> None:
+        """Entfernt einen Eintrag aus beiden Stufen."""
+        with self._lock:
+            self._speicher.pop(key, None)
+            if self._conn is not None:
+                self._disk_delete(key)
+
+    def clear(self) -> None:
+        """Leert den gesamten Cache."""
+        with self._lock:
+            self._speicher.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM ki_cache")
+                    self._conn.commit()
+                    self._disk_bytes = 0
+                except sqlite3.Error as e:
+                    logger.warning(f"KI-Cache konnte nicht geleert werden: {e}")
+
+    def info(self) -> Dict[str, Any]:
+        """Statistiken für Monitoring/Admin-Ansicht."""
+        with self._lock:
+            return {
+                **self.stats,
+                "eintraege_speicher": len(self._speicher),
+                "disk_bytes": self._disk_bytes,
+                "disk_aktiv": self._conn is not None,
+                "path": self.path,
+            }
+
+    # ---------- Speicher-Stufe ----------
+
+    def _speicher_set(self, key: str, erstellt: float, wert: Any, ttl: Optional[float] = None) -> None:
+        self._speicher[key] = (erstellt, wert, self.ttl_sekunden if ttl is None else min(ttl, self.ttl_sekunden))
+        self._speicher.move_to_end(key)
+        while len(self._speicher) > self.max_speicher_eintraege:
+            self._speicher.popitem(last=False)
+
+    # ---------- Festplatten-Stufe ----------
+
+    def _oeffne_disk(self, path: str) -> None:
+        try:
+            verzeichnis = os.path.dirname(path)
+            if verzeichnis and not os.path.exists(verzeichnis):
+                os.makedirs(verzeichnis, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ki_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    wert TEXT NOT NULL,
+                    groesse INTEGER NOT NULL,
+                    erstellt_am REAL NOT NULL,
+                    zugriff_am REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ki_cache_zugriff ON ki_cache (zugriff_am)")
+            conn.commit()
+            self._conn = conn
+            self._disk_bytes = conn.execute("SELECT COALESCE(SUM(groesse), 0) FROM ki_cache").fetchone()[0]
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"KI-Cache: Festplattenspeicher nicht verfügbar ({e}), nur In-Memory")
+            self._conn = None
+
+    def _disk_get(self, key: str, jetzt: float) -> Any:
+        if self._conn is None:
+            return _FEHLT
+        try:
+            row = self._conn.execute(
+                "SELECT wert, erstellt_am FROM ki_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return _FEHLT
+            wert_json, erstellt = row
+            if jetzt - erstellt > self.ttl_sekunden:
+                self._disk_delete(key)
+                return _FEHLT
+            self._conn.execute("UPDATE ki_cache SET zugriff_am = ? WHERE key = ?", (jetzt, key))
+            self._conn.commit()
+            wert = json.loads(wert_json)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"KI-Cache Lesefehler: {e}")
+            return _FEHLT
+
+        self._speicher_set(key, erstellt, wert)
+        return wert
+
+    def _disk_set(self, key: str, wert: Any, model: str, jetzt: float) -> None:
+        if self._conn is None:
+            return
+        try:
+            wert_json = json.dumps(wert, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"KI-Cache: Wert nicht serialisierbar, nur In-Memory ({e})")
+            return
+        groesse = len(wert_json.encode("utf-8"))
+        try:
+            alt = self._conn.execute("SELECT groesse FROM ki_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ki_cache (key, model, wert, groesse, erstellt_am, zugriff_am) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, wert_json, groesse, jetzt, jetzt),
+            )
+            self._conn.commit()
+            self._disk_bytes += groesse - (alt[0] if alt else 0)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._disk_evict(jetzt)
+        except sqlite3.Error as e:
+            logger.warning(f"KI-Cache Schreibfehler: {e}")
+
+    def _disk_delete(self, key: str) -> None:
+        try:
+            alt = self._conn.execute("SELECT groesse FROM ki_cache WHERE key = ?", (key,)).fetchone()
+            if alt:
+                self._conn.execute("DELETE FROM ki_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._disk_bytes -= alt[0]
+        except sqlite3.Error as e:
+            logger.warning(f"KI-Cache Löschfehler: {e}")
+
+    def _disk_evict(self, jetzt: float) -> None:
+        """Entfernt abgelaufene und danach die am längsten nicht genutzten Einträge."""
+        conn = self._conn
+        conn.execute("DELETE FROM ki_cache WHERE erstellt_am < ?", (jetzt - self.ttl_sekunden,))
+        ziel = int(self.max_disk_bytes * 0.9)
+        summe = conn.execute("SELECT COALESCE(SUM(groesse), 0) FROM ki_cache").fetchone()[0]
+        if summe > ziel:
+            zu_loeschen = []
+            freigabe = 0
+            for key, groesse in conn.execute("SELECT key, groesse FROM ki_cache ORDER BY zugriff_am"):
+                if summe - freigabe <= ziel:
+                    break
+                zu_loeschen.append((key,))
+                freigabe += groesse
+            conn.executemany("DELETE FROM ki_cache WHERE key = ?", zu_loeschen)
+            summe -= freigabe
+            self.stats["evictions"] += len(zu_loeschen)
+            for (key,) in zu_loeschen:
+                self._speicher.pop(key, None)
+        conn.commit()
+        self._disk_bytes = summe
+
+
+# ============================================================================
+# PROZESSWEITE INSTANZ
+# ============================================================================
+
+_default_cache: Optional[KICache] = None
+_default_lock = threading.Lock()
+
+
+def get_ki_cache() -> KICache:
+    """
+    Gibt den prozessweiten KI-Cache zurück (wird beim ersten Aufruf angelegt).
+
+    Der Pfad der SQLite-Datei kommt aus KI_CACHE_PATH (Default ./ki_cache.db);
+    KI_CACHE_PATH="" deaktiviert die Festplatten-Stufe.
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                path = os.environ.get("KI_CACHE_PATH", DEFAULT_CACHE_PATH) or None
+                _default_cache = KICache(path=path)
+    return _default_cache
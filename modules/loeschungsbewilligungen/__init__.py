@@ -34,8 +34,13 @@ from .excel_import import (
 
 from .docgen import (
     LBDocumentGenerator,
+    LBCompiledTemplate,
     LBPlaceholder,
     LBGenerationResult,
+    LBBatchResult,
+    LBPdfConverter,
+    generate_batch,
+    generate_batch_parallel,
 )
 
 from .notifications import (
@@ -43,6 +48,10 @@ from .notifications import (
     LBEmailConfig,
     LBNotificationType,
     LBNotificationResult,
+    LBNotification,
+    LBSmtpConnection,
+    LBCompiledEmailTemplate,
+    LBFristenIndex,
     get_faellige_fristen,
     get_ueberfaellige_fristen,
 )
@@ -66,13 +75,22 @@ __all__ = [
     'LBImportError',
     # DocGen
     'LBDocumentGenerator',
+    'LBCompiledTemplate',
     'LBPlaceholder',
     'LBGenerationResult',
+    'LBBatchResult',
+    'LBPdfConverter',
+    'generate_batch',
+    'generate_batch_parallel',
     # Notifications
     'LBNotificationService',
     'LBEmailConfig',
     'LBNotificationType',
     'LBNotificationResult',
+    'LBNotification',
+    'LBSmtpConnection',
+    'LBCompiledEmailTemplate',
+    'LBFristenIndex',
     'get_faellige_fristen',
     'get_ueberfaellige_fristen',
 ]
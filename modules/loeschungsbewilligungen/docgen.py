@@ -7,24 +7,51 @@ basierend auf docxtpl.
 Features:
 - Template-basierte Generierung
 - Automatische Platzhalter-Extraktion
-- Mehrfach-Generierung für Batch-Verarbeitung
+- Mehrfach-Generierung für Batch-Verarbeitung (Template einmal kompiliert)
 - PDF-Konvertierung (optional)
 """
 
 import io
+import logging
+import os
 import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
 from dataclasses import dataclass, field
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List, Dict, Any, BinaryIO
+from pathlib import Path
+from typing import Optional, List, Dict, Any, BinaryIO, Callable, Sequence, Set
 from uuid import UUID, uuid4
 
 try:
     from docxtpl import DocxTemplate
+    from jinja2 import Environment
     DOCXTPL_AVAILABLE = True
 except ImportError:
     DOCXTPL_AVAILABLE = False
 
+# UNO-Bridge von LibreOffice (nur mit dem Python von LibreOffice bzw.
+# python3-uno verfügbar); ohne sie wird soffice --convert-to je Batch genutzt
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    UNO_AVAILABLE = True
+except ImportError:
+    UNO_AVAILABLE = False
+
 from .models import (
     LBCase,
     LBDocument,
@@ -33,6 +60,37 @@ from .models import (
     STANDARD_PLATZHALTER,
 )
 
+logger = logging.getLogger(__name__)
+
+
+# Platzhalter-Formate: $Platzhalter und {{ platzhalter }}
+_DOLLAR_PLACEHOLDER_RE = re.compile(r'\$([A-Za-zäöüÄÖÜß][A-Za-z0-9äöüÄÖÜß_]*)')
+_JINJA_PLACEHOLDER_RE = re.compile(r'\{\{\s*([a-z_][a-z0-9_]*)\s*\}\}')
+
+# Teile, die pro Fall gerendert werden; alle übrigen Teile bleiben unverändert
+_RENDER_PART_RE = re.compile(
+    r'^(word/document\.xml|word/(header|footer)\d*\.xml'
+    r'|word/footnotes\.xml|docProps/core\.xml)$'
+)
+_JINJA_MARKUP_RE = re.compile(r'\{[{%#]')
+_XML_ENCODING_RE = re.compile(r'<\?xml[^?]+\bencoding="([^"]+)"', re.I)
+
+# Spalten-Tags ({%tc %}) brauchen docxtpl.fix_tables, Schleifen über
+# Grafiken die Neunummerierung der docPr-IDs: dafür bleibt docxtpl zuständig.
+_COLUMN_TAG_RE = re.compile(r'\{%-?\s*tc\s')
+_LOOP_TAG_RE = re.compile(r'\{%-?\s*(?:tr\s+|p\s+|r\s+)?for\s')
+
+
+def _find_placeholders(xml_texts: List[str]) -> List[str]:
+    """Sammelt $- und Jinja2-Platzhalter aus den XML-Teilen eines Templates"""
+    placeholders = set()
+    for content in xml_texts:
+        for match in _DOLLAR_PLACEHOLDER_RE.findall(content):
+            placeholders.add(f"${match}")
+        for match in _JINJA_PLACEHOLDER_RE.findall(content):
+            placeholders.add(match)
+    return sorted(placeholders)
+
 
 # ==================== DATACLASSES ====================
 
@@ -59,11 +117,153 @@ class LBGenerationResult:
     # Fehler
     error_message: Optional[str] = None
 
+    # PDF (nur mit LBPdfConverter)
+    pdf_bytes: Optional[bytes] = None
+    pdf_file_name: str = ""
+    pdf_error_message: Optional[str] = None
+
     # Metadaten
     generated_at: datetime = field(default_factory=datetime.now)
     case_id: Optional[UUID] = None
 
 
+@dataclass
+class LBBatchResult:
+    """
+    Ergebnis einer parallelen Batch-Generierung
+
+    Die Dokumente liegen ausschließlich im ZIP; die Einzelergebnisse
+    enthalten keine document_bytes, file_name ist der Name im ZIP.
+    """
+    zip_file: BinaryIO
+    results: List[LBGenerationResult] = field(default_factory=list)
+
+    @property
+    def success_count(self) -> int:
+        return sum(1 for r in self.results if r.success)
+
+    @property
+    def error_count(self) -> int:
+        return sum(1 for r in self.results if not r.success)
+
+
+class LBCompiledTemplate:
+    """
+    Einmal kompiliertes DOCX-Template für die Mehrfach-Generierung
+
+    Beim Kompilieren wird das DOCX genau einmal entpackt, die Platzhalter
+    werden einmal extrahiert und word/document.xml sowie Kopf-/Fußzeilen
+    (und Fußnoten/Dokumenteigenschaften, falls sie Jinja2-Markup enthalten)
+    einmal von docxtpl bereinigt und als Jinja2-Template kompiliert.
+    Alle übrigen Teile liegen als fertig komprimiertes Basis-ZIP vor.
+
+    Pro Fall werden nur die kompilierten Teile gerendert und an eine Kopie
+    des Basis-ZIPs angehängt.
+
+    Verwendung:
+        compiled = LBCompiledTemplate(template_bytes)
+        for context in contexts:
+            docx_bytes = compiled.render(context)
+    """
+
+    def __init__(self, template_bytes: bytes):
+        if not DOCXTPL_AVAILABLE:
+            raise ImportError(
+                "docxtpl ist nicht installiert. "
+                "Bitte installieren mit: pip install docxtpl"
+            )
+
+        self._template_bytes = template_bytes
+        # docxtpl lädt das Dokument erst beim Rendern; hier werden nur die
+        # String-Helfer patch_xml/resolve_listing genutzt.
+        self._docxtpl = DocxTemplate(io.BytesIO(template_bytes))
+        # Kontextwerte werden XML-escaped, damit z.B. "Müller & Söhne" das
+        # Dokument nicht beschädigt
+        self._jinja_env = Environment(autoescape=True)
+
+        self._part_dates: Dict[str, tuple] = {}
+        self._part_encodings: Dict[str, str] = {}
+        self._compiled_parts: Dict[str, Any] = {}
+        xml_texts: List[str] = []
+
+        base = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(template_bytes)) as src, \
+                zipfile.ZipFile(base, "w", zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                data = src.read(info.filename)
+                if info.filename.endswith((".xml", ".rels")):
+                    xml_texts.append(data.decode("utf-8", errors="ignore"))
+
+                if _RENDER_PART_RE.match(info.filename):
+                    encoding = self._detect_encoding(data)
+                    xml = self._docxtpl.patch_xml(data.decode(encoding))
+                    if _JINJA_MARKUP_RE.search(xml):
+                        self._part_dates[info.filename] = info.date_time
+                        self._part_encodings[info.filename] = encoding
+                        self._compiled_parts[info.filename] = self._jinja_env.from_string(
+                            re.sub(r"<w:p([ >])", r"\n<w:p\1", xml)
+                        )
+                        continue
+
+                # Unveränderte Teile: einmal komprimiert, pro Fall nur kopiert
+                dst.writestr(info, data, compress_type=info.compress_type)
+
+        self._base_zip = base.getvalue()
+        self.placeholders = _find_placeholders(xml_texts)
+
+        all_xml = "\n".join(xml_texts)
+        self.requires_docxtpl = bool(
+            _COLUMN_TAG_RE.search(all_xml)
+            or (_LOOP_TAG_RE.search(all_xml) and "<wp:docPr" in all_xml)
+        )
+
+    @staticmethod
+    def _detect_encoding(data: bytes) -> str:
+        """Liest das Encoding aus der XML-Deklaration (Standard: UTF-8)"""
+        match = _XML_ENCODING_RE.match(data[:200].decode("ascii", errors="ignore"))
+        return match.group(1) if match else "utf-8"
+
+    def render(self, context: Dict[str, Any]) -> bytes:
+        """
+        Rendert das Template mit einem Kontext
+
+        Args:
+            context: Platzhalter-Werte
+
+        Returns:
+            DOCX-Dokument als Bytes
+        """
+        if self.requires_docxtpl:
+            return self._render_docxtpl(context)
+
+        output = io.BytesIO(self._base_zip)
+        output.seek(0, io.SEEK_END)
+        with zipfile.ZipFile(output, "a", zipfile.ZIP_DEFLATED) as zf:
+            for name, template in self._compiled_parts.items():
+                xml = template.render(context)
+                xml = re.sub(r"\n<w:p([ >])", r"<w:p\1", xml)
+                xml = (
+                    xml.replace("{_{", "{{")
+                    .replace("}_}", "}}")
+                    .replace("{_%", "{%")
+                    .replace("%_}", "%}")
+                )
+                xml = self._docxtpl.resolve_listing(xml)
+                # Eigene ZipInfo je Aufruf: writestr setzt Offsets/CRC darauf
+                info = zipfile.ZipInfo(name, self._part_dates[name])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(info, xml.encode(self._part_encodings[name]))
+        return output.getvalue()
+
+    def _render_docxtpl(self, context: Dict[str, Any]) -> bytes:
+        """Vollständiges docxtpl-Rendering (Spalten-Tags, Schleifen über Grafiken)"""
+        template = DocxTemplate(io.BytesIO(self._template_bytes))
+        template.render(context, self._jinja_env)
+        output = io.BytesIO()
+        template.save(output)
+        return output.getvalue()
+
+
 class LBDocumentGenerator:
     """
     DOCX-Dokumentgenerierung mit Template-Engine
@@ -79,10 +279,13 @@ class LBDocumentGenerator:
 
         # Dokument generieren
         result = generator.generate(case, organization)
+
+    Für Batch-Generierung kann ein bereits kompiliertes Template geteilt
+    werden (siehe load_compiled_template).
     """
 
     def __init__(self):
-        self._template: Optional[DocxTemplate] = None
+        self._template: Optional[LBCompiledTemplate] = None
         self._template_placeholders: List[str] = []
 
         if not DOCXTPL_AVAILABLE:
@@ -101,43 +304,26 @@ class LBDocumentGenerator:
         Returns:
             Liste der gefundenen Platzhalter
         """
-        self._template = DocxTemplate(template_file)
-        self._template_placeholders = self._extract_placeholders()
-        return self._template_placeholders
+        return self.load_template_bytes(template_file.read())
 
     def load_template_bytes(self, template_bytes: bytes) -> List[str]:
         """Lädt Template aus Bytes"""
-        return self.load_template(io.BytesIO(template_bytes))
+        return self.load_compiled_template(LBCompiledTemplate(template_bytes))
 
-    def _extract_placeholders(self) -> List[str]:
+    def load_compiled_template(self, template: LBCompiledTemplate) -> List[str]:
         """
-        Extrahiert alle Platzhalter aus dem Template
+        Verwendet ein bereits kompiliertes Template
 
-        Unterstützt zwei Formate:
+        Unterstützte Platzhalter-Formate:
         - $Platzhalter (Dollar-Format)
         - {{ platzhalter }} (Jinja2-Format)
-        """
-        if not self._template:
-            return []
-
-        placeholders = set()
-
-        # XML des Dokuments durchsuchen
-        for part in self._template.docx.parts.values():
-            if hasattr(part, 'blob'):
-                content = part.blob.decode('utf-8', errors='ignore')
-
-                # Dollar-Format: $Platzhalter
-                dollar_matches = re.findall(r'\$([A-Za-zäöüÄÖÜß][A-Za-z0-9äöüÄÖÜß_]*)', content)
-                for match in dollar_matches:
-                    placeholders.add(f"${match}")
 
-                # Jinja2-Format: {{ platzhalter }}
-                jinja_matches = re.findall(r'\{\{\s*([a-z_][a-z0-9_]*)\s*\}\}', content)
-                for match in jinja_matches:
-                    placeholders.add(match)
-
-        return sorted(list(placeholders))
+        Returns:
+            Liste der gefundenen Platzhalter
+        """
+        self._template = template
+        self._template_placeholders = template.placeholders
+        return self._template_placeholders
 
     def get_placeholders(self) -> List[LBPlaceholder]:
         """
@@ -188,14 +374,7 @@ class LBDocumentGenerator:
                     result.placeholders_missing.append(ph)
 
             # Dokument generieren
-            self._template.render(context)
-
-            # Zu Bytes konvertieren
-            output = io.BytesIO()
-            self._template.save(output)
-            output.seek(0)
-
-            result.document_bytes = output.getvalue()
+            result.document_bytes = self._template.render(context)
             result.success = True
 
             # Dateiname generieren
@@ -330,35 +509,431 @@ class LBDocumentGenerator:
         return "_".join(parts) + ".docx"
 
 
+# ==================== PDF-KONVERTIERUNG ====================
+
+def find_soffice() -> Optional[str]:
+    """Sucht die LibreOffice-Programmdatei (soffice)"""
+    for name in ("soffice", "libreoffice"):
+        path = shutil.which(name)
+        if path:
+            return path
+    for path in (
+        "/usr/lib/libreoffice/program/soffice",
+        "/opt/libreoffice/program/soffice",
+        "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+        r"C:\Program Files\LibreOffice\program\soffice.exe",
+    ):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class LBPdfConverter:
+    """
+    DOCX→PDF-Konvertierung mit einem dauerhaft laufenden LibreOffice
+
+    Mit UNO-Bridge wird einmal ein headless soffice gestartet, das über
+    einen lokalen Socket Aufträge annimmt; jedes Dokument kostet dann nur
+    Laden und PDF-Export. Ohne UNO-Bridge konvertiert convert_many alle
+    Dokumente eines Aufrufs mit einem einzigen soffice --convert-to.
+
+    Beide Wege laufen offline und nutzen ein eigenes LibreOffice-Profil,
+    damit eine geöffnete Desktop-Instanz nicht stört.
+
+    Verwendung:
+        with LBPdfConverter() as converter:
+            pdfs = converter.convert_many([docx1, docx2])
+    """
+
+    def __init__(
+        self,
+        soffice_path: Optional[str] = None,
+        timeout: float = 60.0,
+        use_uno: Optional[bool] = None,
+    ):
+        """
+        Args:
+            soffice_path: Pfad zu soffice (Default: automatisch suchen)
+            timeout: Sekunden für Start bzw. je Dokument
+            use_uno: UNO-Bridge nutzen (Default: wenn verfügbar)
+        """
+        self.soffice_path = soffice_path or find_soffice()
+        if not self.soffice_path:
+            raise RuntimeError(
+                "LibreOffice (soffice) nicht gefunden. "
+                "Bitte installieren, z.B. apt install libreoffice-writer"
+            )
+        self.timeout = timeout
+        self.use_uno = UNO_AVAILABLE if use_uno is None else (use_uno and UNO_AVAILABLE)
+
+        self._profile_dir = tempfile.mkdtemp(prefix="lb_soffice_")
+        self._process: Optional[subprocess.Popen] = None
+        self._desktop = None
+        # Eine UNO-Verbindung, Aufträge nacheinander
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "LBPdfConverter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _soffice_args(self) -> List[str]:
+        profile_url = Path(self._profile_dir).as_uri()
+        return [
+            self.soffice_path,
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--norestore",
+            "--nodefault",
+            "--nolockcheck",
+            f"-env:UserInstallation={profile_url}",
+        ]
+
+    # ---------- UNO ----------
+
+    def _start(self) -> None:
+        """Startet soffice mit Socket-Listener und verbindet sich"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        connect = f"socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+
+        self._process = subprocess.Popen(
+            self._soffice_args() + [f"--accept={connect}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                context = resolver.resolve(f"uno:{connect}")
+                break
+            except Exception:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self._stop()
+                    raise RuntimeError("LibreOffice konnte nicht gestartet werden")
+                time.sleep(0.2)
+
+        self._desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def _stop(self) -> None:
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+            self._desktop = None
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+    @staticmethod
+    def _property(name: str, value: Any) -> "PropertyValue":
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        return prop
+
+    def _convert_uno(self, docx_path: str, pdf_path: str) -> None:
+        if self._desktop is None:
+            self._start()
+        document = self._desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(docx_path), "_blank", 0,
+            (self._property("Hidden", True),),
+        )
+        if document is None:
+            raise RuntimeError("Dokument konnte nicht geladen werden")
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(pdf_path),
+                (self._property("FilterName", "writer_pdf_Export"),),
+            )
+        finally:
+            document.close(True)
+
+    # ---------- Öffentliche API ----------
+
+    def convert(self, docx_bytes: bytes) -> bytes:
+        """Konvertiert ein DOCX-Dokument in PDF"""
+        pdf = self.convert_many([docx_bytes])[0]
+        if isinstance(pdf, Exception):
+            raise pdf
+        return pdf
+
+    def convert_many(self, documents: Sequence[bytes]) -> List[Any]:
+        """
+        Konvertiert mehrere DOCX-Dokumente in PDF
+
+        Returns:
+            Liste in Eingabereihenfolge: PDF-Bytes oder die Exception
+            für das jeweilige Dokument
+        """
+        if not documents:
+            return []
+
+        with self._lock, tempfile.TemporaryDirectory(prefix="lb_pdf_") as work_dir:
+            docx_paths = []
+            for i, docx_bytes in enumerate(documents):
+                path = os.path.join(work_dir, f"dokument_{i:05d}.docx")
+                with open(path, "wb") as f:
+                    f.write(docx_bytes)
+                docx_paths.append(path)
+            pdf_paths = [os.path.splitext(p)[0] + ".pdf" for p in docx_paths]
+
+            results: List[Any] = []
+            if self.use_uno:
+                for docx_path, pdf_path in zip(docx_paths, pdf_paths):
+                    try:
+                        try:
+                            self._convert_uno(docx_path, pdf_path)
+                        except Exception:
+                            # soffice abgestürzt oder Verbindung weg: einmal neu starten
+                            self._stop()
+                            self._convert_uno(docx_path, pdf_path)
+                        with open(pdf_path, "rb") as f:
+                            results.append(f.read())
+                    except Exception as e:
+                        results.append(e)
+                return results
+
+            try:
+                subprocess.run(
+                    self._soffice_args()
+                    + ["--convert-to", "pdf", "--outdir", work_dir]
+                    + docx_paths,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=self.timeout * len(docx_paths),
+                    check=False,
+                )
+            except subprocess.TimeoutExpired as e:
+                return [RuntimeError(f"PDF-Konvertierung abgebrochen: {e}")] * len(documents)
+
+            for pdf_path in pdf_paths:
+                if os.path.exists(pdf_path):
+                    with open(pdf_path, "rb") as f:
+                        results.append(f.read())
+                else:
+                    results.append(RuntimeError("PDF wurde nicht erzeugt"))
+            return results
+
+    def close(self) -> None:
+        """Beendet soffice und entfernt das temporäre Profil"""
+        with self._lock:
+            self._stop()
+        shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+
+def attach_pdfs(results: List[LBGenerationResult], converter: LBPdfConverter) -> None:
+    """Konvertiert die erfolgreich generierten Dokumente und setzt pdf_bytes"""
+    generated = [r for r in results if r.success and r.document_bytes]
+    pdfs = converter.convert_many([r.document_bytes for r in generated])
+    for result, pdf in zip(generated, pdfs):
+        if isinstance(pdf, Exception):
+            result.pdf_error_message = f"Fehler bei PDF-Konvertierung: {str(pdf)}"
+        else:
+            result.pdf_bytes = pdf
+            result.pdf_file_name = os.path.splitext(result.file_name)[0] + ".pdf"
+
+
 # ==================== BATCH-GENERIERUNG ====================
 
 def generate_batch(
     cases: List[LBCase],
     template_bytes: bytes,
-    organization: Optional[LBOrganization] = None
+    organization: Optional[LBOrganization] = None,
+    pdf_converter: Optional[LBPdfConverter] = None,
 ) -> List[LBGenerationResult]:
     """
     Generiert Dokumente für mehrere Fälle
 
+    Das Template wird einmal kompiliert; pro Fall werden nur die
+    Dokument-, Kopf- und Fußzeilenteile gerendert.
+
     Args:
         cases: Liste der Fälle
         template_bytes: Template als Bytes
         organization: Organisation
+        pdf_converter: Optional - zusätzlich PDFs erzeugen (pdf_bytes)
 
     Returns:
         Liste von GenerationResults
     """
-    results = []
-
-    for case in cases:
-        generator = LBDocumentGenerator()
-        generator.load_template_bytes(template_bytes)
-        result = generator.generate(case, organization)
-        results.append(result)
+    generator = LBDocumentGenerator()
+    generator.load_template_bytes(template_bytes)
 
+    results = [generator.generate(case, organization) for case in cases]
+    if pdf_converter is not None:
+        attach_pdfs(results, pdf_converter)
     return results
 
 
+# Fälle pro Auftrag an einen Worker-Prozess (weniger Pickling-Overhead)
+BATCH_CHUNK_SIZE = 50
+# Ab dieser Größe wird das ZIP aus dem Speicher auf die Platte ausgelagert
+BATCH_ZIP_SPOOL_MAX = 64 * 1024 * 1024
+
+# Pro Worker-Prozess einmal kompiliertes Template (siehe _batch_worker_init)
+_worker_generator: Optional[LBDocumentGenerator] = None
+_worker_organization: Optional[LBOrganization] = None
+
+
+def _batch_worker_init(template_bytes: bytes, organization: Optional[LBOrganization]) -> None:
+    """Läuft einmal je Worker-Prozess: Template kompilieren"""
+    global _worker_generator, _worker_organization
+    _worker_generator = LBDocumentGenerator()
+    _worker_generator.load_template_bytes(template_bytes)
+    _worker_organization = organization
+
+
+def _batch_worker(cases: List[LBCase]) -> List[LBGenerationResult]:
+    """Läuft im Worker-Prozess: Dokumente für einen Block von Fällen erzeugen"""
+    return [_worker_generator.generate(case, _worker_organization) for case in cases]
+
+
+def _unique_zip_name(file_name: str, used: Set[str]) -> str:
+    """
+    Hängt bei bereits vergebenen Dateinamen _2, _3, ... an, bis der Name frei ist
+    (auch wenn ein anderer Fall schon z.B. "name_2.docx" heißt)
+    """
+    name = file_name
+    stem, ext = os.path.splitext(file_name)
+    count = 1
+    while name in used:
+        count += 1
+        name = f"{stem}_{count}{ext}"
+    used.add(name)
+    return name
+
+
+def generate_batch_parallel(
+    cases: Sequence[LBCase],
+    template_bytes: bytes,
+    organization: Optional[LBOrganization] = None,
+    workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    pdf_converter: Optional[LBPdfConverter] = None,
+) -> LBBatchResult:
+    """
+    Generiert Dokumente für viele Fälle parallel direkt in ein ZIP
+
+    Jeder Worker-Prozess kompiliert das Template einmal und rendert Blöcke
+    von chunk_size Fällen. Fertige Dokumente werden sofort in ein ZIP auf
+    einer SpooledTemporaryFile geschrieben; höchstens doppelt so viele
+    Blöcke wie Worker sind gleichzeitig unterwegs, sodass der Speicherbedarf
+    nicht mit der Anzahl der Fälle wächst.
+
+    Args:
+        cases: Liste der Fälle
+        template_bytes: Template als Bytes
+        organization: Organisation
+        workers: Anzahl Worker-Prozesse (Default: CPU-Anzahl, 1 = ohne Prozesse)
+        progress_callback: Optional - wird mit (fertig, gesamt) aufgerufen;
+            läuft im aufrufenden Thread
+        chunk_size: Fälle pro Auftrag an einen Worker
+        pdf_converter: Optional - je Block zusätzlich PDFs ins ZIP schreiben;
+            die Konvertierung läuft im aufrufenden Prozess, während die
+            Worker bereits die nächsten Blöcke rendern
+
+    Returns:
+        LBBatchResult mit ZIP (auf Position 0) und Einzelergebnissen
+    """
+    total = len(cases)
+    chunk_size = max(1, chunk_size)
+    chunks = [list(cases[i:i + chunk_size]) for i in range(0, total, chunk_size)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(chunks) or 1))
+
+    # Einmal im aufrufenden Prozess kompilieren: ungültige Templates
+    # scheitern hier und nicht erst in den Workern
+    generator = LBDocumentGenerator()
+    generator.load_template_bytes(template_bytes)
+
+    zip_file = tempfile.SpooledTemporaryFile(max_size=BATCH_ZIP_SPOOL_MAX)
+    batch = LBBatchResult(zip_file=zip_file)
+    used_names: Set[str] = set()
+    done = 0
+
+    # DOCX ist bereits komprimiert: im ZIP nur abgelegt (ZIP_STORED)
+    with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_STORED) as zf:
+
+        def _collect(results: List[LBGenerationResult]) -> None:
+            nonlocal done
+            if pdf_converter is not None:
+                attach_pdfs(results, pdf_converter)
+            for result in results:
+                if result.success and result.document_bytes:
+                    result.file_name = _unique_zip_name(result.file_name, used_names)
+                    zf.writestr(result.file_name, result.document_bytes)
+                    if result.pdf_bytes:
+                        result.pdf_file_name = os.path.splitext(result.file_name)[0] + ".pdf"
+                        zf.writestr(result.pdf_file_name, result.pdf_bytes)
+                result.document_bytes = None
+                result.pdf_bytes = None
+                batch.results.append(result)
+            done += len(results)
+            if progress_callback:
+                progress_callback(done, total)
+
+        pool: Optional[Executor] = None
+        if workers > 1:
+            try:
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_batch_worker_init,
+                    initargs=(template_bytes, organization),
+                )
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning(f"Prozess-Pool nicht verfügbar ({e}), Generierung ohne Prozesse")
+
+        if pool is None:
+            for chunk in chunks:
+                _collect([generator.generate(case, organization) for case in chunk])
+        else:
+            window = workers * 2
+            pending: Dict[Future, int] = {}
+            next_chunk = 0
+            try:
+                while next_chunk < len(chunks) or pending:
+                    while next_chunk < len(chunks) and len(pending) < window:
+                        pending[pool.submit(_batch_worker, chunks[next_chunk])] = next_chunk
+                        next_chunk += 1
+                    finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        chunk = chunks[pending.pop(future)]
+                        try:
+                            results = future.result()
+                        except Exception as e:
+                            logger.warning(f"Batch-Generierung fehlgeschlagen: {e}")
+                            results = [
+                                LBGenerationResult(
+                                    case_id=case.id,
+                                    error_message=f"Fehler bei Generierung: {str(e)}",
+                                )
+                                for case in chunk
+                            ]
+                        _collect(results)
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    zip_file.seek(0)
+    return batch
+
+
 # ==================== STANDARD-TEMPLATES ====================
 
 def get_standard_template_eigentuemer() -> str:
@@ -7,17 +7,33 @@ aus Excel-Dateien mit:
 - Manueller Spalten-Zuordnung
 - Validierung und Fehlerbehandlung
 - Vorschau vor dem Import
+- Spaltenweiser Import (Umwandlung je Spalte statt je Zeile)
+- Einmaliges Einlesen der Datei (Vorschau streamt nur Kopf + erste Zeilen)
+- Blockweiser Import großer CSV-/XLSX-Dateien mit begrenztem Speicher (iter_import)
 """
 
+import codecs
+import csv
 import io
+import os
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, date
 from decimal import Decimal, InvalidOperation
 from enum import Enum
-from typing import Optional, List, Dict, Any, Tuple, BinaryIO
+from typing import Optional, List, Dict, Any, Tuple, BinaryIO, Callable, Iterator
 from uuid import UUID, uuid4
 
+import numpy as np
 import pandas as pd
+from pandas.io.parsers import TextParser
+
+try:
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
 
 from .models import LBCase, LBCaseStatus
 
@@ -143,6 +159,365 @@ class LBImportResult:
     def has_warnings(self) -> bool:
         return len(self.warnings) > 0
 
+    def merge(self, other: "LBImportResult") -> None:
+        """Übernimmt das Ergebnis eines weiteren Blocks (siehe iter_import)"""
+        self.total_rows += other.total_rows
+        self.imported_count += other.imported_count
+        self.skipped_count += other.skipped_count
+        self.error_count += other.error_count
+        self.cases.extend(other.cases)
+        self.errors.extend(other.errors)
+        self.warnings.extend(other.warnings)
+        self.mapping_used = self.mapping_used or other.mapping_used
+        self.success = self.error_count == 0
+
+
+# ==================== EXCEL-QUELLE ====================
+
+class LBExcelQuelle:
+    """
+    Eine hochgeladene Excel-Datei, die nur einmal geöffnet wird.
+
+    Die Arbeitsmappe wird über pd.ExcelFile (openpyxl, read_only=True) einmal
+    geladen; alle weiteren Zugriffe verwenden dieselbe Mappe:
+    - Blattnamen und geschätzte Zeilenanzahl kommen aus den Metadaten der Mappe
+    - vorschau() streamt nur Kopfzeile und die ersten N Zeilen
+    - lade() liest das Blatt vollständig, auf Wunsch nur ausgewählte Spalten,
+      und cacht das Ergebnis
+    """
+
+    def __init__(self, file: Any):
+        if isinstance(file, (bytes, bytearray)):
+            self.daten = bytes(file)
+        else:
+            if hasattr(file, "seek"):
+                file.seek(0)
+            self.daten = file.read()
+        self._excel = pd.ExcelFile(io.BytesIO(self.daten))
+        self._blaetter: Dict[Tuple[Any, Optional[Tuple[str, ...]]], pd.DataFrame] = {}
+        # Dimension vor dem ersten parse() lesen - pandas setzt sie beim Lesen zurück
+        self._zeilen = {name: self._dimension(name) for name in self._excel.sheet_names}
+
+    def ist_gleiche_datei(self, file: Any) -> bool:
+        """Prüft, ob `file` dieselben Bytes enthält (z.B. erneuter Upload-Aufruf)"""
+        if isinstance(file, (bytes, bytearray)):
+            return bytes(file) == self.daten
+        if hasattr(file, "seek"):
+            file.seek(0)
+        gleich = file.read() == self.daten
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return gleich
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self._excel.sheet_names)
+
+    def zeilenanzahl(self, sheet_name: Any = 0) -> Optional[int]:
+        """
+        Geschätzte Anzahl Datenzeilen laut Blattdimension (ohne Kopfzeile),
+        ohne das Blatt zu lesen.
+
+        Nur eine Schätzung: die Dimension schließt leere, aber formatierte
+        Zeilen am Ende ein. Fehlt sie oder ist sie veraltet ("A1"), wird None
+        geliefert - dann muss gezählt werden.
+        """
+        name = self.sheet_names[sheet_name] if isinstance(sheet_name, int) else sheet_name
+        return self._zeilen.get(name)
+
+    def _dimension(self, name: str) -> Optional[int]:
+        book = self._excel.book
+        if hasattr(book, "sheetnames"):  # openpyxl (read_only)
+            blatt = book[name]
+            try:
+                blatt.calculate_dimension()  # liest nur <dimension>, setzt max_row
+            except ValueError:
+                return None  # Datei ohne Dimensionsangabe
+            max_row = blatt.max_row
+        elif hasattr(book, "sheet_by_name"):  # xlrd (.xls)
+            max_row = book.sheet_by_name(name).nrows
+        else:
+            return None
+        # "A1" (bzw. nur Kopfzeile) schreiben viele Programme ohne echte Dimension
+        return max_row - 1 if max_row and max_row > 1 else None
+
+    def vorschau(self, sheet_name: Any = 0, max_rows: int = 10) -> pd.DataFrame:
+        """Kopfzeile und die ersten `max_rows` Zeilen (Lesen endet danach)"""
+        return self._excel.parse(sheet_name=sheet_name, nrows=max_rows)
+
+    def lade(self, sheet_name: Any = 0, spalten: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Liest ein Blatt vollständig (gecacht).
+
+        Args:
+            sheet_name: Blattname oder -index
+            spalten: Optional - nur diese Spalten (Namen ohne Whitespace am Rand)
+
+        Returns:
+            DataFrame mit normalisierten Spaltennamen (nicht verändern - gecacht)
+        """
+        schluessel = (sheet_name, tuple(sorted(spalten)) if spalten is not None else None)
+        df = self._blaetter.get(schluessel)
+        if df is None:
+            if spalten is None:
+                df = self._excel.parse(sheet_name=sheet_name)
+            else:
+                benoetigt = set(spalten)
+                df = self._excel.parse(
+                    sheet_name=sheet_name,
+                    usecols=lambda name: str(name).strip() in benoetigt
+                )
+            # Spaltennamen normalisieren (Whitespace entfernen)
+            df.columns = [str(c).strip() for c in df.columns]
+            self._blaetter[schluessel] = df
+        return df
+
+    def close(self) -> None:
+        """Schließt die Mappe und gibt gecachte Blätter und Datei-Bytes frei"""
+        self._blaetter.clear()
+        self._excel.close()
+        self.daten = b""
+
+
+# ==================== BLOCKWEISES EINLESEN ====================
+
+# Standard-Blockgröße für iter_import()
+IMPORT_CHUNK_SIZE = 5000
+
+# Bytes, die zur Erkennung von Format, Kodierung und Trennzeichen gelesen werden
+_PROBE_BYTES = 64 * 1024
+
+
+@contextmanager
+def _binaerdatei(file: Any) -> Iterator[BinaryIO]:
+    """Öffnet Pfad, Bytes oder Datei-Objekt als binären Stream (am Anfang positioniert)"""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            yield f
+        return
+    if isinstance(file, (bytes, bytearray)):
+        yield io.BytesIO(file)
+        return
+    if hasattr(file, "seek"):
+        file.seek(0)
+    yield file
+
+
+def _probe(f: BinaryIO) -> bytes:
+    """Liest den Anfang der Datei und setzt den Stream zurück"""
+    probe = f.read(_PROBE_BYTES)
+    f.seek(0)
+    return probe
+
+
+def erkenne_dateiformat(file: Any) -> str:
+    """
+    Erkennt das Format einer Import-Datei anhand der ersten Bytes.
+
+    Returns:
+        "xlsx" (ZIP-Container), "xls" (OLE2-Container) oder "csv"
+    """
+    with _binaerdatei(file) as f:
+        kopf = f.read(8)
+        f.seek(0)
+    if kopf.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    if kopf.startswith(b"\xd0\xcf\x11\xe0"):
+        return "xls"
+    return "csv"
+
+
+def _csv_format(probe: bytes) -> Tuple[str, str]:
+    """
+    Ermittelt Kodierung und Trennzeichen einer CSV-Datei aus ihrem Anfang.
+
+    Returns:
+        (encoding, sep) - UTF-8 (mit/ohne BOM), sonst Windows-1252;
+        Trennzeichen ; , Tab oder |
+    """
+    if probe.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
+        try:
+            # final=False: am Probe-Ende abgeschnittene Multibyte-Zeichen sind kein Fehler
+            codecs.getincrementaldecoder("utf-8")().decode(probe, final=False)
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            encoding = "cp1252"
+
+    text = probe.decode(encoding, errors="ignore")
+    zeilen = text.splitlines()[:20]
+    try:
+        sep = csv.Sniffer().sniff("\n".join(zeilen), delimiters=";,\t|").delimiter
+    except csv.Error:
+        kopf = zeilen[0] if zeilen else ""
+        sep = max(";,\t|", key=kopf.count) if kopf else ";"
+    return encoding, sep
+
+
+def _spaltennamen(kopf: List[Any]) -> List[str]:
+    """Spaltennamen wie bei pd.read_excel: leer → 'Unnamed: i', Duplikate → 'name.1'"""
+    namen: List[str] = []
+    gesehen: Dict[str, int] = {}
+    for i, wert in enumerate(kopf):
+        name = str(wert).strip() if wert is not None else f"Unnamed: {i}"
+        if name in gesehen:
+            gesehen[name] += 1
+            name = f"{name}.{gesehen[name]}"
+        gesehen.setdefault(name, 0)
+        namen.append(name)
+    return namen
+
+
+def _csv_bloecke(
+    f: BinaryIO,
+    chunk_size: int,
+    spalten_fuer: Callable[[List[str]], List[str]]
+) -> Iterator[pd.DataFrame]:
+    """CSV blockweise über pd.read_csv(chunksize=...); alle Werte als Text"""
+    encoding, sep = _csv_format(_probe(f))
+
+    kopf = pd.read_csv(f, sep=sep, encoding=encoding, nrows=0).columns
+    f.seek(0)
+    benoetigt = set(spalten_fuer([str(c).strip() for c in kopf]))
+
+    leser = pd.read_csv(
+        f,
+        sep=sep,
+        encoding=encoding,
+        dtype=str,  # PLZ, Blatt-Nr. usw. unverändert (führende Nullen)
+        usecols=(lambda name: str(name).strip() in benoetigt) if benoetigt else None,
+        skip_blank_lines=False,  # Zeilennummern wie in der Datei
+        chunksize=chunk_size,
+    )
+    with leser:
+        for df in leser:
+            df.columns = [str(c).strip() for c in df.columns]
+            yield df
+
+
+def _xlsx_zellwert(zelle: Any) -> Any:
+    """Zellwert wie im openpyxl-Reader von pd.read_excel: leer → "", Fehler → NaN, 1.0 → 1"""
+    if zelle.value is None:
+        return ""
+    if zelle.data_type == TYPE_ERROR:
+        return np.nan
+    if zelle.data_type == TYPE_NUMERIC:
+        ganzzahl = int(zelle.value)
+        return ganzzahl if ganzzahl == zelle.value else float(zelle.value)
+    return zelle.value
+
+
+def _xlsx_block(zeilen: List[list], spalten: List[str], start: int) -> pd.DataFrame:
+    """
+    Block als DataFrame über denselben Parser wie pd.read_excel (gleiche
+    NA-Werte wie "n/a" oder "NaN", gleiche Typerkennung je Spalte)
+    """
+    df = TextParser(zeilen, names=spalten, header=None, skip_blank_lines=False).read()
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+
+def _xlsx_bloecke(
+    f: BinaryIO,
+    chunk_size: int,
+    sheet_name: Any,
+    spalten_fuer: Callable[[List[str]], List[str]]
+) -> Iterator[pd.DataFrame]:
+    """
+    XLSX zeilenweise über openpyxl (read_only) - es liegt immer nur ein Block
+    als DataFrame vor. Zellen, NA-Werte und Typen werden wie bei pd.read_excel
+    behandelt; die Typerkennung erfolgt allerdings je Block (wie bei
+    pd.read_csv(chunksize=...)). Leere Zeilen am Blattende entfallen.
+    """
+    wb = load_workbook(f, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if isinstance(sheet_name, str) else wb.worksheets[sheet_name or 0]
+        zeilen = ws.iter_rows()
+        kopf = _spaltennamen([
+            None if wert == "" else wert
+            for wert in map(_xlsx_zellwert, next(zeilen, ()))
+        ])
+        spalten = spalten_fuer(kopf) or kopf
+        positionen = [kopf.index(c) for c in spalten]
+
+        leer_zeile = [""] * len(positionen)
+        puffer: List[list] = []
+        start = 0
+        leere = 0  # zurückgehaltene Leerzeilen (nur übernommen, wenn noch Daten folgen)
+
+        for zeile in zeilen:
+            if all(zelle.value is None or zelle.value == "" for zelle in zeile):
+                leere += 1
+                continue
+            werte = [_xlsx_zellwert(zeile[p]) if p < len(zeile) else "" for p in positionen]
+            for eintrag in [leer_zeile] * leere + [werte]:
+                puffer.append(eintrag)
+                if len(puffer) >= chunk_size:
+                    yield _xlsx_block(puffer, spalten, start)
+                    start += len(puffer)
+                    puffer = []
+            leere = 0
+
+        if puffer:
+            yield _xlsx_block(puffer, spalten, start)
+    finally:
+        wb.close()
+
+
+def _excel_bloecke(
+    f: BinaryIO,
+    chunk_size: int,
+    sheet_name: Any,
+    spalten_fuer: Callable[[List[str]], List[str]]
+) -> Iterator[pd.DataFrame]:
+    """Rückfall ohne zeilenweises Lesen (.xls bzw. ohne openpyxl): Blatt einmal laden, blockweise abgeben"""
+    quelle = LBExcelQuelle(f)
+    try:
+        kopf = quelle.vorschau(sheet_name or 0, 0)
+        spalten = spalten_fuer(_spaltennamen(list(kopf.columns)))
+        df = quelle.lade(sheet_name or 0, spalten or None)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    finally:
+        quelle.close()
+
+
+def lies_bloecke(
+    file: Any,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    sheet_name: Any = None,
+    spalten_fuer: Optional[Callable[[List[str]], List[str]]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Liest eine CSV-/Excel-Datei in Blöcken von höchstens `chunk_size` Zeilen.
+
+    Args:
+        file: Pfad, Bytes oder Datei-Objekt (CSV, XLSX oder XLS)
+        chunk_size: Zeilen je Block
+        sheet_name: Arbeitsblatt (nur Excel; Standard: erstes Blatt)
+        spalten_fuer: Erhält die Kopfzeile und liefert die zu lesenden Spalten
+            (leer → alle)
+
+    Yields:
+        DataFrames mit fortlaufendem Index (0 = erste Datenzeile über alle Blöcke)
+        und Spaltennamen ohne Whitespace am Rand
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size muss mindestens 1 sein")
+    spalten_fuer = spalten_fuer or (lambda kopf: [])
+
+    with _binaerdatei(file) as f:
+        dateiformat = erkenne_dateiformat(f)
+        if dateiformat == "csv":
+            yield from _csv_bloecke(f, chunk_size, spalten_fuer)
+        elif dateiformat == "xlsx" and OPENPYXL_AVAILABLE:
+            yield from _xlsx_bloecke(f, chunk_size, sheet_name, spalten_fuer)
+        else:
+            yield from _excel_bloecke(f, chunk_size, sheet_name, spalten_fuer)
+
+
+# ==================== IMPORT-SERVICE ====================
 
 class LBExcelImporter:
     """
@@ -161,8 +536,12 @@ class LBExcelImporter:
             ...
         })
 
-        # Import durchführen
-        result = importer.import_data(file_bytes)
+        # Import durchführen (verwendet die bereits geöffnete Datei)
+        result = importer.import_data()
+
+        # Große CSV-/XLSX-Dateien blockweise (begrenzter Speicher)
+        for teil in importer.iter_import(file, chunk_size=5000):
+            speichere(teil.cases)
     """
 
     def __init__(self, organization_id: UUID, created_by: Optional[UUID] = None):
@@ -170,6 +549,10 @@ class LBExcelImporter:
         self.created_by = created_by
         self.column_mapping: Dict[str, LBExcelColumn] = {}
         self._df: Optional[pd.DataFrame] = None
+        self._quelle: Optional[LBExcelQuelle] = None
+        self._sheet_name: Any = 0
+        self._spalten: List[str] = []
+        self._csv_datei: Any = None
 
     def preview(
         self,
@@ -178,7 +561,7 @@ class LBExcelImporter:
         max_rows: int = 10
     ) -> Dict[str, Any]:
         """
-        Lädt Excel-Datei und gibt Vorschau zurück
+        Lädt Excel- oder CSV-Datei und gibt Vorschau zurück
 
         Returns:
             Dictionary mit:
@@ -186,39 +569,119 @@ class LBExcelImporter:
             - detected_mapping: Automatisch erkannte Zuordnung
             - preview_data: Erste Zeilen als Liste von Dicts
             - sheet_names: Verfügbare Arbeitsblätter
-            - total_rows: Gesamtanzahl Zeilen
+            - total_rows: Gesamtanzahl Zeilen (laut Blattdimension bzw. Zeilenumbrüchen,
+              ohne die Datei zu parsen; ohne verwertbare Dimension gezählt)
+            - total_rows_geschaetzt: True, wenn total_rows nur geschätzt ist
+              (formatierte Leerzeilen am Blattende, Umbrüche in CSV-Feldern)
         """
-        # Excel laden
-        if sheet_name:
-            self._df = pd.read_excel(file, sheet_name=sheet_name)
-        else:
-            xls = pd.ExcelFile(file)
-            sheet_names = xls.sheet_names
-            self._df = pd.read_excel(file, sheet_name=0)
+        if erkenne_dateiformat(file) == "csv":
+            return self._preview_csv(file, max_rows)
 
-        # Spaltennamen normalisieren (Whitespace entfernen)
-        self._df.columns = [str(c).strip() for c in self._df.columns]
+        self._oeffne(file, sheet_name or 0)
+
+        # Nur Kopfzeile + erste Zeilen lesen
+        preview_df = self._quelle.vorschau(self._sheet_name, max_rows)
+        preview_df.columns = [str(c).strip() for c in preview_df.columns]
+        self._spalten = list(preview_df.columns)
 
         # Automatische Spaltenerkennung
         detected_mapping = self._auto_detect_columns()
 
         # Vorschau erstellen
-        preview_df = self._df.head(max_rows)
         preview_data = preview_df.to_dict('records')
 
+        total_rows = self._quelle.zeilenanzahl(self._sheet_name)
+        geschaetzt = total_rows is not None
+        if total_rows is None:
+            total_rows = len(self._lade_daten())
+
         return {
-            "columns": list(self._df.columns),
+            "columns": list(self._spalten),
             "detected_mapping": {k: v.value for k, v in detected_mapping.items()},
             "preview_data": preview_data,
-            "sheet_names": sheet_names if 'sheet_names' in locals() else [sheet_name or "Sheet1"],
-            "total_rows": len(self._df),
+            "sheet_names": self._quelle.sheet_names,
+            "total_rows": total_rows,
+            "total_rows_geschaetzt": geschaetzt,
         }
 
+    def _preview_csv(self, file: Any, max_rows: int) -> Dict[str, Any]:
+        """Vorschau einer CSV-Datei; der Import erfolgt später blockweise (iter_import)"""
+        self._oeffne_csv(file)
+
+        with _binaerdatei(file) as f:
+            encoding, sep = _csv_format(_probe(f))
+            preview_df = pd.read_csv(f, sep=sep, encoding=encoding, dtype=str, nrows=max_rows)
+            preview_df.columns = [str(c).strip() for c in preview_df.columns]
+
+            # Zeilen zählen, ohne zu parsen (Umbrüche in Anführungszeichen zählen mit)
+            f.seek(0)
+            umbrueche = 0
+            letztes = b"\n"
+            for block in iter(lambda: f.read(1 << 20), b""):
+                umbrueche += block.count(b"\n")
+                letztes = block[-1:]
+            if hasattr(f, "seek"):
+                f.seek(0)
+        zeilen = umbrueche + (letztes != b"\n")
+
+        self._spalten = list(preview_df.columns)
+        detected_mapping = self._auto_detect_columns()
+
+        return {
+            "columns": list(self._spalten),
+            "detected_mapping": {k: v.value for k, v in detected_mapping.items()},
+            "preview_data": preview_df.to_dict('records'),
+            "sheet_names": [],
+            "total_rows": max(zeilen - 1, 0),
+            "total_rows_geschaetzt": True,
+        }
+
+    def close(self) -> None:
+        """Gibt geöffnete Datei, Datei-Bytes und gecachte DataFrames frei (nach dem Import)"""
+        if self._quelle is not None:
+            self._quelle.close()
+            self._quelle = None
+        self._csv_datei = None
+        self._df = None
+
+    def _oeffne_csv(self, file: Any) -> None:
+        """Merkt eine CSV-Datei für den blockweisen Import vor"""
+        if self._quelle is not None:
+            self._quelle.close()
+            self._quelle = None
+        self._csv_datei = file
+        self._df = None
+        self._spalten = []
+
+    def _oeffne(self, file: Any, sheet_name: Any = 0) -> None:
+        """Öffnet eine Datei als Quelle; dieselbe Datei wird nicht erneut eingelesen"""
+        self._csv_datei = None
+        if self._quelle is not None and self._quelle.ist_gleiche_datei(file):
+            if sheet_name == self._sheet_name:
+                return
+        else:
+            if self._quelle is not None:
+                self._quelle.close()
+            self._quelle = LBExcelQuelle(file)
+        self._sheet_name = sheet_name
+        self._df = None
+        self._spalten = []
+
+    def _lade_daten(self) -> pd.DataFrame:
+        """
+        Lädt die Daten des gewählten Blatts aus der geöffneten Quelle.
+
+        Ist ein Mapping gesetzt, werden nur die zugeordneten Spalten gelesen.
+        """
+        spalten = [c for c in self.column_mapping if c in self._spalten]
+        self._df = self._quelle.lade(self._sheet_name, spalten or None)
+        return self._df
+
     def _auto_detect_columns(self) -> Dict[str, LBExcelColumn]:
         """Erkennt automatisch Spaltenzuordnungen basierend auf Header-Namen"""
         detected = {}
 
-        for col in self._df.columns:
+        for col in self._spalten:
             col_lower = str(col).lower().strip()
 
             for target_field, patterns in COLUMN_PATTERNS.items():
@@ -254,10 +717,10 @@ class LBExcelImporter:
         validate_only: bool = False
     ) -> LBImportResult:
         """
-        Importiert Daten aus Excel-Datei
+        Importiert Daten aus Excel- oder CSV-Datei
 
         Args:
-            file: Excel-Datei (optional wenn preview() bereits aufgerufen)
+            file: Excel-/CSV-Datei (optional wenn preview() bereits aufgerufen)
             validate_only: Nur validieren, nicht importieren
 
         Returns:
@@ -265,21 +728,78 @@ class LBExcelImporter:
         """
         result = LBImportResult()
 
-        # Datei laden falls nicht schon geschehen
+        # CSV wird immer blockweise gelesen und hier zusammengeführt
+        if file is not None and erkenne_dateiformat(file) == "csv":
+            self._oeffne_csv(file)
+        if self._csv_datei is not None:
+            for teil in self.iter_import(self._csv_datei):
+                result.merge(teil)
+            result.mapping_used = {k: v.value for k, v in self.column_mapping.items()}
+            result.success = result.error_count == 0
+            return result
+
+        # Datei öffnen falls nicht schon geschehen (dieselbe Datei wird wiederverwendet)
         if file is not None:
-            self._df = pd.read_excel(file)
-            self._df.columns = [str(c).strip() for c in self._df.columns]
+            neu = self._quelle is None or not self._quelle.ist_gleiche_datei(file)
+            if neu:
+                self._oeffne(file)
+            if not self._spalten:
+                kopf = self._quelle.vorschau(self._sheet_name, 0)
+                self._spalten = [str(c).strip() for c in kopf.columns]
             if not self.column_mapping:
                 self._auto_detect_columns()
 
-        if self._df is None:
+        if self._quelle is None and self._df is None:
             result.errors.append(LBImportError(
                 row_number=0,
                 message="Keine Datei geladen. Bitte zuerst preview() aufrufen."
             ))
             return result
 
-        result.total_rows = len(self._df)
+        if self._quelle is not None:
+            self._lade_daten()
+
+        self._importiere(self._df, result)
+        return result
+
+    def iter_import(
+        self,
+        file: Any,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        sheet_name: Optional[str] = None
+    ) -> Iterator[LBImportResult]:
+        """
+        Importiert große CSV- oder Excel-Dateien blockweise.
+
+        Die Datei wird nie vollständig als DataFrame gehalten: CSV wird über
+        pd.read_csv(chunksize=...) gelesen, XLSX zeilenweise über openpyxl
+        (read_only). Es werden nur die zugeordneten Spalten übernommen. Ist noch
+        kein Mapping gesetzt, wird es aus der Kopfzeile erkannt.
+
+        Args:
+            file: Pfad, Bytes oder Datei-Objekt (CSV, XLSX oder XLS)
+            chunk_size: Zeilen je Block
+            sheet_name: Arbeitsblatt (nur Excel)
+
+        Yields:
+            LBImportResult je Block; total_rows und Zähler beziehen sich auf den
+            Block, Zeilennummern in Fehlern/Warnungen auf die gesamte Datei.
+            Teilergebnisse lassen sich mit LBImportResult.merge() zusammenführen.
+        """
+        def spalten_fuer(kopf: List[str]) -> List[str]:
+            self._spalten = kopf
+            if not self.column_mapping:
+                self._auto_detect_columns()
+            return [c for c in self.column_mapping if c in kopf]
+
+        for df in lies_bloecke(file, chunk_size, sheet_name, spalten_fuer):
+            result = LBImportResult()
+            self._importiere(df, result)
+            yield result
+
+    def _importiere(self, df: pd.DataFrame, result: LBImportResult) -> None:
+        """Wandelt die Zeilen eines DataFrames in LBCase-Objekte um (Ergebnis in `result`)"""
+        result.total_rows = len(df)
 
         # Keine Pflichtfelder - alle Daten können später ergänzt werden
         # (Grundbuch aus Adresse, GB-Blatt aus Auszug, etc.)
@@ -287,8 +807,18 @@ class LBExcelImporter:
         # Mapping speichern für Ergebnis
         result.mapping_used = {k: v.value for k, v in self.column_mapping.items()}
 
-        # Zeilen verarbeiten
-        for idx, row in self._df.iterrows():
+        # Spaltenweise verarbeiten; Sonderfälle (doppelte Spaltennamen,
+        # nicht-numerischer Index) weiterhin Zeile für Zeile
+        if df.columns.is_unique and pd.api.types.is_integer_dtype(df.index):
+            self._import_spaltenweise(df, result)
+        else:
+            self._import_zeilenweise(df, result)
+
+        result.success = result.error_count == 0
+
+    def _import_zeilenweise(self, df: pd.DataFrame, result: LBImportResult) -> None:
+        """Verarbeitet die Zeilen einzeln über _parse_row (Referenzverhalten)"""
+        for idx, row in df.iterrows():
             row_num = idx + 2  # Excel-Zeile (1-basiert, +1 für Header)
 
             try:
@@ -305,8 +835,119 @@ class LBExcelImporter:
                 ))
                 result.error_count += 1
 
-        result.success = result.error_count == 0
-        return result
+    def _import_spaltenweise(self, df: pd.DataFrame, result: LBImportResult) -> None:
+        """
+        Verarbeitet alle Zeilen spaltenweise.
+
+        Jede zugeordnete Spalte wird einmal umgewandelt (Text, Betrag, Datum),
+        Prüfungen laufen als boolesche Masken über alle Zeilen, und LBCase-
+        Objekte entstehen erst am Ende aus den bereinigten Spalten. Ergebnis,
+        Warnungen und Fehler entsprechen exakt _import_zeilenweise().
+        """
+        anzahl = len(df)
+
+        vorhanden = [(col, feld) for col, feld in self.column_mapping.items() if col in df.columns]
+        # Bei mehreren Spalten für dasselbe Feld gewinnt (wie in _parse_row) die letzte
+        gewinner = {feld: col for col, feld in vorhanden}
+
+        # Gleicher gemeinsamer Typ wie bei iterrows() (z.B. rein numerische Blätter → float)
+        spalten = [col for col, _ in vorhanden]
+        werte = df[spalten].to_numpy(dtype=df.iloc[:0].to_numpy().dtype)
+
+        felder: Dict[LBExcelColumn, np.ndarray] = {}
+        warnungen: Dict[LBExcelColumn, np.ndarray] = {}
+        ist_fehler = np.zeros(anzahl, dtype=bool)
+        fehler = np.empty(anzahl, dtype=object)
+
+        for pos, (col, feld) in enumerate(vorhanden):
+            if gewinner[feld] != col:
+                # Überschriebene Spalte: nur auf Umwandlungsfehler prüfen
+                _, spalten_fehler, ausnahmen = _spaltenweise(werte[:, pos], _unveraendert)
+            elif feld in _FELD_UMWANDLUNG:
+                (wert, warnung), spalten_fehler, ausnahmen = _spaltenweise(
+                    werte[:, pos], _FELD_UMWANDLUNG[feld], teile=2
+                )
+                felder[feld] = wert
+                warnungen[feld] = warnung
+            else:
+                (wert,), spalten_fehler, ausnahmen = _spaltenweise(werte[:, pos], _als_text)
+                felder[feld] = wert
+
+            # Erste Ausnahme je Zeile in Mapping-Reihenfolge
+            neu = spalten_fehler & ~ist_fehler
+            fehler[neu] = ausnahmen[neu]
+            ist_fehler |= spalten_fehler
+
+        leer = np.full(anzahl, None, dtype=object)
+
+        def spalte(feld: LBExcelColumn) -> np.ndarray:
+            return felder.get(feld, leer)
+
+        def gefuellt(*feld_liste: LBExcelColumn) -> np.ndarray:
+            maske = np.zeros(anzahl, dtype=bool)
+            for feld in feld_liste:
+                maske |= pd.notna(spalte(feld))
+            return maske
+
+        # Validierungsmasken: mindestens ein identifizierendes Merkmal
+        identifizierbar = (
+            gefuellt(LBExcelColumn.VORNAME, LBExcelColumn.NACHNAME, LBExcelColumn.FIRMA)
+            | gefuellt(LBExcelColumn.STRASSE, LBExcelColumn.ORT)
+            | gefuellt(LBExcelColumn.GRUNDBUCH, LBExcelColumn.GB_BLATT)
+        )
+        ueberspringen = ~ist_fehler & ~identifizierbar
+        importieren = ~ist_fehler & identifizierbar
+
+        betrag_warnung = warnungen.get(LBExcelColumn.RECHT_BETRAG, leer)
+        datum_warnung = warnungen.get(LBExcelColumn.FRIST_DATUM, leer)
+        mit_warnung = importieren & (pd.notna(betrag_warnung) | pd.notna(datum_warnung))
+
+        # Fehler und Warnungen in Zeilenreihenfolge
+        index = df.index.to_numpy()
+        for pos in np.flatnonzero(ist_fehler | ueberspringen | mit_warnung):
+            row_num = int(index[pos]) + 2  # Excel-Zeile (1-basiert, +1 für Header)
+            if ist_fehler[pos]:
+                result.errors.append(LBImportError(
+                    row_number=row_num,
+                    message=f"Unerwarteter Fehler: {str(fehler[pos])}"
+                ))
+            elif ueberspringen[pos]:
+                result.warnings.append(LBImportError(
+                    row_number=row_num,
+                    message="Zeile übersprungen - keine identifizierenden Daten (Name, Adresse oder Grundbuch).",
+                    severity="warning"
+                ))
+            else:
+                for feld, meldung in (
+                    (LBExcelColumn.RECHT_BETRAG, betrag_warnung[pos]),
+                    (LBExcelColumn.FRIST_DATUM, datum_warnung[pos]),
+                ):
+                    if meldung is not None:
+                        result.warnings.append(LBImportError(
+                            row_number=row_num,
+                            column=feld.value,
+                            message=meldung,
+                            severity="warning"
+                        ))
+
+        # LBCase-Objekte aus den bereinigten Spalten
+        # (die Werte von LBExcelColumn entsprechen den Feldnamen von LBCase)
+        zeilen = np.flatnonzero(importieren)
+        namen = [feld.value for feld in LBExcelColumn]
+        for zeile in zip(*(spalte(feld)[zeilen] for feld in LBExcelColumn)):
+            werte_zeile = dict(zip(namen, zeile))
+            # Grundbuch (beides optional - kann später aus Adresse/Auszug ergänzt werden)
+            werte_zeile["grundbuch"] = werte_zeile["grundbuch"] or ""
+            werte_zeile["gb_blatt"] = werte_zeile["gb_blatt"] or ""
+            result.cases.append(LBCase(
+                organization_id=self.organization_id,
+                created_by=self.created_by,
+                **werte_zeile
+            ))
+
+        result.imported_count = len(zeilen)
+        result.skipped_count = int(ueberspringen.sum())
+        result.error_count = int(ist_fehler.sum())
 
     def _parse_row(
         self,
@@ -320,13 +961,7 @@ class LBExcelImporter:
         values = {}
         for excel_col, target_field in self.column_mapping.items():
             if excel_col in row.index:
-                val = row[excel_col]
-                # NaN zu None konvertieren
-                if pd.isna(val):
-                    val = None
-                elif isinstance(val, float) and val == int(val):
-                    val = int(val)  # 1.0 -> 1
-                values[target_field] = val
+                values[target_field] = _zellwert(row[excel_col])
 
         # Alle Felder sind optional - können später ergänzt werden
         # (Grundbuch aus Adresse, GB-Blatt aus Auszug, etc.)
@@ -403,10 +1038,7 @@ class LBExcelImporter:
         field: LBExcelColumn
     ) -> Optional[str]:
         """Extrahiert String-Wert"""
-        val = values.get(field)
-        if val is None:
-            return None
-        return str(val).strip() if str(val).strip() else None
+        return _als_text(values.get(field))
 
     def _get_decimal_value(
         self,
@@ -416,28 +1048,15 @@ class LBExcelImporter:
         result: LBImportResult
     ) -> Optional[Decimal]:
         """Extrahiert Decimal-Wert"""
-        val = values.get(field)
-        if val is None:
-            return None
-
-        try:
-            # Formatierung bereinigen (1.234,56 -> 1234.56)
-            if isinstance(val, str):
-                val = val.replace(" ", "").replace("€", "").replace("EUR", "")
-                # Deutsche Notation: 1.234,56 -> 1234.56
-                if "," in val and "." in val:
-                    val = val.replace(".", "").replace(",", ".")
-                elif "," in val:
-                    val = val.replace(",", ".")
-            return Decimal(str(val))
-        except (InvalidOperation, ValueError) as e:
+        betrag, warnung = _als_betrag(values.get(field))
+        if warnung:
             result.warnings.append(LBImportError(
                 row_number=row_num,
                 column=field.value,
-                message=f"Ungültiger Betrag: '{val}'",
+                message=warnung,
                 severity="warning"
             ))
-            return None
+        return betrag
 
     def _get_date_value(
         self,
@@ -447,32 +1066,295 @@ class LBExcelImporter:
         result: LBImportResult
     ) -> Optional[date]:
         """Extrahiert Date-Wert"""
-        val = values.get(field)
-        if val is None:
-            return None
-
-        try:
-            if isinstance(val, datetime):
-                return val.date()
-            if isinstance(val, date):
-                return val
-            # String parsen
-            if isinstance(val, str):
-                # Verschiedene Formate probieren
-                for fmt in ["%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"]:
-                    try:
-                        return datetime.strptime(val.strip(), fmt).date()
-                    except ValueError:
-                        continue
+        datum, warnung = _als_datum(values.get(field))
+        if warnung:
             result.warnings.append(LBImportError(
                 row_number=row_num,
                 column=field.value,
-                message=f"Ungültiges Datum: '{val}'",
+                message=warnung,
                 severity="warning"
             ))
-            return None
-        except Exception:
-            return None
+        return datum
+
+
+# ==================== ZELL-UMWANDLUNG ====================
+
+DATUMSFORMATE = ["%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"]
+
+
+def _zellwert(val: Any) -> Any:
+    """Rohwert einer Zelle: NaN → None, ganzzahlige Floats → int (1.0 -> 1)"""
+    if pd.isna(val):
+        return None
+    if isinstance(val, float) and val == int(val):
+        return int(val)
+    return val
+
+
+def _unveraendert(val: Any) -> Any:
+    return val
+
+
+def _als_text(val: Any) -> Optional[str]:
+    """Zellwert als getrimmter Text; leer → None"""
+    if val is None:
+        return None
+    text = str(val).strip()
+    return text if text else None
+
+
+def _als_betrag(val: Any) -> Tuple[Optional[Decimal], Optional[str]]:
+    """
+    Zellwert als Betrag.
+
+    Returns:
+        (Betrag, None) oder (None, Warnungstext) bei ungültigem Wert
+    """
+    if val is None:
+        return None, None
+
+    try:
+        # Formatierung bereinigen (1.234,56 -> 1234.56)
+        if isinstance(val, str):
+            val = val.replace(" ", "").replace("€", "").replace("EUR", "")
+            # Deutsche Notation: 1.234,56 -> 1234.56
+            if "," in val and "." in val:
+                val = val.replace(".", "").replace(",", ".")
+            elif "," in val:
+                val = val.replace(",", ".")
+        betrag = Decimal(str(val))
+    except (InvalidOperation, ValueError):
+        return None, f"Ungültiger Betrag: '{val}'"
+    if not betrag.is_finite():  # "NaN", "Infinity" sind keine Beträge
+        return None, f"Ungültiger Betrag: '{val}'"
+    return betrag, None
+
+
+def _als_datum(val: Any) -> Tuple[Optional[date], Optional[str]]:
+    """
+    Zellwert als Datum (datetime, date oder Text in einem der DATUMSFORMATE).
+
+    Returns:
+        (Datum, None) oder (None, Warnungstext) bei ungültigem Wert
+    """
+    if val is None:
+        return None, None
+
+    try:
+        if isinstance(val, datetime):
+            return val.date(), None
+        if isinstance(val, date):
+            return val, None
+        # String parsen
+        if isinstance(val, str):
+            # Verschiedene Formate probieren
+            for fmt in DATUMSFORMATE:
+                try:
+                    return datetime.strptime(val.strip(), fmt).date(), None
+                except ValueError:
+                    continue
+        return None, f"Ungültiges Datum: '{val}'"
+    except Exception:
+        return None, None
+
+
+# Felder mit eigener Umwandlung; alle übrigen werden als Text übernommen
+_FELD_UMWANDLUNG: Dict[LBExcelColumn, Callable[[Any], Tuple[Any, Optional[str]]]] = {
+    LBExcelColumn.RECHT_BETRAG: _als_betrag,
+    LBExcelColumn.FRIST_DATUM: _als_datum,
+}
+
+# Spaltenarten (pd.api.types.infer_dtype), deren Werte nur bei gleicher
+# Darstellung gleich sind. In gemischten Spalten wären z.B. 1, 1.0 und True
+# für pd.factorize derselbe Wert, würden aber unterschiedlich umgewandelt.
+_GLEICHARTIGE_SPALTEN = {"string", "integer", "floating", "datetime", "datetime64", "date"}
+
+# Ganzzahlige Floats bis 2**53 lassen sich verlustfrei über int64 wandeln
+_MAX_GANZZAHL_FLOAT = 2.0 ** 53
+
+
+def _zellwerte(serie: pd.Series, art: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    _zellwert() für eine ganze Spalte.
+
+    Returns:
+        (Zellwerte, offen) - `offen` markiert Zellen, die einzeln umgewandelt
+        werden müssen (gemischte Spalten, unendliche oder sehr große Floats)
+    """
+    werte = np.array(serie.to_numpy(dtype=object), dtype=object)  # beschreibbare Kopie
+    fehlend = serie.isna().to_numpy()
+    werte[fehlend] = None
+
+    if art == "floating":
+        zahlen = serie.to_numpy(dtype=float, na_value=np.nan)
+        offen = np.abs(zahlen) >= _MAX_GANZZAHL_FLOAT  # auch ±inf
+        ganzzahlig = ~offen & (zahlen == np.trunc(zahlen))
+        werte[ganzzahlig] = zahlen[ganzzahlig].astype(np.int64).astype(object)
+    elif art in _GLEICHARTIGE_SPALTEN or art == "empty":
+        offen = np.zeros(len(werte), dtype=bool)
+    else:
+        offen = ~fehlend
+    return werte, offen
+
+
+def _rohwerte(serie: pd.Series, art: str) -> Tuple[List[np.ndarray], np.ndarray]:
+    """_unveraendert() für eine ganze Spalte"""
+    werte, offen = _zellwerte(serie, art)
+    return [werte], offen
+
+
+def _texte(serie: pd.Series, art: str) -> Tuple[List[np.ndarray], np.ndarray]:
+    """_als_text() für eine ganze Spalte über pandas-Stringoperationen"""
+    werte, offen = _zellwerte(serie, art)
+    texte = np.full(len(werte), None, dtype=object)
+    belegt = ~offen & pd.notna(werte)
+
+    if art in ("integer", "floating"):
+        texte[belegt] = werte[belegt].astype(str)
+    elif art == "string":
+        texte[belegt] = pd.Series(werte[belegt], dtype=object).str.strip().to_numpy(dtype=object)
+    else:
+        offen = offen | belegt
+        belegt[:] = False
+
+    texte[belegt & (texte == "")] = None
+    return [texte], offen
+
+
+def _betraege(serie: pd.Series, art: str) -> Tuple[List[np.ndarray], np.ndarray]:
+    """_als_betrag() für numerische Spalten"""
+    werte, offen = _zellwerte(serie, art)
+    betraege = np.full(len(werte), None, dtype=object)
+    warnungen = np.full(len(werte), None, dtype=object)
+    belegt = ~offen & pd.notna(werte)
+
+    if art in ("integer", "floating"):
+        # str(Zahl) ist hier immer ein gültiger, endlicher Betrag
+        betraege[belegt] = list(map(Decimal, werte[belegt].astype(str)))
+    else:
+        # Texte (Tausenderpunkt, "EUR", Warnungen) einzeln je eindeutigem Wert:
+        # ohne pyarrow ist jede pandas-Stringoperation selbst eine Python-Schleife,
+        # die Kette der Bereinigungsschritte wäre langsamer als _als_betrag
+        offen = offen | belegt
+    return [betraege, warnungen], offen
+
+
+def _daten(serie: pd.Series, art: str) -> Tuple[List[np.ndarray], np.ndarray]:
+    """_als_datum() für eine ganze Spalte über pd.to_datetime je Datumsformat"""
+    werte, offen = _zellwerte(serie, art)
+    daten = np.full(len(werte), None, dtype=object)
+    warnungen = np.full(len(werte), None, dtype=object)
+    belegt = ~offen & pd.notna(werte)
+    positionen = np.flatnonzero(belegt)
+
+    if art in ("datetime", "datetime64"):
+        try:
+            daten[positionen] = pd.to_datetime(pd.Series(werte[belegt], dtype=object)).dt.date.to_numpy(dtype=object)
+        except (ValueError, TypeError, OverflowError):
+            offen |= belegt
+    elif art == "string":
+        texte = pd.Series(werte[belegt], dtype=object).str.strip()
+        geloest = np.zeros(len(texte), dtype=bool)
+        for fmt in DATUMSFORMATE:
+            kandidat = ~geloest
+            if not kandidat.any():
+                break
+            geparst = pd.to_datetime(texte[kandidat], format=fmt, errors="coerce")
+            ok = geparst.notna().to_numpy()
+            treffer = np.flatnonzero(kandidat)[ok]
+            daten[positionen[treffer]] = geparst[ok].dt.date.to_numpy(dtype=object)
+            geloest[treffer] = True
+        offen[positionen[~geloest]] = True
+    else:
+        offen |= belegt
+    return [daten, warnungen], offen
+
+
+# Vektorielle Gegenstücke der Zell-Umwandlungen; Zellen, die sie als offen
+# melden, laufen weiterhin über die Einzelumwandlung (_einzeln)
+_VEKTORIELL: Dict[Callable[[Any], Any], Callable[[pd.Series, str], Tuple[List[np.ndarray], np.ndarray]]] = {
+    _unveraendert: _rohwerte,
+    _als_text: _texte,
+    _als_betrag: _betraege,
+    _als_datum: _daten,
+}
+
+
+def _spaltenweise(
+    spalte: np.ndarray,
+    umwandlung: Callable[[Any], Any],
+    teile: int = 1
+) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Wandelt eine ganze Spalte um: umwandlung(_zellwert(zelle)) für jede Zelle.
+
+    Gleichartige Spalten werden per pd.factorize auf ihre eindeutigen Werte
+    reduziert; das Ergebnis wird per Index auf alle Zeilen verteilt. Text,
+    Betrag und Datum werden dabei vektoriell umgewandelt (Stringoperationen,
+    Mustervergleich, pd.to_datetime). Nur Werte, die so nicht eindeutig sind -
+    ungültige Werte (Warnungstext), gemischte Spalten, Sonderformen - laufen
+    einzeln durch `umwandlung`, damit Ergebnis und Warnungen gleich bleiben.
+
+    Args:
+        spalte: Zellwerte einer Spalte
+        umwandlung: Umwandlung des Zellwerts
+        teile: Anzahl Rückgabewerte der Umwandlung (Tupel → getrennte Arrays)
+
+    Returns:
+        (Liste von `teile` Ergebnis-Arrays, Fehlermaske, Ausnahmen je Zeile)
+    """
+    serie = pd.Series(spalte, copy=False)
+    art = pd.api.types.infer_dtype(serie, skipna=True)
+    if art in _GLEICHARTIGE_SPALTEN:
+        codes, eindeutig = pd.factorize(serie)
+        # Code -1 (fehlender Wert) greift auf den letzten Eintrag zu
+        quelle = pd.Series(eindeutig.tolist() + [None], dtype=object)
+    else:
+        codes = None
+        quelle = serie
+
+    vektoriell = _VEKTORIELL.get(umwandlung)
+    if vektoriell is None:
+        ergebnisse, ist_fehler, ausnahmen = _einzeln(quelle, umwandlung, teile)
+    else:
+        ergebnisse, offen = vektoriell(quelle, art)
+        ist_fehler = np.zeros(len(quelle), dtype=bool)
+        ausnahmen = np.empty(len(quelle), dtype=object)
+        if offen.any():
+            rest, ist_fehler[offen], ausnahmen[offen] = _einzeln(quelle[offen], umwandlung, teile)
+            for ergebnis, teil in zip(ergebnisse, rest):
+                ergebnis[offen] = teil
+
+    if codes is not None:
+        return [e[codes] for e in ergebnisse], ist_fehler[codes], ausnahmen[codes]
+    return ergebnisse, ist_fehler, ausnahmen
+
+
+def _einzeln(
+    quelle: pd.Series,
+    umwandlung: Callable[[Any], Any],
+    teile: int = 1
+) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """Einzelumwandlung je Wert (Fehler werden je Zelle festgehalten)"""
+    anzahl = len(quelle)
+    ergebnisse = [np.empty(anzahl, dtype=object) for _ in range(teile)]
+    ist_fehler = np.zeros(anzahl, dtype=bool)
+    ausnahmen = np.empty(anzahl, dtype=object)
+
+    for i, wert in enumerate(quelle.tolist()):
+        try:
+            ergebnis = umwandlung(_zellwert(wert))
+        except Exception as e:
+            ist_fehler[i] = True
+            ausnahmen[i] = e
+            continue
+        if teile == 1:
+            ergebnisse[0][i] = ergebnis
+        else:
+            for k in range(teile):
+                ergebnisse[k][i] = ergebnis[k]
+
+    return ergebnisse, ist_fehler, ausnahmen
 
 
 # ==================== HILFSFUNKTIONEN ====================
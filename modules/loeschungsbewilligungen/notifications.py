@@ -6,18 +6,33 @@ Versendet automatische Benachrichtigungen bei:
 - Status-Änderungen
 - Frist-Erinnerungen
 - Erhaltenen Bewilligungen
+
+Der Versand nutzt eine dauerhafte SMTP-Verbindung (STARTTLS und Login
+einmal je Verbindung) mit automatischem Neuaufbau, Wiederholung mit
+Backoff und Ratenbegrenzung; send_bulk und die Sende-Warteschlange
+versenden viele Nachrichten über dieselbe Sitzung.
 """
 
+import html
+import logging
+import queue
 import smtplib
+import string
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Hashable, Iterable, Tuple, Union
 from uuid import UUID
 
 from .models import LBCase, LBCaseStatus, LBOrganization
 
+logger = logging.getLogger(__name__)
+
 
 # ==================== KONFIGURATION ====================
 
@@ -33,6 +48,15 @@ class LBEmailConfig:
     from_email: str = "noreply@notariat.de"
     from_name: str = "Notariat - Löschungsbewilligungen"
 
+    # Verbindung und Versand
+    timeout: float = 30.0
+    max_messages_per_connection: int = 100  # danach neue Sitzung (Server-Limits)
+    idle_check_seconds: float = 60.0  # nach dieser Ruhezeit Verbindung per NOOP prüfen
+    rate_limit_per_second: float = 0.0  # 0 = unbegrenzt
+    max_retries: int = 3
+    retry_backoff_seconds: float = 1.0  # verdoppelt sich je Versuch
+    queue_size: int = 1000
+
     # Vorlagen-Einstellungen
     footer_text: str = "Diese E-Mail wurde automatisch generiert."
 
@@ -153,6 +177,257 @@ Mit freundlichen Grüßen
 }
 
 
+# ==================== KOMPILIERTE TEMPLATES ====================
+
+_FORMATTER = string.Formatter()
+
+# Rahmen des HTML-Teils; der Inhalt steht in einem <p>, Absätze trennen </p><p>
+_HTML_KOPF = """
+        <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                p { margin: 10px 0; }
+            </style>
+        </head>
+        <body>
+            <p>"""
+_HTML_FUSS = """</p>
+        </body>
+        </html>
+        """
+
+# (Literaltext, Feldname, Format-Spezifikation, Konvertierung)
+_Teil = Tuple[str, Optional[str], str, Optional[str]]
+
+
+def _text_zu_html(text: str, fett: bool = False) -> Tuple[str, bool]:
+    """
+    Escaped Text für HTML und setzt **fett**, Absätze und Zeilenumbrüche um
+
+    Returns:
+        (HTML, ob nach dem Text noch Fettdruck offen ist)
+    """
+    teile = html.escape(text, quote=False).split("**")
+    ergebnis = [teile[0]]
+    for teil in teile[1:]:
+        fett = not fett
+        ergebnis.append("<strong>" if fett else "</strong>")
+        ergebnis.append(teil)
+    return "".join(ergebnis).replace("\n\n", "</p><p>").replace("\n", "<br>"), fett
+
+
+class LBCompiledEmailTemplate:
+    """
+    Einmal zerlegtes E-Mail-Template (Betreff, Text- und HTML-Teil)
+
+    Die str.format-Syntax der EMAIL_TEMPLATES wird beim Kompilieren in
+    Literal- und Feldteile zerlegt; der HTML-Teil wird dabei einmal aus dem
+    Template (nicht aus jeder fertigen Nachricht) erzeugt. Pro Nachricht
+    werden nur noch die Feldwerte eingesetzt - im HTML-Teil escaped.
+    Fehlende Felder lösen wie bei str.format einen KeyError aus.
+    """
+
+    def __init__(self, subject: str, body: str, footer_text: str = ""):
+        self._subject = self._parse(subject)
+        # Footer wird wie bisher nach dem Formatieren angehängt: Klammern
+        # darin sind kein Platzhalter
+        footer = f"\n\n---\n{footer_text}"
+        self._text = self._parse(body) + [(footer, None, "", None)]
+
+        self._html: List[_Teil] = []
+        fett = False
+        for literal, name, spec, conversion in self._text:
+            literal_html, fett = _text_zu_html(literal, fett)
+            self._html.append((literal_html, name, spec, conversion))
+        if fett:
+            self._html.append(("</strong>", None, "", None))
+
+        self.fields = sorted({name for _, name, _, _ in self._subject + self._text if name})
+
+    @staticmethod
+    def _parse(template: str) -> List[_Teil]:
+        return [
+            (literal, name, spec or "", conversion)
+            for literal, name, spec, conversion in _FORMATTER.parse(template)
+        ]
+
+    @staticmethod
+    def _wert(context: Dict[str, Any], name: str, spec: str, conversion: Optional[str]) -> str:
+        value = _FORMATTER.get_field(name, (), context)[0]
+        if conversion:
+            value = _FORMATTER.convert_field(value, conversion)
+        return format(value, spec)
+
+    def _render(self, teile: List[_Teil], context: Dict[str, Any], escape: bool = False) -> str:
+        ergebnis = []
+        for literal, name, spec, conversion in teile:
+            ergebnis.append(literal)
+            if name is not None:
+                wert = self._wert(context, name, spec, conversion)
+                if escape:
+                    wert = html.escape(wert, quote=False).replace("\n\n", "</p><p>").replace("\n", "<br>")
+                ergebnis.append(wert)
+        return "".join(ergebnis)
+
+    def render_subject(self, context: Dict[str, Any]) -> str:
+        return self._render(self._subject, context)
+
+    def render_text(self, context: Dict[str, Any]) -> str:
+        return self._render(self._text, context)
+
+    def render_html(self, context: Dict[str, Any]) -> str:
+        """HTML-Teil; Feldwerte werden escaped"""
+        return _HTML_KOPF + self._render(self._html, context, escape=True) + _HTML_FUSS
+
+
+# ==================== SMTP-VERBINDUNG ====================
+
+# Fehler, nach denen sich ein erneuter Versuch lohnt (Verbindung weg,
+# Zeitüberschreitung) - aber nur, solange DATA noch nicht begonnen hat;
+# 4xx-Antworten werden gesondert behandelt
+_TRANSIENT_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    ConnectionError,
+    TimeoutError,
+    OSError,
+)
+
+
+class _ZustellungUngewiss(smtplib.SMTPException):
+    """
+    Verbindungsfehler nach Beginn von DATA: der Server hat die Nachricht
+    möglicherweise schon angenommen, ein erneuter Versuch könnte sie doppelt
+    zustellen
+    """
+
+
+class _SMTP(smtplib.SMTP):
+    """smtplib.SMTP, das sich merkt, ob für die aktuelle Nachricht DATA begonnen hat"""
+
+    daten_begonnen = False
+
+    def data(self, msg):
+        self.daten_begonnen = True
+        return super().data(msg)
+
+
+def _is_transient(error: Exception) -> bool:
+    """
+    Ob ein SMTP-Fehler vorübergehend ist (erneuter Versuch sinnvoll)
+
+    Wiederholt werden 4xx-Antworten (der Server hat die Nachricht nicht
+    angenommen) und Verbindungsfehler vor DATA, nicht aber Verbindungsabbrüche
+    während oder nach der Datenübertragung.
+    """
+    if isinstance(error, (smtplib.SMTPNotSupportedError, _ZustellungUngewiss)):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    return isinstance(error, _TRANSIENT_ERRORS)
+
+
+class LBSmtpConnection:
+    """
+    Dauerhafte SMTP-Verbindung
+
+    Verbindet sich beim ersten Versand (STARTTLS, Login) und hält die
+    Sitzung offen. Nach max_messages_per_connection Nachrichten oder wenn
+    ein NOOP nach längerer Ruhezeit scheitert, wird neu verbunden.
+    Nicht thread-sicher; der Service serialisiert den Zugriff.
+    """
+
+    def __init__(self, config: LBEmailConfig):
+        self.config = config
+        self._server: Optional[smtplib.SMTP] = None
+        self._sent = 0
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = _SMTP(
+            self.config.smtp_host, self.config.smtp_port, timeout=self.config.timeout
+        )
+        try:
+            if self.config.use_tls:
+                server.starttls()
+            if self.config.smtp_user and self.config.smtp_password:
+                server.login(self.config.smtp_user, self.config.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _ensure(self) -> smtplib.SMTP:
+        if self._server is not None:
+            if self._sent >= self.config.max_messages_per_connection:
+                self.close()
+            elif time.monotonic() - self._last_used > self.config.idle_check_seconds:
+                try:
+                    if self._server.noop()[0] != 250:
+                        self.close()
+                except OSError:  # umfasst smtplib.SMTPException
+                    self.close()
+        if self._server is None:
+            self._server = self._connect()
+            self._sent = 0
+        return self._server
+
+    def send(self, msg: MIMEMultipart) -> None:
+        """
+        Versendet eine Nachricht; bei Fehlern wird die Verbindung verworfen
+
+        Bricht die Verbindung nach Beginn von DATA ab, wird _ZustellungUngewiss
+        geworfen (kein erneuter Versuch).
+        """
+        server = self._ensure()
+        server.daten_begonnen = False
+        try:
+            server.send_message(msg)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # Abgelehnte Nachricht: smtplib hat die Sitzung per RSET
+            # zurückgesetzt, die Verbindung bleibt nutzbar
+            raise
+        except OSError as e:
+            self.close()
+            if server.daten_begonnen:
+                raise _ZustellungUngewiss(
+                    f"Verbindung während der Datenübertragung abgebrochen, "
+                    f"Zustellung ungewiss: {e}"
+                ) from e
+            raise
+        self._sent += 1
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+
+class _RateLimiter:
+    """Hält einen Mindestabstand zwischen zwei Sendevorgängen ein"""
+
+    def __init__(self, per_second: float):
+        self._interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self._interval
+
+
 # ==================== NOTIFICATION SERVICE ====================
 
 @dataclass
@@ -163,6 +438,15 @@ class LBNotificationResult:
     recipient: str = ""
     sent_at: Optional[datetime] = None
     error_message: Optional[str] = None
+    attempts: int = 0
+
+
+@dataclass
+class LBNotification:
+    """Eine zu versendende Benachrichtigung (für send_bulk und enqueue)"""
+    notification_type: str
+    recipient_email: str
+    context: Dict[str, Any] = field(default_factory=dict)
 
 
 class LBNotificationService:
@@ -178,10 +462,40 @@ class LBNotificationService:
         service = LBNotificationService(config)
 
         result = service.send_neue_auftrag_notification(case, organization, recipient)
+
+        # Viele Nachrichten über eine SMTP-Sitzung
+        results = service.send_bulk(notifications)
+
+        # Hintergrund-Versand über eine begrenzte Warteschlange
+        future = service.enqueue(notification)
+        service.close()
+
+    Die SMTP-Verbindung bleibt zwischen den Aufrufen offen; close() beendet
+    sie (und den Hintergrund-Versand).
     """
 
+    # Anzahl zwischengespeicherter Fall-Kontexte (LRU)
+    CONTEXT_CACHE_SIZE = 10_000
+
     def __init__(self, config: LBEmailConfig):
         self.config = config
+        self._templates: Dict[str, LBCompiledEmailTemplate] = {}
+        self._context_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._context_lock = threading.Lock()
+        self._connection = LBSmtpConnection(config)
+        self._rate_limiter = _RateLimiter(config.rate_limit_per_second)
+        self._lock = threading.Lock()
+        # Eigener Lock für Start/Ende des Hintergrund-Threads; _lock wird
+        # während des Versands (inkl. Backoff) gehalten
+        self._worker_lock = threading.Lock()
+        self._queue: Optional["queue.Queue"] = None
+        self._worker: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "LBNotificationService":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     def send_notification(
         self,
@@ -200,78 +514,145 @@ class LBNotificationService:
         Returns:
             LBNotificationResult
         """
-        result = LBNotificationResult(
-            notification_type=notification_type,
-            recipient=recipient_email
-        )
-
-        template = EMAIL_TEMPLATES.get(notification_type)
-        if not template:
-            result.error_message = f"Unbekannter Benachrichtigungstyp: {notification_type}"
-            return result
-
-        try:
-            # Subject und Body mit Kontext füllen
-            subject = template["subject"].format(**context)
-            body = template["body"].format(**context)
+        return self._deliver(LBNotification(notification_type, recipient_email, context))
 
-            # Footer hinzufügen
-            body += f"\n\n---\n{self.config.footer_text}"
-
-            # E-Mail erstellen
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.config.from_name} <{self.config.from_email}>"
-            msg['To'] = recipient_email
+    def send_bulk(self, notifications: Iterable[LBNotification]) -> List[LBNotificationResult]:
+        """
+        Versendet viele Benachrichtigungen über dieselbe SMTP-Sitzung
 
-            # Plain-Text und HTML
-            text_part = MIMEText(body, 'plain', 'utf-8')
-            html_body = self._convert_to_html(body)
-            html_part = MIMEText(html_body, 'html', 'utf-8')
+        Die Verbindung wird nur nach max_messages_per_connection Nachrichten
+        oder nach einem Verbindungsfehler neu aufgebaut.
 
-            msg.attach(text_part)
-            msg.attach(html_part)
+        Args:
+            notifications: Zu versendende Benachrichtigungen
 
-            # E-Mail versenden
-            self._send_email(msg, recipient_email)
+        Returns:
+            Ein LBNotificationResult je Benachrichtigung (gleiche Reihenfolge)
+        """
+        return [self._deliver(notification) for notification in notifications]
 
-            result.success = True
-            result.sent_at = datetime.now()
+    def _deliver(self, notification: LBNotification) -> LBNotificationResult:
+        """Baut die Nachricht und versendet sie mit Wiederholung und Backoff"""
+        result = LBNotificationResult(
+            notification_type=notification.notification_type,
+            recipient=notification.recipient_email
+        )
 
+        try:
+            msg = self._build_message(notification)
         except Exception as e:
             result.error_message = str(e)
+            return result
 
-        return result
-
-    def _send_email(self, msg: MIMEMultipart, recipient: str) -> None:
-        """Versendet E-Mail über SMTP"""
-        with smtplib.SMTP(self.config.smtp_host, self.config.smtp_port) as server:
-            if self.config.use_tls:
-                server.starttls()
-            if self.config.smtp_user and self.config.smtp_password:
-                server.login(self.config.smtp_user, self.config.smtp_password)
-            server.send_message(msg)
+        with self._lock:
+            while True:
+                result.attempts += 1
+                self._rate_limiter.wait()
+                try:
+                    self._connection.send(msg)
+                except Exception as e:
+                    if result.attempts > self.config.max_retries or not _is_transient(e):
+                        result.error_message = str(e)
+                        return result
+                    delay = self.config.retry_backoff_seconds * 2 ** (result.attempts - 1)
+                    logger.warning(
+                        f"E-Mail an {notification.recipient_email} fehlgeschlagen "
+                        f"(Versuch {result.attempts}): {e} - neuer Versuch in {delay:.1f}s"
+                    )
+                    time.sleep(delay)
+                    continue
+
+                result.success = True
+                result.sent_at = datetime.now()
+                return result
+
+    def get_template(self, notification_type: str) -> LBCompiledEmailTemplate:
+        """Kompiliertes Template eines Benachrichtigungstyps (einmal je Service)"""
+        template = self._templates.get(notification_type)
+        if template is None:
+            raw = EMAIL_TEMPLATES.get(notification_type)
+            if not raw:
+                raise ValueError(f"Unbekannter Benachrichtigungstyp: {notification_type}")
+            template = LBCompiledEmailTemplate(raw["subject"], raw["body"], self.config.footer_text)
+            self._templates[notification_type] = template
+        return template
+
+    def _build_message(self, notification: LBNotification) -> MIMEMultipart:
+        """Erstellt die E-Mail (Text und HTML) aus dem kompilierten Template"""
+        template = self.get_template(notification.notification_type)
+        context = notification.context
+
+        # E-Mail erstellen
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = template.render_subject(context)
+        msg['From'] = f"{self.config.from_name} <{self.config.from_email}>"
+        msg['To'] = notification.recipient_email
+
+        # Plain-Text und HTML
+        msg.attach(MIMEText(template.render_text(context), 'plain', 'utf-8'))
+        msg.attach(MIMEText(template.render_html(context), 'html', 'utf-8'))
+        return msg
+
+    # ==================== SENDE-WARTESCHLANGE ====================
+
+    def enqueue(
+        self,
+        notification: LBNotification,
+        timeout: Optional[float] = None
+    ) -> "Future[LBNotificationResult]":
+        """
+        Stellt eine Benachrichtigung in die Sende-Warteschlange
 
-    def _convert_to_html(self, text: str) -> str:
-        """Konvertiert Plain-Text zu einfachem HTML"""
-        # Markdown-ähnliche Formatierung
-        html = text.replace("\n\n", "</p><p>")
-        html = html.replace("\n", "<br>")
-        html = html.replace("**", "<strong>").replace("**", "</strong>")
+        Der Hintergrund-Thread wird beim ersten Aufruf gestartet. Ist die
+        Warteschlange voll (queue_size), blockiert der Aufruf bis zu timeout
+        Sekunden und wirft dann queue.Full.
 
-        return f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                p {{ margin: 10px 0; }}
-            </style>
-        </head>
-        <body>
-            <p>{html}</p>
-        </body>
-        </html>
+        Returns:
+            Future, das nach dem Versand das LBNotificationResult liefert
         """
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._queue = queue.Queue(maxsize=max(1, self.config.queue_size))
+                self._worker = threading.Thread(
+                    target=self._worker_loop, args=(self._queue,),
+                    name="lb-smtp-worker", daemon=True
+                )
+                self._worker.start()
+            work_queue = self._queue
+
+        future: "Future[LBNotificationResult]" = Future()
+        work_queue.put((notification, future), timeout=timeout)
+        return future
+
+    def _worker_loop(self, work_queue: "queue.Queue") -> None:
+        while True:
+            item = work_queue.get()
+            try:
+                if item is None:
+                    return
+                notification, future = item
+                if future.set_running_or_notify_cancel():
+                    future.set_result(self._deliver(notification))
+            except Exception as e:
+                logger.exception(f"Fehler im E-Mail-Versand: {e}")
+            finally:
+                work_queue.task_done()
+
+    def flush(self) -> None:
+        """Wartet, bis die Warteschlange abgearbeitet ist"""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Arbeitet die Warteschlange ab und schließt die SMTP-Verbindung"""
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._queue.put(None)
+                self._worker.join()
+            self._worker = None
+            self._queue = None
+        with self._lock:
+            self._connection.close()
 
     # ==================== CONVENIENCE METHODS ====================
 
@@ -332,6 +713,34 @@ class LBNotificationService:
         recipient_email: str
     ) -> LBNotificationResult:
         """Sendet Frist-Erinnerung"""
+        return self.send_notification(
+            LBNotificationType.FRIST_ERINNERUNG,
+            recipient_email,
+            self._build_frist_context(case, organization)
+        )
+
+    def send_frist_erinnerungen(
+        self,
+        cases: Iterable[LBCase],
+        organization: LBOrganization,
+        recipient_email: str
+    ) -> List[LBNotificationResult]:
+        """Sendet Frist-Erinnerungen für viele Fälle über eine SMTP-Sitzung"""
+        return self.send_bulk(
+            LBNotification(
+                LBNotificationType.FRIST_ERINNERUNG,
+                recipient_email,
+                self._build_frist_context(case, organization)
+            )
+            for case in cases
+        )
+
+    def _build_frist_context(
+        self,
+        case: LBCase,
+        organization: LBOrganization
+    ) -> Dict[str, Any]:
+        """Kontext für Frist-Erinnerungen"""
         context = self._build_case_context(case, organization)
 
         if case.frist_datum:
@@ -342,11 +751,7 @@ class LBNotificationService:
             context["frist_datum"] = "-"
             context["verbleibende_tage"] = "-"
 
-        return self.send_notification(
-            LBNotificationType.FRIST_ERINNERUNG,
-            recipient_email,
-            context
-        )
+        return context
 
     def send_auftrag_abgeschlossen(
         self,
@@ -368,7 +773,36 @@ class LBNotificationService:
         case: LBCase,
         organization: LBOrganization
     ) -> Dict[str, Any]:
-        """Erstellt Kontext-Dictionary aus Case und Organisation"""
+        """
+        Erstellt Kontext-Dictionary aus Case und Organisation
+
+        Zwischengespeichert je (case.id, case.updated_at) und Organisation;
+        wer einen Fall ändert, setzt updated_at. Zurückgegeben wird eine
+        Kopie, die der Aufrufer ergänzen darf.
+        """
+        key = (
+            case.id, case.updated_at,
+            organization.id if organization else None,
+            organization.updated_at if organization else None,
+        )
+        with self._context_lock:
+            context = self._context_cache.get(key)
+            if context is not None:
+                self._context_cache.move_to_end(key)
+                return dict(context)
+
+        context = self._create_case_context(case, organization)
+        with self._context_lock:
+            self._context_cache[key] = context
+            if len(self._context_cache) > self.CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+        return dict(context)
+
+    def _create_case_context(
+        self,
+        case: LBCase,
+        organization: LBOrganization
+    ) -> Dict[str, Any]:
         return {
             "aktenzeichen": case.aktenzeichen or str(case.id)[:8],
             "grundbuch": case.grundbuch,
@@ -388,39 +822,109 @@ class LBNotificationService:
 
 # ==================== FRIST-PRÜFUNG ====================
 
+def _frist_aktiv(case: LBCase) -> bool:
+    return case.status not in (LBCaseStatus.ABGESCHLOSSEN, LBCaseStatus.STORNIERT)
+
+
+class LBFristenIndex:
+    """
+    Nach frist_datum sortierter Index über offene Fälle
+
+    Abgeschlossene und stornierte Fälle werden nicht aufgenommen. Fällige und
+    überfällige Fälle werden per Binärsuche in O(log n + k) ermittelt statt
+    alle Fälle bei jedem Aufruf zu prüfen. Nach Änderung von Status oder
+    frist_datum eines Falls muss update(case) aufgerufen werden.
+
+    Der eigentliche Datumsindex wird von außen übergeben, damit das Paket
+    nicht vom übergeordneten modules-Paket abhängt: `baue_index` erhält
+    (schlüssel, fall)-Paare, den Feldnamen und den Aktiv-Filter und liefert
+    ein Objekt mit add/remove/passt/zwischen/vor (z.B.
+    modules.fristenindex.baue_fristen_index).
+
+    Verwendung:
+        from modules.fristenindex import baue_fristen_index
+        index = LBFristenIndex(baue_fristen_index, cases)
+        get_faellige_fristen(index, tage_vorher=3)
+    """
+
+    def __init__(
+        self,
+        baue_index: Callable[[Iterable[Tuple[Hashable, Any]], str, Callable[[Any], bool]], Any],
+        cases: Iterable[LBCase] = (),
+    ):
+        self._cases: Dict[UUID, LBCase] = {case.id: case for case in cases}
+        self._index = baue_index(self._cases.items(), "frist_datum", _frist_aktiv)
+
+    def update(self, case: LBCase) -> None:
+        """Nimmt einen Fall auf bzw. aktualisiert seinen Eintrag"""
+        self._cases[case.id] = case
+        self._index.add(case.id, case)
+
+    def remove(self, case_id: UUID) -> None:
+        self._cases.pop(case_id, None)
+        self._index.remove(case_id)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _faelle(self, eintraege) -> List[LBCase]:
+        faelle = []
+        for case_id, zeitpunkt in eintraege:
+            case = self._cases.get(case_id)
+            if self._index.passt(case, zeitpunkt):
+                faelle.append(case)
+        return faelle
+
+    def faellige(self, tage_vorher: int = 3, heute: Optional[date] = None) -> List[LBCase]:
+        """Offene Fälle mit heute <= frist_datum <= heute + tage_vorher, nach Frist sortiert"""
+        heute = heute or date.today()
+        return self._faelle(self._index.zwischen(heute, heute + timedelta(days=tage_vorher)))
+
+    def ueberfaellige(self, heute: Optional[date] = None) -> List[LBCase]:
+        """Offene Fälle mit frist_datum < heute, nach Frist sortiert"""
+        return self._faelle(self._index.vor(heute or date.today()))
+
+
 def get_faellige_fristen(
-    cases: List[LBCase],
+    cases: Union[List[LBCase], LBFristenIndex],
     tage_vorher: int = 3
 ) -> List[LBCase]:
     """
     Gibt alle Fälle zurück, deren Frist in den nächsten X Tagen fällig ist
 
     Args:
-        cases: Liste der zu prüfenden Fälle
+        cases: Liste der zu prüfenden Fälle oder ein LBFristenIndex
+            (wiederholte Abfragen ohne Scan über alle Fälle)
         tage_vorher: Tage vor der Frist
 
     Returns:
         Liste der fälligen Fälle
     """
+    if isinstance(cases, LBFristenIndex):
+        return cases.faellige(tage_vorher)
+
     heute = date.today()
     grenze = heute + timedelta(days=tage_vorher)
 
     faellige = []
     for case in cases:
-        if case.frist_datum and case.status not in [LBCaseStatus.ABGESCHLOSSEN, LBCaseStatus.STORNIERT]:
+        if case.frist_datum and _frist_aktiv(case):
             if heute <= case.frist_datum <= grenze:
                 faellige.append(case)
 
     return faellige
 
 
-def get_ueberfaellige_fristen(cases: List[LBCase]) -> List[LBCase]:
-    """Gibt alle überfälligen Fälle zurück"""
+def get_ueberfaellige_fristen(cases: Union[List[LBCase], LBFristenIndex]) -> List[LBCase]:
+    """Gibt alle überfälligen Fälle zurück (Liste oder LBFristenIndex)"""
+    if isinstance(cases, LBFristenIndex):
+        return cases.ueberfaellige()
+
     heute = date.today()
     ueberfaellige = []
 
     for case in cases:
-        if case.frist_datum and case.status not in [LBCaseStatus.ABGESCHLOSSEN, LBCaseStatus.STORNIERT]:
+        if case.frist_datum and _frist_aktiv(case):
             if case.frist_datum < heute:
                 ueberfaellige.append(case)
 
@@ -13,12 +13,19 @@ Verwendet OpenAI Structured Outputs für Schema-konforme JSON-Ausgaben.
 import json
 import re
 import hashlib
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field, asdict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Callable
 from enum import Enum
 from datetime import datetime
 
+from .aehnlichkeit import AehnlichkeitsIndex, wort_menge
+from .dokumentverarbeitung import get_llm_rate_limiter, mit_wiederholung
+from .ki_cache import get_ki_cache
+
 # ============================================================================
 # ENUMS
 # ============================================================================
@@ -250,6 +257,11 @@ NOTAR_PARSER_JSON_SCHEMA = {
     }
 }
 
+# Prompt-Version für den KI-Cache: ändert sich automatisch mit Prompt oder Schema
+NOTAR_PARSER_PROMPT_VERSION = "notar-parser-v1-" + hashlib.sha256(
+    (NOTAR_PARSER_SYSTEM_PROMPT + json.dumps(NOTAR_PARSER_JSON_SCHEMA, sort_keys=True)).encode("utf-8")
+).hexdigest()[:12]
+
 
 # ============================================================================
 # DATENKLASSEN
@@ -442,6 +454,53 @@ def segment_paragraphs(text: str) -> List[str]:
 # HASH & NORMALISIERUNG FÜR GENERELLE BAUSTEINE
 # ============================================================================
 
+# Platzhalter-Muster (vorkompiliert, Reihenfolge = Priorität)
+# Datum (z.B. 01.01.2024, 1.1.24)
+_DATE_RE = re.compile(r"\b\d{1,2}\.\d{1,2}\.\d{2,4}\b")
+# Beträge (z.B. 100.000,00 oder 100000,00)
+_AMOUNT_RE = re.compile(r"\b\d[\d\.]*,\d{2}\b")
+# Urkundsnummern (z.B. UR-Nr. 123/2024)
+_UR_NR_RE = re.compile(r"ur[.-]?\s*nr[.\s:]*\d+/\d+", re.IGNORECASE)
+# Aktenzeichen (z.B. 333/24)
+_AKT_NR_RE = re.compile(r"\b\d{1,4}/\d{2,4}\b")
+
+# Alle vier Muster als eine Alternation; lastgroup bestimmt den Platzhalter
+_PLATZHALTER_RE = re.compile(
+    "|".join(
+        f"(?P<{name}>{muster.pattern})"
+        for name, muster in (
+            ("DATE", _DATE_RE),
+            ("AMOUNT", _AMOUNT_RE),
+            ("UR_NR", _UR_NR_RE),
+            ("AKT_NR", _AKT_NR_RE),
+        )
+    ),
+    re.IGNORECASE,
+)
+_PLATZHALTER = {name: "${" + name + "}" for name in ("DATE", "AMOUNT", "UR_NR", "AKT_NR")}
+
+# Alle Platzhalter-Muster enthalten eine Ziffer
+_ZIFFER_RE = re.compile(r"\d")
+
+# Konstellationen, in denen ein nachrangiges Muster vor einem vorrangigen
+# beginnt und mit ihm überlappt (z.B. "5/12.12.2024", "5/10,00"). Nur dort
+# kann der Einzeldurchlauf vom schrittweisen Ersetzen abweichen; solche Texte
+# werden schrittweise normalisiert.
+_KONFLIKT_RE = re.compile(r"[\d.,/]\d{1,2}\.\d{1,2}\.\d{2,4}|/\d[\d.]*,\d")
+
+
+def _platzhalter(match: "re.Match") -> str:
+    return _PLATZHALTER[match.lastgroup]
+
+
+def _normalize_schrittweise(t: str) -> str:
+    """Ersetzt die Platzhalter nacheinander (Semantik der ursprünglichen Implementierung)."""
+    t = _DATE_RE.sub("${DATE}", t)
+    t = _AMOUNT_RE.sub("${AMOUNT}", t)
+    t = _UR_NR_RE.sub("${UR_NR}", t)
+    return _AKT_NR_RE.sub("${AKT_NR}", t)
+
+
 def normalize_for_hash(text: str) -> str:
     """
     Normalisiert Text für Hash-Berechnung.
@@ -450,26 +509,23 @@ def normalize_for_hash(text: str) -> str:
     damit gleiche Bausteine mit unterschiedlichen konkreten Werten
     denselben Hash ergeben.
 
+    Alle Platzhalter werden in einem Durchlauf über eine vorkompilierte
+    Alternation ersetzt. Das Ergebnis ist identisch mit dem schrittweisen
+    Ersetzen (Golden-Prüfung: scripts/pruefe_normalize_for_hash.py),
+    bestehende Bibliotheks-Hashes bleiben also gültig.
+
     Args:
         text: Der zu normalisierende Text
 
     Returns:
         Normalisierter Text
     """
-    t = text.lower()
-    t = re.sub(r"\s+", " ", t).strip()
-
-    # Platzhalter für variable Elemente
-    # Datum (z.B. 01.01.2024, 1.1.24)
-    t = re.sub(r"\b\d{1,2}\.\d{1,2}\.\d{2,4}\b", "${DATE}", t)
-    # Beträge (z.B. 100.000,00 oder 100000,00)
-    t = re.sub(r"\b\d[\d\.]*,\d{2}\b", "${AMOUNT}", t)
-    # Urkundsnummern (z.B. UR-Nr. 123/2024)
-    t = re.sub(r"ur[.-]?\s*nr[.\s:]*\d+/\d+", "${UR_NR}", t, flags=re.IGNORECASE)
-    # Aktenzeichen (z.B. 333/24)
-    t = re.sub(r"\b\d{1,4}/\d{2,4}\b", "${AKT_NR}", t)
-
-    return t
+    t = " ".join(text.lower().split())
+    if not _ZIFFER_RE.search(t):
+        return t
+    if _KONFLIKT_RE.search(t):
+        return _normalize_schrittweise(t)
+    return _PLATZHALTER_RE.sub(_platzhalter, t)
 
 
 def block_hash(text: str) -> str:
@@ -486,17 +542,60 @@ def block_hash(text: str) -> str:
     return hashlib.sha256(norm.encode("utf-8")).hexdigest()
 
 
-def match_generic_block(block_text: str, library: List[Dict[str, Any]]) -> GenericMatch:
+# Mindest-Jaccard-Ähnlichkeit (normalisierte Wortmengen) für einen NEAR_TEXT-Treffer
+NEAR_TEXT_SCHWELLENWERT = 0.85
+
+
+def build_near_text_index(
+    library: List[Dict[str, Any]],
+    schwellenwert: float = NEAR_TEXT_SCHWELLENWERT
+) -> AehnlichkeitsIndex:
+    """
+    Baut den MinHash/LSH-Index für NEAR_TEXT-Matching über die Bibliothek.
+
+    Indiziert werden alle Einträge mit "text"; die Texte werden wie für den
+    Hash normalisiert, damit abweichende Daten/Beträge/Nummern nicht zählen.
+
+    Args:
+        library: Liste von Bausteinen mit {"id": ..., "text": ...}
+        schwellenwert: Untere Ähnlichkeitsgrenze des Index
+
+    Returns:
+        AehnlichkeitsIndex (Schlüssel = Bibliotheks-ID)
+    """
+    index = AehnlichkeitsIndex(schwellenwert=schwellenwert)
+    for lib_block in library:
+        text = lib_block.get("text")
+        if text:
+            index.add(lib_block.get("id", ""), woerter=wort_menge(normalize_for_hash(text)))
+    return index
+
+
+def match_generic_block(
+    block_text: str,
+    library: List[Dict[str, Any]],
+    near_index: Optional[AehnlichkeitsIndex] = None,
+    near_schwellenwert: float = NEAR_TEXT_SCHWELLENWERT
+) -> GenericMatch:
     """
     Matched einen Block gegen die Bibliothek bekannter genereller Bausteine.
 
+    Zuerst exakt über den normalisierten Hash, danach (falls ein near_index
+    übergeben wird) über MinHash/LSH mit exakter Jaccard-Prüfung.
+
     Args:
         block_text: Der Text des zu matchenden Blocks
         library: Liste von bekannten Bausteinen mit {"id": ..., "hash": ..., "description": ...}
+            oder ein GenericBlockLibraryIndex (dann O(1) je Block, inkl. NEAR_TEXT)
+        near_index: Optional - Index aus build_near_text_index() für NEAR_TEXT
+        near_schwellenwert: Mindest-Ähnlichkeit für einen NEAR_TEXT-Treffer
 
     Returns:
         GenericMatch mit Match-Informationen
     """
+    if isinstance(library, GenericBlockLibraryIndex):
+        return library.match(block_text)
+
     h = block_hash(block_text)
 
     for lib_block in library:
@@ -508,9 +607,22 @@ def match_generic_block(block_text: str, library: List[Dict[str, Any]]) -> Gener
                 library_id=lib_block.get("id", "")
             )
 
-    # TODO: Implementiere NEAR_TEXT und EMBEDDING Matching
-    # Für Near-Text: Levenshtein-Distanz oder ähnliches
-    # Für Embedding: Vektorähnlichkeit mit OpenAI Embeddings
+    if near_index is not None:
+        treffer = near_index.suche(
+            woerter=wort_menge(normalize_for_hash(block_text)),
+            schwellenwert=near_schwellenwert,
+            limit=1
+        )
+        if treffer:
+            library_id, score = treffer[0]
+            return GenericMatch(
+                matched=True,
+                match_type=MatchType.NEAR_TEXT.value,
+                match_score=round(score, 4),
+                library_id=library_id
+            )
+
+    # TODO: EMBEDDING-Matching (Vektorähnlichkeit mit OpenAI Embeddings)
 
     return GenericMatch(
         matched=False,
@@ -520,6 +632,189 @@ def match_generic_block(block_text: str, library: List[Dict[str, Any]]) -> Gener
     )
 
 
+# ============================================================================
+# BIBLIOTHEK GENERELLER BAUSTEINE (HASH-INDEX)
+# ============================================================================
+
+class GenericBlockLibraryIndex:
+    """
+    Index über die Bibliothek genereller Bausteine (Tabelle generic_block_library).
+
+    Statt die Bibliothek für jeden Block jeder Urkunde linear zu durchsuchen,
+    werden die Einträge einmal geladen und über ihren normalisierten Hash in
+    einem Dict gehalten (O(1) je Block). Für NEAR_TEXT wird beim ersten Block
+    ohne exakten Treffer ein MinHash/LSH-Index über alle Einträge mit Text
+    aufgebaut und danach mitgeführt. Änderungen werden inkrementell über
+    refresh() übernommen (nur seit dem letzten Stand geänderte Zeilen).
+
+    Einträge sind Dicts im Format von match_generic_block:
+        {"id": ..., "hash": ..., "description": ..., "text": ..., "aktiv": True,
+         "aktualisiert_am": datetime}
+    Fehlt "hash", wird er aus "text" berechnet.
+
+    Verwendung:
+        library = GenericBlockLibraryIndex(eintraege)
+        matches = library.match_blocks([b.text_excerpt for b in output.blocks])
+    """
+
+    def __init__(
+        self,
+        eintraege: Iterable[Dict[str, Any]] = (),
+        near_text: bool = True,
+        near_schwellenwert: float = NEAR_TEXT_SCHWELLENWERT
+    ):
+        self._lock = threading.RLock()
+        self._eintraege: Dict[str, Dict[str, Any]] = {}
+        self._by_hash: Dict[str, Dict[str, None]] = {}
+        self.near_text = near_text
+        self.near_schwellenwert = near_schwellenwert
+        self._near: Optional[AehnlichkeitsIndex] = None  # lazy, siehe _near_index()
+        self.stand: Optional[datetime] = None  # jüngstes aktualisiert_am aller geladenen Zeilen
+        self.geladen_um: float = 0.0           # time.monotonic() des letzten refresh()
+        self.refresh(eintraege)
+
+    def __len__(self) -> int:
+        return len(self._eintraege)
+
+    def __contains__(self, library_id) -> bool:
+        return library_id in self._eintraege
+
+    def get(self, library_id: str) -> Optional[Dict[str, Any]]:
+        """Eintrag zu einer Bibliotheks-ID."""
+        return self._eintraege.get(library_id)
+
+    # ---------- Pflege ----------
+
+    def upsert(self, eintrag: Dict[str, Any]) -> None:
+        """Fügt einen Eintrag hinzu oder ersetzt ihn (inaktive Einträge werden entfernt)."""
+        library_id = str(eintrag.get("id", ""))
+        if not eintrag.get("aktiv", True):
+            self.remove(library_id)
+            return
+        text = eintrag.get("text") or ""
+        h = eintrag.get("hash") or (block_hash(text) if text else "")
+
+        with self._lock:
+            self._remove(library_id)
+            eintrag = {**eintrag, "id": library_id, "hash": h}
+            self._eintraege[library_id] = eintrag
+            if h:
+                self._by_hash.setdefault(h, {})[library_id] = None
+            if self._near is not None and text:
+                self._near.add(library_id, woerter=wort_menge(normalize_for_hash(text)))
+
+    def _near_index(self) -> Optional[AehnlichkeitsIndex]:
+        """Baut den NEAR_TEXT-Index beim ersten Bedarf auf."""
+        if not self.near_text:
+            return None
+        if self._near is None:
+            near = AehnlichkeitsIndex(schwellenwert=self.near_schwellenwert)
+            for library_id, eintrag in self._eintraege.items():
+                text = eintrag.get("text")
+                if text:
+                    near.add(library_id, woerter=wort_menge(normalize_for_hash(text)))
+            self._near = near
+        return self._near
+
+    def remove(self, library_id: str) -> None:
+        """Entfernt einen Eintrag."""
+        with self._lock:
+            self._remove(str(library_id))
+
+    def _remove(self, library_id: str) -> None:
+        alt = self._eintraege.pop(library_id, None)
+        if alt is None:
+            return
+        ids = self._by_hash.get(alt["hash"])
+        if ids is not None:
+            ids.pop(library_id, None)
+            if not ids:
+                del self._by_hash[alt["hash"]]
+        if self._near is not None:
+            self._near.remove(library_id)
+
+    def refresh(self, geaenderte: Iterable[Dict[str, Any]]) -> int:
+        """
+        Übernimmt geänderte Einträge (z.B. alle Zeilen mit aktualisiert_am > stand).
+
+        Returns:
+            Anzahl übernommener Einträge
+        """
+        anzahl = 0
+        with self._lock:
+            for eintrag in geaenderte:
+                self.upsert(eintrag)
+                geaendert = eintrag.get("aktualisiert_am")
+                if geaendert is not None and (self.stand is None or geaendert > self.stand):
+                    self.stand = geaendert
+                anzahl += 1
+            self.geladen_um = time.monotonic()
+        return anzahl
+
+    def braucht_refresh(self, intervall_sekunden: float) -> bool:
+        """Ob der letzte refresh() länger als `intervall_sekunden` zurückliegt."""
+        return time.monotonic() - self.geladen_um >= intervall_sekunden
+
+    # ---------- Matching ----------
+
+    def match(self, block_text: str) -> GenericMatch:
+        """Matched einen einzelnen Block (siehe match_blocks)."""
+        return self.match_blocks([block_text])[0]
+
+    def match_blocks(self, texts: List[str]) -> List[GenericMatch]:
+        """
+        Matched alle Blöcke einer Urkunde in einem Durchgang.
+
+        Alle Texte werden zuerst gehasht und per Dict-Lookup gegen die
+        Bibliothek geprüft; nur die verbleibenden Blöcke gehen (falls aktiv)
+        in die NEAR_TEXT-Suche.
+
+        Returns:
+            GenericMatch je Text (gleiche Reihenfolge wie `texts`)
+        """
+        normalisiert = [normalize_for_hash(t or "") for t in texts]
+        ergebnis: List[GenericMatch] = []
+        with self._lock:
+            for norm in normalisiert:
+                h = hashlib.sha256(norm.encode("utf-8")).hexdigest()
+                ids = self._by_hash.get(h)
+                if ids:
+                    ergebnis.append(GenericMatch(
+                        matched=True,
+                        match_type=MatchType.EXACT_HASH.value,
+                        match_score=1.0,
+                        library_id=next(iter(ids))
+                    ))
+                    continue
+
+                near = self._near_index() if norm else None
+                if near is not None:
+                    treffer = near.suche(
+                        woerter=wort_menge(norm),
+                        schwellenwert=self.near_schwellenwert,
+                        limit=1
+                    )
+                    if treffer:
+                        library_id, score = treffer[0]
+                        ergebnis.append(GenericMatch(
+                            matched=True,
+                            match_type=MatchType.NEAR_TEXT.value,
+                            match_score=round(score, 4),
+                            library_id=library_id
+                        ))
+                        continue
+
+                ergebnis.append(GenericMatch())
+        return ergebnis
+
+    def als_library_reference(self) -> List[Dict[str, Any]]:
+        """Einträge im Format der library_reference für den LLM-Prompt (id, hash, description)."""
+        return [
+            {"id": e["id"], "hash": e["hash"], "description": e.get("description", "")}
+            for e in list(self._eintraege.values())
+        ]
+
+
 # ============================================================================
 # LLM-EXTRAKTION
 # ============================================================================
@@ -860,26 +1155,253 @@ def build_workflow_from_facts(facts: List[ParserFact]) -> List[ParserTask]:
     return tasks
 
 
+# ============================================================================
+# CHUNKING (MAP-REDUCE FÜR LANGE URKUNDEN)
+# ============================================================================
+
+# Token-Budget je Chunk (Vertragstext, ohne Prompt/Schema)
+CHUNK_MAX_TOKENS = 6000
+
+# Ab dieser geschätzten Länge wird eine Urkunde automatisch in Chunks geparst
+CHUNK_SCHWELLE_TOKENS = 8000
+
+# Gleichzeitige LLM-Aufrufe je Urkunde
+CHUNK_MAX_PARALLEL = 4
+
+# Grobe Schätzung für deutschsprachige Texte (~4 Zeichen je Token)
+ZEICHEN_PRO_TOKEN = 4
+
+
+def schaetze_tokens(text: str) -> int:
+    """Schätzt die Tokenanzahl eines Textes (ohne Tokenizer-Abhängigkeit)."""
+    return (len(text) + ZEICHEN_PRO_TOKEN - 1) // ZEICHEN_PRO_TOKEN
+
+
+def _teile_segment(segment: str, max_tokens: int) -> List[str]:
+    """Zerlegt ein einzelnes überlanges Segment zeilenweise (notfalls hart)."""
+    max_zeichen = max_tokens * ZEICHEN_PRO_TOKEN
+    teile: List[str] = []
+    aktuell = ""
+    for zeile in segment.split("\n"):
+        while len(zeile) > max_zeichen:
+            if aktuell:
+                teile.append(aktuell)
+                aktuell = ""
+            teile.append(zeile[:max_zeichen])
+            zeile = zeile[max_zeichen:]
+        if aktuell and len(aktuell) + 1 + len(zeile) > max_zeichen:
+            teile.append(aktuell)
+            aktuell = zeile
+        else:
+            aktuell = f"{aktuell}\n{zeile}" if aktuell else zeile
+    if aktuell:
+        teile.append(aktuell)
+    return teile
+
+
+def bilde_chunks(segments: List[str], max_tokens: int = CHUNK_MAX_TOKENS) -> List[str]:
+    """
+    Fasst Segmente (aus segment_paragraphs) zu Chunks mit Token-Budget zusammen.
+
+    Segmente werden in Dokumentreihenfolge aufgefüllt und nie zwischen zwei
+    Chunks geteilt, außer ein einzelnes Segment übersteigt das Budget.
+
+    Args:
+        segments: Paragraph-Segmente in Dokumentreihenfolge
+        max_tokens: Maximale geschätzte Tokens je Chunk
+
+    Returns:
+        Liste von Chunk-Texten
+    """
+    chunks: List[str] = []
+    aktuell: List[str] = []
+    aktuell_tokens = 0
+    for segment in segments:
+        teile = [segment] if schaetze_tokens(segment) <= max_tokens else _teile_segment(segment, max_tokens)
+        for teil in teile:
+            tokens = schaetze_tokens(teil)
+            if aktuell and aktuell_tokens + tokens > max_tokens:
+                chunks.append("\n\n".join(aktuell))
+                aktuell, aktuell_tokens = [], 0
+            aktuell.append(teil)
+            aktuell_tokens += tokens
+    if aktuell:
+        chunks.append("\n\n".join(aktuell))
+    return chunks
+
+
+def _quellen_schluessel(block: ParserBlock) -> tuple:
+    """Deduplikationsschlüssel eines Blocks: Quellenverweis + normalisierter Text."""
+    verweis = block.source_ref.line_hint or block.anchor or block.outline_path
+    return (" ".join(verweis.lower().split()), block_hash(block.text_excerpt))
+
+
+def merge_parser_outputs(outputs: List[NotarParserOutput]) -> NotarParserOutput:
+    """
+    Führt die Ergebnisse mehrerer Chunks deterministisch zusammen (Reduce-Schritt).
+
+    - IDs werden je Chunk mit "c<index>-" präfixiert, damit sich gleich
+      benannte IDs verschiedener Chunks nicht überschneiden
+    - Blocks mit gleichem Quellenverweis und gleichem (normalisiertem) Text
+      werden auf das erste Vorkommen zusammengelegt; Verweise aus Facts,
+      Issues und Tasks werden auf den verbleibenden Block umgeschrieben
+    - Facts, Issues und Tasks werden nach Inhalt dedupliziert
+    - Meta: erster Chunk mit erkanntem Vertragstyp, Subtypen vereinigt
+
+    Args:
+        outputs: Chunk-Ergebnisse in Dokumentreihenfolge
+
+    Returns:
+        Zusammengeführter NotarParserOutput (Tasks wie vom LLM geliefert)
+    """
+    blocks: List[ParserBlock] = []
+    facts: List[ParserFact] = []
+    tasks: List[ParserTask] = []
+    issues: List[ParserIssue] = []
+
+    block_nach_quelle: Dict[tuple, str] = {}
+    fact_schluessel: Dict[tuple, str] = {}
+    task_schluessel: Dict[tuple, str] = {}
+    issue_schluessel = set()
+
+    for index, output in enumerate(outputs):
+        praefix = f"c{index}-"
+        block_ids: Dict[str, str] = {}
+        fact_ids: Dict[str, str] = {}
+        task_ids: Dict[str, str] = {}
+
+        for block in output.blocks:
+            schluessel = _quellen_schluessel(block)
+            vorhanden = block_nach_quelle.get(schluessel)
+            if vorhanden is not None:
+                block_ids[block.block_id] = vorhanden
+                continue
+            neue_id = praefix + block.block_id
+            block_ids[block.block_id] = neue_id
+            block_nach_quelle[schluessel] = neue_id
+            block.block_id = neue_id
+            blocks.append(block)
+
+        for fact in output.facts:
+            fact.source_block_id = block_ids.get(fact.source_block_id, fact.source_block_id)
+            schluessel = (
+                fact.fact_type, fact.stage, fact.source_block_id,
+                json.dumps(fact.params, sort_keys=True, ensure_ascii=False, default=str),
+            )
+            vorhanden = fact_schluessel.get(schluessel)
+            if vorhanden is not None:
+                fact_ids[fact.fact_id] = vorhanden
+                continue
+            neue_id = praefix + fact.fact_id
+            fact_ids[fact.fact_id] = neue_id
+            fact_schluessel[schluessel] = neue_id
+            fact.fact_id = neue_id
+            facts.append(fact)
+
+        # Erst alle Task-IDs abbilden, dann Abhängigkeiten (können vorwärts zeigen)
+        neue_tasks: List[ParserTask] = []
+        for task in output.tasks:
+            task.derived_from_fact_ids = list(dict.fromkeys(
+                fact_ids.get(f, f) for f in task.derived_from_fact_ids
+            ))
+            schluessel = (task.task_type, task.stage, task.actor, tuple(sorted(task.derived_from_fact_ids)))
+            vorhanden = task_schluessel.get(schluessel)
+            if vorhanden is not None:
+                task_ids[task.task_id] = vorhanden
+                continue
+            neue_id = praefix + task.task_id
+            task_ids[task.task_id] = neue_id
+            task_schluessel[schluessel] = neue_id
+            task.task_id = neue_id
+            neue_tasks.append(task)
+        for task in neue_tasks:
+            task.depends_on_task_ids = list(dict.fromkeys(
+                task_ids.get(t, t) for t in task.depends_on_task_ids
+            ))
+        tasks.extend(neue_tasks)
+
+        for issue in output.issues:
+            issue.block_id_hint = block_ids.get(issue.block_id_hint, issue.block_id_hint)
+            schluessel = (issue.severity, issue.message, issue.block_id_hint)
+            if schluessel in issue_schluessel:
+                continue
+            issue_schluessel.add(schluessel)
+            issues.append(issue)
+
+    metas = [o.meta for o in outputs]
+    erkannt = [m for m in metas if m.contract_type_guess and m.contract_type_guess.upper() != "UNKNOWN"]
+    basis = (erkannt or metas)[0] if metas else ParserMeta("", [], "")
+    meta = ParserMeta(
+        contract_type_guess=basis.contract_type_guess,
+        subtype_guess=list(dict.fromkeys(s for m in metas for s in m.subtype_guess)),
+        property_kind_guess=next(
+            (m.property_kind_guess for m in metas if m.property_kind_guess), basis.property_kind_guess
+        ),
+    )
+
+    return NotarParserOutput(meta=meta, blocks=blocks, facts=facts, tasks=tasks, issues=issues)
+
+
 # ============================================================================
 # HAUPT-API
 # ============================================================================
 
+def parser_parameter_hash(
+    context: Optional[Dict[str, Any]],
+    model: str,
+    library_reference: Optional[List[Dict[str, Any]]] = None,
+    use_deterministic_planner: bool = True,
+    chunked: Optional[bool] = None,
+    max_chunk_tokens: int = CHUNK_MAX_TOKENS,
+) -> str:
+    """
+    Hash aller ergebnisrelevanten Parser-Parameter (ohne den Urkundentext).
+
+    Zusammen mit dem Dokument-Hash der Schlüssel für gespeicherte Ergebnisse:
+    dieselbe Urkunde mit anderem Kontext (z.B. contract_type_hint), Modell
+    oder Prompt wird neu geparst.
+    """
+    parameter = {
+        "context": context or {},
+        "model": model,
+        "prompt_version": NOTAR_PARSER_PROMPT_VERSION,
+        "library_reference": library_reference,
+        "planner": use_deterministic_planner,
+        "chunked": chunked,
+        "max_chunk_tokens": max_chunk_tokens,
+    }
+    daten = json.dumps(parameter, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(daten.encode("utf-8")).hexdigest()
+
+
 def parse_urkunde(
     contract_text: str,
     context: Optional[Dict[str, Any]] = None,
     library_reference: Optional[List[Dict[str, Any]]] = None,
     model: str = "gpt-4o-2024-11-20",
     api_key: Optional[str] = None,
-    use_deterministic_planner: bool = True
+    use_deterministic_planner: bool = True,
+    use_cache: bool = True,
+    library: Optional[GenericBlockLibraryIndex] = None,
+    chunked: Optional[bool] = None,
+    max_chunk_tokens: int = CHUNK_MAX_TOKENS,
+    max_parallel: int = CHUNK_MAX_PARALLEL,
+    ergebnis_laden: Optional[Callable[..., Optional[Dict[str, Any]]]] = None,
+    ergebnis_speichern: Optional[Callable[..., Any]] = None
 ) -> NotarParserOutput:
     """
     Hauptfunktion: Parst eine Urkunde vollständig.
 
     Workflow:
+    0. Dokument-Hash berechnen; bereits gespeicherte Ergebnisse direkt liefern
     1. Text segmentieren
-    2. LLM-Extraktion mit Structured Outputs
-    3. Optional: Deterministischen Rule-Planner anwenden
-    4. Hash für Deduplikation berechnen
+    2. LLM-Extraktion mit Structured Outputs (Ergebnis im KI-Cache)
+       - kurze Urkunden: ein Aufruf mit dem gesamten Text
+       - lange Urkunden: Segmente zu Chunks mit Token-Budget bündeln,
+         Chunks parallel extrahieren und deterministisch zusammenführen
+         (Laufzeit ~ längster Chunk statt Gesamtdokument)
+    3. Optional: Deterministischen Rule-Planner anwenden (einmal, auf dem Gesamtergebnis)
+    4. Ergebnis speichern
 
     Args:
         contract_text: Der zu parsende Vertragstext
@@ -888,6 +1410,18 @@ def parse_urkunde(
         model: OpenAI-Modell
         api_key: Optional - OpenAI API Key
         use_deterministic_planner: Ob der deterministische Planner die LLM-Tasks überschreiben soll
+        use_cache: Ob die LLM-Antwort aus dem KI-Cache gelesen/dort gespeichert wird
+        library: Optional - Index der generellen Bausteine; Treffer ersetzen
+            das generic_match der LLM-Antwort (deterministisch, ohne Tokens)
+        chunked: Chunk-Modus erzwingen (True) / abschalten (False);
+            None = automatisch ab CHUNK_SCHWELLE_TOKENS
+        max_chunk_tokens: Token-Budget je Chunk
+        max_parallel: Gleichzeitige LLM-Aufrufe im Chunk-Modus
+        ergebnis_laden: Optional - (dokument_hash, parameter_hash=...) → gespeichertes
+            Ergebnis im Format von NotarParserOutput.to_dict() oder None
+            (z.B. database.lade_parser_ergebnis)
+        ergebnis_speichern: Optional - (output, parameter_hash=..., model_verwendet=...)
+            persistiert ein neu geparstes Ergebnis (z.B. database.speichere_parser_ergebnis)
 
     Returns:
         NotarParserOutput mit allen extrahierten Daten
@@ -899,33 +1433,95 @@ def parse_urkunde(
     if context is None:
         context = {}
 
+    # 0) Dokument- und Parameter-Hash; bereits geparste Urkunden nicht erneut an das LLM senden
+    dokument_hash = hashlib.sha256(contract_text.encode("utf-8")).hexdigest()
+    parameter_hash = parser_parameter_hash(
+        context, model, library_reference, use_deterministic_planner, chunked, max_chunk_tokens
+    )
+    if ergebnis_laden is not None:
+        gespeichert = ergebnis_laden(dokument_hash, parameter_hash=parameter_hash)
+        if gespeichert:
+            output = parse_llm_response(gespeichert)
+            output.parser_version = gespeichert.get("parser_version", output.parser_version)
+            if isinstance(gespeichert.get("parsed_at"), datetime):
+                output.parsed_at = gespeichert["parsed_at"]
+            output.source_document_hash = dokument_hash
+            _matche_bibliothek(output, library)
+            return output
+
     # 1) Segmentierung (optional, verbessert LLM-Qualität)
     segments = segment_paragraphs(contract_text)
 
-    # 2) LLM-Extraktion
-    raw_response = call_notar_parser(
-        contract_text=contract_text,
-        context=context,
-        library_reference=library_reference,
-        model=model,
-        api_key=api_key
-    )
+    # 2) LLM-Extraktion (gleicher Text/Kontext/Modell/Prompt → gecachte Antwort)
+    drossel = get_llm_rate_limiter()
+
+    def _extraktion(text: str, ctx: Dict[str, Any]) -> Dict[str, Any]:
+        def _aufruf() -> Dict[str, Any]:
+            return mit_wiederholung(
+                lambda: call_notar_parser(
+                    contract_text=text,
+                    context=ctx,
+                    library_reference=library_reference,
+                    model=model,
+                    api_key=api_key
+                ),
+                drossel=drossel,
+            )
 
-    # 3) In typisierte Objekte konvertieren
-    output = parse_llm_response(raw_response)
+        if not use_cache:
+            return _aufruf()
+        cache = get_ki_cache()
+        cache_key = cache.make_key(
+            text, model, NOTAR_PARSER_PROMPT_VERSION,
+            context=ctx, library_reference=library_reference
+        )
+        return cache.get_or_compute(cache_key, _aufruf, model=model)
+
+    if chunked is None:
+        chunked = schaetze_tokens(contract_text) > CHUNK_SCHWELLE_TOKENS
+    chunks = bilde_chunks(segments, max_chunk_tokens) if chunked else []
+
+    if len(chunks) > 1:
+        # 2a) Map: Chunks parallel extrahieren (Reihenfolge bleibt erhalten)
+        def _chunk_extraktion(index: int) -> NotarParserOutput:
+            ctx = dict(context, chunk={"index": index + 1, "count": len(chunks)})
+            return parse_llm_response(_extraktion(chunks[index], ctx))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(chunks)))) as pool:
+            teil_outputs = list(pool.map(_chunk_extraktion, range(len(chunks))))
+
+        # 3) Reduce: deterministisch zusammenführen
+        output = merge_parser_outputs(teil_outputs)
+    else:
+        # 3) In typisierte Objekte konvertieren
+        output = parse_llm_response(_extraktion(contract_text, context))
+
+    # 3b) Generelle Bausteine deterministisch gegen die Bibliothek matchen
+    _matche_bibliothek(output, library)
 
     # 4) Optional: Deterministischen Planner anwenden
     if use_deterministic_planner and output.facts:
         output.tasks = build_workflow_from_facts(output.facts)
 
-    # 5) Dokument-Hash berechnen
-    output.source_document_hash = hashlib.sha256(
-        contract_text.encode("utf-8")
-    ).hexdigest()
+    # 5) Dokument-Hash setzen und Ergebnis speichern
+    output.source_document_hash = dokument_hash
+    if ergebnis_speichern is not None:
+        ergebnis_speichern(output, parameter_hash=parameter_hash, model_verwendet=model)
 
     return output
 
 
+def _matche_bibliothek(output: NotarParserOutput, library: Optional[GenericBlockLibraryIndex]) -> None:
+    """Ersetzt generic_match der Blocks durch Treffer aus dem Bibliotheks-Index."""
+    if library is None or not len(library) or not output.blocks:
+        return
+    matches = library.match_blocks([b.text_excerpt for b in output.blocks])
+    for block, match in zip(output.blocks, matches):
+        if match.matched:
+            block.generic_match = match
+            block.generic_candidate = True
+
+
 # ============================================================================
 # VALIDIERUNG (Optional, für zusätzliche Sicherheit)
 # ============================================================================
@@ -0,0 +1,246 @@
+"""
+Volltextsuche - inkrementeller invertierter Index mit deutscher Tokenisierung
+
+Ersetzt die bisherigen Substring-Scans (`str(feld).lower()` auf jedem Feld
+jedes Objekts bei jedem Rerun) durch einen invertierten Index, der beim
+Anlegen, Ändern und Löschen von Objekten inkrementell gepflegt wird.
+
+Tokenisierung:
+- Kleinschreibung, Umlaut-Faltung (ä→ae, ö→oe, ü→ue) und ß→ss, sodass
+  "Müller", "Mueller" und "MÜLLER" denselben Term ergeben
+- Akzente werden entfernt (é→e)
+- Zerlegung an allen Nicht-Alphanumerischen Zeichen
+
+Abfragen:
+- Alle Suchbegriffe müssen vorkommen (UND-Verknüpfung)
+- Ein Suchbegriff trifft exakte Terme, Präfixe ("grund" → "grundbuch")
+  und Bestandteile von Komposita ("schuld" → "grundschuld", ab 4 Zeichen)
+- Treffer werden nach BM25 gewichtet; exakte Treffer zählen mehr als
+  Präfix- und Kompositum-Treffer
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+# ============================================================================
+# TOKENISIERUNG
+# ============================================================================
+
+_UMLAUT_TABELLE = str.maketrans({
+    "ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss",
+    "Ä": "ae", "Ö": "oe", "Ü": "ue", "ẞ": "ss",
+})
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Mindestlänge eines Suchbegriffs für die Suche in Komposita-Bestandteilen
+MIN_KOMPOSITUM_LAENGE = 4
+
+# Gewichte je Trefferart
+GEWICHT_EXAKT = 1.0
+GEWICHT_PRAEFIX = 0.6
+GEWICHT_KOMPOSITUM = 0.4
+
+
+def normalisiere(text: str) -> str:
+    """Faltet Umlaute/ß, entfernt Akzente und wandelt in Kleinbuchstaben."""
+    text = text.translate(_UMLAUT_TABELLE).lower()
+    if text.isascii():
+        return text
+    zerlegt = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in zerlegt if not unicodedata.combining(c))
+
+
+def tokenize(text: Any) -> List[str]:
+    """Zerlegt einen (beliebigen) Wert in normalisierte Suchterme."""
+    if text is None:
+        return []
+    if not isinstance(text, str):
+        text = str(text)
+    return TOKEN_RE.findall(normalisiere(text))
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class VolltextIndex:
+    """
+    Invertierter Index über beliebige Dokumente (Objekt-IDs → Text).
+
+    Thread-sicher; für die gemeinsame Nutzung über alle Sessions gedacht
+    (siehe IndexedCollection.add_volltext in modules/datenspeicher.py).
+
+    Verwendung:
+        index = VolltextIndex()
+        index.add("akte1", "Müller ./. Schmidt Grundschuldlöschung")
+        index.search("grundschuld mueller")  # [("akte1", 2.3)]
+    """
+
+    # BM25-Parameter
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[Any, int]] = {}
+        self._doc_terms: Dict[Any, Dict[str, int]] = {}
+        self._doc_laenge: Dict[Any, int] = {}
+        self._laenge_summe = 0
+        self._vokabular: List[str] = []
+        self._expansion_cache: Dict[str, List[Tuple[str, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._doc_terms
+
+    # ---------- Pflege ----------
+
+    def add(self, doc_id: Any, *texte: Any) -> None:
+        """Indiziert ein Dokument (ersetzt einen vorhandenen Eintrag)."""
+        terme: Counter = Counter()
+        for text in texte:
+            terme.update(tokenize(text))
+
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in terme.items():
+                bucket = self._postings.get(term)
+                if bucket is None:
+                    bucket = {}
+                    self._postings[term] = bucket
+                    insort(self._vokabular, term)
+                    self._expansion_cache.clear()
+                bucket[doc_id] = tf
+            laenge = sum(terme.values())
+            self._doc_terms[doc_id] = dict(terme)
+            self._doc_laenge[doc_id] = laenge
+            self._laenge_summe += laenge
+
+    update = add
+
+    def remove(self, doc_id: Any) -> None:
+        """Entfernt ein Dokument aus dem Index."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: Any) -> None:
+        terme = self._doc_terms.pop(doc_id, None)
+        if terme is None:
+            return
+        self._laenge_summe -= self._doc_laenge.pop(doc_id, 0)
+        for term in terme:
+            bucket = self._postings.get(term)
+            if bucket is None:
+                continue
+            bucket.pop(doc_id, None)
+            if not bucket:
+                del self._postings[term]
+                pos = bisect_left(self._vokabular, term)
+                if pos < len(self._vokabular) and self._vokabular[pos] == term:
+                    del self._vokabular[pos]
+                self._expansion_cache.clear()
+
+    def clear(self) -> None:
+        """Leert den Index."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_laenge.clear()
+            self._laenge_summe = 0
+            self._vokabular.clear()
+            self._expansion_cache.clear()
+
+    # ---------- Abfragen ----------
+
+    def _expandiere(self, token: str) -> List[Tuple[str, float]]:
+        """Ermittelt alle Index-Terme, die ein Suchbegriff trifft, inkl. Gewicht."""
+        cached = self._expansion_cache.get(token)
+        if cached is not None:
+            return cached
+
+        treffer: Dict[str, float] = {}
+        if token in self._postings:
+            treffer[token] = GEWICHT_EXAKT
+
+        # Präfix-Treffer über das sortierte Vokabular
+        pos = bisect_left(self._vokabular, token)
+        while pos < len(self._vokabular) and self._vokabular[pos].startswith(token):
+            treffer.setdefault(self._vokabular[pos], GEWICHT_PRAEFIX)
+            pos += 1
+
+        # Bestandteile von Komposita ("schuld" in "grundschuld")
+        if len(token) >= MIN_KOMPOSITUM_LAENGE:
+            for term in self._vokabular:
+                if term not in treffer and token in term:
+                    treffer[term] = GEWICHT_KOMPOSITUM
+
+        ergebnis = list(treffer.items())
+        self._expansion_cache[token] = ergebnis
+        return ergebnis
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """
+        Sucht Dokumente, die alle Begriffe der Abfrage enthalten.
+
+        Returns:
+            Liste von (doc_id, score), absteigend nach Relevanz sortiert
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            anzahl = len(self._doc_terms)
+            if anzahl == 0:
+                return []
+            avg_laenge = self._laenge_summe / anzahl or 1.0
+
+            scores: Optional[Dict[Any, float]] = None
+            for token in tokens:
+                token_scores: Dict[Any, float] = {}
+                for term, gewicht in self._expandiere(token):
+                    bucket = self._postings[term]
+                    idf = math.log(1 + (anzahl - len(bucket) + 0.5) / (len(bucket) + 0.5))
+                    for doc_id, tf in bucket.items():
+                        if scores is not None and doc_id not in scores:
+                            continue
+                        norm = self.K1 * (1 - self.B + self.B * self._doc_laenge[doc_id] / avg_laenge)
+                        wert = gewicht * idf * tf * (self.K1 + 1) / (tf + norm)
+                        if wert > token_scores.get(doc_id, 0.0):
+                            token_scores[doc_id] = wert
+
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {doc_id: scores[doc_id] + wert for doc_id, wert in token_scores.items()}
+                if not scores:
+                    return []
+
+        ergebnis = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return ergebnis[:limit] if limit else ergebnis
+
+    def search_ids(self, query: str) -> Set[Any]:
+        """Menge aller Dokument-IDs, die die Abfrage erfüllen (ohne Sortierung)."""
+        return {doc_id for doc_id, _ in self.search(query)}
+
+
+def volltext_felder(*werte: Any) -> List[str]:
+    """Hilfsfunktion für Textfunktionen: flacht Listenfelder ab und verwirft None."""
+    felder: List[str] = []
+    for wert in werte:
+        if wert is None:
+            continue
+        if isinstance(wert, (list, tuple, set)):
+            felder.extend(str(w) for w in wert if w is not None)
+        else:
+            felder.append(str(wert))
+    return felder
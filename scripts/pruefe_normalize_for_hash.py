@@ -0,0 +1,100 @@
+"""
+Golden-Prüfung & Benchmark für normalize_for_hash
+
+Vergleicht die Single-Pass-Normalisierung aus modules/urkundenparser.py mit
+der ursprünglichen, schrittweisen Implementierung (bestehende Hashes der
+Bausteinbibliothek müssen gültig bleiben) und misst beide.
+
+Verwendung (im Projektverzeichnis):
+    python -m scripts.pruefe_normalize_for_hash [urkunde.txt ...]
+
+Ohne Argumente nur Golden-Prüfung auf dem Zufallskorpus.
+"""
+
+import random
+import re
+import sys
+import time
+from typing import Dict, Iterable, List
+
+from modules.urkundenparser import normalize_for_hash, segment_paragraphs
+
+
+def normalize_for_hash_legacy(text: str) -> str:
+    """Ursprüngliche Implementierung - Referenz für pruefe_normalize_for_hash()."""
+    t = text.lower()
+    t = re.sub(r"\s+", " ", t).strip()
+    t = re.sub(r"\b\d{1,2}\.\d{1,2}\.\d{2,4}\b", "${DATE}", t)
+    t = re.sub(r"\b\d[\d\.]*,\d{2}\b", "${AMOUNT}", t)
+    t = re.sub(r"ur[.-]?\s*nr[.\s:]*\d+/\d+", "${UR_NR}", t, flags=re.IGNORECASE)
+    t = re.sub(r"\b\d{1,4}/\d{2,4}\b", "${AKT_NR}", t)
+    return t
+
+
+# Zeichen, an denen sich die Platzhalter-Muster gegenseitig beeinflussen können
+_GOLDEN_ALPHABET = "0123456789.,/ :-urnNRaU\t\n\x1c"
+
+
+def golden_korpus(anzahl: int = 200_000, seed: int = 0) -> List[str]:
+    """
+    Zufällige Kurztexte aus Ziffern, Trennzeichen und "ur nr"-Bestandteilen.
+
+    Deckt die Überlappungsfälle der Platzhalter-Muster wesentlich dichter ab
+    als echte Urkunden und ergänzt diese in pruefe_normalize_for_hash().
+    """
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(_GOLDEN_ALPHABET) for _ in range(rng.randrange(1, 25)))
+        for _ in range(anzahl)
+    ]
+
+
+def pruefe_normalize_for_hash(texte: Iterable[str]) -> List[str]:
+    """
+    Golden-Prüfung: vergleicht normalize_for_hash mit der ursprünglichen Implementierung.
+
+    Returns:
+        Liste der Texte mit abweichendem Ergebnis (leer = identische Hashes)
+    """
+    return [t for t in texte if normalize_for_hash(t) != normalize_for_hash_legacy(t)]
+
+
+def benchmark_normalize_for_hash(texte: List[str], wiederholungen: int = 5) -> Dict[str, float]:
+    """
+    Misst alte und neue Normalisierung auf einem Korpus (z.B. Urkunden-Absätzen).
+
+    Returns:
+        Dict mit Laufzeiten in Sekunden (bestes von `wiederholungen`) und Faktor
+    """
+    def _messe(funktion) -> float:
+        beste = float("inf")
+        for _ in range(wiederholungen):
+            start = time.perf_counter()
+            for t in texte:
+                funktion(t)
+            beste = min(beste, time.perf_counter() - start)
+        return beste
+
+    alt = _messe(normalize_for_hash_legacy)
+    neu = _messe(normalize_for_hash)
+    return {"alt_sekunden": alt, "neu_sekunden": neu, "faktor": alt / neu if neu else 0.0}
+
+
+if __name__ == "__main__":
+    absaetze: List[str] = []
+    for pfad in sys.argv[1:]:
+        with open(pfad, encoding="utf-8") as f:
+            absaetze.extend(segment_paragraphs(f.read()))
+
+    abweichungen = pruefe_normalize_for_hash(golden_korpus() + absaetze)
+    print(f"Golden-Prüfung: {len(abweichungen)} Abweichungen")
+    for t in abweichungen[:10]:
+        print(f"  {t!r}")
+
+    if absaetze:
+        ergebnis = benchmark_normalize_for_hash(absaetze)
+        print(
+            f"Benchmark über {len(absaetze)} Absätze: alt {ergebnis['alt_sekunden']:.3f}s, "
+            f"neu {ergebnis['neu_sekunden']:.3f}s (Faktor {ergebnis['faktor']:.1f})"
+        )
+    sys.exit(1 if abweichungen else 0)
@@ -9,13 +9,28 @@ import streamlit as st
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 import json
-import io
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 import hashlib
 import re
 import base64
 import uuid
+import functools
+
+from modules.datenspeicher import SharedDataStore, faellige_objekte, find_by, reindex_entry, volltext_ids
+from modules.fristenindex import ErinnerungsScheduler
+from modules.volltextsuche import volltext_felder
+from modules.aehnlichkeit import berechne_minhash
+from modules.urkundenparser import GenericBlockLibraryIndex
+from modules.ki_cache import get_ki_cache
+from modules.dokumentverarbeitung import (
+    extrahiere_text_aus_datei,
+    zerlege_vertrag_in_bausteine as ki_zerlege_vertrag_in_bausteine,
+    verarbeite_batch_parallel,
+    get_llm_rate_limiter,
+    mit_wiederholung,
+    RateLimiter,
+)
 
 # Datenbank-Integration
 try:
@@ -23,8 +38,14 @@ try:
         init_database,
         check_database_connection,
         health_check as db_health_check,
-        track_interaktion,
+        db_request_scope,
+        track_interaktion_async,
         get_interaktionen_stats,
+        get_generic_block_library_eintraege,
+        get_notar_profil_id,
+        migration_uuid,
+        lade_parser_ergebnis,
+        speichere_parser_ergebnis,
         InteraktionsTyp as DBInteraktionsTyp,
     )
     DATABASE_AVAILABLE = True
@@ -42,6 +63,9 @@ def safe_track_interaktion(
     """
     Sicher Interaktionen tracken - nur wenn DB verfügbar und verbunden.
 
+    Die Interaktion wird nur eingereiht und im Hintergrund gesammelt
+    geschrieben (siehe database.tracking); kein DB-Roundtrip pro Klick.
+
     Args:
         interaktions_typ: Typ der Interaktion (z.B. 'login', 'dokument_upload')
         details: Zusätzliche Details als Dictionary
@@ -61,13 +85,23 @@ def safe_track_interaktion(
             user = st.session_state.current_user
             nutzer_id = getattr(user, 'user_id', None)
 
-        # Interaktion tracken
-        return track_interaktion(
+        # Unbekannte Typen (z.B. 'demo_login') als Aktion eines Klicks erfassen
+        try:
+            typ = DBInteraktionsTyp(interaktions_typ)
+        except ValueError:
+            typ = DBInteraktionsTyp.BUTTON_CLICK
+
+        details = dict(details or {})
+        if immobilien_id:
+            details['immobilien_id'] = immobilien_id
+
+        # Interaktion einreihen
+        return track_interaktion_async(
+            typ=typ,
+            aktion=interaktions_typ,
             nutzer_id=nutzer_id,
             projekt_id=projekt_id,
-            immobilien_id=immobilien_id,
-            interaktions_typ=interaktions_typ,
-            details=details or {}
+            details=details
         )
     except Exception as e:
         # Fehler beim Tracking sollten die App nicht crashen
@@ -75,6 +109,40 @@ def safe_track_interaktion(
         return None
 
 
+# Ausweis-OCR enthält personenbezogene Daten: nur im Speicher, kurz gültig
+AUSWEIS_OCR_CACHE_TTL_SEKUNDEN = 15 * 60
+
+
+def ki_cache_abfrage(inhalt, model: str, prompt_version: str, aufruf,
+                     prompt: str = None, sensibel: bool = False) -> str:
+    """
+    Führt einen KI-Aufruf über den prozessweiten KI-Cache aus.
+
+    Gleiche Eingabe (Text oder Bytes), gleiches Modell und gleiche
+    Prompt-Version liefern die gespeicherte Antwort ohne erneuten API-Call.
+
+    Args:
+        inhalt: Eingabe bzw. vollständiger Prompt (str) oder Datei-Bytes
+        model: Modellbezeichnung
+        prompt_version: Version des Prompts (bei Prompt-Änderungen erhöhen)
+        aufruf: Funktion ohne Argumente, die den API-Call ausführt und den Antworttext liefert
+        prompt: Prompt-Text, falls nicht in `inhalt` enthalten (z.B. bei Bildern) -
+                sein Hash geht in den Schlüssel ein, Prompt-Änderungen invalidieren
+        sensibel: Personenbezogene Ergebnisse nicht auf die Festplatte schreiben
+                  und nach AUSWEIS_OCR_CACHE_TTL_SEKUNDEN verwerfen
+
+    Returns:
+        Antworttext des Modells
+    """
+    cache = get_ki_cache()
+    extra = {"prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest()} if prompt else {}
+    key = cache.make_key(inhalt, model, prompt_version, **extra)
+    if sensibel:
+        return cache.get_or_compute(key, aufruf, model=model, persistent=False,
+                                    ttl_sekunden=AUSWEIS_OCR_CACHE_TTL_SEKUNDEN)
+    return cache.get_or_compute(key, aufruf, model=model)
+
+
 # ============================================================================
 # DATENBANK-KONFIGURATION FUNKTIONEN
 # ============================================================================
@@ -235,15 +303,170 @@ def initialize_database_tables(db_url: str) -> dict:
         return {'success': False, 'error': str(e)}
 
 
-def migrate_session_to_database(items: list) -> dict:
+# Objektart des Session State → Immobilientyp der Datenbank
+_MIGRATION_IMMOBILIENTYP = {
+    "Wohnung": "wohnung",
+    "Haus": "einfamilienhaus",
+    "Mehrfamilienhaus": "mehrfamilienhaus",
+    "Grundstück/Land": "grundstueck",
+}
+
+
+def _migration_adresse(adresse: str) -> dict:
+    """Zerlegt 'Straße 1, 12345 Ort' in Straße, Hausnummer, PLZ und Ort."""
+    import re
+
+    teile = {'strasse': None, 'hausnummer': None, 'plz': '', 'ort': ''}
+    if not adresse:
+        return teile
+    strasse_teil, _, ort_teil = adresse.rpartition(',')
+    if not strasse_teil:
+        strasse_teil, ort_teil = adresse, ''
+    treffer = re.match(r'\s*(\d{5})\s+(.+)', ort_teil)
+    if treffer:
+        teile['plz'], teile['ort'] = treffer.group(1), treffer.group(2).strip()[:100]
+    else:
+        teile['ort'] = ort_teil.strip()[:100]
+    treffer = re.match(r'(.*?)\s+(\d+\s*[a-zA-Z]?)$', strasse_teil.strip())
+    if treffer:
+        teile['strasse'], teile['hausnummer'] = treffer.group(1)[:200], treffer.group(2)
+    else:
+        teile['strasse'] = strasse_teil.strip()[:200] or None
+    return teile
+
+
+def _migration_zeilen_nutzer(users: dict) -> tuple:
+    """Zeilen für nutzer und notar_profile aus den Session-Nutzern."""
+    from database import UserRole as DBUserRole, migration_uuid, db_enum
+
+    nutzer_zeilen, notar_zeilen = [], []
+    for user_id, user in users.items():
+        personal = getattr(user, 'personal_daten', None)
+        if personal and (personal.vorname or personal.nachname):
+            vorname, nachname = personal.vorname, personal.nachname
+        else:
+            vorname, _, nachname = (user.name or '').rpartition(' ')
+            if not vorname:
+                vorname, nachname = nachname, ''
+        rolle = db_enum(DBUserRole, user.rolle, DBUserRole.KAEUFER)
+        nutzer_id = migration_uuid('nutzer', user_id)
+        nutzer_zeilen.append({
+            'id': nutzer_id,
+            'email': user.email,
+            'password_hash': user.password_hash,
+            'rolle': rolle,
+            'vorname': vorname[:100] or None,
+            'nachname': nachname[:100] or None,
+            'telefon': getattr(user, 'telefon', None) or None,
+        })
+        if rolle == DBUserRole.NOTAR:
+            notar_zeilen.append({
+                'id': migration_uuid('notar_profil', user_id),
+                'nutzer_id': nutzer_id,
+            })
+    return nutzer_zeilen, notar_zeilen
+
+
+def _migration_zeilen_projekte(projekte: dict) -> tuple:
+    """Zeilen für immobilien und projekte (jedes Projekt braucht eine Immobilie)."""
+    from database import (
+        ImmobilienTyp as DBImmobilienTyp, ProjektStatus as DBProjektStatus,
+        migration_uuid, db_enum,
+    )
+
+    immobilien_zeilen, projekt_zeilen = [], []
+    for projekt_id, projekt in projekte.items():
+        immobilie_id = migration_uuid('immobilie', projekt_id)
+        immobilien_zeilen.append({
+            'id': immobilie_id,
+            **_migration_adresse(getattr(projekt, 'adresse', '')),
+            'immobilientyp': db_enum(
+                DBImmobilienTyp,
+                _MIGRATION_IMMOBILIENTYP.get(getattr(projekt, 'property_type', ''), ''),
+                DBImmobilienTyp.SONSTIGE,
+            ),
+        })
+        kaufpreis = getattr(projekt, 'kaufpreis', 0)
+        projekt_zeilen.append({
+            'id': migration_uuid('projekt', projekt_id),
+            'immobilie_id': immobilie_id,
+            'name': (projekt.name or '')[:200],
+            'beschreibung': getattr(projekt, 'beschreibung', '') or None,
+            'status': db_enum(DBProjektStatus, getattr(projekt, 'status', None), DBProjektStatus.VORBEREITUNG),
+            'angebotspreis': kaufpreis or None,
+            'preisverhandlung_erlaubt': getattr(projekt, 'preisverhandlung_erlaubt', False),
+            'rechtsdokumente_erforderlich': getattr(projekt, 'rechtsdokumente_erforderlich', True),
+            'expose_nach_akzeptanz': getattr(projekt, 'expose_nach_akzeptanz', True),
+            'notartermin': getattr(projekt, 'notartermin', None),
+        })
+    return immobilien_zeilen, projekt_zeilen
+
+
+def _migration_zeilen_akten(akten: dict, users: dict, projekte: dict) -> tuple:
+    """
+    Zeilen für akten. Akten, deren Notar kein Session-Nutzer mit Rolle Notar
+    ist, werden übersprungen, da notar_id ein Notarprofil referenziert (ob das
+    Profil in der Datenbank existiert, prüft bulk_migriere).
+
+    Returns:
+        (zeilen, anzahl_uebersprungen)
+    """
+    from database import (
+        AktenHauptbereich as DBAktenHauptbereich, AktenStatus as DBAktenStatus,
+        UserRole as DBUserRole, migration_uuid, db_enum,
+    )
+
+    zeilen, uebersprungen = [], 0
+    for akte_id, akte in akten.items():
+        notar = users.get(akte.notar_id)
+        if notar is None or db_enum(DBUserRole, notar.rolle, DBUserRole.KAEUFER) != DBUserRole.NOTAR:
+            uebersprungen += 1
+            continue
+        aktenzeichen = akte.aktenzeichen or akte.generiere_aktenzeichen()
+        zeilen.append({
+            'id': migration_uuid('akte', akte_id),
+            'notar_id': migration_uuid('notar_profil', akte.notar_id),
+            'aktennummer': akte.aktennummer,
+            'aktenjahr': akte.aktenjahr,
+            'verkaeufer_nachname': akte.verkaeufer_nachname or None,
+            'kaeufer_nachname': akte.kaeufer_nachname or None,
+            'notar_kuerzel': akte.notar_kuerzel or None,
+            'mitarbeiter_kuerzel': akte.mitarbeiter_kuerzel or None,
+            'aktenzeichen': aktenzeichen[:100],
+            'kurzbezeichnung': (akte.kurzbezeichnung or akte.generiere_kurzbezeichnung())[:80],
+            'hauptbereich': db_enum(DBAktenHauptbereich, akte.hauptbereich, DBAktenHauptbereich.SONSTIGE),
+            'untertyp': akte.untertyp or None,
+            'projekt_id': migration_uuid('projekt', akte.projekt_id) if akte.projekt_id in projekte else None,
+            'parteien': akte.parteien or None,
+            'status': db_enum(DBAktenStatus, akte.status, DBAktenStatus.NEU),
+            'betreff': (akte.betreff or '')[:500] or None,
+            'interne_notizen': akte.interne_notizen or None,
+            'beurkundungstermin': akte.beurkundungstermin,
+            'naechste_wiedervorlage': akte.naechste_wiedervorlage,
+            'geschaeftswert': akte.geschaeftswert or None,
+            'gebuehren': akte.gebuehren or None,
+            'gebuehren_bezahlt': akte.gebuehren_bezahlt,
+        })
+    return zeilen, uebersprungen
+
+
+def migrate_session_to_database(items: list, progress_callback=None) -> dict:
     """
     Migriert ausgewählte Daten vom Session State in die Datenbank.
 
+    Schreibt per Bulk-INSERT in Blöcken über die gecachte Engine; bereits
+    vorhandene Datensätze (gleiche abgeleitete ID, E-Mail oder Aktenzeichen)
+    werden übersprungen, eine wiederholte Migration ist also unschädlich.
+    Verweise zeigen auf die in der Datenbank vorhandenen Zeilen; Datensätze
+    ohne Elternzeile (z.B. Akten, deren Notarprofil fehlt) werden übersprungen.
+
     Args:
         items: Liste der zu migrierenden Datentypen
+        progress_callback: Optional - wird mit (fertig, gesamt) aufgerufen
 
     Returns:
-        Dictionary mit 'success', 'migrated_count', 'error'
+        Dictionary mit 'success', 'migrated_count', 'existing_count',
+        'skipped_count', 'error'
     """
     if not DATABASE_AVAILABLE:
         return {'success': False, 'error': 'Datenbank-Modul nicht verfügbar'}
@@ -253,85 +476,194 @@ def migrate_session_to_database(items: list) -> dict:
         return {'success': False, 'error': 'Keine Datenbankverbindung konfiguriert'}
 
     try:
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
-        from database import Base, Nutzer, Projekt, Dokument, Akte, Preisvorschlag, Benachrichtigung
-
-        engine = create_engine(db_url)
-        Session = sessionmaker(bind=engine)
-        session = Session()
+        from database import (
+            get_engine_for_url, bulk_migriere,
+            Nutzer, NotarProfil, Immobilie, Projekt, Akte,
+        )
 
-        migrated_count = 0
+        users = st.session_state.get('users', {})
+        projekte = st.session_state.get('projekte', {})
+        tabellen = []
+        uebersprungen = 0
 
-        # Nutzer migrieren
+        # Reihenfolge = Fremdschlüssel-Abhängigkeiten
         if "Nutzer" in items:
-            for user_id, user in st.session_state.get('users', {}).items():
-                existing = session.query(Nutzer).filter_by(user_id=user_id).first()
-                if not existing:
-                    db_nutzer = Nutzer(
-                        user_id=user.user_id,
-                        email=user.email,
-                        password_hash=user.password_hash,
-                        name=user.name,
-                        rolle=user.rolle,
-                        telefon=getattr(user, 'telefon', ''),
-                        adresse=getattr(user, 'adresse', ''),
-                        onboarding_complete=getattr(user, 'onboarding_complete', False)
-                    )
-                    session.add(db_nutzer)
-                    migrated_count += 1
+            nutzer_zeilen, notar_zeilen = _migration_zeilen_nutzer(users)
+            tabellen += [(Nutzer, nutzer_zeilen), (NotarProfil, notar_zeilen)]
 
-        # Projekte migrieren
         if "Projekte" in items:
-            for projekt_id, projekt in st.session_state.get('projekte', {}).items():
-                existing = session.query(Projekt).filter_by(projekt_id=projekt_id).first()
-                if not existing:
-                    db_projekt = Projekt(
-                        projekt_id=projekt.projekt_id,
-                        name=projekt.name,
-                        beschreibung=getattr(projekt, 'beschreibung', ''),
-                        adresse=getattr(projekt, 'adresse', ''),
-                        kaufpreis=getattr(projekt, 'kaufpreis', 0),
-                        status=getattr(projekt, 'status', 'aktiv'),
-                        makler_id=getattr(projekt, 'makler_id', None),
-                        notar_id=getattr(projekt, 'notar_id', None)
-                    )
-                    session.add(db_projekt)
-                    migrated_count += 1
+            immobilien_zeilen, projekt_zeilen = _migration_zeilen_projekte(projekte)
+            tabellen += [(Immobilie, immobilien_zeilen), (Projekt, projekt_zeilen)]
 
-        # Akten migrieren
         if "Akten" in items:
-            for akte_id, akte in st.session_state.get('akten', {}).items():
-                existing = session.query(Akte).filter_by(akte_id=akte_id).first()
-                if not existing:
-                    db_akte = Akte(
-                        akte_id=akte.akte_id,
-                        notar_id=akte.notar_id,
-                        aktenzeichen=akte.aktenzeichen,
-                        aktennummer=akte.aktennummer,
-                        aktenjahr=akte.aktenjahr,
-                        hauptbereich=akte.hauptbereich,
-                        untertyp=akte.untertyp,
-                        betreff=getattr(akte, 'betreff', ''),
-                        status=getattr(akte, 'status', 'offen')
-                    )
-                    session.add(db_akte)
-                    migrated_count += 1
+            akten_zeilen, uebersprungen = _migration_zeilen_akten(
+                st.session_state.get('akten', {}), users, projekte
+            )
+            tabellen.append((Akte, akten_zeilen))
 
-        session.commit()
-        session.close()
-        engine.dispose()
+        ergebnis = bulk_migriere(get_engine_for_url(db_url), tabellen, progress_callback)
 
-        return {'success': True, 'migrated_count': migrated_count}
+        return {
+            'success': True,
+            'migrated_count': ergebnis.eingefuegt,
+            'existing_count': ergebnis.vorhanden,
+            'skipped_count': uebersprungen + ergebnis.ohne_bezug,
+        }
 
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def load_database_to_session() -> dict:
+def _user_aus_db(db_nutzer, user_id: str = None) -> 'User':
+    """Wandelt einen Datenbank-Nutzer in das User-Objekt des Session State."""
+    rolle = db_nutzer.rolle.name if db_nutzer.rolle else 'KAEUFER'
+    name = " ".join(filter(None, [db_nutzer.vorname, db_nutzer.nachname])) or db_nutzer.email
+    return User(
+        user_id=user_id or str(db_nutzer.id),
+        name=name,
+        email=db_nutzer.email,
+        rolle=UserRole[rolle].value if rolle in UserRole.__members__ else UserRole.KAEUFER.value,
+        password_hash=db_nutzer.password_hash,
+    )
+
+
+def _projekt_aus_db(db_projekt, immobilie, beteiligungen, projekt_id: str = None) -> 'Projekt':
+    """Wandelt Projekt, Immobilie und Beteiligungen in das Projekt des Session State."""
+    ids_nach_rolle = {}
+    for beteiligung in beteiligungen:
+        ids_nach_rolle.setdefault(beteiligung.rolle.name, []).append(str(beteiligung.nutzer_id))
+
+    adresse = ""
+    if immobilie is not None:
+        strasse = " ".join(filter(None, [immobilie.strasse, immobilie.hausnummer]))
+        ort = " ".join(filter(None, [immobilie.plz, immobilie.ort]))
+        adresse = ", ".join(filter(None, [strasse, ort]))
+
+    status = db_projekt.status.name if db_projekt.status else 'VORBEREITUNG'
+    return Projekt(
+        projekt_id=projekt_id or str(db_projekt.id),
+        name=db_projekt.name,
+        beschreibung=db_projekt.beschreibung or '',
+        adresse=adresse,
+        kaufpreis=float(db_projekt.angebotspreis) if db_projekt.angebotspreis else 0.0,
+        makler_id=next(iter(ids_nach_rolle.get('MAKLER', [])), ''),
+        kaeufer_ids=ids_nach_rolle.get('KAEUFER', []),
+        verkaeufer_ids=ids_nach_rolle.get('VERKAEUFER', []),
+        finanzierer_ids=ids_nach_rolle.get('FINANZIERER', []),
+        notar_id=next(iter(ids_nach_rolle.get('NOTAR', [])), ''),
+        status=ProjektStatus[status].value if status in ProjektStatus.__members__ else ProjektStatus.VORBEREITUNG.value,
+        expose_nach_akzeptanz=bool(db_projekt.expose_nach_akzeptanz),
+        rechtsdokumente_erforderlich=bool(db_projekt.rechtsdokumente_erforderlich),
+        preisverhandlung_erlaubt=bool(db_projekt.preisverhandlung_erlaubt),
+        notartermin=db_projekt.notartermin,
+    )
+
+
+def _db_lade_nutzer(db_url, user_id):
+    """Read-Through-Loader für st.session_state.users (Session-ID oder DB-UUID)."""
+    try:
+        from database import get_nutzer_by_id, migration_uuid
+
+        db_nutzer = get_nutzer_by_id(migration_uuid('nutzer', user_id), database_url=db_url)
+        return _user_aus_db(db_nutzer, user_id) if db_nutzer else None
+    except Exception as e:
+        print(f"Nachladen Nutzer {user_id} fehlgeschlagen: {e}")
+        return None
+
+
+def _db_lade_projekt(db_url, projekt_id):
+    """Read-Through-Loader für st.session_state.projekte (Session-ID oder DB-UUID)."""
+    try:
+        from database import iter_projekte, migration_uuid
+
+        for db_projekt, immobilie, beteiligungen in iter_projekte([migration_uuid('projekt', projekt_id)],
+                                                                  database_url=db_url):
+            return _projekt_aus_db(db_projekt, immobilie, beteiligungen, projekt_id)
+        return None
+    except Exception as e:
+        print(f"Nachladen Projekt {projekt_id} fehlgeschlagen: {e}")
+        return None
+
+
+def _db_installiere_loader(db_url: str):
+    """
+    Macht users/projekte prozessweit zu Read-Through-Caches auf die Datenbank.
+
+    Die Loader laufen auch in Hintergrund-Threads ohne Session State und
+    bekommen die URL deshalb fest mit; jeder Aufruf setzt sie neu (die
+    zuletzt verbundene Datenbank gilt).
+    """
+    from functools import partial
+
+    store = get_shared_store()
+    store.get_dict('users').set_loader(partial(_db_lade_nutzer, db_url))
+    store.get_dict('projekte').set_loader(partial(_db_lade_projekt, db_url))
+
+
+def _db_lazy_aktiv() -> bool:
+    return DATABASE_AVAILABLE and st.session_state.get('database_connected', False) \
+        and st.session_state.get('db_lazy_loading', False)
+
+
+def _db_hydriere_sichtbare_projekte(user, db_url: str) -> int:
+    """
+    Lädt die Projekte, an denen der Nutzer beteiligt ist (über
+    ProjektBeteiligung), in den Session State. Alles Weitere wird erst beim
+    ersten Zugriff nachgeladen.
+
+    Returns:
+        Anzahl neu geladener Projekte
+    """
+    from database import get_sichtbare_projekt_ids, iter_projekte, migration_uuid
+
+    projekte = st.session_state.projekte
+    geladen = projekte.keys()  # Snapshot - löst keinen Nachladevorgang aus
+    sichtbar = [str(pid) for pid in get_sichtbare_projekt_ids(migration_uuid('nutzer', user.user_id),
+                                                              database_url=db_url)]
+    fehlend = [pid for pid in sichtbar if pid not in geladen]
+
+    for db_projekt, immobilie, beteiligungen in iter_projekte(fehlend, database_url=db_url):
+        projekte[str(db_projekt.id)] = _projekt_aus_db(db_projekt, immobilie, beteiligungen)
+
+    for pid in sichtbar:
+        if pid not in user.projekt_ids:
+            user.projekt_ids.append(pid)
+    return len(fehlend)
+
+
+def _db_nutzer_login(email: str, password_hash: str):
+    """
+    Login-Fallback für noch nicht geladene Nutzer: ein Query per E-Mail statt
+    alle Nutzer vorab zu laden. Der Nutzer wird im Session State abgelegt.
+    """
+    if not _db_lazy_aktiv():
+        return None
+    try:
+        from database import get_nutzer_by_email
+
+        db_nutzer = get_nutzer_by_email(email, database_url=st.session_state.get('db_connection_url'))
+        if db_nutzer is None or db_nutzer.password_hash != password_hash or db_nutzer.ist_aktiv is False:
+            return None
+        user = _user_aus_db(db_nutzer)
+        st.session_state.users[user.user_id] = user
+        return user
+    except Exception as e:
+        print(f"Datenbank-Login fehlgeschlagen: {e}")
+        return None
+
+
+def load_database_to_session(lazy: bool = True) -> dict:
     """
     Lädt Daten aus der Datenbank in den Session State.
 
+    Lazy (Standard, z.B. Auto-Load beim Start): Nutzer und Projekte werden
+    nicht vorab geladen. users/projekte werden zu Read-Through-Caches, beim
+    Login werden nur die Projekte des Nutzers geladen - die Startzeit hängt
+    damit nicht von der Datenbankgröße ab.
+
+    Vollständig (lazy=False): alle Nutzer und Projekte werden seitenweise
+    (yield_per) gelesen und übernommen.
+
     Returns:
         Dictionary mit 'success', 'loaded_count', 'error'
     """
@@ -343,52 +675,28 @@ def load_database_to_session() -> dict:
         return {'success': False, 'error': 'Keine Datenbankverbindung konfiguriert'}
 
     try:
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
-        from database import Nutzer, Projekt, Akte
-
-        engine = create_engine(db_url)
-        Session = sessionmaker(bind=engine)
-        session = Session()
+        from database import iter_nutzer, iter_projekte
 
+        _db_installiere_loader(db_url)
+        st.session_state.db_lazy_loading = True
         loaded_count = 0
 
+        if lazy:
+            user = st.session_state.get('current_user')
+            if user is not None and hasattr(user, 'projekt_ids'):
+                loaded_count = _db_hydriere_sichtbare_projekte(user, db_url)
+            return {'success': True, 'loaded_count': loaded_count}
+
         # Nutzer laden
-        db_users = session.query(Nutzer).all()
-        for db_user in db_users:
-            # In Session State User-Objekt konvertieren
-            user = User(
-                user_id=db_user.user_id,
-                email=db_user.email,
-                password_hash=db_user.password_hash,
-                name=db_user.name,
-                rolle=db_user.rolle,
-                telefon=db_user.telefon or '',
-                adresse=db_user.adresse or '',
-                onboarding_complete=db_user.onboarding_complete or False
-            )
-            st.session_state.users[db_user.user_id] = user
+        for db_nutzer in iter_nutzer(database_url=db_url):
+            st.session_state.users[str(db_nutzer.id)] = _user_aus_db(db_nutzer)
             loaded_count += 1
 
         # Projekte laden
-        db_projekte = session.query(Projekt).all()
-        for db_projekt in db_projekte:
-            projekt = ProjektData(
-                projekt_id=db_projekt.projekt_id,
-                name=db_projekt.name,
-                beschreibung=db_projekt.beschreibung or '',
-                adresse=db_projekt.adresse or '',
-                kaufpreis=float(db_projekt.kaufpreis) if db_projekt.kaufpreis else 0,
-                status=db_projekt.status or 'aktiv',
-                makler_id=db_projekt.makler_id,
-                notar_id=db_projekt.notar_id
-            )
-            st.session_state.projekte[db_projekt.projekt_id] = projekt
+        for db_projekt, immobilie, beteiligungen in iter_projekte(database_url=db_url):
+            st.session_state.projekte[str(db_projekt.id)] = _projekt_aus_db(db_projekt, immobilie, beteiligungen)
             loaded_count += 1
 
-        session.close()
-        engine.dispose()
-
         return {'success': True, 'loaded_count': loaded_count}
 
     except Exception as e:
@@ -2232,7 +2540,7 @@ def add_to_aktentasche(
     """Fügt ein Element zur Aktentasche hinzu"""
     aktentasche = get_or_create_aktentasche(user_id)
 
-    inhalt_id = f"akt_{user_id}_{len(aktentasche.inhalte)}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    inhalt_id = f"akt_{user_id}_{uuid.uuid4().hex}"
 
     inhalt = AktentascheInhalt(
         inhalt_id=inhalt_id,
@@ -9976,6 +10284,8 @@ class Textbaustein:
 
     # Text-Hash für Duplikaterkennung
     text_hash: str = ""
+    # MinHash-Signatur für die Ähnlichkeitssuche (siehe modules/aehnlichkeit.py)
+    minhash_signatur: List[int] = field(default_factory=list)
 
 @dataclass
 class VertragsDokument:
@@ -10232,185 +10542,327 @@ def restore_session_from_storage():
 # SESSION STATE INITIALISIERUNG
 # ============================================================================
 
+# Hash-Indizes je Collection (Attribute der gespeicherten Objekte).
+# Accessoren wie get_akten_fuer_notar() lesen über find_by() statt Full-Scan.
+INDIZIERTE_COLLECTIONS = {
+    'akten': ('notar_id', 'sachbearbeiter_id', 'projekt_id'),
+    'termine': ('projekt_id',),
+    'eingaenge': ('empfaenger_id',),
+    'nachrichten': ('empfaenger_id', 'empfaenger_ids', 'sender_id', 'absender_id'),
+    'gating_pruefungen': ('projekt_id',),
+    'importierte_emails': ('akte_id',),
+    'vdr_mitgliedschaften': ('deal_id', 'user_id'),
+    'vdr_gruppen': ('deal_id',),
+    'vdr_gruppenmitgliedschaften': ('user_id', 'gruppe_id'),
+    'vdr_nda_anerkennungen': ('user_id',),
+    'vdr_ordner': ('deal_id',),
+    'vdr_dokumente': ('deal_id',),
+    'vdr_qa_threads': ('deal_id',),
+    'vdr_qa_nachrichten': ('thread_id',),
+    'textbausteine': ('notar_id',),
+}
+
+# Collections mit MinHash/LSH-Ähnlichkeitsindex: Name → Argumente für add_aehnlichkeit
+AEHNLICHKEITS_COLLECTIONS = {
+    'textbausteine': {'text_feld': 'text', 'signatur_feld': 'minhash_signatur'},
+}
+
+
+def _volltext_projekt(projekt) -> list:
+    return volltext_felder(projekt.name, projekt.beschreibung, projekt.adresse)
+
+
+def _volltext_akte(akte) -> list:
+    return volltext_felder(akte.aktenzeichen, akte.verkaeufer_nachname, akte.kaeufer_nachname,
+                           akte.betreff, akte.kurzbezeichnung)
+
+
+def _volltext_email(email_obj) -> list:
+    return volltext_felder(email_obj.betreff, email_obj.absender_email, email_obj.absender_name,
+                           email_obj.inhalt_text, email_obj.empfaenger_liste, email_obj.tags)
+
+
+def _volltext_wirtschaftsdaten(dokument) -> list:
+    return volltext_felder(dokument.filename, dokument.ocr_text)
+
+
+# Volltextindizes je Collection (Textfunktion liefert die durchsuchbaren Felder).
+# Kurze, häufig direkt geänderte Felder (Status, Kategorie) werden in den
+# Filterfunktionen weiterhin direkt geprüft.
+VOLLTEXT_COLLECTIONS = {
+    'projekte': _volltext_projekt,
+    'akten': _volltext_akte,
+    'importierte_emails': _volltext_email,
+    'wirtschaftsdaten': _volltext_wirtschaftsdaten,
+}
+
+
+def _frist_offen(frist) -> bool:
+    return frist.status == "offen"
+
+
+def _termin_aktiv(termin) -> bool:
+    return termin.status != TerminStatus.ABGESAGT.value
+
+
+# Fristenindizes je Collection: nach Datum sortiert, nur aktive Objekte
+# (Argumente für add_fristen). Status-Änderungen am Objekt → reindex_entry().
+FRISTEN_COLLECTIONS = {
+    'fristen': {'feld': 'faellig_am', 'aktiv': _frist_offen},
+    'termine': {'feld': 'datum', 'aktiv': _termin_aktiv},
+}
+
+
+@st.cache_resource
+def get_shared_store() -> SharedDataStore:
+    """
+    Prozessweiter Datenspeicher für alle Sessions.
+
+    Über st.cache_resource existiert genau eine Instanz pro Prozess; alle
+    Sessions teilen sich deren Collections statt eigene Kopien anzulegen.
+    """
+    store = SharedDataStore()
+    for name, felder in INDIZIERTE_COLLECTIONS.items():
+        store.get_dict(name, indexes=felder)
+    for name, text_func in VOLLTEXT_COLLECTIONS.items():
+        store.get_dict(name, volltext=text_func)
+    for name, argumente in AEHNLICHKEITS_COLLECTIONS.items():
+        store.get_dict(name, aehnlichkeit=argumente)
+    for name, argumente in FRISTEN_COLLECTIONS.items():
+        store.get_dict(name, fristen=argumente)
+    return store
+
+
+# Mindestabstand zwischen zwei inkrementellen Refreshs der Bausteinbibliothek
+GENERIC_LIBRARY_REFRESH_SEKUNDEN = 60
+
+
+def notar_profil_id_fuer(user_id: str):
+    """
+    Notarprofil-ID (notar_profile.id) zu einer Session-User-ID oder None,
+    wenn die Datenbank nicht verbunden ist oder der Nutzer kein Profil hat.
+    """
+    if not (DATABASE_AVAILABLE and st.session_state.get('database_connected', False)):
+        return None
+    nutzer_id = migration_uuid('nutzer', user_id)
+    return get_notar_profil_id(nutzer_id) if nutzer_id else None
+
+
+@st.cache_resource
+def get_generic_block_library(notar_profil_id=None) -> GenericBlockLibraryIndex:
+    """
+    Prozessweiter Hash-Index der Bibliothek genereller Bausteine je Notar.
+
+    Enthält die globalen Einträge und die des Notars (ohne Profil nur die
+    globalen), damit private Bausteine nicht in Urkunden anderer Notare
+    auftauchen. Wird einmal vollständig aus generic_block_library geladen;
+    danach übernimmt aktualisiere_generic_block_library() nur geänderte Zeilen.
+    """
+    eintraege = get_generic_block_library_eintraege(
+        notar_id=notar_profil_id, nur_global=notar_profil_id is None
+    ) if DATABASE_AVAILABLE else []
+    return GenericBlockLibraryIndex(eintraege)
+
+
+def aktualisiere_generic_block_library(notar_profil_id=None) -> GenericBlockLibraryIndex:
+    """Gibt den Bibliotheks-Index des Notars zurück und übernimmt (höchstens einmal pro Minute) geänderte Einträge."""
+    library = get_generic_block_library(notar_profil_id)
+    if DATABASE_AVAILABLE and library.braucht_refresh(GENERIC_LIBRARY_REFRESH_SEKUNDEN):
+        library.refresh(get_generic_block_library_eintraege(
+            seit=library.stand, notar_id=notar_profil_id, nur_global=notar_profil_id is None
+        ))
+    return library
+
+
 def init_session_state():
-    """Initialisiert den Session State mit Demo-Daten"""
+    """
+    Initialisiert den Session State.
+
+    Entitäts-Collections werden an den gemeinsamen Datenspeicher gebunden
+    (siehe get_shared_store), Demo-Daten werden nur einmal pro Prozess
+    angelegt. Im Session State selbst liegt nur noch UI-State.
+    """
     if 'initialized' not in st.session_state:
+        store = get_shared_store()
         st.session_state.initialized = True
         st.session_state.current_user = None
-        st.session_state.users = {}
-        st.session_state.projekte = {}
-        st.session_state.legal_documents = {}
-        st.session_state.financing_offers = {}
-        st.session_state.preisangebote = {}  # Preisverhandlung zwischen Käufer/Verkäufer
-        st.session_state.wirtschaftsdaten = {}
-        st.session_state.notifications = {}
-        st.session_state.benachrichtigungen = {}  # Deutsche Benachrichtigungen
-        st.session_state.comments = {}
-        st.session_state.invitations = {}
-        st.session_state.timeline_events = {}
+        st.session_state.users = store.get_dict('users')
+        st.session_state.projekte = store.get_dict('projekte')
+        st.session_state.legal_documents = store.get_dict('legal_documents')
+        st.session_state.financing_offers = store.get_dict('financing_offers')
+        st.session_state.preisangebote = store.get_dict('preisangebote')  # Preisverhandlung zwischen Käufer/Verkäufer
+        st.session_state.wirtschaftsdaten = store.get_dict('wirtschaftsdaten')
+        st.session_state.notifications = store.get_dict('notifications')
+        st.session_state.benachrichtigungen = store.get_dict('benachrichtigungen')  # Deutsche Benachrichtigungen
+        st.session_state.comments = store.get_dict('comments')
+        st.session_state.invitations = store.get_dict('invitations')
+        st.session_state.timeline_events = store.get_dict('timeline_events')
 
         # Neue Datenstrukturen
-        st.session_state.makler_profiles = {}
-        st.session_state.expose_data = {}
-        st.session_state.document_requests = {}
-        st.session_state.notar_checklists = {}
-        st.session_state.bank_folders = {}
-        st.session_state.notar_mitarbeiter = {}
-        st.session_state.verkaeufer_dokumente = {}
+        st.session_state.makler_profiles = store.get_dict('makler_profiles')
+        st.session_state.expose_data = store.get_dict('expose_data')
+        st.session_state.document_requests = store.get_dict('document_requests')
+        st.session_state.notar_checklists = store.get_dict('notar_checklists')
+        st.session_state.bank_folders = store.get_dict('bank_folders')
+        st.session_state.notar_mitarbeiter = store.get_dict('notar_mitarbeiter')
+        st.session_state.verkaeufer_dokumente = store.get_dict('verkaeufer_dokumente')
 
         # Termin-Koordination
-        st.session_state.termine = {}  # Termin-ID -> Termin
-        st.session_state.terminvorschlaege = {}  # Vorschlag-ID -> TerminVorschlag
-        st.session_state.notar_kalender = {}  # Simulierter Outlook-Kalender
+        st.session_state.termine = store.get_dict('termine')  # Termin-ID -> Termin
+        st.session_state.terminvorschlaege = store.get_dict('terminvorschlaege')  # Vorschlag-ID -> TerminVorschlag
+        st.session_state.notar_kalender = store.get_dict('notar_kalender')  # Simulierter Outlook-Kalender
 
         # Makler-Empfehlungssystem
-        st.session_state.makler_empfehlungen = {}  # ID -> MaklerEmpfehlung
+        st.session_state.makler_empfehlungen = store.get_dict('makler_empfehlungen')  # ID -> MaklerEmpfehlung
 
         # Finanzierungs-Erweiterung
-        st.session_state.finanzierer_einladungen = {}  # ID -> FinanziererEinladung
-        st.session_state.finanzierungsanfragen = {}  # ID -> FinanzierungsAnfrage
-        st.session_state.finanzierungsmodelle = {}  # ID -> Finanzierungsmodell
+        st.session_state.finanzierer_einladungen = store.get_dict('finanzierer_einladungen')  # ID -> FinanziererEinladung
+        st.session_state.finanzierungsanfragen = store.get_dict('finanzierungsanfragen')  # ID -> FinanzierungsAnfrage
+        st.session_state.finanzierungsmodelle = store.get_dict('finanzierungsmodelle')  # ID -> Finanzierungsmodell
 
         # Automatische Marktanalyse
-        st.session_state.marktanalyse_ergebnisse = {}  # Projekt-ID -> MarktanalyseErgebnis
-        st.session_state.marktpreis_historie = {}  # Projekt-ID -> List[MarktpreisHistorie]
+        st.session_state.marktanalyse_ergebnisse = store.get_dict('marktanalyse_ergebnisse')  # Projekt-ID -> MarktanalyseErgebnis
+        st.session_state.marktpreis_historie = store.get_dict('marktpreis_historie')  # Projekt-ID -> List[MarktpreisHistorie]
 
         # Notar-Datenermittlung
-        st.session_state.flurkart_anfragen = {}  # ID -> FlurkartAnfrage
-        st.session_state.grundbuch_anfragen = {}  # ID -> GrundbuchAnfrage
-        st.session_state.baulasten_anfragen = {}  # ID -> BaulastenAnfrage
-        st.session_state.steuer_id_abfragen = {}  # ID -> SteuerIDAbfrage
-        st.session_state.grunderwerbsteuer_meldungen = {}  # ID -> GrunderwerbsteuerMeldung
-        st.session_state.vorkaufsrecht_anfragen = {}  # ID -> VorkaufsrechtAnfrage
+        st.session_state.flurkart_anfragen = store.get_dict('flurkart_anfragen')  # ID -> FlurkartAnfrage
+        st.session_state.grundbuch_anfragen = store.get_dict('grundbuch_anfragen')  # ID -> GrundbuchAnfrage
+        st.session_state.baulasten_anfragen = store.get_dict('baulasten_anfragen')  # ID -> BaulastenAnfrage
+        st.session_state.steuer_id_abfragen = store.get_dict('steuer_id_abfragen')  # ID -> SteuerIDAbfrage
+        st.session_state.grunderwerbsteuer_meldungen = store.get_dict('grunderwerbsteuer_meldungen')  # ID -> GrunderwerbsteuerMeldung
+        st.session_state.vorkaufsrecht_anfragen = store.get_dict('vorkaufsrecht_anfragen')  # ID -> VorkaufsrechtAnfrage
 
         # NEU: Grundbuch-Belastungen & Löschungsanforderungen
-        st.session_state.grundbuch_belastungen = {}  # ID -> GrundbuchBelastung
-        st.session_state.loeschungs_anforderungen = {}  # ID -> LoeschungsAnforderung
-        st.session_state.kaeufer_belastungs_abfragen = {}  # ID -> KaeuferBelastungsAbfrage
-        st.session_state.bank_grundschuld_infos = {}  # ID -> BankGrundschuldInfo
-        st.session_state.mietverhaeltnis_infos = {}  # ID -> MietverhaeltnisInfo
-        st.session_state.workflow_benachrichtigungen = {}  # ID -> WorkflowBenachrichtigung
+        st.session_state.grundbuch_belastungen = store.get_dict('grundbuch_belastungen')  # ID -> GrundbuchBelastung
+        st.session_state.loeschungs_anforderungen = store.get_dict('loeschungs_anforderungen')  # ID -> LoeschungsAnforderung
+        st.session_state.kaeufer_belastungs_abfragen = store.get_dict('kaeufer_belastungs_abfragen')  # ID -> KaeuferBelastungsAbfrage
+        st.session_state.bank_grundschuld_infos = store.get_dict('bank_grundschuld_infos')  # ID -> BankGrundschuldInfo
+        st.session_state.mietverhaeltnis_infos = store.get_dict('mietverhaeltnis_infos')  # ID -> MietverhaeltnisInfo
+        st.session_state.workflow_benachrichtigungen = store.get_dict('workflow_benachrichtigungen')  # ID -> WorkflowBenachrichtigung
 
         # NEU: Erweiterte Grundbuch-Daten (alle Abteilungen)
-        st.session_state.grundbuch_eigentuemer = {}  # ID -> GrundbuchEigentuemer
-        st.session_state.grundbuch_bestandsverzeichnis = {}  # ID -> GrundbuchBestandsverzeichnis
-        st.session_state.eigentuemer_pruefungen = {}  # ID -> EigentuemerPruefung
-        st.session_state.berechtigungs_nachweise = {}  # ID -> BerechtigungsNachweis
+        st.session_state.grundbuch_eigentuemer = store.get_dict('grundbuch_eigentuemer')  # ID -> GrundbuchEigentuemer
+        st.session_state.grundbuch_bestandsverzeichnis = store.get_dict('grundbuch_bestandsverzeichnis')  # ID -> GrundbuchBestandsverzeichnis
+        st.session_state.eigentuemer_pruefungen = store.get_dict('eigentuemer_pruefungen')  # ID -> EigentuemerPruefung
+        st.session_state.berechtigungs_nachweise = store.get_dict('berechtigungs_nachweise')  # ID -> BerechtigungsNachweis
 
         # NEU: Erklärungs-Modus für Verträge
-        st.session_state.vertrags_abschnitte = {}  # abschnitt_id -> VertragsAbschnitt
-        st.session_state.vertrags_erklaerungen = {}  # erklaerung_id -> VertragsErklaerung
-        st.session_state.vertraege_mit_erklaerungen = {}  # vertrag_id -> VertragMitErklaerungen
+        st.session_state.vertrags_abschnitte = store.get_dict('vertrags_abschnitte')  # abschnitt_id -> VertragsAbschnitt
+        st.session_state.vertrags_erklaerungen = store.get_dict('vertrags_erklaerungen')  # erklaerung_id -> VertragsErklaerung
+        st.session_state.vertraege_mit_erklaerungen = store.get_dict('vertraege_mit_erklaerungen')  # vertrag_id -> VertragMitErklaerungen
         st.session_state.aktiver_erklaerungsmodus_vertrag = None  # Aktuell angezeigter Vertrag im Erklärungs-Modus
-        st.session_state.urkunde_ablauf_erklaerungen = {}  # ablauf_id -> UrkundeAblaufErklaerung
-        st.session_state.notar_freigegebene_erklaerungen = {}  # abschnitt_typ -> freigegebene VertragsErklaerung
+        st.session_state.urkunde_ablauf_erklaerungen = store.get_dict('urkunde_ablauf_erklaerungen')  # ablauf_id -> UrkundeAblaufErklaerung
+        st.session_state.notar_freigegebene_erklaerungen = store.get_dict('notar_freigegebene_erklaerungen')  # abschnitt_typ -> freigegebene VertragsErklaerung
 
         # Käufer-Todos
-        st.session_state.kaeufer_todos = {}  # ID -> KaeuferTodo
+        st.session_state.kaeufer_todos = store.get_dict('kaeufer_todos')  # ID -> KaeuferTodo
 
         # Handwerker-Empfehlungen (vom Notar verwaltet)
-        st.session_state.handwerker_empfehlungen = {}  # ID -> Handwerker
-        st.session_state.handwerker_bewertungen = {}  # VERBESSERUNG 7: ID -> HandwerkerBewertung
+        st.session_state.handwerker_empfehlungen = store.get_dict('handwerker_empfehlungen')  # ID -> Handwerker
+        st.session_state.handwerker_bewertungen = store.get_dict('handwerker_bewertungen')  # VERBESSERUNG 7: ID -> HandwerkerBewertung
 
         # Ideenboard für Käufer
-        st.session_state.ideenboard = {}  # ID -> IdeenboardEintrag
+        st.session_state.ideenboard = store.get_dict('ideenboard')  # ID -> IdeenboardEintrag
 
         # Aktentaschen für alle Benutzer
-        st.session_state.aktentaschen = {}  # User-ID -> Aktentasche
+        st.session_state.aktentaschen = store.get_dict('aktentaschen')  # User-ID -> Aktentasche
 
         # Importierte Akten (Notar)
-        st.session_state.importierte_akten = {}  # Akte-ID -> ImportierteAkte
+        st.session_state.importierte_akten = store.get_dict('importierte_akten')  # Akte-ID -> ImportierteAkte
 
         # NEU: Gesellschaften und Parteien
-        st.session_state.gesellschaften = {}  # Gesellschaft-ID -> Gesellschaft
-        st.session_state.organe = {}  # Organ-ID -> Organ
-        st.session_state.hr_eintraege = {}  # HR-ID -> HandelsregisterEintrag
-        st.session_state.parteien = {}  # Partei-ID -> Partei
+        st.session_state.gesellschaften = store.get_dict('gesellschaften')  # Gesellschaft-ID -> Gesellschaft
+        st.session_state.organe = store.get_dict('organe')  # Organ-ID -> Organ
+        st.session_state.hr_eintraege = store.get_dict('hr_eintraege')  # HR-ID -> HandelsregisterEintrag
+        st.session_state.parteien = store.get_dict('parteien')  # Partei-ID -> Partei
 
         # NEU: Aktenzeichen-Zähler pro Notar und Jahr
-        st.session_state.aktenzeichen_zaehler = {}  # "notar_id_jahr" -> letzte_nummer
+        st.session_state.aktenzeichen_zaehler = store.get_dict('aktenzeichen_zaehler')  # "notar_id_jahr" -> letzte_nummer
 
         # ===== KOMMUNIKATIONS-ERWEITERUNGEN =====
         # Briefköpfe
-        st.session_state.briefkoepfe = {}  # Briefkopf-ID -> Briefkopf
+        st.session_state.briefkoepfe = store.get_dict('briefkoepfe')  # Briefkopf-ID -> Briefkopf
 
         # E-Mail-Signaturen
-        st.session_state.email_signaturen = {}  # Signatur-ID -> EmailSignatur
+        st.session_state.email_signaturen = store.get_dict('email_signaturen')  # Signatur-ID -> EmailSignatur
 
         # Makler-Mitarbeiter
-        st.session_state.makler_mitarbeiter = {}  # Mitarbeiter-ID -> MaklerMitarbeiter
+        st.session_state.makler_mitarbeiter = store.get_dict('makler_mitarbeiter')  # Mitarbeiter-ID -> MaklerMitarbeiter
 
         # Kommunikation
-        st.session_state.nachrichten = {}  # Nachricht-ID -> KommunikationsNachricht
-        st.session_state.kommunikations_anlagen = {}  # Anlage-ID -> KommunikationsAnlage
+        st.session_state.nachrichten = store.get_dict('nachrichten')  # Nachricht-ID -> KommunikationsNachricht
+        st.session_state.kommunikations_anlagen = store.get_dict('kommunikations_anlagen')  # Anlage-ID -> KommunikationsAnlage
 
         # Akten-Ordner
-        st.session_state.akten_ordner = {}  # Ordner-ID -> AktenOrdner
+        st.session_state.akten_ordner = store.get_dict('akten_ordner')  # Ordner-ID -> AktenOrdner
 
         # Gespeicherte Suchen
-        st.session_state.gespeicherte_suchen = {}  # Suche-ID -> GespeicherteSuche
+        st.session_state.gespeicherte_suchen = store.get_dict('gespeicherte_suchen')  # Suche-ID -> GespeicherteSuche
 
         # Audit-Log
-        st.session_state.audit_log = []  # Liste von AuditLogEintrag
+        st.session_state.audit_log = store.get_list('audit_log')  # Liste von AuditLogEintrag
 
         # ===== BENACHRICHTIGUNGS-CENTER =====
-        st.session_state.eingaenge = {}  # Eingang-ID -> Eingang
-        st.session_state.antwort_vorlagen = {}  # Vorlage-ID -> AntwortVorlage
-        st.session_state.fristen = {}  # Frist-ID -> Frist
-        st.session_state.gating_pruefungen = {}  # Pruefung-ID -> GatingPruefung
-        st.session_state.dokument_versionen = {}  # Version-ID -> DokumentVersionierung
-        st.session_state.kpi_snapshots = {}  # Snapshot-ID -> KPISnapshot
-        st.session_state.bericht_konfigurationen = {}  # Bericht-ID -> BerichtKonfiguration
+        st.session_state.eingaenge = store.get_dict('eingaenge')  # Eingang-ID -> Eingang
+        st.session_state.antwort_vorlagen = store.get_dict('antwort_vorlagen')  # Vorlage-ID -> AntwortVorlage
+        st.session_state.fristen = store.get_dict('fristen')  # Frist-ID -> Frist
+        st.session_state.gating_pruefungen = store.get_dict('gating_pruefungen')  # Pruefung-ID -> GatingPruefung
+        st.session_state.dokument_versionen = store.get_dict('dokument_versionen')  # Version-ID -> DokumentVersionierung
+        st.session_state.kpi_snapshots = store.get_dict('kpi_snapshots')  # Snapshot-ID -> KPISnapshot
+        st.session_state.bericht_konfigurationen = store.get_dict('bericht_konfigurationen')  # Bericht-ID -> BerichtKonfiguration
 
         # ===== VERTRAGSVERSIONEN & VERGLEICH =====
-        st.session_state.vertrags_versionen = {}  # Version-ID -> VertragsVersion
-        st.session_state.text_aenderungen = {}  # Aenderung-ID -> TextAenderung
+        st.session_state.vertrags_versionen = store.get_dict('vertrags_versionen')  # Version-ID -> VertragsVersion
+        st.session_state.text_aenderungen = store.get_dict('text_aenderungen')  # Aenderung-ID -> TextAenderung
 
         # ===== PAPIERKORB-SYSTEM =====
-        st.session_state.papierkorb = {}  # Papierkorb-ID -> PapierkorbElement
-        st.session_state.papierkorb_einstellungen = {}  # User-ID -> PapierkorbEinstellungen
-        st.session_state.papierkorb_system_einstellungen = PapierkorbEinstellungen(
-            einstellung_id="system",
-            user_id="",
-            standard_aufbewahrungsstunden=48,
-            auto_loeschen_aktiv=True
+        st.session_state.papierkorb = store.get_dict('papierkorb')  # Papierkorb-ID -> PapierkorbElement
+        st.session_state.papierkorb_einstellungen = store.get_dict('papierkorb_einstellungen')  # User-ID -> PapierkorbEinstellungen
+        st.session_state.papierkorb_system_einstellungen = store.get_value(
+            'papierkorb_system_einstellungen',
+            lambda: PapierkorbEinstellungen(
+                einstellung_id="system",
+                user_id="",
+                standard_aufbewahrungsstunden=48,
+                auto_loeschen_aktiv=True
+            )
         )
 
         # ===== TEXT-TO-SPEECH (VORLESEN) =====
-        st.session_state.tts_einstellungen = {}  # User-ID -> TTSEinstellungen
-        st.session_state.vorlese_sessions = {}  # Session-ID -> VorleseSession
+        st.session_state.tts_einstellungen = store.get_dict('tts_einstellungen')  # User-ID -> TTSEinstellungen
+        st.session_state.vorlese_sessions = store.get_dict('vorlese_sessions')  # Session-ID -> VorleseSession
         st.session_state.tts_aktiv = False  # Globaler Status ob TTS gerade läuft
 
         # ===== DSGVO - DATENSCHUTZ-GRUNDVERORDNUNG =====
-        st.session_state.personenbezogene_daten = {}  # Daten-ID -> PersonenbezogeneDaten
-        st.session_state.loesch_protokolle = {}  # Protokoll-ID -> LoeschProtokoll
-        st.session_state.loesch_anfragen = {}  # Anfrage-ID -> LoeschAnfrage
-        st.session_state.dsgvo_auskuenfte = {}  # Auskunft-ID -> DSGVOAuskunft
-        st.session_state.dsgvo_einwilligungen = {}  # Einwilligung-ID -> DSGVOEinwilligung
-        st.session_state.daten_herkunft_log = []  # Liste von Datenerfassungs-Events
-        st.session_state.dsgvo_nachweisdokumente = {}  # Dokument-ID -> DSGVONachweisdokument
+        st.session_state.personenbezogene_daten = store.get_dict('personenbezogene_daten')  # Daten-ID -> PersonenbezogeneDaten
+        st.session_state.loesch_protokolle = store.get_dict('loesch_protokolle')  # Protokoll-ID -> LoeschProtokoll
+        st.session_state.loesch_anfragen = store.get_dict('loesch_anfragen')  # Anfrage-ID -> LoeschAnfrage
+        st.session_state.dsgvo_auskuenfte = store.get_dict('dsgvo_auskuenfte')  # Auskunft-ID -> DSGVOAuskunft
+        st.session_state.dsgvo_einwilligungen = store.get_dict('dsgvo_einwilligungen')  # Einwilligung-ID -> DSGVOEinwilligung
+        st.session_state.daten_herkunft_log = store.get_list('daten_herkunft_log')  # Liste von Datenerfassungs-Events
+        st.session_state.dsgvo_nachweisdokumente = store.get_dict('dsgvo_nachweisdokumente')  # Dokument-ID -> DSGVONachweisdokument
 
         # ===== DUE DILIGENCE DATENRAUM (VDR) =====
-        st.session_state.vdr_deals = {}  # Deal-ID -> VDRDeal
-        st.session_state.vdr_mitgliedschaften = {}  # Mitgliedschaft-ID -> VDRMitgliedschaft
-        st.session_state.vdr_gruppen = {}  # Gruppe-ID -> VDRGruppe
-        st.session_state.vdr_gruppenmitgliedschaften = {}  # ID -> VDRGruppenmitgliedschaft
-        st.session_state.vdr_ordner = {}  # Ordner-ID -> VDROrdner
-        st.session_state.vdr_dokumente = {}  # Dokument-ID -> VDRDokument
-        st.session_state.vdr_dokument_versionen = {}  # Version-ID -> VDRDokumentVersion
-        st.session_state.vdr_extrahierter_text = {}  # ID -> VDRExtrahierterText
-        st.session_state.vdr_policies = {}  # Policy-ID -> VDRPolicy
-        st.session_state.vdr_policy_regeln = {}  # Regel-ID -> VDRPolicyRegel
-        st.session_state.vdr_policy_evidence = {}  # Evidence-ID -> VDRPolicyEvidence
-        st.session_state.vdr_policy_quellen = {}  # Quelle-ID -> VDRPolicyQuelle
-        st.session_state.vdr_nda_anerkennungen = {}  # ID -> VDRNDAAnerkennung
-        st.session_state.vdr_audit_events = []  # Liste von VDRAuditEvent (append-only!)
-        st.session_state.vdr_qa_threads = {}  # Thread-ID -> VDRQAThread
-        st.session_state.vdr_qa_nachrichten = {}  # Nachricht-ID -> VDRQANachricht
-        st.session_state.vdr_entwuerfe = {}  # Entwurf-ID -> VDREntwurf
-
-        # System-Antwortvorlagen initialisieren
-        _initialisiere_system_antwortvorlagen()
+        st.session_state.vdr_deals = store.get_dict('vdr_deals')  # Deal-ID -> VDRDeal
+        st.session_state.vdr_mitgliedschaften = store.get_dict('vdr_mitgliedschaften')  # Mitgliedschaft-ID -> VDRMitgliedschaft
+        st.session_state.vdr_gruppen = store.get_dict('vdr_gruppen')  # Gruppe-ID -> VDRGruppe
+        st.session_state.vdr_gruppenmitgliedschaften = store.get_dict('vdr_gruppenmitgliedschaften')  # ID -> VDRGruppenmitgliedschaft
+        st.session_state.vdr_ordner = store.get_dict('vdr_ordner')  # Ordner-ID -> VDROrdner
+        st.session_state.vdr_dokumente = store.get_dict('vdr_dokumente')  # Dokument-ID -> VDRDokument
+        st.session_state.vdr_dokument_versionen = store.get_dict('vdr_dokument_versionen')  # Version-ID -> VDRDokumentVersion
+        st.session_state.vdr_extrahierter_text = store.get_dict('vdr_extrahierter_text')  # ID -> VDRExtrahierterText
+        st.session_state.vdr_policies = store.get_dict('vdr_policies')  # Policy-ID -> VDRPolicy
+        st.session_state.vdr_policy_regeln = store.get_dict('vdr_policy_regeln')  # Regel-ID -> VDRPolicyRegel
+        st.session_state.vdr_policy_evidence = store.get_dict('vdr_policy_evidence')  # Evidence-ID -> VDRPolicyEvidence
+        st.session_state.vdr_policy_quellen = store.get_dict('vdr_policy_quellen')  # Quelle-ID -> VDRPolicyQuelle
+        st.session_state.vdr_nda_anerkennungen = store.get_dict('vdr_nda_anerkennungen')  # ID -> VDRNDAAnerkennung
+        st.session_state.vdr_audit_events = store.get_list('vdr_audit_events')  # Liste von VDRAuditEvent (append-only!)
+        st.session_state.vdr_qa_threads = store.get_dict('vdr_qa_threads')  # Thread-ID -> VDRQAThread
+        st.session_state.vdr_qa_nachrichten = store.get_dict('vdr_qa_nachrichten')  # Nachricht-ID -> VDRQANachricht
+        st.session_state.vdr_entwuerfe = store.get_dict('vdr_entwuerfe')  # Entwurf-ID -> VDREntwurf
+
+        # System-Antwortvorlagen initialisieren (einmal pro Prozess)
+        store.run_once('system_antwortvorlagen', _initialisiere_system_antwortvorlagen)
 
         # API-Keys für OCR (vom Notar konfigurierbar)
         # Zuerst versuchen aus st.secrets zu laden (persistent)
@@ -10433,46 +10885,46 @@ def init_session_state():
         st.session_state.valid_tokens = {}
 
         # Rechtsdokumente-Akzeptanzen (User -> Notar -> Dokument -> Datum)
-        st.session_state.rechtsdokument_akzeptanzen = {}
+        st.session_state.rechtsdokument_akzeptanzen = store.get_dict('rechtsdokument_akzeptanzen')
 
         # Notar-Rechtsdokumente (Datenschutz, AGB, Widerruf)
-        st.session_state.notar_rechtsdokumente = {}
+        st.session_state.notar_rechtsdokumente = store.get_dict('notar_rechtsdokumente')
 
         # ============================================================
         # VERTRAGSARCHIV & TEXTBAUSTEINE
         # ============================================================
-        st.session_state.textbausteine = {}  # baustein_id -> Textbaustein
-        st.session_state.vertragsdokumente = {}  # dokument_id -> VertragsDokument
+        st.session_state.textbausteine = store.get_dict('textbausteine')  # baustein_id -> Textbaustein
+        st.session_state.vertragsdokumente = store.get_dict('vertragsdokumente')  # dokument_id -> VertragsDokument
         st.session_state.verarbeitete_uploads = set()  # Set von (dateiname, dateigröße) Tupeln für bereits verarbeitete Dateien
-        st.session_state.vertragsvorlagen = {}  # vorlage_id -> VertragsVorlage
-        st.session_state.vertragsentwuerfe = {}  # entwurf_id -> Vertragsentwurf
+        st.session_state.vertragsvorlagen = store.get_dict('vertragsvorlagen')  # vorlage_id -> VertragsVorlage
+        st.session_state.vertragsentwuerfe = store.get_dict('vertragsentwuerfe')  # entwurf_id -> Vertragsentwurf
 
         # ============================================================
         # AKTENMANAGEMENT
         # ============================================================
-        st.session_state.akten = {}  # akte_id -> Akte
-        st.session_state.akten_nachrichten = {}  # nachricht_id -> AktenNachricht
-        st.session_state.benutzerdefinierte_kategorien = {}  # kategorie_id -> BenutzerdefiniertKategorie
-        st.session_state.notar_kuerzel = {}  # notar_id -> kuerzel (z.B. "SQ")
-        st.session_state.mitarbeiter_kuerzel = {}  # mitarbeiter_id -> kuerzel (z.B. "Go")
-        st.session_state.letzte_aktennummer = {}  # notar_id -> {jahr: nummer}
+        st.session_state.akten = store.get_dict('akten')  # akte_id -> Akte
+        st.session_state.akten_nachrichten = store.get_dict('akten_nachrichten')  # nachricht_id -> AktenNachricht
+        st.session_state.benutzerdefinierte_kategorien = store.get_dict('benutzerdefinierte_kategorien')  # kategorie_id -> BenutzerdefiniertKategorie
+        st.session_state.notar_kuerzel = store.get_dict('notar_kuerzel')  # notar_id -> kuerzel (z.B. "SQ")
+        st.session_state.mitarbeiter_kuerzel = store.get_dict('mitarbeiter_kuerzel')  # mitarbeiter_id -> kuerzel (z.B. "Go")
+        st.session_state.letzte_aktennummer = store.get_dict('letzte_aktennummer')  # notar_id -> {jahr: nummer}
 
         # ============================================================
         # DOKUMENTEN-CHAT
         # ============================================================
-        st.session_state.chat_sessions = {}  # session_id -> ChatSession
-        st.session_state.chat_nachrichten = {}  # nachricht_id -> ChatNachricht
-        st.session_state.generierte_schreiben = {}  # schreiben_id -> GeneriertesSchreiben
-        st.session_state.schreiben_vorlagen = {}  # vorlage_id -> SchreibenVorlage
-        st.session_state.workflow_vorschlaege = {}  # vorschlag_id -> WorkflowVorschlag
+        st.session_state.chat_sessions = store.get_dict('chat_sessions')  # session_id -> ChatSession
+        st.session_state.chat_nachrichten = store.get_dict('chat_nachrichten')  # nachricht_id -> ChatNachricht
+        st.session_state.generierte_schreiben = store.get_dict('generierte_schreiben')  # schreiben_id -> GeneriertesSchreiben
+        st.session_state.schreiben_vorlagen = store.get_dict('schreiben_vorlagen')  # vorlage_id -> SchreibenVorlage
+        st.session_state.workflow_vorschlaege = store.get_dict('workflow_vorschlaege')  # vorschlag_id -> WorkflowVorschlag
         st.session_state.aktive_chat_session_id = None
 
         # ============================================================
         # EMAIL-IMPORT
         # ============================================================
-        st.session_state.importierte_emails = {}  # email_id -> ImportierteEmail
-        st.session_state.email_anhaenge = {}  # anhang_id -> EmailAnhang
-        st.session_state.email_filter = {}  # filter_id -> EmailFilter
+        st.session_state.importierte_emails = store.get_dict('importierte_emails')  # email_id -> ImportierteEmail
+        st.session_state.email_anhaenge = store.get_dict('email_anhaenge')  # anhang_id -> EmailAnhang
+        st.session_state.email_filter = store.get_dict('email_filter')  # filter_id -> EmailFilter
         st.session_state.verarbeitete_email_dateien = set()  # Set für Duplikaterkennung
 
         # Datenbank-Status
@@ -10491,14 +10943,19 @@ def init_session_state():
             except Exception as e:
                 st.session_state.database_status = {'error': str(e)}
 
-        # Demo-Daten
-        create_demo_users()
-        create_demo_projekt()
-        create_demo_timeline()
-        create_demo_makler_empfehlungen()
-        create_demo_handwerker()
-        create_demo_notar_rechtsdokumente()
-        create_demo_notar_mitarbeiter()
+        # Demo-Daten (einmal pro Prozess im gemeinsamen Speicher)
+        store.run_once('demo_daten', _create_demo_daten)
+
+
+def _create_demo_daten():
+    """Legt alle Demo-Daten im gemeinsamen Datenspeicher an."""
+    create_demo_users()
+    create_demo_projekt()
+    create_demo_timeline()
+    create_demo_makler_empfehlungen()
+    create_demo_handwerker()
+    create_demo_notar_rechtsdokumente()
+    create_demo_notar_mitarbeiter()
 
 def create_demo_users():
     """Erstellt Demo-Benutzer für alle Rollen"""
@@ -10865,33 +11322,55 @@ def search_matches(search_term: str, *fields) -> bool:
 
 
 def filter_projekte_by_search(projekte: list, search_term: str) -> list:
-    """Filtert Projekte nach Suchbegriff"""
+    """
+    Filtert Projekte nach Suchbegriff.
+
+    Name, Beschreibung und Adresse werden über den Volltextindex der
+    Projekte-Collection gesucht; Kaufpreis und Status direkt.
+    """
     if not search_term:
         return projekte
 
-    return [p for p in projekte if search_matches(
-        search_term,
-        p.name,
-        p.beschreibung,
-        p.adresse,
-        str(p.kaufpreis),
-        p.status
-    )]
+    alle_projekte = st.session_state.get('projekte', {})
+    treffer = volltext_ids(alle_projekte, search_term)
+
+    def passt(p) -> bool:
+        if search_matches(search_term, str(p.kaufpreis), p.status):
+            return True
+        if treffer is not None and p.projekt_id in alle_projekte:
+            return p.projekt_id in treffer
+        return search_matches(search_term, p.name, p.beschreibung, p.adresse)
+
+    return [p for p in projekte if passt(p)]
 
 
 def filter_dokumente_by_search(dokumente: list, search_term: str) -> list:
-    """Filtert Dokumente nach Suchbegriff"""
+    """
+    Filtert Dokumente nach Suchbegriff.
+
+    Dateiname und OCR-Text von Wirtschaftsdaten-Dokumenten werden über den
+    Volltextindex gesucht; übrige Dokumente und Kurzfelder direkt.
+    """
     if not search_term:
         return dokumente
 
-    return [d for d in dokumente if search_matches(
-        search_term,
-        getattr(d, 'filename', ''),
-        getattr(d, 'name', ''),
-        getattr(d, 'kategorie', ''),
-        getattr(d, 'doc_type', ''),
-        getattr(d, 'ocr_text', '')
-    )]
+    alle_dokumente = st.session_state.get('wirtschaftsdaten', {})
+    treffer = volltext_ids(alle_dokumente, search_term)
+
+    def passt(d) -> bool:
+        if search_matches(
+            search_term,
+            getattr(d, 'name', ''),
+            getattr(d, 'kategorie', ''),
+            getattr(d, 'doc_type', '')
+        ):
+            return True
+        doc_id = getattr(d, 'doc_id', None)
+        if treffer is not None and doc_id in alle_dokumente:
+            return doc_id in treffer
+        return search_matches(search_term, getattr(d, 'filename', ''), getattr(d, 'ocr_text', ''))
+
+    return [d for d in dokumente if passt(d)]
 
 
 def filter_angebote_by_search(angebote: list, search_term: str) -> list:
@@ -10936,7 +11415,16 @@ def display_search_results_info(total: int, filtered: int, search_term: str):
 
 def create_notification(user_id: str, titel: str, nachricht: str, typ: str = NotificationType.INFO.value, link: str = None):
     """Erstellt eine neue Benachrichtigung"""
-    notif_id = f"notif_{len(st.session_state.notifications)}"
+    return _speichere_notification(st.session_state.notifications, st.session_state.users,
+                                   user_id, titel, nachricht, typ, link)
+
+
+def _speichere_notification(notifications: dict, users: dict, user_id: str, titel: str, nachricht: str,
+                            typ: str = NotificationType.INFO.value, link: str = None) -> str:
+    """Legt eine Benachrichtigung an (ohne Session-Zugriff, z.B. aus dem Erinnerungs-Scheduler)."""
+    # uuid statt laufender Nummer: Scheduler-Thread und Sessions legen parallel an,
+    # und gelöschte Einträge würden sonst Nummern erneut freigeben
+    notif_id = f"notif_{uuid.uuid4().hex}"
     notification = Notification(
         notif_id=notif_id,
         user_id=user_id,
@@ -10946,9 +11434,9 @@ def create_notification(user_id: str, titel: str, nachricht: str, typ: str = Not
         created_at=datetime.now(),
         link=link
     )
-    st.session_state.notifications[notif_id] = notification
-    if user_id in st.session_state.users:
-        st.session_state.users[user_id].notifications.append(notif_id)
+    notifications[notif_id] = notification
+    if user_id in users:
+        users[user_id].notifications.append(notif_id)
     return notif_id
 
 def get_unread_notifications(user_id: str) -> List[Notification]:
@@ -10991,7 +11479,7 @@ def kann_preisverhandlung_fuehren(projekt: Projekt, user_id: str, user_rolle: st
 
 def create_preisangebot(projekt_id: str, von_user_id: str, von_rolle: str, betrag: float, nachricht: str = "") -> str:
     """Erstellt ein neues Preisangebot"""
-    angebot_id = f"preis_{len(st.session_state.preisangebote)}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    angebot_id = f"preis_{uuid.uuid4().hex}"
 
     angebot = Preisangebot(
         angebot_id=angebot_id,
@@ -11275,7 +11763,7 @@ def create_akte(
 
 def get_akten_fuer_notar(notar_id: str, status_filter: Optional[str] = None) -> List[Akte]:
     """Holt alle Akten für einen Notar, optional nach Status gefiltert."""
-    akten = [a for a in st.session_state.akten.values() if a.notar_id == notar_id]
+    akten = find_by(st.session_state.akten, 'notar_id', notar_id)
 
     if status_filter:
         akten = [a for a in akten if a.status == status_filter]
@@ -11285,7 +11773,7 @@ def get_akten_fuer_notar(notar_id: str, status_filter: Optional[str] = None) ->
 
 def get_akten_fuer_sachbearbeiter(sachbearbeiter_id: str, status_filter: Optional[str] = None) -> List[Akte]:
     """Holt alle Akten für einen Sachbearbeiter, optional nach Status gefiltert."""
-    akten = [a for a in st.session_state.akten.values() if a.sachbearbeiter_id == sachbearbeiter_id]
+    akten = find_by(st.session_state.akten, 'sachbearbeiter_id', sachbearbeiter_id)
 
     if status_filter:
         akten = [a for a in akten if a.status == status_filter]
@@ -11313,10 +11801,13 @@ def suche_akten(
     Returns:
         Liste der gefundenen Akten
     """
-    akten = [a for a in st.session_state.akten.values() if a.notar_id == notar_id]
+    akten = find_by(st.session_state.akten, 'notar_id', notar_id)
 
-    # Suchbegriff anwenden
-    if suchbegriff:
+    # Suchbegriff anwenden (Volltextindex, Fallback Substring-Suche)
+    treffer = volltext_ids(st.session_state.akten, suchbegriff) if suchbegriff else None
+    if treffer is not None:
+        akten = [a for a in akten if a.akte_id in treffer]
+    elif suchbegriff:
         suchbegriff_lower = suchbegriff.lower()
         akten = [a for a in akten if (
             suchbegriff_lower in a.aktenzeichen.lower() or
@@ -11343,10 +11834,8 @@ def suche_akten(
 
 def get_akte_fuer_projekt(projekt_id: str) -> Optional[Akte]:
     """Holt die Akte, die mit einem Projekt verknüpft ist."""
-    for akte in st.session_state.akten.values():
-        if akte.projekt_id == projekt_id:
-            return akte
-    return None
+    akten = find_by(st.session_state.akten, 'projekt_id', projekt_id)
+    return akten[0] if akten else None
 
 
 def get_projekt_immobiliendaten(projekt_id: str) -> Dict[str, Any]:
@@ -12903,31 +13392,34 @@ Extrahiere alle sichtbaren Daten und gib sie im folgenden JSON-Format zurück:
 Falls ein Feld nicht lesbar ist, setze es auf null.
 Antworte NUR mit dem JSON, ohne weitere Erklärungen."""
 
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1024,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": base64_image
+        response_text = ki_cache_abfrage(
+            image_data, "claude-sonnet-4-20250514", "ausweis-ocr",
+            lambda: client.messages.create(
+                model="claude-sonnet-4-20250514",
+                max_tokens=1024,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image",
+                                "source": {
+                                    "type": "base64",
+                                    "media_type": media_type,
+                                    "data": base64_image
+                                }
+                            },
+                            {
+                                "type": "text",
+                                "text": prompt
                             }
-                        },
-                        {
-                            "type": "text",
-                            "text": prompt
-                        }
-                    ]
-                }
-            ]
+                        ]
+                    }
+                ]
+            ).content[0].text,
+            prompt=prompt, sensibel=True
         )
 
-        response_text = message.content[0].text
         ocr_text = f"=== Claude Vision API Ergebnis ===\n\n{response_text}"
 
         # JSON parsen (gleiche Logik wie bei OpenAI)
@@ -13044,28 +13536,31 @@ Extrahiere alle sichtbaren Daten und gib sie im folgenden JSON-Format zurück:
 Falls ein Feld nicht lesbar ist, setze es auf null.
 Antworte NUR mit dem JSON, ohne weitere Erklärungen."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}",
-                                "detail": "high"
+        response_text = ki_cache_abfrage(
+            image_data, "gpt-4o", "ausweis-ocr",
+            lambda: client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:image/jpeg;base64,{base64_image}",
+                                    "detail": "high"
+                                }
                             }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=1000
+                        ]
+                    }
+                ],
+                max_tokens=1000
+            ).choices[0].message.content,
+            prompt=prompt, sensibel=True
         )
 
         # Antwort parsen
-        response_text = response.choices[0].message.content
         ocr_text = f"=== OpenAI Vision API Ergebnis ===\n\n{response_text}"
 
         # JSON extrahieren
@@ -13469,14 +13964,15 @@ Antworte NUR mit dem JSON, ohne zusätzlichen Text."""
             from openai import OpenAI
             client = OpenAI(api_key=api_keys['openai'])
 
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=4000
-            )
-
-            antwort = response.choices[0].message.content.strip()
+            antwort = ki_cache_abfrage(
+                prompt, "gpt-4o-mini", "grundbuch-ocr-v1",
+                lambda: client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.1,
+                    max_tokens=4000
+                ).choices[0].message.content
+            ).strip()
 
             # JSON extrahieren
             if "```json" in antwort:
@@ -13506,13 +14002,14 @@ Antworte NUR mit dem JSON, ohne zusätzlichen Text."""
             import anthropic
             client = anthropic.Anthropic(api_key=api_keys['anthropic'])
 
-            response = client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            antwort = response.content[0].text.strip()
+            antwort = ki_cache_abfrage(
+                prompt, "claude-3-haiku-20240307", "grundbuch-ocr-v1",
+                lambda: client.messages.create(
+                    model="claude-3-haiku-20240307",
+                    max_tokens=4000,
+                    messages=[{"role": "user", "content": prompt}]
+                ).content[0].text
+            ).strip()
 
             if "```json" in antwort:
                 antwort = antwort.split("```json")[1].split("```")[0]
@@ -15404,7 +15901,7 @@ def render_checklist_form(checklist: NotarChecklist) -> bool:
 
 def create_bank_folder(projekt_id: str, erstellt_von: str) -> str:
     """Erstellt eine neue Bankenmappe für ein Projekt"""
-    folder_id = f"bankfolder_{len(st.session_state.bank_folders)}"
+    folder_id = f"bankfolder_{uuid.uuid4().hex}"
 
     projekt = st.session_state.projekte.get(projekt_id)
     if not projekt:
@@ -15579,7 +16076,7 @@ def render_bank_folder_view():
 
 def create_document_request(projekt_id: str, dokument_typ: str, angefordert_von: str, angefordert_bei: str, nachricht: str = ""):
     """Erstellt eine neue Dokumentenanforderung"""
-    request_id = f"req_{len(st.session_state.document_requests)}"
+    request_id = f"req_{uuid.uuid4().hex}"
     request = DocumentRequest(
         request_id=request_id,
         projekt_id=projekt_id,
@@ -16119,7 +16616,7 @@ def create_termin_vorschlaege(projekt_id: str, notar_id: str, termin_typ: str =
     ausgewaehlte_slots = verfuegbar[:3]
 
     # Erstelle Terminvorschlag
-    vorschlag_id = f"vorschlag_{len(st.session_state.terminvorschlaege)}"
+    vorschlag_id = f"vorschlag_{uuid.uuid4().hex}"
     vorschlag = TerminVorschlag(
         vorschlag_id=vorschlag_id,
         projekt_id=projekt_id,
@@ -16210,7 +16707,7 @@ def create_termin_from_vorschlag(vorschlag: 'TerminVorschlag', ausgewaehlter_ind
     if notar and hasattr(notar, 'adresse'):
         ort = notar.adresse
 
-    termin_id = f"termin_{len(st.session_state.termine)}"
+    termin_id = f"termin_{uuid.uuid4().hex}"
     termin = Termin(
         termin_id=termin_id,
         projekt_id=projekt.projekt_id,
@@ -16521,7 +17018,7 @@ def render_neuer_termin_form(projekt: 'Projekt', termin_typ: str, user_rolle: st
             if notar:
                 kontakte.append({'name': notar.name, 'telefon': '', 'rolle': 'Notar'})
 
-        termin_id = f"termin_{len(st.session_state.termine)}"
+        termin_id = f"termin_{uuid.uuid4().hex}"
         termin = Termin(
             termin_id=termin_id,
             projekt_id=projekt.projekt_id,
@@ -16585,58 +17082,114 @@ def get_termin_icon(termin_typ: str) -> str:
     }
     return icons.get(termin_typ, "📅")
 
-def check_und_sende_erinnerungen(user_id: str, user_rolle: str):
-    """Prüft und sendet automatische Erinnerungen für anstehende Termine"""
-    heute = date.today()
+# Wie weit im Voraus Termin-Erinnerungen eingeplant werden (größter sinnvoller
+# Wert in Termin.erinnerung_tage_vorher) und wie oft neu abgeglichen wird
+TERMIN_ERINNERUNG_VORLAUF_TAGE = 30
+TERMIN_ERINNERUNG_ABGLEICH_SEKUNDEN = 300
 
-    for termin_id, termin in st.session_state.termine.items():
-        # Prüfe ob User für diesen Termin relevant ist
-        projekt = st.session_state.projekte.get(termin.projekt_id)
-        if not projekt:
-            continue
 
-        # Prüfe Sichtbarkeit
-        if user_rolle not in termin.sichtbar_fuer:
-            continue
+def _sende_termin_erinnerung(store: SharedDataStore, termin_id: str, tage_vorher: int) -> None:
+    """Erstellt die Erinnerung `tage_vorher` Tage vor einem Termin für alle sichtbaren Rollen."""
+    termin = store.get_dict('termine').get(termin_id)
+    if not termin or tage_vorher in termin.alle_erinnerungen_gesendet:
+        return
+    if termin.status == TerminStatus.ABGESAGT.value or (termin.datum - date.today()).days != tage_vorher:
+        return  # Termin abgesagt oder verschoben - Abgleich plant neu
+    projekt = store.get_dict('projekte').get(termin.projekt_id)
+    if not projekt:
+        return
 
-        # Berechne Tage bis zum Termin
-        tage_bis_termin = (termin.datum - heute).days
+    if termin.termin_typ == TerminTyp.BEURKUNDUNG.value:
+        titel = f"🔔 Reminder: Beurkundung in {tage_vorher} Tag{'en' if tage_vorher > 1 else ''}!"
+        nachricht = f"Morgen findet die Beurkundung für '{projekt.name}' statt. Bitte bereiten Sie alle erforderlichen Unterlagen vor."
+    else:
+        titel = f"🔔 Terminerinnerung: {termin.termin_typ}"
+        nachricht = f"In {tage_vorher} Tag{'en' if tage_vorher > 1 else ''}: {termin.termin_typ} für '{projekt.name}' am {termin.datum.strftime('%d.%m.%Y')} um {termin.uhrzeit_start} Uhr."
+
+    # Erstelle Benachrichtigung für alle relevanten User
+    empfaenger_ids = []
+
+    if "Käufer" in termin.sichtbar_fuer:
+        empfaenger_ids.extend(projekt.kaeufer_ids)
+    if "Verkäufer" in termin.sichtbar_fuer:
+        empfaenger_ids.extend(projekt.verkaeufer_ids)
+    if "Makler" in termin.sichtbar_fuer and projekt.makler_id:
+        empfaenger_ids.append(projekt.makler_id)
+    if "Notar" in termin.sichtbar_fuer and projekt.notar_id:
+        empfaenger_ids.append(projekt.notar_id)
+    if "Finanzierer" in termin.sichtbar_fuer:
+        empfaenger_ids.extend(projekt.finanzierer_ids)
+
+    notifications = store.get_dict('notifications')
+    users = store.get_dict('users')
+    for emp_id in set(empfaenger_ids):
+        _speichere_notification(
+            notifications, users,
+            user_id=emp_id,
+            titel=titel,
+            nachricht=nachricht,
+            typ=NotificationType.WARNING.value if tage_vorher <= 1 else NotificationType.INFO.value
+        )
+
+    # Markiere als gesendet
+    termin.alle_erinnerungen_gesendet[tage_vorher] = datetime.now()
+
+
+def _plane_termin_erinnerungen(store: SharedDataStore, scheduler: ErinnerungsScheduler) -> None:
+    """
+    Plant die Erinnerungen aller Termine der nächsten Tage im Scheduler ein.
 
-        # Prüfe für jeden Erinnerungstag
+    Liest nur die Termine im Vorlauf-Fenster über den Fristenindex; bereits
+    gesendete Erinnerungen (alle_erinnerungen_gesendet) werden übersprungen.
+    """
+    heute = date.today()
+    termine = store.get_dict('termine')
+    kommende = faellige_objekte(termine, heute, heute + timedelta(days=TERMIN_ERINNERUNG_VORLAUF_TAGE))
+    if kommende is None:
+        kommende = [t for t in termine.values() if t.datum >= heute]
+
+    for termin in kommende:
         for tage_vorher in termin.erinnerung_tage_vorher:
-            if tage_bis_termin == tage_vorher and tage_vorher not in termin.alle_erinnerungen_gesendet:
-                # Sende Erinnerung
-                if termin.termin_typ == TerminTyp.BEURKUNDUNG.value:
-                    titel = f"🔔 Reminder: Beurkundung in {tage_vorher} Tag{'en' if tage_vorher > 1 else ''}!"
-                    nachricht = f"Morgen findet die Beurkundung für '{projekt.name}' statt. Bitte bereiten Sie alle erforderlichen Unterlagen vor."
-                else:
-                    titel = f"🔔 Terminerinnerung: {termin.termin_typ}"
-                    nachricht = f"In {tage_vorher} Tag{'en' if tage_vorher > 1 else ''}: {termin.termin_typ} für '{projekt.name}' am {termin.datum.strftime('%d.%m.%Y')} um {termin.uhrzeit_start} Uhr."
-
-                # Erstelle Benachrichtigung für alle relevanten User
-                empfaenger_ids = []
-
-                if "Käufer" in termin.sichtbar_fuer:
-                    empfaenger_ids.extend(projekt.kaeufer_ids)
-                if "Verkäufer" in termin.sichtbar_fuer:
-                    empfaenger_ids.extend(projekt.verkaeufer_ids)
-                if "Makler" in termin.sichtbar_fuer and projekt.makler_id:
-                    empfaenger_ids.append(projekt.makler_id)
-                if "Notar" in termin.sichtbar_fuer and projekt.notar_id:
-                    empfaenger_ids.append(projekt.notar_id)
-                if "Finanzierer" in termin.sichtbar_fuer:
-                    empfaenger_ids.extend(projekt.finanzierer_ids)
-
-                for emp_id in set(empfaenger_ids):
-                    create_notification(
-                        user_id=emp_id,
-                        titel=titel,
-                        nachricht=nachricht,
-                        typ=NotificationType.WARNING.value if tage_vorher <= 1 else NotificationType.INFO.value
-                    )
+            key = (termin.termin_id, tage_vorher)
+            if tage_vorher in termin.alle_erinnerungen_gesendet:
+                scheduler.markiere_ausgeloest(key)
+                continue
+            erinnerung_am = termin.datum - timedelta(days=tage_vorher)
+            if erinnerung_am < heute:
+                continue  # Erinnerungstag verpasst - wie bisher keine Nachmeldung
+            scheduler.plane(
+                key, erinnerung_am,
+                lambda payload: _sende_termin_erinnerung(store, *payload),
+                key
+            )
+
+
+@st.cache_resource
+def get_erinnerungs_scheduler(_store: SharedDataStore) -> ErinnerungsScheduler:
+    """
+    Prozessweiter Scheduler für Termin-Erinnerungen.
+
+    Gleicht alle TERMIN_ERINNERUNG_ABGLEICH_SEKUNDEN gegen den Fristenindex
+    der Termine ab und löst jede Erinnerung am Erinnerungstag genau einmal
+    aus - unabhängig davon, ob gerade jemand den Kalender öffnet.
+    """
+    scheduler = ErinnerungsScheduler()
+    scheduler.registriere_job(
+        TERMIN_ERINNERUNG_ABGLEICH_SEKUNDEN,
+        lambda: _plane_termin_erinnerungen(_store, scheduler)
+    )
+    scheduler.start()
+    return scheduler
 
-                # Markiere als gesendet
-                termin.alle_erinnerungen_gesendet[tage_vorher] = datetime.now()
+
+def check_und_sende_erinnerungen(user_id: str, user_rolle: str):
+    """
+    Stellt sicher, dass der Erinnerungs-Scheduler läuft.
+
+    Erinnerungen werden nicht mehr bei jedem Render geprüft, sondern vom
+    Scheduler (siehe get_erinnerungs_scheduler) zum Erinnerungstag ausgelöst.
+    """
+    get_erinnerungs_scheduler(get_shared_store())
 
 def get_alle_termine_fuer_user(user_id: str, user_rolle: str) -> List['Termin']:
     """Holt alle relevanten Termine für einen User"""
@@ -17178,7 +17731,7 @@ def render_expose_editor(projekt: Projekt):
         expose = st.session_state.expose_data.get(projekt.expose_data_id)
 
     if not expose:
-        expose_id = f"expose_{len(st.session_state.expose_data)}"
+        expose_id = f"expose_{uuid.uuid4().hex}"
         expose = ExposeData(
             expose_id=expose_id,
             projekt_id=projekt.projekt_id,
@@ -17936,6 +18489,10 @@ def login_page():
                     user = u
                     break
 
+            # Noch nicht geladene Nutzer direkt aus der Datenbank
+            if not user:
+                user = _db_nutzer_login(email, hash_password(password))
+
             # Falls kein normaler Benutzer, Notar-Mitarbeiter prüfen
             if not user:
                 for ma in st.session_state.notar_mitarbeiter.values():
@@ -17951,6 +18508,13 @@ def login_page():
                 st.session_state.current_user = user
                 st.session_state.is_notar_mitarbeiter = False
 
+                # Nur die Projekte dieses Nutzers aus der Datenbank laden
+                if _db_lazy_aktiv():
+                    try:
+                        _db_hydriere_sichtbare_projekte(user, st.session_state.get('db_connection_url'))
+                    except Exception as e:
+                        print(f"Laden der Projekte fehlgeschlagen: {e}")
+
                 # Session-Token erstellen und speichern wenn "Angemeldet bleiben" aktiv
                 if remember_me:
                     token = get_session_token(email)
@@ -18856,7 +19420,7 @@ def makler_projekte_view():
                     cancel = st.form_submit_button("❌ Abbrechen")
 
                 if submit and name and beschreibung:
-                    projekt_id = f"projekt_{len(st.session_state.projekte)}"
+                    projekt_id = f"projekt_{uuid.uuid4().hex}"
 
                     projekt = Projekt(
                         projekt_id=projekt_id,
@@ -19093,7 +19657,7 @@ def makler_profil_view():
     if not profile:
         st.info("Sie haben noch kein Profil erstellt. Erstellen Sie jetzt Ihr Makler-Profil!")
         if st.button("➕ Profil erstellen"):
-            profile_id = f"profile_{len(st.session_state.makler_profiles)}"
+            profile_id = f"profile_{uuid.uuid4().hex}"
             profile = MaklerProfile(
                 profile_id=profile_id,
                 makler_id=makler_id,
@@ -19206,7 +19770,7 @@ def makler_profil_view():
 
             if st.form_submit_button("➕ Hinzufügen"):
                 if agent_name and agent_position and agent_telefon and agent_email:
-                    agent_id = f"agent_{len(profile.team_mitglieder)}"
+                    agent_id = f"agent_{uuid.uuid4().hex}"
                     foto_bytes = foto_file.read() if foto_file else None
 
                     new_agent = MaklerAgent(
@@ -19493,7 +20057,7 @@ def makler_einladungen():
             # Token generieren
             token = hashlib.sha256(f"{email}{projekt_id}{datetime.now()}".encode()).hexdigest()[:16]
 
-            invitation_id = f"inv_{len(st.session_state.invitations)}"
+            invitation_id = f"inv_{uuid.uuid4().hex}"
             invitation = Invitation(
                 invitation_id=invitation_id,
                 projekt_id=projekt_id,
@@ -19577,7 +20141,7 @@ def makler_kommentare():
 
                 if st.form_submit_button("📤 Senden"):
                     if nachricht:
-                        comment_id = f"comment_{len(st.session_state.comments)}"
+                        comment_id = f"comment_{uuid.uuid4().hex}"
                         comment = Comment(
                             comment_id=comment_id,
                             projekt_id=projekt.projekt_id,
@@ -20025,8 +20589,10 @@ def interessent_nachrichten():
         return
 
     # Nachrichten anzeigen
-    nachrichten = [n for n in st.session_state.nachrichten.values()
-                   if n.empfaenger_id == user_id or n.sender_id == user_id]
+    nachrichten = list({id(n): n for n in (
+        find_by(st.session_state.nachrichten, 'empfaenger_id', user_id) +
+        find_by(st.session_state.nachrichten, 'sender_id', user_id)
+    )}.values())
 
     if nachrichten:
         for nachricht in sorted(nachrichten, key=lambda x: x.timestamp, reverse=True):
@@ -20770,7 +21336,7 @@ def kaeufer_handwerker_empfehlungen():
                         )
                         if st.button("💾 Bewertung speichern", key=f"save_rating_{hw.handwerker_id}"):
                             # Bewertung speichern
-                            bewertung_id = f"hwbew_{len(st.session_state.get('handwerker_bewertungen', {}))}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                            bewertung_id = f"hwbew_{uuid.uuid4().hex}"
                             neue_bewertung = HandwerkerBewertung(
                                 bewertung_id=bewertung_id,
                                 handwerker_id=hw.handwerker_id,
@@ -21628,7 +22194,7 @@ def kaeufer_finanzierung_anfragen(projekte):
 
                     if st.form_submit_button("📧 Finanzierer einladen"):
                         if fin_email:
-                            einl_id = f"fineinl_{len(st.session_state.finanzierer_einladungen)}"
+                            einl_id = f"fineinl_{uuid.uuid4().hex}"
                             token = str(uuid.uuid4())
 
                             neue_einladung = FinanziererEinladung(
@@ -22008,7 +22574,7 @@ def kaeufer_wirtschaftsdaten_upload():
                 ocr_text, kategorie = simulate_ocr(file_data, file.name)
 
                 # Dokument speichern
-                doc_id = f"wirt_{st.session_state.current_user.user_id}_{len(st.session_state.wirtschaftsdaten)}"
+                doc_id = f"wirt_{st.session_state.current_user.user_id}_{uuid.uuid4().hex}"
 
                 doc = WirtschaftsdatenDokument(
                     doc_id=doc_id,
@@ -25240,7 +25806,7 @@ def verkaeufer_dokumente_view():
 
         if submit and datei and dokument_typ:
             # Dokument speichern
-            dokument_id = f"vdoc_{len(st.session_state.verkaeufer_dokumente)}"
+            dokument_id = f"vdoc_{uuid.uuid4().hex}"
             datei_bytes = datei.read()
 
             neues_dokument = VerkäuferDokument(
@@ -25601,7 +26167,7 @@ def finanzierer_angebote_erstellen():
                                   if o.projekt_id == projekt_id and o.finanzierer_id == finanzierer_id]
             angebot_nummer = len(bestehende_angebote) + 1
 
-            offer_id = f"offer_{len(st.session_state.financing_offers)}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            offer_id = f"offer_{uuid.uuid4().hex}"
             status = FinanzierungsStatus.ENTWURF.value if als_entwurf else FinanzierungsStatus.GESENDET.value
 
             offer = FinancingOffer(
@@ -29623,8 +30189,30 @@ def berechne_text_hash(text: str) -> str:
     return hashlib.md5(normalized.encode()).hexdigest()
 
 
+def setze_baustein_text(baustein: Textbaustein, text: str) -> None:
+    """Setzt den Text eines Bausteins inkl. Text-Hash und MinHash-Signatur und aktualisiert die Indizes."""
+    baustein.text = text
+    baustein.text_hash = berechne_text_hash(text)
+    baustein.minhash_signatur = berechne_minhash(text)
+    reindex_entry(st.session_state.textbausteine, baustein.baustein_id)
+
+
 def finde_aehnliche_bausteine(text: str, notar_id: str, schwellenwert: float = 0.8) -> List[Tuple[str, float]]:
-    """Findet ähnliche Textbausteine basierend auf einfachem Textvergleich"""
+    """
+    Findet ähnliche Textbausteine (Wort-Jaccard ≥ schwellenwert, exakte Duplikate = 1.0).
+
+    Kandidaten liefert der MinHash/LSH-Index der Collection; die Ähnlichkeit
+    wird nur für diese exakt berechnet.
+    """
+    bausteine = st.session_state.textbausteine
+    if getattr(bausteine, 'aehnlichkeit', None) is not None:
+        return [
+            (baustein.baustein_id, wert)
+            for baustein, wert in bausteine.aehnliche(text, schwellenwert)
+            if baustein.notar_id == notar_id
+        ]
+
+    # Fallback ohne Index: paarweiser Vergleich
     aehnliche = []
     text_hash = berechne_text_hash(text)
     text_words = set(text.lower().split())
@@ -29651,83 +30239,22 @@ def finde_aehnliche_bausteine(text: str, notar_id: str, schwellenwert: float = 0
     return sorted(aehnliche, key=lambda x: x[1], reverse=True)
 
 
-def extrahiere_text_aus_datei(datei_bytes: bytes, dateityp: str, dateiname: str) -> str:
-    """Extrahiert Text aus verschiedenen Dateiformaten"""
-    text = ""
-
-    if dateityp == "docx":
-        try:
-            # Versuche docx zu parsen (einfache XML-Extraktion)
-            import zipfile
-            from xml.etree import ElementTree
-
-            with zipfile.ZipFile(io.BytesIO(datei_bytes)) as docx:
-                if 'word/document.xml' in docx.namelist():
-                    with docx.open('word/document.xml') as doc:
-                        tree = ElementTree.parse(doc)
-                        root = tree.getroot()
-                        # Namespace für Word-Dokumente
-                        ns = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
-                        paragraphs = root.findall('.//w:p', ns)
-                        for p in paragraphs:
-                            texts = p.findall('.//w:t', ns)
-                            para_text = ''.join(t.text or '' for t in texts)
-                            if para_text.strip():
-                                text += para_text + "\n"
-        except Exception as e:
-            text = f"[Fehler beim Lesen der DOCX-Datei: {str(e)}]"
-
-    elif dateityp == "rtf":
-        try:
-            # RTF-Text-Extraktion
-            import re as re_rtf
-            content = datei_bytes.decode('latin-1', errors='ignore')
-
-            # Entferne RTF-Steuerzeichen und extrahiere Text
-            # Entferne RTF-Header und Control-Words
-            content = re_rtf.sub(r'\\[a-z]+\d*\s?', '', content)
-            # Entferne geschweifte Klammern
-            content = re_rtf.sub(r'[{}]', '', content)
-            # Entferne Hex-Codes wie \'xx
-            content = re_rtf.sub(r"\\'[0-9a-fA-F]{2}", '', content)
-            # Ersetze RTF-Zeilenumbrüche
-            content = content.replace('\\par', '\n')
-            content = content.replace('\\line', '\n')
-            # Bereinige mehrfache Leerzeichen
-            content = re_rtf.sub(r' +', ' ', content)
-            content = re_rtf.sub(r'\n+', '\n', content)
-
-            text = content.strip()
-
-            if len(text) < 50:
-                text = "[RTF-Text konnte nicht vollständig extrahiert werden. Bitte prüfen Sie das Dokument.]"
-        except Exception as e:
-            text = f"[Fehler beim Lesen der RTF-Datei: {str(e)}]"
-
-    elif dateityp == "pdf":
-        # PDF-Text-Extraktion (vereinfacht - in Production würde man PyPDF2 oder pdfplumber verwenden)
-        try:
-            # Versuche einfache Text-Extraktion aus PDF
-            content = datei_bytes.decode('latin-1', errors='ignore')
-            # Suche nach Text-Streams
-            import re
-            text_pattern = re.compile(r'\((.*?)\)', re.DOTALL)
-            matches = text_pattern.findall(content)
-            text = ' '.join(matches[:100])  # Begrenzen
-            if len(text) < 100:
-                text = "[PDF-Text konnte nicht automatisch extrahiert werden. Bitte OCR verwenden oder Text manuell eingeben.]"
-        except Exception:
-            text = "[PDF-Verarbeitung fehlgeschlagen]"
-
-    elif dateityp in ["image", "jpg", "jpeg", "png"]:
-        text = "[Bild-Datei erkannt. OCR-Verarbeitung erforderlich für Textextraktion.]"
-
-    return text.strip()
-
+def ki_analysiere_textbaustein(
+    text: str,
+    api_key: Optional[str] = None,
+    drossel: Optional[RateLimiter] = None
+) -> Dict[str, Any]:
+    """
+    Verwendet KI um Titel, Zusammenfassung und Kategorie für einen Textbaustein zu generieren
 
-def ki_analysiere_textbaustein(text: str) -> Dict[str, Any]:
-    """Verwendet KI um Titel, Zusammenfassung und Kategorie für einen Textbaustein zu generieren"""
-    api_key = st.session_state.api_keys.get('openai', '')
+    Args:
+        text: Text des Bausteins
+        api_key: Optional - OpenAI API-Key (Default: aus dem Session State; in
+            Worker-Threads muss er übergeben werden)
+        drossel: Optional - RateLimiter für die API-Aufrufe (Default: prozessweiter Limiter)
+    """
+    if api_key is None:
+        api_key = st.session_state.api_keys.get('openai', '')
 
     if not api_key:
         # Fallback: Einfache Heuristik
@@ -29787,25 +30314,31 @@ Antworte im JSON-Format:
             }
         )
 
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json_module.loads(response.read().decode('utf-8'))
-            content = result['choices'][0]['message']['content']
+        def _anfrage() -> str:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                result = json_module.loads(response.read().decode('utf-8'))
+                return result['choices'][0]['message']['content']
 
-            # Parse JSON aus Antwort
-            # Entferne mögliche Markdown-Code-Blöcke
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0]
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0]
+        content = ki_cache_abfrage(
+            prompt, "gpt-4o-mini", "textbaustein-analyse-v1",
+            lambda: mit_wiederholung(_anfrage, drossel=drossel or get_llm_rate_limiter())
+        )
 
-            parsed = json_module.loads(content.strip())
-            return {
-                'titel': parsed.get('titel', 'Unbenannter Baustein'),
-                'zusammenfassung': parsed.get('zusammenfassung', ''),
-                'kategorie': parsed.get('kategorie', 'Sonstiges'),
-                'vertragstypen': parsed.get('vertragstypen', []),
-                'ki_generiert': True
-            }
+        # Parse JSON aus Antwort
+        # Entferne mögliche Markdown-Code-Blöcke
+        if '```json' in content:
+            content = content.split('```json')[1].split('```')[0]
+        elif '```' in content:
+            content = content.split('```')[1].split('```')[0]
+
+        parsed = json_module.loads(content.strip())
+        return {
+            'titel': parsed.get('titel', 'Unbenannter Baustein'),
+            'zusammenfassung': parsed.get('zusammenfassung', ''),
+            'kategorie': parsed.get('kategorie', 'Sonstiges'),
+            'vertragstypen': parsed.get('vertragstypen', []),
+            'ki_generiert': True
+        }
 
     except Exception as e:
         # Fallback bei Fehler
@@ -29865,59 +30398,6 @@ def ki_analysiere_textbaustein_fallback(text: str) -> Dict[str, Any]:
     }
 
 
-def ki_zerlege_vertrag_in_bausteine(volltext: str) -> List[Dict[str, Any]]:
-    """Zerlegt einen Vertrag in einzelne Textbausteine mit Start/End-Indizes"""
-    bausteine = []
-    import re
-
-    # Verschiedene Muster für Vertragsabschnitte
-    patterns = [
-        r'§\s*\d+',  # § 1, § 2, etc.
-        r'Artikel\s+\d+',  # Artikel 1, etc.
-        r'\n[IVX]+\.\s',  # I. II. III. etc.
-        r'\n\d+\.\s+[A-ZÄÖÜ]',  # 1. Titel, 2. Titel
-    ]
-
-    # Finde alle Trennpunkte mit Positionen
-    trennpunkte = [0]  # Start des Dokuments
-
-    for pattern in patterns:
-        matches = list(re.finditer(pattern, volltext, flags=re.MULTILINE))
-        if len(matches) >= 2:  # Mindestens 2 Treffer für sinnvolle Zerlegung
-            trennpunkte = [0] + [m.start() for m in matches] + [len(volltext)]
-            break
-
-    # Falls keine Muster gefunden, nach doppelten Zeilenumbrüchen suchen
-    if len(trennpunkte) <= 2:
-        matches = list(re.finditer(r'\n\s*\n', volltext))
-        if matches:
-            trennpunkte = [0] + [m.end() for m in matches] + [len(volltext)]
-
-    # Falls immer noch keine Trennpunkte, den gesamten Text als einen Baustein
-    if len(trennpunkte) <= 2:
-        trennpunkte = [0, len(volltext)]
-
-    # Bausteine aus Trennpunkten erstellen
-    for i in range(len(trennpunkte) - 1):
-        start_idx = trennpunkte[i]
-        end_idx = trennpunkte[i + 1]
-        teil_text = volltext[start_idx:end_idx].strip()
-
-        if len(teil_text) > 50:  # Mindestlänge für einen Baustein
-            # Berechne tatsächliche Start/End-Position (ohne führende/trailing Whitespaces)
-            actual_start = volltext.find(teil_text, start_idx)
-            actual_end = actual_start + len(teil_text)
-
-            bausteine.append({
-                'text': teil_text,
-                'position': i,
-                'start_index': actual_start,
-                'end_index': actual_end
-            })
-
-    return bausteine
-
-
 def verarbeite_dokumente_batch(
     dateien: List[Any],
     notar_id: str,
@@ -29929,6 +30409,13 @@ def verarbeite_dokumente_batch(
     """
     Verarbeitet mehrere Dokumente gleichzeitig und zerlegt sie automatisch in Textbausteine.
 
+    Textextraktion und Zerlegung laufen in einem Prozess-Pool, die KI-Analyse
+    gedrosselt (mit Wiederholung bei Rate-Limits) in einem Thread-Pool
+    (siehe modules/dokumentverarbeitung.py). Session State und
+    progress_callback werden nur hier im Streamlit-Thread angefasst, jeweils
+    sobald ein Dokument fertig ist. Fehler eines Dokuments brechen den Batch
+    nicht ab.
+
     Args:
         dateien: Liste von hochgeladenen Dateien (Streamlit UploadedFile)
         notar_id: ID des Notars
@@ -29954,40 +30441,49 @@ def verarbeite_dokumente_batch(
 
     total = len(dateien)
 
-    for idx, datei in enumerate(dateien):
-        try:
-            # Progress-Update
-            if progress_callback:
-                progress_callback(idx, total, f"Verarbeite: {datei.name}")
-
-            # 1. Datei einlesen
-            datei_bytes = datei.read()
-            datei.seek(0)  # Reset für potentiellen späteren Zugriff
-
-            dateiname = datei.name
-            dateityp = dateiname.split('.')[-1].lower()
-            if dateityp in ['jpg', 'jpeg', 'png']:
-                dateityp = 'image'
+    # Dateien im Hauptthread einlesen (UploadedFile ist nicht prozessübergreifend nutzbar)
+    eingaben = []
+    for datei in dateien:
+        datei_bytes = datei.read()
+        datei.seek(0)  # Reset für potentiellen späteren Zugriff
+        eingaben.append((datei.name, datei_bytes))
+
+    # KI-Analyse läuft in Worker-Threads → API-Key hier aus dem Session State lesen
+    analysiere = None
+    if ki_analyse:
+        analysiere = functools.partial(
+            ki_analysiere_textbaustein,
+            api_key=st.session_state.api_keys.get('openai', ''),
+            drossel=get_llm_rate_limiter(),
+        )
 
-            # 2. Text extrahieren
-            extrahierter_text = extrahiere_text_aus_datei(datei_bytes, dateityp, dateiname)
+    if progress_callback:
+        progress_callback(0, total, f"Verarbeite {total} Dokument(e)...")
 
-            if not extrahierter_text or len(extrahierter_text.strip()) < 50:
-                ergebnis['fehler'].append(f"❌ {dateiname}: Kein Text extrahierbar oder zu kurz")
+    fertig = 0
+    for dok_ergebnis in verarbeite_batch_parallel(eingaben, analysiere=analysiere, auto_zerlegen=auto_zerlegen):
+        fertig += 1
+        dateiname = dok_ergebnis.dateiname
+        try:
+            if dok_ergebnis.fehler:
+                ergebnis['fehler'].append(f"❌ {dateiname}: {dok_ergebnis.fehler}")
                 ergebnis['details'].append({
                     'dateiname': dateiname,
                     'status': 'fehler',
-                    'meldung': 'Kein Text extrahierbar oder zu kurz'
+                    'meldung': dok_ergebnis.fehler
                 })
                 continue
 
-            # 3. Dokument erstellen
+            extrahierter_text = dok_ergebnis.volltext
+            datei_bytes = dok_ergebnis.datei_bytes
+
+            # Dokument erstellen
             dokument_id = str(uuid.uuid4())[:8]
             dokument = VertragsDokument(
                 dokument_id=dokument_id,
                 notar_id=notar_id,
                 dateiname=dateiname,
-                dateityp=dateityp,
+                dateityp=dok_ergebnis.dateityp,
                 dateigroesse=len(datei_bytes),
                 datei_bytes=datei_bytes,
                 volltext=extrahierter_text,
@@ -30001,33 +30497,19 @@ def verarbeite_dokumente_batch(
             st.session_state.vertragsdokumente[dokument_id] = dokument
             ergebnis['dokumente'].append(dokument)
 
-            # 4. Optional: In Textbausteine zerlegen
+            # Textbausteine aus der Zerlegung übernehmen
             bausteine_erstellt = 0
-            if auto_zerlegen and len(extrahierter_text) > 100:
-                # Progress-Update
-                if progress_callback:
-                    progress_callback(idx, total, f"Zerlege in Bausteine: {dateiname}")
-
-                # Textbausteine extrahieren
-                zerlegte_bausteine = ki_zerlege_vertrag_in_bausteine(extrahierter_text)
-
+            if dok_ergebnis.bausteine:
                 baustein_ids = []
-                for baustein_data in zerlegte_bausteine:
+                for baustein_data in dok_ergebnis.bausteine:
                     baustein_text = baustein_data['text']
 
-                    # KI-Analyse wenn aktiviert
-                    if ki_analyse:
-                        try:
-                            analyse = ki_analysiere_textbaustein(baustein_text)
-                            titel = analyse.get('titel', 'Unbenannter Baustein')
-                            zusammenfassung = analyse.get('zusammenfassung', baustein_text[:150] + '...')
-                            kategorie = analyse.get('kategorie', 'Sonstiges')
-                            ki_generiert = analyse.get('ki_generiert', True)
-                        except Exception:
-                            titel = baustein_text[:50].replace('\n', ' ').strip()
-                            zusammenfassung = baustein_text[:150] + '...' if len(baustein_text) > 150 else baustein_text
-                            kategorie = 'Sonstiges'
-                            ki_generiert = False
+                    analyse = baustein_data.get('analyse')
+                    if analyse:
+                        titel = analyse.get('titel', 'Unbenannter Baustein')
+                        zusammenfassung = analyse.get('zusammenfassung', baustein_text[:150] + '...')
+                        kategorie = analyse.get('kategorie', 'Sonstiges')
+                        ki_generiert = analyse.get('ki_generiert', True)
                     else:
                         titel = baustein_text[:50].replace('\n', ' ').strip()
                         zusammenfassung = baustein_text[:150] + '...' if len(baustein_text) > 150 else baustein_text
@@ -30079,13 +30561,18 @@ def verarbeite_dokumente_batch(
             })
 
         except Exception as e:
-            ergebnis['fehler'].append(f"❌ {datei.name}: {str(e)}")
+            ergebnis['fehler'].append(f"❌ {dateiname}: {str(e)}")
             ergebnis['details'].append({
-                'dateiname': datei.name,
+                'dateiname': dateiname,
                 'status': 'fehler',
                 'meldung': str(e)
             })
 
+        finally:
+            # Progress-Update, sobald ein Dokument fertig ist
+            if progress_callback:
+                progress_callback(fertig, total, f"Fertig: {dateiname}")
+
     # Finaler Progress-Update
     if progress_callback:
         progress_callback(total, total, "Verarbeitung abgeschlossen")
@@ -30589,24 +31076,21 @@ def render_visueller_baustein_editor(dok_id: str, volltext: str, bausteine_ids:
                 # Aktuellen Baustein aktualisieren
                 selected_baustein.start_index = new_start
                 selected_baustein.end_index = new_end
-                selected_baustein.text = volltext[new_start:new_end].strip()
+                setze_baustein_text(selected_baustein, volltext[new_start:new_end].strip())
                 selected_baustein.aktualisiert_am = datetime.now()
-                selected_baustein.text_hash = berechne_text_hash(selected_baustein.text)
 
                 # Angrenzende Bausteine anpassen (kaskadierend)
                 if baustein_idx > 0:
                     vorheriger = dok_bausteine[baustein_idx - 1]
                     if vorheriger.end_index > new_start:
                         vorheriger.end_index = new_start
-                        vorheriger.text = volltext[vorheriger.start_index:vorheriger.end_index].strip()
-                        vorheriger.text_hash = berechne_text_hash(vorheriger.text)
+                        setze_baustein_text(vorheriger, volltext[vorheriger.start_index:vorheriger.end_index].strip())
 
                 if baustein_idx < len(dok_bausteine) - 1:
                     naechster = dok_bausteine[baustein_idx + 1]
                     if naechster.start_index < new_end:
                         naechster.start_index = new_end
-                        naechster.text = volltext[naechster.start_index:naechster.end_index].strip()
-                        naechster.text_hash = berechne_text_hash(naechster.text)
+                        setze_baustein_text(naechster, volltext[naechster.start_index:naechster.end_index].strip())
 
                 st.success("✅ Änderungen übernommen!")
                 st.rerun()
@@ -31584,7 +32068,7 @@ def notar_vertragsarchiv_view():
                                 baustein_auswahl.status = TextbausteinStatus.AKTUALISIERUNG.value
 
                                 if st.button("✅ Update übernehmen"):
-                                    baustein_auswahl.text = ergebnis.get('vorschlag', baustein_auswahl.text)
+                                    setze_baustein_text(baustein_auswahl, ergebnis.get('vorschlag', baustein_auswahl.text))
                                     baustein_auswahl.version += 1
                                     baustein_auswahl.aktualisiert_am = datetime.now()
                                     baustein_auswahl.status = TextbausteinStatus.FREIGEGEBEN.value
@@ -31696,11 +32180,29 @@ def notar_vertragsarchiv_view():
                                 context["is_rented"] = is_rented
                                 context["is_condominium"] = is_condominium
 
+                                # Bereits geparste Urkunden aus der Datenbank laden statt erneut zu parsen.
+                                # Parser-Runs hängen am Notarprofil (notar_profile.id) - ohne Profil
+                                # in der Datenbank wird weder geladen noch gespeichert.
+                                notar_profil_id = notar_profil_id_fuer(notar_id)
+                                ergebnis_laden = ergebnis_speichern = None
+                                if notar_profil_id is not None:
+                                    ergebnis_laden = lambda h, **kw: lade_parser_ergebnis(
+                                        h, notar_id=notar_profil_id, **kw
+                                    )
+                                    # Vertragsdokumente liegen nur im Session State (keine
+                                    # vertragsdokumente-Zeile) - der Run wird daher nicht verknüpft
+                                    ergebnis_speichern = lambda out, **kw: speichere_parser_ergebnis(
+                                        out, notar_id=notar_profil_id, **kw
+                                    )
+
                                 # Parser aufrufen
                                 parser_output = parse_urkunde(
                                     contract_text=dokument.volltext,
                                     context=context,
-                                    api_key=api_key
+                                    api_key=api_key,
+                                    library=aktualisiere_generic_block_library(notar_profil_id),
+                                    ergebnis_laden=ergebnis_laden,
+                                    ergebnis_speichern=ergebnis_speichern
                                 )
 
                                 # Ergebnisse in Session State speichern
@@ -32545,7 +33047,7 @@ def notar_checklisten_view():
                 partei = None
 
         if st.button("Checkliste erstellen") and partei:
-            checklist_id = f"checklist_{len(st.session_state.notar_checklists)}"
+            checklist_id = f"checklist_{uuid.uuid4().hex}"
             new_checklist = NotarChecklist(
                 checklist_id=checklist_id,
                 projekt_id=selected_projekt_id,
@@ -32745,7 +33247,7 @@ def notar_mitarbeiter_view():
 
         if st.form_submit_button("➕ Mitarbeiter hinzufügen", type="primary"):
             if ma_name and ma_email and ma_passwort:
-                mitarbeiter_id = f"notarma_{len(st.session_state.notar_mitarbeiter)}"
+                mitarbeiter_id = f"notarma_{uuid.uuid4().hex}"
 
                 neuer_mitarbeiter = NotarMitarbeiter(
                     mitarbeiter_id=mitarbeiter_id,
@@ -33415,9 +33917,12 @@ Erstelle einen vollständigen notariellen Kaufvertragsentwurf mit: Präambel, Ka
                 method="POST"
             )
 
-            with urllib.request.urlopen(req, timeout=120) as response:
-                result = json_module.loads(response.read().decode('utf-8'))
-                return result['choices'][0]['message']['content']
+            def _anfrage() -> str:
+                with urllib.request.urlopen(req, timeout=120) as response:
+                    result = json_module.loads(response.read().decode('utf-8'))
+                    return result['choices'][0]['message']['content']
+
+            return ki_cache_abfrage(prompt, "gpt-4", "kaufvertrag-v1", _anfrage)
 
         elif api_type == "anthropic":
             import urllib.request
@@ -33436,9 +33941,12 @@ Erstelle einen vollständigen notariellen Kaufvertragsentwurf mit: Präambel, Ka
                 method="POST"
             )
 
-            with urllib.request.urlopen(req, timeout=120) as response:
-                result = json_module.loads(response.read().decode('utf-8'))
-                return result['content'][0]['text']
+            def _anfrage() -> str:
+                with urllib.request.urlopen(req, timeout=120) as response:
+                    result = json_module.loads(response.read().decode('utf-8'))
+                    return result['content'][0]['text']
+
+            return ki_cache_abfrage(prompt, "claude-3-sonnet-20240229", "kaufvertrag-v1", _anfrage)
 
     except Exception as e:
         st.error(f"API-Fehler: {str(e)}")
@@ -33832,7 +34340,7 @@ def notar_makler_empfehlung_view():
                 st.warning("⚠️ Dieser Makler wurde bereits eingeladen.")
             else:
                 # Neue Empfehlung erstellen
-                empfehlung_id = f"emp_{len(st.session_state.makler_empfehlungen) + 1}"
+                empfehlung_id = f"emp_{uuid.uuid4().hex}"
                 onboarding_token = str(uuid.uuid4())
 
                 neue_empfehlung = MaklerEmpfehlung(
@@ -36759,14 +37267,15 @@ Antworte NUR mit dem JSON, ohne zusätzlichen Text.""".format(text=text[:4000])
         try:
             import openai
             client = openai.OpenAI(api_key=api_keys['openai'])
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=1500
-            )
-
-            antwort = response.choices[0].message.content.strip()
+            antwort = ki_cache_abfrage(
+                prompt, "gpt-4o-mini", "aktenbeteiligte-v1",
+                lambda: client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.1,
+                    max_tokens=1500
+                ).choices[0].message.content
+            ).strip()
             # JSON extrahieren
             if "```json" in antwort:
                 antwort = antwort.split("```json")[1].split("```")[0]
@@ -36794,13 +37303,14 @@ Antworte NUR mit dem JSON, ohne zusätzlichen Text.""".format(text=text[:4000])
         try:
             import anthropic
             client = anthropic.Anthropic(api_key=api_keys['anthropic'])
-            response = client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=1500,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            antwort = response.content[0].text.strip()
+            antwort = ki_cache_abfrage(
+                prompt, "claude-3-haiku-20240307", "aktenbeteiligte-v1",
+                lambda: client.messages.create(
+                    model="claude-3-haiku-20240307",
+                    max_tokens=1500,
+                    messages=[{"role": "user", "content": prompt}]
+                ).content[0].text
+            ).strip()
             if "```json" in antwort:
                 antwort = antwort.split("```json")[1].split("```")[0]
             elif "```" in antwort:
@@ -38967,12 +39477,23 @@ def notar_einstellungen_view():
 
                 if st.button("📤 Daten exportieren", key="export_to_db", disabled=not db_connected):
                     if db_connected and migrate_items:
-                        with st.spinner("Exportiere Daten..."):
-                            result = migrate_session_to_database(migrate_items)
-                            if result['success']:
-                                st.success(f"✅ {result['migrated_count']} Datensätze exportiert!")
-                            else:
-                                st.error(f"❌ Fehler: {result.get('error', 'Unbekannt')}")
+                        fortschritt = st.progress(0.0, text="Exportiere Daten...")
+
+                        def _migration_fortschritt(fertig, gesamt):
+                            fortschritt.progress(fertig / gesamt if gesamt else 1.0,
+                                                 text=f"Exportiere Daten... {fertig}/{gesamt}")
+
+                        result = migrate_session_to_database(migrate_items, _migration_fortschritt)
+                        fortschritt.empty()
+                        if result['success']:
+                            st.success(f"✅ {result['migrated_count']} Datensätze exportiert!")
+                            if result.get('existing_count') or result.get('skipped_count'):
+                                st.caption(
+                                    f"{result.get('existing_count', 0)} bereits vorhanden, "
+                                    f"{result.get('skipped_count', 0)} ohne Notar bzw. Bezugsdatensatz übersprungen"
+                                )
+                        else:
+                            st.error(f"❌ Fehler: {result.get('error', 'Unbekannt')}")
                     else:
                         st.warning("⚠️ Keine Verbindung oder keine Daten ausgewählt")
 
@@ -38983,7 +39504,7 @@ def notar_einstellungen_view():
                 if st.button("📥 Daten importieren", key="import_from_db", disabled=not db_connected):
                     if db_connected:
                         with st.spinner("Importiere Daten..."):
-                            result = load_database_to_session()
+                            result = load_database_to_session(lazy=False)
                             if result['success']:
                                 st.success(f"✅ {result['loaded_count']} Datensätze geladen!")
                                 st.rerun()
@@ -38998,6 +39519,16 @@ def notar_einstellungen_view():
                 )
                 st.session_state.db_auto_load = auto_load
 
+                if st.button("📈 Referenzpreise neu berechnen", key="rebuild_referenzpreise", disabled=not db_connected,
+                             help="Berechnet das Aggregat der Markt-Referenzpreise aus der Preishistorie neu"):
+                    from database import aktualisiere_markt_referenzpreise
+                    with st.spinner("Berechne Referenzpreise..."):
+                        anzahl = aktualisiere_markt_referenzpreise()
+                    if anzahl is not None:
+                        st.success(f"✅ {anzahl} Referenzpreis-Zeilen berechnet")
+                    else:
+                        st.error("❌ Fehler beim Berechnen der Referenzpreise")
+
         with db_tabs[2]:
             st.markdown("#### 📋 Datenbankschema")
 
@@ -39016,6 +39547,7 @@ def notar_einstellungen_view():
             | `preisvorschlag` | Preisverhandlungen |
             | `preis_historie` | Preisentwicklung |
             | `markt_daten` | Marktdaten für ML |
+            | `markt_referenzpreise` | Vergleichspreise je Region, Typ, Fläche und Monat |
             | `dokument` | Dokumente mit OCR |
             | `interaktion` | Benutzeraktivitäten |
             | `benachrichtigung` | Systembenachrichtigungen |
@@ -41254,12 +41786,11 @@ def render_kommunikationszentrale(user_id: str, projekt_id: str = None):
         return
 
     # Nachrichten für diesen Benutzer laden
-    empfangene = [n for n in st.session_state.nachrichten.values()
-                  if user_id in n.empfaenger_ids and not n.ist_geloescht and not n.ist_entwurf]
-    gesendete = [n for n in st.session_state.nachrichten.values()
-                 if n.absender_id == user_id and not n.ist_geloescht and not n.ist_entwurf]
-    entwuerfe = [n for n in st.session_state.nachrichten.values()
-                 if n.absender_id == user_id and n.ist_entwurf]
+    empfangene = [n for n in find_by(st.session_state.nachrichten, 'empfaenger_ids', user_id)
+                  if not n.ist_geloescht and not n.ist_entwurf]
+    eigene = find_by(st.session_state.nachrichten, 'absender_id', user_id)
+    gesendete = [n for n in eigene if not n.ist_geloescht and not n.ist_entwurf]
+    entwuerfe = [n for n in eigene if n.ist_entwurf]
 
     # Filter nach Projekt wenn angegeben
     if projekt_id:
@@ -41936,8 +42467,8 @@ def get_eingaenge_zaehler(user_id: str) -> Dict[str, int]:
         "gesamt": 0
     }
 
-    for eingang in st.session_state.eingaenge.values():
-        if eingang.empfaenger_id == user_id and eingang.status == EingangStatus.NEU.value:
+    for eingang in find_by(st.session_state.eingaenge, 'empfaenger_id', user_id):
+        if eingang.status == EingangStatus.NEU.value:
             zaehler[eingang.typ] = zaehler.get(eingang.typ, 0) + 1
             zaehler["gesamt"] += 1
 
@@ -42444,8 +42975,7 @@ def erstelle_standard_gating_pruefungen(projekt_id: str):
 
 def get_gating_status(projekt_id: str) -> Dict:
     """Ermittelt den Gating-Status für ein Projekt"""
-    pruefungen = [p for p in st.session_state.get('gating_pruefungen', {}).values()
-                  if p.projekt_id == projekt_id]
+    pruefungen = find_by(st.session_state.get('gating_pruefungen', {}), 'projekt_id', projekt_id)
 
     if not pruefungen:
         return {
@@ -42535,8 +43065,7 @@ def render_gating_uebersicht(projekt_id: str, user_rolle: str):
     # Detaillierte Prüfungen
     st.markdown("### 📋 Prüfungen im Detail")
 
-    pruefungen = [p for p in st.session_state.get('gating_pruefungen', {}).values()
-                  if p.projekt_id == projekt_id]
+    pruefungen = find_by(st.session_state.get('gating_pruefungen', {}), 'projekt_id', projekt_id)
     pruefungen.sort(key=lambda p: p.reihenfolge)
 
     for pruefung in pruefungen:
@@ -42691,23 +43220,21 @@ def erstelle_standard_fristen(projekt_id: str, beurkundungsdatum: datetime = Non
 
 
 def get_faellige_fristen(user_id: str = None, projekt_id: str = None, tage_voraus: int = 7) -> List[Frist]:
-    """Ermittelt fällige Fristen"""
-    fristen = list(st.session_state.get('fristen', {}).values())
+    """Ermittelt fällige Fristen (offen, überfällig oder in den nächsten `tage_voraus` Tagen)"""
+    alle_fristen = st.session_state.get('fristen', {})
+    grenze = datetime.now() + timedelta(days=tage_voraus)
+
+    # Über den Fristenindex: nur offene Fristen bis zur Grenze, bereits sortiert
+    faellige = faellige_objekte(alle_fristen, bis=grenze)
+    if faellige is None:
+        faellige = [f for f in alle_fristen.values()
+                    if f.status == "offen" and f.faellig_am and f.faellig_am <= grenze]
+        faellige.sort(key=lambda f: f.faellig_am)
 
     if user_id:
-        fristen = [f for f in fristen if f.verantwortlich_id == user_id]
+        faellige = [f for f in faellige if f.verantwortlich_id == user_id]
     if projekt_id:
-        fristen = [f for f in fristen if f.projekt_id == projekt_id]
-
-    # Nur offene Fristen
-    fristen = [f for f in fristen if f.status == "offen"]
-
-    # Fällige oder bald fällige
-    jetzt = datetime.now()
-    grenze = jetzt + timedelta(days=tage_voraus)
-
-    faellige = [f for f in fristen if f.faellig_am and f.faellig_am <= grenze]
-    faellige.sort(key=lambda f: f.faellig_am)
+        faellige = [f for f in faellige if f.projekt_id == projekt_id]
 
     return faellige
 
@@ -42810,6 +43337,7 @@ def _render_frist_card(frist: Frist):
                 if st.button("✅", key=f"done_frist_{frist.frist_id}", help="Als erledigt markieren"):
                     frist.status = "erledigt"
                     frist.erledigt_am = datetime.now()
+                    reindex_entry(st.session_state.fristen, frist.frist_id)
                     st.rerun()
 
 
@@ -43217,8 +43745,8 @@ def render_mandanten_portal(user_id: str, user_rolle: str):
     # Anstehende Termine
     termine_count = 0
     for p in projekte:
-        projekt_termine = [t for t in st.session_state.termine.values()
-                          if t.projekt_id == p.projekt_id and t.status != "abgesagt"]
+        projekt_termine = [t for t in find_by(st.session_state.termine, 'projekt_id', p.projekt_id)
+                          if t.status != "abgesagt"]
         termine_count += len(projekt_termine)
 
     col1, col2, col3, col4 = st.columns(4)
@@ -46832,6 +47360,7 @@ def _versuche_email_zuordnung(email_obj: ImportierteEmail) -> ImportierteEmail:
     # Bei hoher Konfidenz automatisch zuordnen
     if beste_konfidenz >= 0.5 and beste_akte_id:
         email_obj.akte_id = beste_akte_id
+        reindex_entry(st.session_state.importierte_emails, email_obj.email_id)
         email_obj.status = EmailStatus.ZUGEORDNET.value
 
     return email_obj
@@ -46844,38 +47373,37 @@ def get_emails_fuer_akte(akte_id: str, filter_obj: EmailFilter = None) -> List[I
     """
     emails = []
 
-    for email_obj in st.session_state.importierte_emails.values():
-        if email_obj.akte_id == akte_id:
-            # Filter anwenden falls vorhanden
-            if filter_obj:
-                if filter_obj.suchbegriff:
-                    such = filter_obj.suchbegriff.lower()
-                    if not (such in email_obj.betreff.lower() or
-                            such in email_obj.inhalt_text.lower() or
-                            such in email_obj.absender_email.lower()):
-                        continue
-
-                if filter_obj.von_email and filter_obj.von_email.lower() not in email_obj.absender_email.lower():
+    for email_obj in find_by(st.session_state.importierte_emails, 'akte_id', akte_id):
+        # Filter anwenden falls vorhanden
+        if filter_obj:
+            if filter_obj.suchbegriff:
+                such = filter_obj.suchbegriff.lower()
+                if not (such in email_obj.betreff.lower() or
+                        such in email_obj.inhalt_text.lower() or
+                        such in email_obj.absender_email.lower()):
                     continue
 
-                if filter_obj.nur_mit_anhaengen and email_obj.anzahl_anhaenge == 0:
-                    continue
+            if filter_obj.von_email and filter_obj.von_email.lower() not in email_obj.absender_email.lower():
+                continue
 
-                if filter_obj.nur_ungelesen and email_obj.gelesen:
-                    continue
+            if filter_obj.nur_mit_anhaengen and email_obj.anzahl_anhaenge == 0:
+                continue
 
-                if filter_obj.richtung and email_obj.richtung != filter_obj.richtung:
-                    continue
+            if filter_obj.nur_ungelesen and email_obj.gelesen:
+                continue
 
-                if filter_obj.datum_von and email_obj.gesendet_am:
-                    if email_obj.gesendet_am.date() < filter_obj.datum_von:
-                        continue
+            if filter_obj.richtung and email_obj.richtung != filter_obj.richtung:
+                continue
 
-                if filter_obj.datum_bis and email_obj.gesendet_am:
-                    if email_obj.gesendet_am.date() > filter_obj.datum_bis:
-                        continue
+            if filter_obj.datum_von and email_obj.gesendet_am:
+                if email_obj.gesendet_am.date() < filter_obj.datum_von:
+                    continue
+
+            if filter_obj.datum_bis and email_obj.gesendet_am:
+                if email_obj.gesendet_am.date() > filter_obj.datum_bis:
+                    continue
 
-            emails.append(email_obj)
+        emails.append(email_obj)
 
     # Sortieren
     sortierung = filter_obj.sortierung if filter_obj else "datum_desc"
@@ -46899,6 +47427,16 @@ def suche_emails(suchbegriff: str, user_id: str, nur_eigene: bool = True) -> Lis
     ergebnisse = []
     such = suchbegriff.lower()
 
+    # Volltextindex: nur Treffer laden statt alle E-Mails zu durchsuchen
+    treffer = volltext_ids(st.session_state.importierte_emails, suchbegriff)
+    if treffer is not None:
+        for email_id in treffer:
+            email_obj = st.session_state.importierte_emails.get(email_id)
+            if email_obj and (not nur_eigene or email_obj.user_id == user_id):
+                ergebnisse.append(email_obj)
+        ergebnisse.sort(key=lambda e: e.gesendet_am or e.importiert_am, reverse=True)
+        return ergebnisse
+
     for email_obj in st.session_state.importierte_emails.values():
         # Nur eigene E-Mails oder alle
         if nur_eigene and email_obj.user_id != user_id:
@@ -47188,6 +47726,7 @@ def render_emailverkehr_smart_folder(akte_id: str, user_id: str):
                 with col2:
                     if st.button("➕ Zuordnen", key=f"assign_{email_obj.email_id}"):
                         email_obj.akte_id = akte_id
+                        reindex_entry(st.session_state.importierte_emails, email_obj.email_id)
                         email_obj.status = EmailStatus.ZUGEORDNET.value
                         st.success("✅ Zugeordnet!")
                         st.rerun()
@@ -47323,6 +47862,8 @@ def _render_email_card(email_obj: ImportierteEmail, akte_id: str, user_id: str):
             if neuer_tag and st.button("➕", key=f"add_tag_{email_obj.email_id}"):
                 if neuer_tag not in email_obj.tags:
                     email_obj.tags.append(neuer_tag)
+                    # Tags sind volltextindiziert - direkte Änderung nachziehen
+                    reindex_entry(st.session_state.importierte_emails, email_obj.email_id)
                     st.rerun()
 
         with col2:
@@ -47397,6 +47938,7 @@ def render_notar_email_import_view(user_id: str):
                 if bulk_akte and st.button("➕ Alle zuordnen", key="bulk_assign"):
                     for email_obj in nicht_zugeordnet:
                         email_obj.akte_id = bulk_akte
+                        reindex_entry(st.session_state.importierte_emails, email_obj.email_id)
                         email_obj.status = EmailStatus.ZUGEORDNET.value
                     st.success(f"✅ {len(nicht_zugeordnet)} E-Mails zugeordnet!")
                     st.rerun()
@@ -47421,6 +47963,7 @@ def render_notar_email_import_view(user_id: str):
                                 st.info(f"💡 Vorschlag: {akte.bezeichnung} ({email_obj.zuordnung_konfidenz:.0%})")
                                 if st.button("✓ Übernehmen", key=f"accept_{email_obj.email_id}"):
                                     email_obj.akte_id = email_obj.zuordnung_vorschlag_akte
+                                    reindex_entry(st.session_state.importierte_emails, email_obj.email_id)
                                     email_obj.status = EmailStatus.ZUGEORDNET.value
                                     st.rerun()
 
@@ -47436,6 +47979,7 @@ def render_notar_email_import_view(user_id: str):
                         if st.button("➕", key=f"assign_single_{email_obj.email_id}"):
                             if single_akte:
                                 email_obj.akte_id = single_akte
+                                reindex_entry(st.session_state.importierte_emails, email_obj.email_id)
                                 email_obj.status = EmailStatus.ZUGEORDNET.value
                                 st.success("✅ Zugeordnet!")
                                 st.rerun()
@@ -47555,11 +48099,10 @@ def vdr_audit_log(deal_id: str, user_id: str, aktion: str, objekt_typ: str = "",
 
     # Gruppen-Snapshot für den User zum Zeitpunkt des Events
     gruppen_snapshot = []
-    for gm in st.session_state.vdr_gruppenmitgliedschaften.values():
-        if gm.user_id == user_id:
-            gruppe = st.session_state.vdr_gruppen.get(gm.gruppe_id)
-            if gruppe and gruppe.deal_id == deal_id:
-                gruppen_snapshot.append(gm.gruppe_id)
+    for gm in find_by(st.session_state.vdr_gruppenmitgliedschaften, 'user_id', user_id):
+        gruppe = st.session_state.vdr_gruppen.get(gm.gruppe_id)
+        if gruppe and gruppe.deal_id == deal_id:
+            gruppen_snapshot.append(gm.gruppe_id)
 
     event = VDRAuditEvent(
         event_id=str(uuid.uuid4())[:8],
@@ -47595,20 +48138,19 @@ def vdr_pruefe_nda_status(deal_id: str, user_id: str) -> bool:
     ]
 
     ist_kaeufer = False
-    for gm in st.session_state.vdr_gruppenmitgliedschaften.values():
-        if gm.user_id == user_id:
-            gruppe = st.session_state.vdr_gruppen.get(gm.gruppe_id)
-            if gruppe and gruppe.deal_id == deal_id and gruppe.typ in kaeufer_gruppen_typen:
-                ist_kaeufer = True
-                break
+    for gm in find_by(st.session_state.vdr_gruppenmitgliedschaften, 'user_id', user_id):
+        gruppe = st.session_state.vdr_gruppen.get(gm.gruppe_id)
+        if gruppe and gruppe.deal_id == deal_id and gruppe.typ in kaeufer_gruppen_typen:
+            ist_kaeufer = True
+            break
 
     # Wenn kein Käufer, NDA nicht erforderlich
     if not ist_kaeufer:
         return True
 
     # Prüfe NDA-Status
-    for nda in st.session_state.vdr_nda_anerkennungen.values():
-        if nda.deal_id == deal_id and nda.user_id == user_id:
+    for nda in find_by(st.session_state.vdr_nda_anerkennungen, 'user_id', user_id):
+        if nda.deal_id == deal_id:
             if nda.status == VDRNDAStatus.ACCEPTED.value:
                 return True
 
@@ -47623,16 +48165,15 @@ def vdr_get_user_berechtigungen(deal_id: str, user_id: str) -> List[str]:
     berechtigungen = set()
 
     # 1. Individuelle Mitgliedschaft prüfen
-    for mitgliedschaft in st.session_state.vdr_mitgliedschaften.values():
-        if mitgliedschaft.deal_id == deal_id and mitgliedschaft.user_id == user_id:
+    for mitgliedschaft in find_by(st.session_state.vdr_mitgliedschaften, 'user_id', user_id):
+        if mitgliedschaft.deal_id == deal_id:
             berechtigungen.update(mitgliedschaft.berechtigungen)
 
     # 2. Gruppen-Berechtigungen prüfen
-    for gm in st.session_state.vdr_gruppenmitgliedschaften.values():
-        if gm.user_id == user_id:
-            gruppe = st.session_state.vdr_gruppen.get(gm.gruppe_id)
-            if gruppe and gruppe.deal_id == deal_id:
-                berechtigungen.update(gruppe.standard_berechtigungen)
+    for gm in find_by(st.session_state.vdr_gruppenmitgliedschaften, 'user_id', user_id):
+        gruppe = st.session_state.vdr_gruppen.get(gm.gruppe_id)
+        if gruppe and gruppe.deal_id == deal_id:
+            berechtigungen.update(gruppe.standard_berechtigungen)
 
     return list(berechtigungen)
 
@@ -47914,10 +48455,7 @@ def vdr_suche(deal_id: str, user_id: str, suchbegriff: str) -> List[VDRDokument]
     ergebnisse = []
     such = suchbegriff.lower()
 
-    for dok in st.session_state.vdr_dokumente.values():
-        if dok.deal_id != deal_id:
-            continue
-
+    for dok in find_by(st.session_state.vdr_dokumente, 'deal_id', deal_id):
         # Suche in Titel, Beschreibung, Tags
         if (such in dok.titel.lower() or
             such in dok.beschreibung.lower() or
@@ -48013,21 +48551,15 @@ def render_vdr_dashboard(user_id: str, projekt_id: str = ""):
 
     # Deals für diesen User finden
     user_deals = []
+    mitglied_deal_ids = {m.deal_id for m in find_by(st.session_state.vdr_mitgliedschaften, 'user_id', user_id)}
+    for gm in find_by(st.session_state.vdr_gruppenmitgliedschaften, 'user_id', user_id):
+        gruppe = st.session_state.vdr_gruppen.get(gm.gruppe_id)
+        if gruppe:
+            mitglied_deal_ids.add(gruppe.deal_id)
     for deal in st.session_state.vdr_deals.values():
-        # Prüfe ob User Mitglied ist
-        for mitglied in st.session_state.vdr_mitgliedschaften.values():
-            if mitglied.deal_id == deal.deal_id and mitglied.user_id == user_id:
-                user_deals.append(deal)
-                break
-        else:
-            # Prüfe Gruppenmitgliedschaft
-            for gm in st.session_state.vdr_gruppenmitgliedschaften.values():
-                if gm.user_id == user_id:
-                    gruppe = st.session_state.vdr_gruppen.get(gm.gruppe_id)
-                    if gruppe and gruppe.deal_id == deal.deal_id:
-                        if deal not in user_deals:
-                            user_deals.append(deal)
-                        break
+        # Prüfe ob User (direkt oder über eine Gruppe) Mitglied ist
+        if deal.deal_id in mitglied_deal_ids:
+            user_deals.append(deal)
 
     # Wenn projekt_id angegeben, nach passenden Deals filtern
     if projekt_id:
@@ -48156,13 +48688,13 @@ def render_vdr_dokumente_tab(deal: VDRDeal, user_id: str, berechtigungen: List[s
         return
 
     # Ordnerstruktur anzeigen
-    ordner_liste = [o for o in st.session_state.vdr_ordner.values() if o.deal_id == deal.deal_id]
+    ordner_liste = find_by(st.session_state.vdr_ordner, 'deal_id', deal.deal_id)
     ordner_liste.sort(key=lambda o: o.sort_order)
 
     for ordner in ordner_liste:
         # Dokumente in diesem Ordner
-        ordner_docs = [d for d in st.session_state.vdr_dokumente.values()
-                      if d.deal_id == deal.deal_id and d.ordner_id == ordner.ordner_id]
+        ordner_docs = [d for d in find_by(st.session_state.vdr_dokumente, 'deal_id', deal.deal_id)
+                      if d.ordner_id == ordner.ordner_id]
 
         with st.expander(f"📁 {ordner.name} ({len(ordner_docs)})", expanded=False):
             if ordner_docs:
@@ -48230,7 +48762,7 @@ def render_vdr_qa_tab(deal: VDRDeal, user_id: str, berechtigungen: List[str]):
                         st.error("Bitte geben Sie eine Frage ein.")
 
     # Threads anzeigen
-    threads = [t for t in st.session_state.vdr_qa_threads.values() if t.deal_id == deal.deal_id]
+    threads = find_by(st.session_state.vdr_qa_threads, 'deal_id', deal.deal_id)
     threads.sort(key=lambda t: t.zuletzt_aktualisiert, reverse=True)
 
     # Status-Filter
@@ -48247,8 +48779,7 @@ def render_vdr_qa_tab(deal: VDRDeal, user_id: str, berechtigungen: List[str]):
 
     for thread in filtered_threads:
         # Nachrichten des Threads
-        nachrichten = [n for n in st.session_state.vdr_qa_nachrichten.values()
-                      if n.thread_id == thread.thread_id]
+        nachrichten = find_by(st.session_state.vdr_qa_nachrichten, 'thread_id', thread.thread_id)
         nachrichten.sort(key=lambda n: n.erstellt_am)
 
         frage = next((n for n in nachrichten if n.art == "question"), None)
@@ -48304,7 +48835,7 @@ def render_vdr_upload_tab(deal: VDRDeal, user_id: str):
     st.markdown("### Dokument hochladen")
 
     # Ordner-Auswahl
-    ordner_liste = [o for o in st.session_state.vdr_ordner.values() if o.deal_id == deal.deal_id]
+    ordner_liste = find_by(st.session_state.vdr_ordner, 'deal_id', deal.deal_id)
     ordner_liste.sort(key=lambda o: o.sort_order)
 
     ordner_optionen = {o.ordner_id: o.name for o in ordner_liste}
@@ -48343,7 +48874,7 @@ def render_vdr_berechtigungen_tab(deal: VDRDeal, user_id: str):
     st.markdown("### Berechtigungen")
 
     # Gruppen anzeigen
-    gruppen = [g for g in st.session_state.vdr_gruppen.values() if g.deal_id == deal.deal_id]
+    gruppen = find_by(st.session_state.vdr_gruppen, 'deal_id', deal.deal_id)
 
     for gruppe in gruppen:
         with st.expander(f"👥 {gruppe.name}", expanded=False):
@@ -48353,8 +48884,7 @@ def render_vdr_berechtigungen_tab(deal: VDRDeal, user_id: str):
                 st.markdown(f"• {perm}")
 
             # Mitglieder dieser Gruppe
-            mitglieder = [gm for gm in st.session_state.vdr_gruppenmitgliedschaften.values()
-                         if gm.gruppe_id == gruppe.gruppe_id]
+            mitglieder = find_by(st.session_state.vdr_gruppenmitgliedschaften, 'gruppe_id', gruppe.gruppe_id)
             st.markdown(f"**Mitglieder ({len(mitglieder)}):**")
             for gm in mitglieder:
                 user = st.session_state.users.get(gm.user_id)
@@ -48370,7 +48900,7 @@ def render_vdr_mitglieder_tab(deal: VDRDeal, user_id: str):
     user_optionen = {u.user_id: f"{u.name} ({u.rolle})" for u in all_users}
 
     # Gruppen zur Auswahl
-    gruppen = [g for g in st.session_state.vdr_gruppen.values() if g.deal_id == deal.deal_id]
+    gruppen = find_by(st.session_state.vdr_gruppen, 'deal_id', deal.deal_id)
     gruppen_optionen = {g.gruppe_id: g.name for g in gruppen}
 
     with st.form(f"add_member_{deal.deal_id}"):
@@ -48382,8 +48912,8 @@ def render_vdr_mitglieder_tab(deal: VDRDeal, user_id: str):
 
         if st.form_submit_button("Hinzufügen"):
             # Prüfen ob bereits Mitglied
-            existiert = any(gm.user_id == selected_user and gm.gruppe_id == selected_gruppe
-                          for gm in st.session_state.vdr_gruppenmitgliedschaften.values())
+            existiert = any(gm.gruppe_id == selected_gruppe
+                          for gm in find_by(st.session_state.vdr_gruppenmitgliedschaften, 'user_id', selected_user))
             if existiert:
                 st.warning("Benutzer ist bereits Mitglied dieser Gruppe")
             else:
@@ -48476,8 +49006,10 @@ try:
     from modules.loeschungsbewilligungen import (
         LBCase, LBCaseStatus, LBDocumentType, LBOrgRole,
         LBExcelImporter, LBImportResult, LBImportError,
-        LBDocumentGenerator, LBGenerationResult,
+        LBDocumentGenerator, LBGenerationResult, generate_batch_parallel,
+        LBPdfConverter,
     )
+    from modules.loeschungsbewilligungen.docgen import find_soffice
     from modules.loeschungsbewilligungen.excel_import import create_import_template, get_available_fields
     LB_MODULE_AVAILABLE = True
 except ImportError:
@@ -48702,8 +49234,8 @@ def _render_lb_excel_import():
     st.markdown("---")
 
     uploaded_file = st.file_uploader(
-        "Excel-Datei hochladen",
-        type=["xlsx", "xls"],
+        "Excel- oder CSV-Datei hochladen",
+        type=["xlsx", "xls", "csv"],
         key="lb_excel_upload"
     )
 
@@ -48713,8 +49245,16 @@ def _render_lb_excel_import():
         if LB_MODULE_AVAILABLE:
             try:
                 from uuid import uuid4
-                org_id = uuid4()  # Demo-Organisation
-                importer = LBExcelImporter(org_id)
+
+                # Importer je Upload über Reruns behalten - die Datei wird nur einmal eingelesen
+                upload_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+                gespeichert = st.session_state.get("lb_excel_importer")
+                if gespeichert and gespeichert[0] == upload_id:
+                    importer = gespeichert[1]
+                else:
+                    org_id = uuid4()  # Demo-Organisation
+                    importer = LBExcelImporter(org_id)
+                    st.session_state["lb_excel_importer"] = (upload_id, importer)
 
                 # Vorschau laden
                 preview = importer.preview(uploaded_file)
@@ -48727,25 +49267,33 @@ def _render_lb_excel_import():
                         st.caption(f"✓ {excel_col} → {target_field}")
 
                 # Datenvorschau
-                st.markdown(f"**Vorschau ({preview['total_rows']} Zeilen):**")
+                zeilen_text = f"ca. {preview['total_rows']}" if preview.get("total_rows_geschaetzt") else preview["total_rows"]
+                st.markdown(f"**Vorschau ({zeilen_text} Zeilen):**")
                 import pandas as pd
                 df_preview = pd.DataFrame(preview["preview_data"])
                 st.dataframe(df_preview, use_container_width=True, height=200)
 
                 # Import-Button
                 if st.button("📊 Daten importieren", type="primary"):
-                    # Datei neu laden für Import
-                    uploaded_file.seek(0)
-                    result = importer.import_data(uploaded_file)
+                    # Die von preview() geöffnete Datei wird weiterverwendet (kein zweites
+                    # Einlesen). Fälle nur bei fehlerfreiem Import übernehmen - ein
+                    # erneuter Versuch nach Fehlern legt so keine Fälle doppelt an
+                    with st.spinner("Importiere Daten..."):
+                        result = importer.import_data()
 
-                    if result.success:
-                        st.success(f"✅ {result.imported_count} Fälle erfolgreich importiert!")
+                    # Datei-Bytes und DataFrames nicht über den Import hinaus im Session State halten
+                    importer.close()
+                    st.session_state.pop("lb_excel_importer", None)
 
-                        # In Session State speichern
+                    if result.success:
                         for case in result.cases:
                             st.session_state.lb_cases[str(case.id)] = case.to_dict()
+                        st.success(f"✅ {result.imported_count} Fälle erfolgreich importiert!")
                     else:
-                        st.error(f"❌ Import fehlgeschlagen: {len(result.errors)} Fehler")
+                        st.error(
+                            f"❌ Import fehlgeschlagen: 0 importiert, {result.error_count} Fehler "
+                            f"({result.imported_count} Zeilen wären gültig gewesen)"
+                        )
                         for error in result.errors[:5]:
                             st.error(str(error))
 
@@ -49078,6 +49626,102 @@ def _render_lb_dokumente_generieren():
                     )
 
 
+    st.markdown("---")
+    _render_lb_batch_generierung(cases)
+
+
+def _lb_case_aus_dict(case: dict) -> "LBCase":
+    """Wandelt einen Fall aus dem Session State in ein LBCase um."""
+    daten = dict(case)
+    # Demo-Fälle haben verkürzte IDs und 'lfd_nr' statt 'laufende_nummer'
+    try:
+        uuid.UUID(str(daten.get('id')))
+    except ValueError:
+        daten.pop('id', None)
+    daten.setdefault('laufende_nummer', daten.get('lfd_nr'))
+    for feld in ('recht_betrag', 'abloesebetrag'):
+        wert = daten.get(feld)
+        if isinstance(wert, str):
+            wert = wert.replace('€', '').replace('EUR', '').strip()
+            if ',' in wert:
+                wert = wert.replace('.', '').replace(',', '.')
+            try:
+                daten[feld] = float(wert) if wert else None
+            except ValueError:
+                daten[feld] = None
+    if daten.get('status') not in {s.value for s in LBCaseStatus}:
+        daten['status'] = LBCaseStatus.ENTWURF.value
+    return LBCase.from_dict(daten)
+
+
+def _render_lb_batch_generierung(cases: list):
+    """Batch-Generierung aller Fälle aus einer DOCX-Vorlage als ZIP."""
+    st.markdown("### Batch: alle Fälle als ZIP")
+
+    if not LB_MODULE_AVAILABLE:
+        st.info("Batch-Generierung benötigt docxtpl (pip install docxtpl).")
+        return
+
+    vorlage = st.file_uploader(
+        "DOCX-Vorlage für alle Fälle",
+        type=["docx"],
+        key="lb_batch_template"
+    )
+
+    soffice_verfuegbar = find_soffice() is not None
+    als_pdf = st.checkbox(
+        "Zusätzlich als PDF (LibreOffice)",
+        value=soffice_verfuegbar,
+        disabled=not soffice_verfuegbar,
+        help=None if soffice_verfuegbar else "LibreOffice ist auf dem Server nicht installiert.",
+        key="lb_batch_pdf"
+    )
+
+    if vorlage and st.button(f"📦 {len(cases)} Dokumente generieren", use_container_width=True):
+        progress_bar = st.progress(0.0)
+
+        def _fortschritt(fertig: int, gesamt: int):
+            progress_bar.progress(fertig / gesamt, text=f"{fertig} / {gesamt} Dokumente")
+
+        converter = LBPdfConverter() if als_pdf else None
+        try:
+            batch = generate_batch_parallel(
+                [_lb_case_aus_dict(c) for c in cases],
+                vorlage.getvalue(),
+                progress_callback=_fortschritt,
+                pdf_converter=converter,
+            )
+        except Exception as e:
+            progress_bar.empty()
+            st.error(f"Vorlage konnte nicht verarbeitet werden: {e}")
+            return
+        finally:
+            if converter is not None:
+                converter.close()
+
+        progress_bar.empty()
+        pdf_fehler = [r for r in batch.results if r.pdf_error_message]
+        if pdf_fehler:
+            st.warning(f"{len(pdf_fehler)} PDFs konnten nicht erzeugt werden (DOCX ist im ZIP enthalten).")
+        if batch.error_count:
+            st.warning(f"{batch.success_count} Dokumente generiert, {batch.error_count} fehlgeschlagen.")
+            with st.expander("Fehler anzeigen"):
+                for result in batch.results:
+                    if not result.success:
+                        st.text(f"{result.case_id}: {result.error_message}")
+        else:
+            st.success(f"✅ {batch.success_count} Dokumente generiert!")
+
+        with batch.zip_file:
+            st.download_button(
+                "📥 Alle Dokumente als ZIP herunterladen",
+                data=batch.zip_file.read(),
+                file_name=f"Loeschungsbewilligungen_{datetime.now().strftime('%Y%m%d')}.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+
+
 def _generate_lb_demo_document(case: dict, template_type: str) -> str:
     """Generiert ein Demo-Dokument als Text."""
 
@@ -49581,4 +50225,9 @@ def main():
             st.error("Unbekannte Rolle")
 
 if __name__ == "__main__":
-    main()
+    if DATABASE_AVAILABLE:
+        # Pool-Verbindung der Request-Session nach jedem Run freigeben
+        with db_request_scope():
+            main()
+    else:
+        main()